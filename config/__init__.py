@@ -1,9 +1,30 @@
+import importlib
 from .settings import Settings
-from .ad_patterns import AdPatterns
-from .browser_config import BrowserConfig
+
+# browser_config тянет Selenium; отчётам и анализу достаточно Settings
+_LAZY_EXPORTS = {
+    'AdPatterns': '.ad_patterns',
+    'BrowserConfig': '.browser_config',
+    'RuleRegistry': '.rule_packs',
+    'CompiledRules': '.rule_packs',
+    'RulePackError': '.rule_packs',
+    'UserAgentPool': '.user_agents'
+}
 
 __all__ = [
     'Settings',
     'AdPatterns',
-    'BrowserConfig'
-]
\ No newline at end of file
+    'BrowserConfig',
+    'RuleRegistry',
+    'CompiledRules',
+    'RulePackError',
+    'UserAgentPool'
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
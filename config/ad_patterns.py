@@ -1,5 +1,10 @@
 class AdPatterns:
-    """Паттерны для обнаружения рекламных элементов"""
+    """
+    Встроенные паттерны для обнаружения рекламных элементов
+
+    Рабочие правила загружаются из пакетов config/rules (см. config.rule_packs);
+    эти константы используются как запасной вариант, если пакетов нет.
+    """
     # Рекламные сети и домены
     AD_NETWORKS = {
         # 'google_ads': [
@@ -53,6 +58,13 @@ class AdPatterns:
         # ]
     }
     
+    # Классы/ID для определения сети найденного элемента
+    NETWORK_ATTRIBUTION = {
+        'google_ads': ['adsbygoogle'],
+        'yandex_ads': ['yandex_rtb_', 'adfox_'],
+        'meta_ads': ['fb-ad']
+    }
+    
     # HTML классы и атрибуты рекламы
     AD_CLASS_PATTERNS = [
         'yandex_rtb_',
@@ -1,31 +1,55 @@
 from selenium.webdriver.chrome.options import Options
 from .settings import Settings
-from fake_useragent import UserAgent
+from .user_agents import UserAgentPool
 
 class BrowserConfig:
     @staticmethod
-    def get_chrome_options(config: Settings):
-        options = Options()
+    def get_user_agent(config: Settings, domain=None):
+        """User-Agent из общего пула; закреплённый за доменом при USER_AGENT_PIN_PER_DOMAIN"""
+        pinned = domain if config.USER_AGENT_PIN_PER_DOMAIN is True else None
+        return UserAgentPool.get(config).pick(pinned)
+
+    @staticmethod
+    def get_chrome_arguments(config: Settings, user_data_dir=None, domain=None):
+        """Аргументы командной строки Chrome, общие для WebDriver и CDP"""
+        arguments = []
+
+        if user_data_dir:
+            arguments.append(f"--user-data-dir={user_data_dir}")
+
+        # Без мастера первого запуска и фоновой загрузки компонентов
+        arguments.append("--no-first-run")
+        arguments.append("--no-default-browser-check")
+        arguments.append("--disable-component-update")
 
         if config.HEADLESS:
-            options.add_argument("--headless=new")
-
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-        options.add_argument(f"--window-size={config.WIDTH_WINDOW},{config.HEIGHT_WINDOW}")
-        options.add_argument(f"user-agent={UserAgent().random}")
-        options.add_argument("--disable-features=VizDisplayCompositor")
-        options.add_argument("--disable-background-timer-throttling")
-        options.add_argument("--disable-backgrounding-occluded-windows")
-        options.add_argument("--disable-renderer-backgrounding")
+            arguments.append("--headless=new")
+
+        arguments.append("--no-sandbox")
+        arguments.append("--disable-dev-shm-usage")
+        arguments.append("--disable-gpu")
+        arguments.append(f"--window-size={config.WIDTH_WINDOW},{config.HEIGHT_WINDOW}")
+        arguments.append(f"user-agent={BrowserConfig.get_user_agent(config, domain)}")
+        arguments.append("--disable-features=VizDisplayCompositor")
+        arguments.append("--disable-background-timer-throttling")
+        arguments.append("--disable-backgrounding-occluded-windows")
+        arguments.append("--disable-renderer-backgrounding")
+        
+        arguments.append("--disable-blink-features=AutomationControlled")
+        
+        arguments.append("--memory-pressure-off")
+        arguments.append("--max_old_space_size=1024")
+        
+        return arguments
+
+    @staticmethod
+    def get_chrome_options(config: Settings, user_data_dir=None, domain=None):
+        options = Options()
+
+        for argument in BrowserConfig.get_chrome_arguments(config, user_data_dir, domain):
+            options.add_argument(argument)
         
-        options.add_argument("--disable-blink-features=AutomationControlled")
         options.add_experimental_option("excludeSwitches", ["enable-automation"])
         options.add_experimental_option('useAutomationExtension', False)
         
-        options.add_argument("--memory-pressure-off")
-        options.add_argument("--max_old_space_size=1024")
-        
-        return options
-    
\ No newline at end of file
+        return options
\ No newline at end of file
@@ -0,0 +1,372 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import threading
+from pathlib import Path
+from .settings import Settings
+from .ad_patterns import AdPatterns
+
+COMPILER_VERSION = 2
+
+PACK_KINDS = ('common', 'network', 'site')
+LIST_FIELDS = ('domains', 'class_patterns', 'id_patterns', 'data_attributes', 'keywords', 'script_patterns')
+
+
+class RulePackError(ValueError):
+    """Ошибка валидации пакета правил"""
+
+
+class CompiledRules:
+    """
+    Неизменяемый скомпилированный набор правил обнаружения
+
+    Экземпляр никогда не меняется после компиляции: горячая перезагрузка
+    подменяет ссылку в RuleRegistry, а текущие сканирования продолжают
+    работать со своим снимком.
+    """
+
+    def __init__(self, packs, version, site_packs=None):
+        self.version = version
+        self.pack_names = tuple(pack['name'] for pack in packs)
+
+        self.class_patterns = self._union(packs, 'class_patterns')
+        self.id_patterns = self._union(packs, 'id_patterns')
+        self.data_attributes = self._union(packs, 'data_attributes')
+        self.keywords = self._union(packs, 'keywords')
+        self.script_patterns = self._union(packs, 'script_patterns')
+        self.standard_sizes = tuple(dict.fromkeys(
+            tuple(size) for pack in packs for size in pack.get('standard_sizes', [])
+        ))
+
+        # Сети: (имя, confidence, регулярка по доменам и URL)
+        self.networks = tuple(
+            (pack['name'], float(pack.get('confidence', 0.8)), regex)
+            for pack in packs if pack['kind'] == 'network'
+            for regex in [self._alternation(pack.get('domains', []), escape=False)]
+            if regex is not None
+        )
+        # Атрибуция по классам/ID: сначала сети с большей уверенностью,
+        # при равенстве — в порядке пакетов
+        self.attribution = tuple(sorted(
+            (
+                (pack['name'], float(pack.get('attribution_confidence', pack.get('confidence', 0.8))), regex)
+                for pack in packs if pack['kind'] == 'network'
+                for regex in [self._alternation(pack.get('class_patterns', []) + pack.get('id_patterns', []))]
+                if regex is not None
+            ),
+            key=lambda item: -item[1]
+        ))
+
+        self.element_selector = ", ".join(
+            [f"[class*='{p}']" for p in self.class_patterns] + [f"[id*='{p}']" for p in self.id_patterns]
+        )
+        self.attribute_selector = ", ".join(f"[{attr}]" for attr in self.data_attributes)
+
+        self._site_rules = {}
+        for site_pack in site_packs or []:
+            merged = CompiledRules(list(packs) + [site_pack], f"{version}+{site_pack['name']}")
+            for domain in site_pack['sites']:
+                self._site_rules[domain] = merged
+
+    @staticmethod
+    def _union(packs, field):
+        return tuple(dict.fromkeys(item for pack in packs for item in pack.get(field, [])))
+
+    @staticmethod
+    def _alternation(patterns, escape=True):
+        if not patterns:
+            return None
+        parts = [re.escape(p) if escape else p for p in patterns]
+        return re.compile("|".join(f"(?:{p})" for p in parts), re.IGNORECASE)
+
+    def for_domain(self, domain):
+        """Правила с учётом пакета сайта (домен и его родительские домены)"""
+        if not domain or not self._site_rules:
+            return self
+        labels = domain.lower().split('.')
+        for i in range(len(labels) - 1):
+            rules = self._site_rules.get('.'.join(labels[i:]))
+            if rules:
+                return rules
+        return self
+
+    def __repr__(self):
+        return f"CompiledRules(version={self.version[:12]}, packs={list(self.pack_names)})"
+
+
+class RulePackLoader:
+    """Загрузка, валидация и компиляция пакетов правил из JSON файлов"""
+
+    def __init__(self, rules_dir, cache_dir=None):
+        self.rules_dir = Path(rules_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.logger = logging.getLogger(__name__)
+
+    def list_files(self):
+        if not self.rules_dir.is_dir():
+            return []
+        return sorted(self.rules_dir.rglob('*.json'))
+
+    def fingerprint(self, files=None):
+        """Быстрый отпечаток каталога (пути, размеры, mtime) для опроса изменений"""
+        files = self.list_files() if files is None else files
+        return tuple((str(f), f.stat().st_size, f.stat().st_mtime_ns) for f in files)
+
+    def content_hash(self, files):
+        digest = hashlib.sha256(f"compiler:{COMPILER_VERSION}".encode())
+        for path in files:
+            digest.update(str(path.relative_to(self.rules_dir)).encode())
+            digest.update(path.read_bytes())
+        return digest.hexdigest()
+
+    def load(self):
+        """
+        Загрузка скомпилированных правил: из дискового кэша по хешу содержимого
+        или с компиляцией. Без файлов правил используются встроенные AdPatterns.
+
+        Returns:
+            CompiledRules
+        """
+        files = self.list_files()
+        if not files:
+            self.logger.warning(f"Пакеты правил не найдены в {self.rules_dir}, используются встроенные паттерны")
+            return self.compile_packs(self.legacy_packs(), 'legacy')
+
+        version = self.content_hash(files)
+        cached = self._read_cache(version)
+        if cached is not None:
+            return cached
+
+        packs = [self.validate(self._read_json(path), path) for path in files]
+        rules = self.compile_packs(packs, version)
+        self._write_cache(version, rules)
+        return rules
+
+    def compile_packs(self, packs, version):
+        enabled = [p for p in packs if p.get('enabled', True)]
+        base = [p for p in enabled if p['kind'] != 'site']
+        sites = [p for p in enabled if p['kind'] == 'site']
+        rules = CompiledRules(base, version, sites)
+        self.logger.info(f"Пакеты правил скомпилированы: {rules}")
+        return rules
+
+    @staticmethod
+    def _read_json(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except json.JSONDecodeError as e:
+            raise RulePackError(f"{path}: invalid JSON: {e}") from e
+
+    @staticmethod
+    def validate(pack, source='<pack>'):
+        """Проверка структуры пакета; RulePackError с указанием файла и поля"""
+        if not isinstance(pack, dict):
+            raise RulePackError(f"{source}: pack must be a JSON object")
+        if not isinstance(pack.get('name'), str) or not pack['name']:
+            raise RulePackError(f"{source}: 'name' is required")
+        if pack.get('kind') not in PACK_KINDS:
+            raise RulePackError(f"{source}: 'kind' must be one of {PACK_KINDS}")
+
+        for field in LIST_FIELDS:
+            values = pack.get(field, [])
+            if not isinstance(values, list) or not all(isinstance(v, str) and v for v in values):
+                raise RulePackError(f"{source}: '{field}' must be a list of non-empty strings")
+            if field in ('class_patterns', 'id_patterns') and any("'" in v or '\\' in v for v in values):
+                raise RulePackError(f"{source}: '{field}' must not contain quotes or backslashes")
+
+        for field in ('domains',):
+            for value in pack.get(field, []):
+                try:
+                    re.compile(value)
+                except re.error as e:
+                    raise RulePackError(f"{source}: bad pattern in '{field}': {value} ({e})") from e
+
+        for size in pack.get('standard_sizes', []):
+            if (not isinstance(size, list) or len(size) != 2
+                    or not all(isinstance(v, int) and v > 0 for v in size)):
+                raise RulePackError(f"{source}: 'standard_sizes' items must be [width, height]")
+
+        for field in ('confidence', 'attribution_confidence'):
+            confidence = pack.get(field, 0.8)
+            if not isinstance(confidence, (int, float)) or not 0 <= confidence <= 1:
+                raise RulePackError(f"{source}: '{field}' must be within [0, 1]")
+
+        if pack['kind'] == 'site':
+            sites = pack.get('sites')
+            if not isinstance(sites, list) or not sites:
+                raise RulePackError(f"{source}: site pack requires a non-empty 'sites' list")
+
+        return pack
+
+    @staticmethod
+    def legacy_packs():
+        """Пакеты из встроенных констант AdPatterns"""
+        packs = [{
+            'name': 'legacy',
+            'kind': 'common',
+            'class_patterns': list(AdPatterns.AD_CLASS_PATTERNS),
+            'id_patterns': list(AdPatterns.AD_ID_PATTERNS),
+            'data_attributes': list(AdPatterns.AD_DATA_ATTRIBUTES),
+            'keywords': list(AdPatterns.AD_KEYWORDS),
+            'script_patterns': list(AdPatterns.AD_SCRIPT_PATTERNS),
+            'standard_sizes': [list(size) for size in AdPatterns.STANDARD_AD_SIZES],
+        }]
+        for network, domains in AdPatterns.AD_NETWORKS.items():
+            packs.append({
+                'name': network,
+                'kind': 'network',
+                'confidence': 0.9 if network == 'yandex_ads' else 0.8,
+                'domains': list(domains),
+                'class_patterns': list(AdPatterns.NETWORK_ATTRIBUTION.get(network, [])),
+            })
+        # Сети, закомментированные в AD_NETWORKS, отключены: ни поиска, ни атрибуции
+        for network, patterns in AdPatterns.NETWORK_ATTRIBUTION.items():
+            if network not in AdPatterns.AD_NETWORKS:
+                packs.append({
+                    'name': network,
+                    'kind': 'network',
+                    'enabled': False,
+                    'attribution_confidence': 0.9 if network == 'google_ads' else 0.8,
+                    'class_patterns': list(patterns)
+                })
+        return packs
+
+    def _cache_path(self, version):
+        return self.cache_dir / f"rules_{version}.pickle"
+
+    def _read_cache(self, version):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._cache_path(version), 'rb') as f:
+                rules = pickle.load(f)
+            self.logger.debug(f"Compiled rules loaded from cache: {version[:12]}")
+            return rules
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.debug(f"Compiled rules cache unreadable: {str(e)}")
+            return None
+
+    def _write_cache(self, version, rules):
+        if not self.cache_dir:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._cache_path(version).with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(rules, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._cache_path(version))
+            for stale in self.cache_dir.glob('rules_*.pickle'):
+                if stale != self._cache_path(version):
+                    stale.unlink(missing_ok=True)
+        except Exception as e:
+            self.logger.debug(f"Compiled rules cache not written: {str(e)}")
+
+
+class RuleRegistry:
+    """
+    Процессный реестр текущих правил с атомарной горячей заменой
+
+    current() возвращает снимок CompiledRules; reload_if_changed() и фоновый
+    наблюдатель подменяют ссылку целиком, не трогая выданные ранее снимки.
+    """
+
+    _lock = threading.Lock()
+    _current = None
+    _fingerprint = None
+    _loader = None
+    _watcher = None
+    _stop_event = None
+    logger = logging.getLogger(__name__)
+
+    @classmethod
+    def configure(cls, rules_dir=None, cache_dir=None):
+        """Переопределение каталогов и сброс текущего снимка"""
+        with cls._lock:
+            cls._loader = RulePackLoader(
+                rules_dir or Settings.RULES_DIR,
+                cache_dir if cache_dir is not None else Settings.CACHE_DIR
+            )
+            cls._current = None
+            cls._fingerprint = None
+
+    @classmethod
+    def _get_loader(cls):
+        if cls._loader is None:
+            cls._loader = RulePackLoader(Settings.RULES_DIR, Settings.CACHE_DIR)
+        return cls._loader
+
+    @classmethod
+    def current(cls):
+        """Текущий снимок правил (ленивая загрузка при первом обращении)"""
+        rules = cls._current
+        if rules is not None:
+            return rules
+        with cls._lock:
+            if cls._current is None:
+                loader = cls._get_loader()
+                cls._fingerprint = loader.fingerprint()
+                cls._current = loader.load()
+            return cls._current
+
+    @classmethod
+    def reload_if_changed(cls):
+        """
+        Перекомпиляция при изменении файлов правил
+
+        Невалидный пакет не ломает работу: ошибка логируется, остаётся
+        предыдущий снимок.
+
+        Returns:
+            bool: Был ли подменён снимок
+        """
+        loader = cls._get_loader()
+        fingerprint = loader.fingerprint()
+        if fingerprint == cls._fingerprint and cls._current is not None:
+            return False
+
+        try:
+            rules = loader.load()
+        except (RulePackError, OSError) as e:
+            cls.logger.error(f"Перезагрузка правил отклонена: {e}")
+            cls._fingerprint = fingerprint
+            return False
+
+        with cls._lock:
+            previous = cls._current
+            cls._current = rules
+            cls._fingerprint = fingerprint
+
+        changed = previous is None or previous.version != rules.version
+        if changed:
+            cls.logger.info(f"Правила обнаружения обновлены: {rules}")
+        return changed
+
+    @classmethod
+    def start_watching(cls, interval=None):
+        """Фоновый опрос каталога правил для долгоживущих воркеров"""
+        if cls._watcher and cls._watcher.is_alive():
+            return
+        interval = interval or Settings.RULES_RELOAD_INTERVAL
+        cls._stop_event = threading.Event()
+
+        def watch(stop_event):
+            while not stop_event.wait(interval):
+                try:
+                    cls.reload_if_changed()
+                except Exception as e:
+                    cls.logger.error(f"Ошибка опроса пакетов правил: {e}")
+
+        cls._watcher = threading.Thread(target=watch, args=(cls._stop_event,), name="rule-pack-watcher", daemon=True)
+        cls._watcher.start()
+
+    @classmethod
+    def stop_watching(cls):
+        if cls._stop_event:
+            cls._stop_event.set()
+        cls._watcher = None
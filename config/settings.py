@@ -6,11 +6,56 @@ class Settings:
     BASE_DIR = Path(__file__).parent.parent
     OUTPUT_DIR = BASE_DIR / "data" / "output"
     SCREENSHOT_DIR = OUTPUT_DIR / "screenshots"
+    CREATIVES_DIR = OUTPUT_DIR / "creatives"
+    LEGEND_DIR = SCREENSHOT_DIR / "legends"
     LOG_DIR = OUTPUT_DIR / "logs"
     COOKIES_DIR = OUTPUT_DIR / "cookies"
-    
-    for directory in [OUTPUT_DIR, SCREENSHOT_DIR, LOG_DIR, COOKIES_DIR]:
-        directory.mkdir(parents=True, exist_ok=True)
+    CACHE_DIR = OUTPUT_DIR / "cache"
+    REPORTS_DIR = OUTPUT_DIR / "reports"
+    SCAN_DATA_PATH = OUTPUT_DIR / "scan_data.jsonl"
+    DASHBOARD_DIR = REPORTS_DIR / "dashboard"
+    STARTUP_IMPORT_BUDGET_MS = 300  # импорт main и команд report/analyze
+
+    USER_AGENT_SOURCE = "bundled"  # "bundled" (config/user_agents.json) или "fake_useragent"
+    USER_AGENTS_PATH = BASE_DIR / "config" / "user_agents.json"
+    USER_AGENT_PIN_PER_DOMAIN = True  # один и тот же UA для домена во всех сканированиях
+    USER_AGENT_SEED = "adparser"
+
+    REPORT_WORKERS = 2  # процессов для отчётов во время обхода; 0 — в основном процессе
+    REPORT_FORMATS = ("json", "csv", "pdf")  # экспортируются параллельно в потоках
+    PDF_THUMBNAIL_SIZE = (96, 72)  # миниатюра объявления в PDF, пт
+    DASHBOARD_ENABLED = True  # HTML-сводка пакета после сканирования
+    DASHBOARD_PAGE_SIZE = 500  # строк в странице данных HTML-сводки
+    PUBLIC_SUFFIX_LIST_PATH = BASE_DIR / "config" / "public_suffix_list.dat"
+    PUBLIC_SUFFIX_INCLUDE_PRIVATE = True  # blogspot.com, github.io и т.п. считаются суффиксами
+    DOMAIN_CACHE_SIZE = 65536  # хостов в LRU-кэшах utils.domain
+    SCREENSHOT_STORAGE_ENABLED = True  # снимки страниц: имя по хешу, кодирование в пуле потоков
+    SCREENSHOT_ENCODE_WORKERS = 2
+    SCREENSHOT_THUMBNAIL_SIZE = (320, 240)  # миниатюра верха страницы, пишется при кодировании (для PDF)
+    SCREENSHOT_FORMATS = {
+        'full_page': 'webp_lossless',
+        'visible': 'webp_lossless',
+        'annotated': 'webp',
+        'comparison': 'avif'
+    }
+    ANNOTATION_MODE = "overlay"  # "overlay" — только JSON разметки, "eager" — растровые копии при сканировании
+    ANNOTATION_HTML_VIEWER = True  # HTML рядом с разметкой: рамки рисует браузер
+    ANNOTATION_TILE_THRESHOLD = 8000  # выше этой высоты (px) снимки хранятся в PNG, разметка и сравнение строятся полосами
+    ANNOTATION_STRIP_HEIGHT = 1024  # строк в полосе при потоковой отрисовке
+    LEGEND_MODE = "sheet"  # "sheet" — многостраничный лист легенд, "files" — файл на сканирование
+    LEGEND_WORKERS = 2  # процессов отрисовки легенд; 0 — в основном процессе
+    LEGEND_PAGE_HEIGHT = 4000  # высота страницы листа легенд, px
+    LEGEND_GLYPH_CACHE_SIZE = 4096  # надписей в кэше масок LegendBuilder
+    CREATIVE_STORE_ENABLED = True  # снимки объявлений хранятся один раз на креатив
+    CREATIVE_HASH_DISTANCE = 6  # бит pHash, при которых креативы считаются одинаковыми
+    CREATIVE_SIZE_TOLERANCE = 2  # пикселей расхождения ширины и высоты у одинаковых креативов
+    URL_ANALYSIS_CACHE_SIZE = 4096  # разобранных URL в LRU-кэше URLAnalysisEngine
+    URL_ANALYTICS_CHUNK_SIZE = 5000  # посадочных URL в одной пачке команды urls
+    URL_ANALYTICS_WORKERS = 2
+    URL_TRACKING_DOMAINS = (
+        'doubleclick.net', 'googleadservices.com', 'clck.ru', 'click.mail.ru',
+        'ad.adriver.ru', 'ads.adfox.ru', 'trk.mail.ru', 'bs.yandex.ru', 'go.redirectingat.com'
+    )
     
     WIDTH_WINDOW = 1920
     HEIGHT_WINDOW = 1080
@@ -19,9 +64,64 @@ class Settings:
     PAGE_LOAD_TIMEOUT = 30
     IMPLICIT_WAIT = 5
     
+    OBSERVER_ENABLED = True
+    OBSERVER_BUFFER_SIZE = 500
+    OBSERVER_RECT_HISTORY = 10
+    
+    SELECTOR_CACHE_ENABLED = True
+    SELECTOR_CACHE_MAX_DOMAINS = 200
+    SELECTOR_CACHE_MAX_SELECTORS = 50
+    SELECTOR_CACHE_MAX_AGE_DAYS = 30
+    SELECTOR_CACHE_FULL_SWEEP_EVERY = 10
+    
+    SCORING_WEIGHTS_PATH = BASE_DIR / "config" / "scoring_weights.json"
+    SCORING_HISTORY_ENABLED = False
+    SCORING_HISTORY_PATH = CACHE_DIR / "scoring_history.jsonl"
+    
+    RULES_DIR = BASE_DIR / "config" / "rules"
+    RULES_HOT_RELOAD = False
+    RULES_RELOAD_INTERVAL = 30
+    
+    INTERACTION_CONCURRENCY = 8
+    INTERACTION_TAB_TIMEOUT = 30
+    
+    PACING_PROFILE = "stealth"
+    PACING_DOMAIN_BUDGET = 120
+    
+    BACKEND = "selenium"
+    CHROME_BINARY = None
+    CDP_BROWSERS = 1
+    CDP_TABS_PER_BROWSER = 4
+    CDP_COMMAND_TIMEOUT = 30
+    CDP_STARTUP_TIMEOUT = 30
+    CDP_ISOLATE_CONTEXTS = True
+    CONTEXTS_PER_BROWSER = 4
+    CONTEXT_PERSIST_COOKIES = False
+    
     MEMORY_LIMIT_MB = 1000
     CLEANUP_INTERVAL = 50
+    MEMORY_BUDGET_MB = 3000  # Python + дерево процессов chromedriver/Chrome (PSS)
+    MEMORY_PRESSURE_THRESHOLDS = (0.7, 0.85, 1.0, 1.2)  # доли бюджета для ступеней действий
+    MEMORY_SAMPLE_INTERVAL = 1.0
+    MEMORY_PAUSE_TIMEOUT = 60
+
+    SUPERVISOR_PROBE_TIMEOUT = 5  # секунд на проверку живости драйвера
+    SUPERVISOR_MAX_REQUEUES = 2
+    SUPERVISOR_BACKOFF = 5  # базовая задержка повторной постановки URL, удваивается
+
+    PROFILE_TEMPLATE_ENABLED = True
+    PROFILE_TEMPLATE_DIR = CACHE_DIR / "profile_template"
+    PROFILE_CLONES_DIR = CACHE_DIR / "profiles"
+    PROFILE_TEMPLATE_MAX_AGE = 7 * 24 * 3600  # секунд до перестроения шаблона
+    PROFILE_WARMUP_SETTLE = 3
+    CONSENT_BUTTON_TEXTS = ('принять', 'согласен', 'согласна', 'понятно', 'хорошо', 'accept', 'i agree', 'agree', 'got it', 'ok')
     
     DISABLE_IMAGES = True
     MAX_RETRIES = 3
-    RETRY_DELAY = 2
\ No newline at end of file
+    RETRY_DELAY = 2
+
+    @classmethod
+    def ensure_directories(cls):
+        """Создание выходных каталогов; вызывается точками входа, а не при импорте"""
+        for directory in [cls.OUTPUT_DIR, cls.SCREENSHOT_DIR, cls.LOG_DIR, cls.COOKIES_DIR, cls.CACHE_DIR, cls.REPORTS_DIR]:
+            directory.mkdir(parents=True, exist_ok=True)
\ No newline at end of file
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import logging
+import random
+import threading
+from config.settings import Settings
+from utils.performance import startup_timer
+
+
+class UserAgentPool:
+    """
+    Пул User-Agent с взвешенным выбором за O(1)
+
+    Корпус загружается один раз на процесс — из файла config/user_agents.json
+    или из базы fake_useragent (USER_AGENT_SOURCE). Для выбора строятся
+    таблицы метода псевдонимов (Walker/Vose): одна случайная ячейка и одно
+    сравнение на выбор. При закреплении за доменом выбор детерминирован
+    хешем домена, поэтому сайт видит один и тот же UA во всех сканированиях.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, user_agents, weights=None, seed="", rng=None):
+        if not user_agents:
+            raise ValueError("Пустой корпус User-Agent")
+        self.user_agents = list(user_agents)
+        self.seed = seed
+        self.rng = rng or random.Random()
+        self._probability, self._alias = self.build_alias_table(weights or [1.0] * len(self.user_agents))
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def build_alias_table(weights):
+        """
+        Таблицы метода псевдонимов (алгоритм Vose)
+
+        Returns:
+            tuple: (вероятности ячеек, индексы псевдонимов)
+        """
+        count = len(weights)
+        total = float(sum(weights))
+        scaled = [w * count / total for w in weights]
+        probability = [0.0] * count
+        alias = list(range(count))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            less, more = small.pop(), large.pop()
+            probability[less] = scaled[less]
+            alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+
+        for index in small + large:
+            probability[index] = 1.0
+        return probability, alias
+
+    def _pick_index(self, rng):
+        column = rng.randrange(len(self._probability))
+        return column if rng.random() < self._probability[column] else self._alias[column]
+
+    def pick(self, domain=None):
+        """
+        Взвешенный случайный User-Agent
+
+        Args:
+            domain (str): Если указан, выбор закреплён за доменом
+
+        Returns:
+            str: Строка User-Agent
+        """
+        if domain:
+            digest = hashlib.sha256(f"{self.seed}:{domain.lower()}".encode()).digest()
+            return self.user_agents[self._pick_index(random.Random(digest))]
+        return self.user_agents[self._pick_index(self.rng)]
+
+    # --- Загрузка корпуса ---
+
+    @classmethod
+    def from_file(cls, path, seed=""):
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)['user_agents']
+        return cls([e['ua'] for e in entries], [e.get('weight', 1.0) for e in entries], seed)
+
+    @classmethod
+    def from_fake_useragent(cls, seed=""):
+        """Корпус fake_useragent: только настольный Chrome — им управляет драйвер"""
+        from fake_useragent import UserAgent
+
+        rows = [r for r in UserAgent().data_browsers if r.get('browser') == 'Chrome' and r.get('type') == 'desktop']
+        return cls([r['useragent'] for r in rows], [r.get('percent') or 0.001 for r in rows], seed)
+
+    @classmethod
+    def get(cls, config: Settings = Settings):
+        """Общий пул процесса; создаётся при первом обращении"""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls._load(config)
+        return cls._instance
+
+    @classmethod
+    def _load(cls, config):
+        logger = logging.getLogger(__name__)
+        seed = config.USER_AGENT_SEED
+        with startup_timer('user_agent_pool'):
+            if config.USER_AGENT_SOURCE == "fake_useragent":
+                try:
+                    pool = cls.from_fake_useragent(seed)
+                except Exception as e:
+                    logger.warning(f"База fake_useragent недоступна, используется встроенный корпус: {str(e)}")
+                    pool = cls.from_file(config.USER_AGENTS_PATH, seed)
+            else:
+                pool = cls.from_file(config.USER_AGENTS_PATH, seed)
+        logger.info(f"Загружено {len(pool.user_agents)} User-Agent ({config.USER_AGENT_SOURCE})")
+        return pool
+
+    @classmethod
+    def reset(cls):
+        cls._instance = None
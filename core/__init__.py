@@ -1,9 +1,32 @@
-from .driver_manager import DriverManager
-from .error_handler import ErrorHandler
-from .memory_manager import MemoryManager
+import importlib
+
+# driver_manager тянет Selenium — импорт только при обращении
+_LAZY_EXPORTS = {
+    'DriverManager': '.driver_manager',
+    'ErrorHandler': '.error_handler',
+    'DriverCrashedError': '.error_handler',
+    'MemoryManager': '.memory_manager',
+    'PacingScheduler': '.pacing_scheduler',
+    'ContextScheduler': '.context_scheduler',
+    'DriverSupervisor': '.driver_supervisor',
+    'ProfileTemplate': '.profile_template'
+}
 
 __all__ = [
     'DriverManager',
     'ErrorHandler',
-    'MemoryManager'
-]
\ No newline at end of file
+    'DriverCrashedError',
+    'MemoryManager',
+    'PacingScheduler',
+    'ContextScheduler',
+    'DriverSupervisor',
+    'ProfileTemplate'
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from config.settings import Settings
+
+
+class ContextScheduler:
+    """
+    Планировщик изолированных контекстов браузера
+
+    Вместо отдельного Chrome на сайт каждое сканирование получает свой
+    контекст (Target.createBrowserContext) внутри общего браузера: свои
+    cookies, localStorage и кэш, но общие процессы браузера и GPU.
+    Контекст уничтожается по окончании сканирования.
+    """
+
+    def __init__(self, browser, config: Settings, max_contexts=None):
+        self.browser = browser
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self.max_contexts = max(1, int(max_contexts or config.CONTEXTS_PER_BROWSER))
+        self._slots = asyncio.Semaphore(self.max_contexts)
+        self.active = {}
+        self.stats = {'created': 0, 'disposed': 0, 'peak_active': 0, 'cookies_restored': 0, 'cookies_saved': 0}
+
+    @asynccontextmanager
+    async def context(self, domain=None):
+        """
+        Изолированный контекст на время сканирования
+
+        Args:
+            domain (str): Домен сканирования; используется для сохранённых cookies
+
+        Yields:
+            str: browserContextId
+        """
+        async with self._slots:
+            context_id = await self._create(domain)
+            try:
+                yield context_id
+            finally:
+                await self._dispose(context_id, domain)
+
+    async def _create(self, domain):
+        connection = self.browser.connection
+        result = await connection.send('Target.createBrowserContext', {'disposeOnDetach': True})
+        context_id = result['browserContextId']
+
+        self.active[context_id] = domain
+        self.stats['created'] += 1
+        self.stats['peak_active'] = max(self.stats['peak_active'], len(self.active))
+
+        cookies = self._load_cookies(domain)
+        if cookies:
+            try:
+                await connection.send('Storage.setCookies', {'cookies': cookies, 'browserContextId': context_id})
+                self.stats['cookies_restored'] += len(cookies)
+            except Exception as e:
+                self.logger.warning(f"Cookies для {domain} не восстановлены: {e}")
+
+        self.logger.info(f"Создан контекст браузера {context_id} для {domain}")
+        return context_id
+
+    async def _dispose(self, context_id, domain):
+        connection = self.browser.connection
+        try:
+            if self.config.CONTEXT_PERSIST_COOKIES is True and domain:
+                result = await connection.send('Storage.getCookies', {'browserContextId': context_id})
+                self._save_cookies(domain, result.get('cookies', []))
+        except Exception as e:
+            self.logger.warning(f"Cookies для {domain} не сохранены: {e}")
+
+        try:
+            await connection.send('Target.disposeBrowserContext', {'browserContextId': context_id})
+            self.stats['disposed'] += 1
+        except Exception as e:
+            self.logger.error(f"Ошибка удаления контекста {context_id}: {e}")
+        finally:
+            self.active.pop(context_id, None)
+
+    def _cookie_path(self, domain):
+        safe_domain = "".join(c for c in domain if c.isalnum() or c in ('-', '.'))
+        return self.config.COOKIES_DIR / f"{safe_domain}.json"
+
+    def _load_cookies(self, domain):
+        if self.config.CONTEXT_PERSIST_COOKIES is not True or not domain:
+            return []
+        try:
+            with open(self._cookie_path(domain), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            self.logger.warning(f"Файл cookies {domain} не прочитан: {e}")
+            return []
+
+    def _save_cookies(self, domain, cookies):
+        # Сохраняются только cookies самого домена: сторонние не переносятся между сайтами
+        own = []
+        for cookie in cookies:
+            cookie_domain = (cookie.get('domain') or '').lstrip('.')
+            # Совпадение по границе метки: cookie "a.ru" не относится к "ria.ru"
+            if cookie_domain and (domain == cookie_domain or domain.endswith('.' + cookie_domain)):
+                own.append(cookie)
+        with open(self._cookie_path(domain), 'w', encoding='utf-8') as f:
+            json.dump(own, f, ensure_ascii=False)
+        self.stats['cookies_saved'] += len(own)
+
+    def get_stats(self):
+        return {**self.stats, 'active': len(self.active), 'max_contexts': self.max_contexts}
@@ -4,6 +4,7 @@ from config.settings import Settings
 from config.browser_config import BrowserConfig
 from core.memory_manager import MemoryManager
 from core.error_handler import ErrorHandler
+from core.profile_template import ProfileTemplate
 import logging
 import time
 
@@ -11,38 +12,75 @@ class DriverManager:
     def __init__(self, config: Settings):
         self.config = config
         self.driver = None
-        self.memory_manager = MemoryManager(self.config.MEMORY_LIMIT_MB)
+        self.memory_manager = MemoryManager(
+            self.config.MEMORY_LIMIT_MB,
+            budget_mb=self.config.MEMORY_BUDGET_MB,
+            thresholds=self.config.MEMORY_PRESSURE_THRESHOLDS
+        )
+        self.profile_template = ProfileTemplate(self.config) if self.config.PROFILE_TEMPLATE_ENABLED is True else None
+        self.profile_dir = None
+        self.last_startup_seconds = None
         self.logger = logging.getLogger(__name__)
         
-    def create_driver(self, headless=None):
+    def create_driver(self, headless=None, domain=None):
         try:
             if not self.memory_manager.check_memory():
                 self.logger.warning("Приближается лимит памяти, ожидание очистки...")
             
-            options = BrowserConfig.get_chrome_options(self.config)
+            started = time.perf_counter()
+            if self.profile_template:
+                self.profile_dir = self.profile_template.clone()
+            options = BrowserConfig.get_chrome_options(self.config, user_data_dir=self.profile_dir, domain=domain)
             self.driver = webdriver.Chrome(options=options)
+            self.last_startup_seconds = time.perf_counter() - started
             
             self.driver.set_page_load_timeout(self.config.PAGE_LOAD_TIMEOUT)
             self.driver.implicitly_wait(self.config.IMPLICIT_WAIT)
             
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             
-            self.logger.info("Chrome WebDriver успешно создан")
+            # Учёт памяти chromedriver и всех процессов Chrome этого драйвера
+            self.memory_manager.track(self.driver)
+            self.memory_manager.start_sampling(self.config.MEMORY_SAMPLE_INTERVAL)
+            
+            self.logger.info(
+                f"Chrome WebDriver успешно создан за {self.last_startup_seconds:.2f} с"
+                f"{' (профиль из шаблона)' if self.profile_dir else ''}"
+            )
             return self.driver
             
         except WebDriverException as e:
             self.logger.error(f"Не удалось создать Chrome WebDriver: {str(e)}")
             ErrorHandler.handle_driver_error(e)
+            self._release_profile()
             return None
     
     def quit_driver(self):
         if self.driver:
+            self.memory_manager.untrack(MemoryManager.get_driver_pids(self.driver))
             try:
                 self.driver.quit()
                 self.driver = None
                 self.logger.info("Chrome WebDriver успешно закрыт")
             except Exception as e:
                 self.logger.error(f"Ошибка закрытия драйвера: {str(e)}")
+        self._release_profile()
+
+    def _release_profile(self):
+        """Удаление копии профиля (в том числе после аварийного сброса драйвера)"""
+        if self.profile_template and self.profile_dir:
+            self.profile_template.release(self.profile_dir)
+        self.profile_dir = None
+
+    def relieve_memory_pressure(self):
+        """
+        Ступенчатое снижение давления памяти текущего драйвера
+
+        Returns:
+            str: Действие из PRESSURE_ACTIONS; 'recycle_driver' и 'pause'
+                 выполняет вызывающая сторона в безопасной точке
+        """
+        return self.memory_manager.relieve_pressure(self.driver)
 
     def restart_driver(self):
         """Перезапуск драйвера (полезно при утечках памяти)"""
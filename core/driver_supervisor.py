@@ -0,0 +1,191 @@
+import heapq
+import logging
+import threading
+import time
+import psutil
+from config.settings import Settings
+from core.driver_manager import DriverManager
+from core.error_handler import ErrorHandler, DriverCrashedError
+from core.memory_manager import MemoryManager
+from utils.domain import registrable_domain
+
+
+class DriverSupervisor:
+    """
+    Супервизор драйвера: проверка живости и восстановление после сбоев
+
+    Каждый URL сканируется в свежем драйвере. Если сканирование прервано
+    потерей сеанса или зависанием chromedriver, дерево процессов драйвера
+    принудительно завершается, а URL возвращается в очередь с
+    экспоненциальной задержкой. Ошибки самой страницы не повторяются.
+    """
+
+    def __init__(self, driver_manager: DriverManager, config: Settings):
+        self.driver_manager = driver_manager
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self.probe_timeout = config.SUPERVISOR_PROBE_TIMEOUT
+        self.max_requeues = config.SUPERVISOR_MAX_REQUEUES
+        self.backoff = config.SUPERVISOR_BACKOFF
+        self.stats = {
+            'probes': 0, 'failed_probes': 0, 'replacements': 0, 'requeued': 0,
+            'killed_processes': 0, 'abandoned': [], 'failures': {}
+        }
+
+    # --- Проверка живости ---
+
+    def probe(self, driver=None):
+        """
+        Быстрая проверка живости: session_id и дешёвый скрипт с коротким таймаутом
+
+        Скрипт выполняется в отдельном потоке, чтобы зависший chromedriver
+        не блокировал сканирование на полный таймаут HTTP-клиента.
+        """
+        driver = driver or self.driver_manager.driver
+        self.stats['probes'] += 1
+        if driver is None or not getattr(driver, 'session_id', None):
+            self.stats['failed_probes'] += 1
+            return False
+
+        result = {}
+
+        def run():
+            try:
+                result['value'] = driver.execute_script("return 1")
+            except Exception as e:
+                result['error'] = e
+
+        worker = threading.Thread(target=run, name="driver-probe", daemon=True)
+        worker.start()
+        worker.join(self.probe_timeout)
+
+        alive = not worker.is_alive() and result.get('value') == 1
+        if not alive:
+            self.stats['failed_probes'] += 1
+            self.logger.warning(f"Проверка живости драйвера не пройдена: {result.get('error', 'таймаут')}")
+        return alive
+
+    def check(self, driver=None):
+        """Проверка в контрольной точке сканирования; DriverCrashedError если драйвер мёртв"""
+        if not self.probe(driver):
+            raise DriverCrashedError("Драйвер не отвечает на проверку живости")
+
+    # --- Завершение процессов ---
+
+    def kill_process_tree(self, pid):
+        """Завершение процесса и всех потомков (terminate, затем kill)"""
+        try:
+            root = psutil.Process(pid)
+            processes = root.children(recursive=True) + [root]
+        except (psutil.NoSuchProcess, ValueError):
+            return 0
+
+        for process in processes:
+            try:
+                process.terminate()
+            except psutil.NoSuchProcess:
+                pass
+        _, alive = psutil.wait_procs(processes, timeout=3)
+        for process in alive:
+            try:
+                process.kill()
+            except psutil.NoSuchProcess:
+                pass
+        psutil.wait_procs(alive, timeout=3)
+
+        self.stats['killed_processes'] += len(processes)
+        return len(processes)
+
+    def discard_driver(self):
+        """Сброс драйвера без quit(): вызов к мёртвому сеансу может зависнуть"""
+        driver = self.driver_manager.driver
+        if driver is None:
+            return
+        pids = MemoryManager.get_driver_pids(driver)
+        self.driver_manager.memory_manager.untrack(pids)
+        for pid in pids:
+            killed = self.kill_process_tree(pid)
+            self.logger.warning(f"Завершено {killed} процессов зависшего драйвера (pid {pid})")
+        self.driver_manager.driver = None
+        self.stats['replacements'] += 1
+
+    # --- Очередь URL ---
+
+    def run(self, urls, scan, on_result=None):
+        """
+        Сканирование очереди URL под надзором
+
+        Args:
+            urls (list): Адреса страниц
+            scan (callable): scan(driver, url) -> scan_data или None
+            on_result (callable): Вызывается с scan_data сразу после успешного сканирования
+
+        Returns:
+            list: Результаты успешных сканирований
+        """
+        queue = [(0.0, index, url, 0) for index, url in enumerate(urls)]
+        heapq.heapify(queue)
+        results = {}
+
+        while queue:
+            not_before, index, url, attempt = heapq.heappop(queue)
+            wait = not_before - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+
+            failure = self._scan_once(url, scan, results, index)
+            if failure is None:
+                if on_result and index in results:
+                    try:
+                        on_result(results[index])
+                    except Exception as e:
+                        # Ошибка записи результата не должна прерывать остальную очередь
+                        self.logger.error(f"Ошибка обработки результата {url}: {str(e)}")
+                continue
+
+            if attempt < self.max_requeues:
+                delay = self.backoff * (2 ** attempt)
+                self.stats['requeued'] += 1
+                self.logger.warning(f"{url} возвращён в очередь через {delay:.0f} с ({failure})")
+                heapq.heappush(queue, (time.monotonic() + delay, index, url, attempt + 1))
+            else:
+                self.stats['abandoned'].append(url)
+                self.logger.error(f"{url} пропущен после {attempt + 1} попыток ({failure})")
+
+        return [results[index] for index in sorted(results)]
+
+    def _scan_once(self, url, scan, results, index):
+        """Одна попытка; возвращает класс отказа, если URL нужно повторить"""
+        driver = self.driver_manager.create_driver(domain=registrable_domain(url))
+        if driver is None:
+            self._count_failure('DRIVER_START')
+            return 'DRIVER_START'
+
+        try:
+            scan_data = scan(driver, url)
+            if scan_data:
+                results[index] = scan_data
+            return None
+
+        except Exception as e:
+            failure = ErrorHandler.classify_driver_failure(e)
+            if failure not in ErrorHandler.FATAL_FAILURES and not self.probe(driver):
+                failure = 'SESSION_LOST'
+            self._count_failure(failure)
+
+            if failure in ErrorHandler.FATAL_FAILURES:
+                self.logger.error(f"Сбой драйвера ({failure}) на {url}: {str(e)}")
+                self.discard_driver()
+                return failure
+
+            self.logger.error(f"Ошибка сканирования {url} ({failure}): {str(e)}")
+            return None
+
+        finally:
+            self.driver_manager.quit_driver()
+
+    def _count_failure(self, failure):
+        self.stats['failures'][failure] = self.stats['failures'].get(failure, 0) + 1
+
+    def get_stats(self):
+        return {**self.stats, 'abandoned': list(self.stats['abandoned'])}
@@ -3,12 +3,28 @@ from selenium.common.exceptions import (
     WebDriverException, 
     TimeoutException, 
     NoSuchElementException,
-    StaleElementReferenceException
+    StaleElementReferenceException,
+    InvalidSessionIdException
 )
+from urllib3.exceptions import ReadTimeoutError, MaxRetryError, ProtocolError
+
+
+class DriverCrashedError(WebDriverException):
+    """Сеанс WebDriver потерян: Chrome упал или chromedriver завис"""
 
 class ErrorHandler:
     """Централизованная обработка ошибок Selenium"""
     logger = logging.getLogger(__name__)
+
+    # Признаки потерянного сеанса в тексте WebDriverException
+    SESSION_LOST_MARKERS = (
+        'invalid session id', 'session deleted', 'chrome not reachable', 'disconnected:',
+        'tab crashed', 'target crashed', 'no such session', 'cannot determine loading status'
+    )
+    HUNG_MARKERS = ('timed out receiving message from renderer', 'read timed out')
+
+    # Классы отказов, после которых драйвер нужно заменить
+    FATAL_FAILURES = ('SESSION_LOST', 'DRIVER_HUNG')
     
     @staticmethod
     def handle_driver_error(error):
@@ -34,4 +50,30 @@ class ErrorHandler:
             return "STALE_ELEMENT"
         else:
             ErrorHandler.logger.warning(f"Element error: {str(error)}")
-            return "ELEMENT_ERROR"
\ No newline at end of file
+            return "ELEMENT_ERROR"
+
+    @staticmethod
+    def classify_driver_failure(error):
+        """
+        Классификация отказа для супервизора драйвера
+
+        Returns:
+            str: SESSION_LOST, DRIVER_HUNG, TIMEOUT_ERROR, DRIVER_ERROR или UNKNOWN_ERROR
+        """
+        message = str(error).lower()
+        if isinstance(error, (DriverCrashedError, InvalidSessionIdException, ConnectionError, ProtocolError)):
+            return "SESSION_LOST"
+        if isinstance(error, (ReadTimeoutError, MaxRetryError)) or any(m in message for m in ErrorHandler.HUNG_MARKERS):
+            return "DRIVER_HUNG"
+        if isinstance(error, WebDriverException) and any(m in message for m in ErrorHandler.SESSION_LOST_MARKERS):
+            return "SESSION_LOST"
+        if isinstance(error, TimeoutException):
+            return "TIMEOUT_ERROR"
+        if isinstance(error, WebDriverException):
+            return "DRIVER_ERROR"
+        return "UNKNOWN_ERROR"
+
+    @staticmethod
+    def is_fatal_driver_error(error):
+        """Требует ли ошибка замены драйвера"""
+        return ErrorHandler.classify_driver_failure(error) in ErrorHandler.FATAL_FAILURES
\ No newline at end of file
@@ -1,20 +1,43 @@
 import psutil
 import logging
 import gc
+import threading
+import time
+
+# Уровни давления памяти и соответствующие действия (по возрастанию)
+PRESSURE_ACTIONS = ('none', 'close_windows', 'clear_caches', 'recycle_driver', 'pause')
+
 
 class MemoryManager:
-    """Менеджер для мониторинга и управления потреблением памяти"""
-    
-    def __init__(self, memory_limit_mb=1000):
+    """
+    Менеджер для мониторинга и управления потреблением памяти
+
+    Кроме процесса Python учитывается всё дерево процессов драйвера:
+    chromedriver, Chrome и его рендереры. Фоновый поток периодически
+    снимает RSS/PSS дерева, фиксирует пик за сканирование и уровень
+    давления; действия по снижению выполняются в потоке сканирования
+    (relieve_pressure), т.к. WebDriver не потокобезопасен.
+    """
+
+    def __init__(self, memory_limit_mb=1000, budget_mb=None, thresholds=(0.7, 0.85, 1.0, 1.2)):
         self.memory_limit = memory_limit_mb
+        self.budget_mb = budget_mb or memory_limit_mb
+        self.thresholds = tuple(thresholds)
         self.logger = logging.getLogger(__name__)
-    
+
+        self._lock = threading.Lock()
+        self._root_pids = set()
+        self._sampler = None
+        self._stop_event = threading.Event()
+        self.last_sample = None
+        self._scan = None
+
     def check_memory(self):
         """
         Проверяет текущее потребление памяти
         
         Returns:
-            bool: True если память в пределах лимита, False если接近 лимита
+            bool: True если память в пределах лимита, False если близко к лимиту
         """
         process = psutil.Process()
         memory_mb = process.memory_info().rss / 1024 / 1024
@@ -36,4 +59,226 @@ class MemoryManager:
     def get_memory_usage(self):
         """Возвращает текущее использование памяти в MB"""
         process = psutil.Process()
-        return process.memory_info().rss / 1024 / 1024
\ No newline at end of file
+        return process.memory_info().rss / 1024 / 1024
+
+    # --- Учёт дерева процессов ---
+
+    @staticmethod
+    def get_driver_pids(driver):
+        """PID chromedriver (Chrome и рендереры — его потомки)"""
+        try:
+            return [driver.service.process.pid]
+        except Exception:
+            return []
+
+    def track(self, pids):
+        """Добавление корневых процессов в учёт (драйвер или список PID)"""
+        if not isinstance(pids, (list, tuple, set)):
+            pids = self.get_driver_pids(pids)
+        with self._lock:
+            self._root_pids.update(pids)
+
+    def untrack(self, pids=None):
+        """Исключение процессов из учёта (все, если pids не указаны)"""
+        with self._lock:
+            if pids is None:
+                self._root_pids.clear()
+            else:
+                self._root_pids.difference_update(pids)
+
+    @staticmethod
+    def process_tree_usage(root_pids):
+        """
+        Суммарная память деревьев процессов
+
+        PSS берётся из memory_full_info там, где он доступен (Linux), иначе
+        используется RSS: общие страницы Chrome в RSS считаются многократно.
+
+        Returns:
+            dict: rss_mb, pss_mb, processes
+        """
+        seen = set()
+        rss = pss = 0
+        for root_pid in root_pids:
+            try:
+                root = psutil.Process(root_pid)
+                tree = [root] + root.children(recursive=True)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            for process in tree:
+                if process.pid in seen:
+                    continue
+                seen.add(process.pid)
+                try:
+                    try:
+                        info = process.memory_full_info()
+                        pss += getattr(info, 'pss', info.rss)
+                    except psutil.AccessDenied:
+                        info = process.memory_info()
+                        pss += info.rss
+                    rss += info.rss
+                except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
+                    continue
+        return {'rss_mb': rss / 1024 / 1024, 'pss_mb': pss / 1024 / 1024, 'processes': len(seen)}
+
+    def sample(self):
+        """Снимок памяти Python и отслеживаемых деревьев процессов"""
+        with self._lock:
+            root_pids = set(self._root_pids)
+        browser = self.process_tree_usage(root_pids)
+        python_mb = self.get_memory_usage()
+        sample = {
+            'timestamp': time.time(),
+            'python_rss_mb': python_mb,
+            'browser_rss_mb': browser['rss_mb'],
+            'browser_pss_mb': browser['pss_mb'],
+            'browser_processes': browser['processes'],
+            'total_pss_mb': python_mb + browser['pss_mb']
+        }
+        self._record(sample)
+        return sample
+
+    def _record(self, sample):
+        with self._lock:
+            self.last_sample = sample
+            scan = self._scan
+            if scan is not None:
+                scan['samples'] += 1
+                for key in ('total_pss_mb', 'browser_rss_mb', 'browser_pss_mb', 'python_rss_mb'):
+                    scan['peak_' + key] = max(scan['peak_' + key], sample[key])
+                scan['peak_browser_processes'] = max(scan['peak_browser_processes'], sample['browser_processes'])
+
+    def pressure_level(self, sample=None):
+        """Уровень давления: индекс в PRESSURE_ACTIONS по доле бюджета"""
+        sample = sample or self.last_sample
+        if not sample:
+            return 0
+        share = sample['total_pss_mb'] / self.budget_mb
+        return sum(1 for threshold in self.thresholds if share >= threshold)
+
+    def start_sampling(self, interval=1.0):
+        """Запуск фонового потока замеров"""
+        if self._sampler and self._sampler.is_alive():
+            return
+        self._stop_event.clear()
+
+        def run():
+            while not self._stop_event.wait(interval):
+                try:
+                    self.sample()
+                except Exception as e:
+                    self.logger.debug(f"Memory sample failed: {str(e)}")
+
+        self._sampler = threading.Thread(target=run, name="memory-sampler", daemon=True)
+        self._sampler.start()
+
+    def stop_sampling(self):
+        self._stop_event.set()
+        if self._sampler:
+            self._sampler.join(timeout=5)
+        self._sampler = None
+
+    # --- Сканирование и действия ---
+
+    def begin_scan(self):
+        """Начало окна замеров для одного сканирования"""
+        with self._lock:
+            self._scan = {
+                'samples': 0,
+                'peak_total_pss_mb': 0.0,
+                'peak_browser_rss_mb': 0.0,
+                'peak_browser_pss_mb': 0.0,
+                'peak_python_rss_mb': 0.0,
+                'peak_browser_processes': 0,
+                'actions': []
+            }
+        self.sample()
+
+    def end_scan(self):
+        """
+        Итог окна замеров (значение для scan_data['memory_usage'])
+
+        Returns:
+            dict: Пиковые значения в MB, число замеров и выполненные действия
+        """
+        try:
+            self.sample()
+        except Exception as e:
+            self.logger.debug(f"Memory sample failed: {str(e)}")
+        with self._lock:
+            scan, self._scan = self._scan, None
+        if not scan:
+            return {}
+        scan.update({k: round(v, 1) for k, v in scan.items() if k.endswith('_mb')})
+        scan['budget_mb'] = self.budget_mb
+        return scan
+
+    def relieve_pressure(self, driver=None):
+        """
+        Ступенчатое снижение давления памяти в безопасной точке сканирования
+
+        1. закрытие лишних окон; 2. очистка кэшей браузера через CDP и GC;
+        3. рекомендация пересоздать драйвер; 4. рекомендация приостановить
+        планировщик. Шаги 3-4 выполняет вызывающая сторона.
+
+        Returns:
+            str: Выполненное или рекомендуемое действие из PRESSURE_ACTIONS
+        """
+        level = self.pressure_level()
+        if level == 0:
+            return 'none'
+
+        action = PRESSURE_ACTIONS[level]
+        sample = self.last_sample
+        self.logger.warning(
+            f"Давление памяти: {sample['total_pss_mb']:.0f} MB из {self.budget_mb} MB, действие: {action}"
+        )
+
+        if driver is not None:
+            self._close_stray_windows(driver)
+            if level >= 2:
+                self._clear_browser_caches(driver)
+        if level >= 2:
+            self.force_cleanup()
+
+        with self._lock:
+            if self._scan is not None:
+                self._scan['actions'].append(action)
+        return action
+
+    def _close_stray_windows(self, driver):
+        try:
+            current = driver.current_window_handle
+            for handle in driver.window_handles:
+                if handle != current:
+                    driver.switch_to.window(handle)
+                    driver.close()
+            driver.switch_to.window(current)
+        except Exception as e:
+            self.logger.warning(f"Не удалось закрыть лишние окна: {str(e)}")
+
+    def _clear_browser_caches(self, driver):
+        for command in ('Network.clearBrowserCache', 'HeapProfiler.collectGarbage'):
+            try:
+                driver.execute_cdp_cmd(command, {})
+            except Exception as e:
+                self.logger.debug(f"CDP {command} failed: {str(e)}")
+
+    def should_pause(self):
+        """Превышен ли верхний порог бюджета по свежему замеру"""
+        return self.pressure_level(self.sample()) >= PRESSURE_ACTIONS.index('pause')
+
+    def wait_for_headroom(self, timeout=60, interval=1.0):
+        """
+        Пауза планировщика, пока давление не опустится ниже уровня пересоздания
+
+        Returns:
+            bool: Появился ли запас памяти до истечения таймаута
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.pressure_level(self.sample()) < PRESSURE_ACTIONS.index('recycle_driver'):
+                return True
+            time.sleep(interval)
+        self.logger.warning("Память не освободилась за отведённое время, продолжаем")
+        return False
@@ -0,0 +1,146 @@
+import logging
+import random
+import time
+from collections import defaultdict, deque
+from config.settings import Settings
+
+# Диапазоны пауз (секунды) по видам действий
+PACING_PROFILES = {
+    # Собственные тестовые стенды: без искусственных задержек
+    'fast': {},
+    # Боевые сайты: паузы, имитирующие поведение человека
+    'stealth': {
+        'before_scroll': (1.33, 2.55),
+        'before_click': (1.0, 2.0),
+        'after_click': (2.77, 3.55),
+        'page_settle': (2.3, 3.7),
+        'redirect_action': (1.5, 2.0),
+        'after_refresh': (2.2, 2.8),
+    },
+}
+
+DEFAULT_PROFILE = 'stealth'
+
+
+class PacingScheduler:
+    """
+    Планировщик «человеческих» задержек
+
+    Все преднамеренные паузы проходят через delay(): диапазон берётся из
+    профиля, суммарное время пауз на домен ограничено бюджетом. Отложенная
+    работа (defer) выполняется внутри пауз, поэтому ожидание не простаивает.
+    """
+
+    def __init__(self, config: Settings, profile=None, rng=None, clock=time.monotonic, sleep=time.sleep):
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self.rng = rng or random.Random()
+        self.clock = clock
+        self.sleep = sleep
+
+        self.profile_name = self._resolve_profile(profile if profile is not None else config.PACING_PROFILE)
+        self.profile = PACING_PROFILES[self.profile_name]
+        budget = config.PACING_DOMAIN_BUDGET
+        self.domain_budget = float(budget) if isinstance(budget, (int, float)) and budget > 0 else None
+
+        self.domain = None
+        self._deferred = deque()
+        self._started_at = clock()
+        self._delay_seconds = 0.0
+        self._overlapped_seconds = 0.0
+        self._delays_by_kind = defaultdict(lambda: {'count': 0, 'seconds': 0.0})
+        self._spent_by_domain = defaultdict(float)
+        self._exhausted_domains = set()
+
+    def _resolve_profile(self, profile):
+        if isinstance(profile, str) and profile in PACING_PROFILES:
+            return profile
+        self.logger.warning(f"Неизвестный профиль задержек {profile!r}, используется {DEFAULT_PROFILE}")
+        return DEFAULT_PROFILE
+
+    def set_domain(self, domain):
+        """Домен, к бюджету которого относятся следующие паузы"""
+        self.domain = domain
+
+    def defer(self, func, *args, **kwargs):
+        """Постановка работы в очередь на выполнение во время ближайшей паузы"""
+        self._deferred.append((func, args, kwargs))
+
+    def delay(self, kind):
+        """
+        Преднамеренная пауза вида kind
+
+        Сначала выполняется отложенная работа, затем досыпается остаток паузы.
+        Если работа заняла больше паузы, сна нет вовсе.
+
+        Returns:
+            float: Запланированная длительность паузы в секундах
+        """
+        duration = self._plan(kind)
+        deadline = self.clock() + duration
+
+        while self._deferred and self.clock() < deadline:
+            self._run_deferred()
+
+        remaining = deadline - self.clock()
+        slept = 0.0
+        if remaining > 0:
+            self.sleep(remaining)
+            slept = remaining
+
+        overlapped = duration - max(remaining, 0.0)
+        self._overlapped_seconds += overlapped
+        self._delay_seconds += slept
+        stats = self._delays_by_kind[kind]
+        stats['count'] += 1
+        stats['seconds'] += duration
+        return duration
+
+    def _plan(self, kind):
+        bounds = self.profile.get(kind)
+        if not bounds:
+            return 0.0
+
+        duration = self.rng.uniform(*bounds)
+        if self.domain_budget is not None:
+            spent = self._spent_by_domain[self.domain]
+            if spent + duration > self.domain_budget:
+                if self.domain not in self._exhausted_domains:
+                    self._exhausted_domains.add(self.domain)
+                    self.logger.warning(f"Бюджет пауз для {self.domain} исчерпан ({self.domain_budget:.0f} с)")
+                duration = max(0.0, self.domain_budget - spent)
+        self._spent_by_domain[self.domain] += duration
+        return duration
+
+    def _run_deferred(self):
+        func, args, kwargs = self._deferred.popleft()
+        try:
+            func(*args, **kwargs)
+        except Exception as e:
+            self.logger.error(f"Ошибка отложенной задачи {getattr(func, '__name__', func)}: {e}")
+
+    def flush(self):
+        """Выполнение всей оставшейся отложенной работы"""
+        while self._deferred:
+            self._run_deferred()
+
+    def get_report(self):
+        """
+        Отчёт о распределении времени
+
+        Returns:
+            dict: Время на паузы, полезную работу и работу, совмещённую с паузами
+        """
+        wall = self.clock() - self._started_at
+        return {
+            'profile': self.profile_name,
+            'wall_seconds': round(wall, 3),
+            'delay_seconds': round(self._delay_seconds, 3),
+            'work_seconds': round(max(wall - self._delay_seconds, 0.0), 3),
+            'overlapped_work_seconds': round(self._overlapped_seconds, 3),
+            'delay_share': round(self._delay_seconds / wall, 3) if wall > 0 else 0.0,
+            'delays': {kind: {'count': s['count'], 'seconds': round(s['seconds'], 3)}
+                       for kind, s in self._delays_by_kind.items()},
+            'domains': {str(domain): round(spent, 3) for domain, spent in self._spent_by_domain.items()},
+            'exhausted_domains': sorted(str(d) for d in self._exhausted_domains)
+        }
@@ -0,0 +1,235 @@
+import errno
+import json
+import logging
+import os
+import pickle
+import shutil
+import time
+import uuid
+from pathlib import Path
+from urllib.parse import urlparse
+from config.settings import Settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ioctl FICLONE: копирование при записи на btrfs/XFS/overlayfs
+FICLONE = 0x40049409
+
+# Файлы и каталоги профиля, которые нельзя переносить между запусками
+VOLATILE_ENTRIES = (
+    'SingletonLock', 'SingletonSocket', 'SingletonCookie', 'DevToolsActivePort',
+    'Crashpad', 'ShaderCache', 'GrShaderCache', 'Default/Sessions', 'Default/Session Storage'
+)
+
+# Кнопки согласия на cookies на русском и английском
+CONSENT_SCRIPT = """
+const texts = arguments[0];
+const buttons = Array.from(document.querySelectorAll('button, a, [role="button"], input[type="button"], input[type="submit"]'));
+for (const button of buttons) {
+    const label = (button.innerText || button.value || '').trim().toLowerCase();
+    if (label && label.length < 40 && texts.some(text => label === text || label.startsWith(text))) {
+        button.click();
+        return label;
+    }
+}
+return null;
+"""
+
+
+class ProfileTemplate:
+    """
+    Шаблон прогретого профиля Chrome
+
+    Профиль строится один раз: Chrome проходит первый запуск, посещает
+    целевые сайты, принимает баннеры согласия и заполняет HTTP-кэш
+    статикой. Каждый драйвер получает дешёвую копию шаблона: файлы
+    клонируются копированием при записи, где ФС это умеет, иначе
+    копируются. Жёсткие ссылки не используются: Chrome дописывает и
+    удаляет записи HTTP-кэша на месте, и клон испортил бы шаблон.
+    """
+
+    MARKER = ".template.json"
+
+    def __init__(self, config: Settings):
+        self.config = config
+        self.template_dir = Path(config.PROFILE_TEMPLATE_DIR)
+        self.clones_dir = Path(config.PROFILE_CLONES_DIR)
+        self.logger = logging.getLogger(__name__)
+        self.stats = {'clones': 0, 'reflinked': 0, 'copied': 0, 'clone_seconds': 0.0}
+
+    # --- Построение шаблона ---
+
+    def get_info(self):
+        """Сведения о шаблоне из маркера или None, если шаблона нет"""
+        try:
+            with open(self.template_dir / self.MARKER, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def is_fresh(self):
+        info = self.get_info()
+        if not info:
+            return False
+        return time.time() - info.get('built_at', 0) < self.config.PROFILE_TEMPLATE_MAX_AGE
+
+    def ensure_built(self, urls, driver_factory=None):
+        """Построение шаблона, если его нет или он устарел; False при ошибке"""
+        if self.is_fresh():
+            return True
+        try:
+            self.build(urls, driver_factory)
+            return True
+        except Exception as e:
+            self.logger.error(f"Не удалось построить шаблон профиля: {str(e)}")
+            shutil.rmtree(self.template_dir, ignore_errors=True)
+            return False
+
+    def build(self, urls, driver_factory=None):
+        """
+        Прогрев профиля на целевых сайтах
+
+        Args:
+            urls (list): Сайты для прогрева
+            driver_factory (callable): driver_factory(user_data_dir) -> WebDriver
+        """
+        from selenium import webdriver
+        from config.browser_config import BrowserConfig
+
+        if driver_factory is None:
+            def driver_factory(user_data_dir):
+                options = BrowserConfig.get_chrome_options(self.config, user_data_dir=user_data_dir)
+                return webdriver.Chrome(options=options)
+
+        shutil.rmtree(self.template_dir, ignore_errors=True)
+        self.template_dir.mkdir(parents=True, exist_ok=True)
+        started = time.time()
+        cookies = self._load_saved_cookies()
+        consents = {}
+
+        driver = driver_factory(str(self.template_dir))
+        try:
+            driver.set_page_load_timeout(self.config.PAGE_LOAD_TIMEOUT)
+            for url in urls:
+                try:
+                    driver.get(url)
+                    domain = urlparse(url).netloc
+                    restored = self._restore_cookies(driver, cookies, domain)
+                    if restored:
+                        driver.refresh()
+                    consents[domain] = driver.execute_script(CONSENT_SCRIPT, list(self.config.CONSENT_BUTTON_TEXTS))
+                    time.sleep(self.config.PROFILE_WARMUP_SETTLE)
+                except Exception as e:
+                    self.logger.warning(f"Прогрев профиля на {url} не выполнен: {str(e)}")
+        finally:
+            # quit() сбрасывает cookies и кэш на диск
+            driver.quit()
+
+        self._strip_volatile(self.template_dir)
+        info = {
+            'built_at': time.time(),
+            'build_seconds': round(time.time() - started, 2),
+            'urls': list(urls),
+            'consents': consents,
+            'size_mb': round(self._dir_size(self.template_dir) / 1024 / 1024, 1)
+        }
+        with open(self.template_dir / self.MARKER, 'w', encoding='utf-8') as f:
+            json.dump(info, f, indent=2, ensure_ascii=False)
+        self.logger.info(f"Шаблон профиля построен за {info['build_seconds']} с, {info['size_mb']} MB")
+        return info
+
+    def _load_saved_cookies(self):
+        """Cookies, сохранённые PageLoader.get_cookies (COOKIES_DIR/cookies.pkl)"""
+        try:
+            with open(self.config.COOKIES_DIR / "cookies.pkl", 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            self.logger.warning(f"Сохранённые cookies не прочитаны: {str(e)}")
+            return []
+
+    def _restore_cookies(self, driver, cookies, domain):
+        restored = 0
+        for cookie in cookies:
+            cookie_domain = cookie.get('domain', '').lstrip('.')
+            if cookie_domain and (domain == cookie_domain or domain.endswith('.' + cookie_domain)):
+                try:
+                    driver.add_cookie(cookie)
+                    restored += 1
+                except Exception:
+                    continue
+        return restored
+
+    def _strip_volatile(self, root):
+        for entry in VOLATILE_ENTRIES:
+            path = root / entry
+            if path.is_dir() and not path.is_symlink():
+                shutil.rmtree(path, ignore_errors=True)
+            elif path.exists() or path.is_symlink():
+                path.unlink()
+
+    @staticmethod
+    def _dir_size(root):
+        return sum(path.stat().st_size for path in root.rglob('*') if path.is_file() and not path.is_symlink())
+
+    # --- Клонирование ---
+
+    def clone(self):
+        """
+        Копия шаблона для одного драйвера
+
+        Returns:
+            str: Путь к каталогу профиля или None, если шаблона нет
+        """
+        if not self.get_info():
+            return None
+
+        started = time.perf_counter()
+        target = self.clones_dir / f"profile-{uuid.uuid4().hex[:12]}"
+        target.mkdir(parents=True)
+
+        for source_dir, dirnames, filenames in os.walk(self.template_dir):
+            relative = Path(source_dir).relative_to(self.template_dir)
+            (target / relative).mkdir(exist_ok=True)
+            for name in filenames:
+                if relative == Path('.') and name == self.MARKER:
+                    continue
+                self._clone_file(Path(source_dir) / name, target / relative / name)
+
+        elapsed = time.perf_counter() - started
+        self.stats['clones'] += 1
+        self.stats['clone_seconds'] += elapsed
+        self.logger.debug(f"Профиль склонирован за {elapsed:.3f} с: {target}")
+        return str(target)
+
+    def _clone_file(self, source, target):
+        """Копирование при записи, иначе обычная копия"""
+        if fcntl is not None:
+            try:
+                with open(source, 'rb') as src, open(target, 'wb') as dst:
+                    fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                self.stats['reflinked'] += 1
+                return
+            except OSError as e:
+                if e.errno not in (errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL, errno.ENOTTY, errno.EBADF):
+                    raise
+
+        shutil.copy2(source, target)
+        self.stats['copied'] += 1
+
+    def release(self, profile_dir):
+        """Удаление копии профиля после закрытия драйвера"""
+        if profile_dir and Path(profile_dir).parent == self.clones_dir:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+    def get_stats(self):
+        clones = self.stats['clones']
+        return {
+            **self.stats,
+            'avg_clone_seconds': round(self.stats['clone_seconds'] / clones, 4) if clones else 0.0,
+            'template': self.get_info()
+        }
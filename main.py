@@ -1,140 +1,523 @@
 from config.settings import Settings
-from core.driver_manager import DriverManager
-from modules.parser.page_loader import PageLoader
-from modules.detection.ad_detector import AdDetector
-from modules.screenshot.capturer import ScreenshotCapturer
-from modules.screenshot.annotator import ScreenshotAnnotator
-from modules.screenshot.legend_builder import LegendBuilder
-from modules.reporting.report_generator import ReportGenerator
-
-from modules.interaction_v1.interaction_manager_v1 import InteractionManagerV1
 from utils.logger import setup_logging
+import argparse
 import logging
+import sys
 import time
 import json
 
-def main():
-    """Основная функция приложения"""
-    setup_logging()
-    logger = logging.getLogger(__name__)
-    
-    config = Settings()
-    logger.info("Запуск приложения Ad Parser")
-    
-    urls = [
-        "https://ria.ru/",
-        "https://1prime.ru/",
-        "https://monocle.ru/",
-        "https://rg.ru/",
-        "https://oilcapital.ru/",
-        "https://secretmag.ru/",
-        "https://www.rbc.ru/",
-        "https://tass.ru/",
-        "https://www.m24.ru/"
-    ]
+# Браузерный стек (Selenium, PIL, NumPy) и отчёты импортируются внутри команд:
+# report и analyze не должны платить за загрузку scan
+
+DEFAULT_URLS = [
+    "https://ria.ru/",
+    "https://1prime.ru/",
+    "https://monocle.ru/",
+    "https://rg.ru/",
+    "https://oilcapital.ru/",
+    "https://secretmag.ru/",
+    "https://www.rbc.ru/",
+    "https://tass.ru/",
+    "https://www.m24.ru/"
+]
+
+def render_annotations(config, detected_ads, full_page_screenshot, scan):
+    """
+    Разметка скриншота
+
+    По умолчанию (ANNOTATION_MODE = "overlay") сохраняется только JSON
+    разметки рядом со скриншотом; размеченное и сравнительное изображения
+    и легенда строятся командами render и legends по запросу. Файл
+    разметки называется по сканированию: имя скриншота в хранилище —
+    хеш содержимого и может совпасть у разных сканирований.
+
+    Returns:
+        str: Путь к файлу разметки или None при ошибке
+    """
+    from modules.screenshot.annotator import ScreenshotAnnotator
+    from modules.screenshot.legend_builder import LegendBuilder
+
+    try:
+        screenshot_annotator = ScreenshotAnnotator(config)
+
+        overlay = screenshot_annotator.build_overlay(detected_ads, full_page_screenshot)
+        overlay_path = screenshot_annotator.save_overlay(
+            overlay, screenshot_annotator.overlay_path(full_page_screenshot, scan)
+        )
+
+        if config.ANNOTATION_MODE == "eager":
+            render_overlay_images(config, overlay, comparison=True)
+            LegendBuilder(config).create_detailed_legend_image(detected_ads, scan=scan)
+
+        return overlay_path
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Ошибка разметки скриншота {scan}: {str(e)}")
+        return None
 
+
+def log_ad_summary(detected_ads):
+    """Сводка по объявлениям сканирования — один раз, для лога, легенды и отчётов"""
+    from modules.reporting.statistics import StatisticsCalculator
+
+    ad_summary = StatisticsCalculator().calculate_ad_summary(detected_ads)
+    logging.getLogger(__name__).info(f"Статистика обнаружения: {json.dumps(ad_summary, indent=2)}")
+    return ad_summary
+
+
+def render_overlay_images(config, overlay, comparison=False):
+    """Размеченное и (по запросу) сравнительное изображения из сохранённой разметки; {} при ошибке"""
+    from modules.screenshot.annotator import ScreenshotAnnotator
+
+    try:
+        screenshot_annotator = ScreenshotAnnotator(config)
+        annotated_screenshot = screenshot_annotator.render_overlay(overlay)
+        images = {'annotated': annotated_screenshot}
+        if comparison:
+            images['comparison'] = screenshot_annotator.create_comparison_image(
+                overlay['screenshot'],
+                annotated_screenshot
+            )
+        return images
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Ошибка отрисовки разметки {overlay.get('screenshot')}: {str(e)}")
+        return {}
+
+
+def run_selenium_scans(urls, config, pacing, on_result=None):
+    """Последовательное сканирование через Selenium WebDriver под надзором супервизора"""
+    from core.driver_manager import DriverManager
+    from core.driver_supervisor import DriverSupervisor
+    from modules.parser.page_loader import PageLoader
+    from modules.detection.ad_detector import AdDetector
+    from modules.screenshot.capturer import ScreenshotCapturer
+    from modules.interaction_v1.interaction_manager_v1 import InteractionManagerV1
+    from utils.domain import registrable_domain, scan_key
+
+    logger = logging.getLogger(__name__)
     driver_manager = DriverManager(config)
+    memory_manager = driver_manager.memory_manager
+    supervisor = DriverSupervisor(driver_manager, config)
+
+    def scan_url(driver, url):
+        # Драйвер пересоздаётся на каждый URL; при сохраняющемся давлении
+        # памяти сканирование ждёт её освобождения
+        if memory_manager.should_pause():
+            memory_manager.wait_for_headroom(config.MEMORY_PAUSE_TIMEOUT)
+
+        logger.info(f"URL-адрес обработки: {url}")
+        scan_start_time = time.time()
+        key = scan_key(url, scan_start_time)
+        pacing.set_domain(registrable_domain(url))
+        memory_manager.begin_scan()
+
+        page_loader = PageLoader(driver, config, pacing=pacing)
+
+        ad_detector = AdDetector(driver, config)
+
+        screenshot_capturer = ScreenshotCapturer(driver, config)
+
+        interaction_manager = InteractionManagerV1(driver, config, pacing=pacing)
+
+        if not page_loader.load_page(url):
+            logger.error(f"Не удалось загрузить страницу.: {url}")
+            return None
+
+        ad_detector.start_observing()
+
+        page_loader.scroll_page(scroll_steps = 15)
+
+        detected_ads = ad_detector.detect_ads()
+        logger.info(f"Обнаружено {len(detected_ads)} реклам на {url}")
+        ad_summary = log_ad_summary(detected_ads)
+
+        full_page_screenshot = screenshot_capturer.capture_full_page(scan=key)
+
+        annotation_overlay = None
+        if detected_ads and full_page_screenshot:
+            annotation_overlay = render_annotations(config, detected_ads, full_page_screenshot, key)
+
+            screenshot_capturer.capture_ads_screenshots(detected_ads)
+
+        # Шаги выше перехватывают ошибки сами — мёртвый сеанс видно только по проверке
+        supervisor.check(driver)
+
+        # Вкладки параллельного режима — основной источник роста памяти Chrome
+        memory_action = driver_manager.relieve_memory_pressure()
+        if memory_action in ('recycle_driver', 'pause'):
+            logger.warning("Давление памяти: взаимодействие выполняется последовательно")
+
+        if config.INTERACTION_CONCURRENCY > 1 and memory_action not in ('recycle_driver', 'pause'):
+            interaction_results = interaction_manager.perform_concurrent_ad_interaction(detected_ads)
+        else:
+            interaction_results = interaction_manager.perform_complete_ad_interaction(detected_ads)
+
+        supervisor.check(driver)
+
+        logger.info(f"Завершена обработка для {url}")
+        return {
+            'url': url,
+            'main_domain': registrable_domain(url),
+            'scan_key': key,
+            'scan_timestamp': time.time(),
+            'scan_duration': time.time() - scan_start_time,
+            'detected_ads': detected_ads,
+            'ad_summary': ad_summary,
+            'interaction_results': interaction_results,
+            'full_page_screenshot': full_page_screenshot,
+            'annotation_overlay': annotation_overlay,
+            'processed_urls': [url],
+            'memory_usage': memory_manager.end_scan()
+        }
 
-    all_scan_data = []
-    
     try:
-        for url in urls:
-            logger.info(f"URL-адрес обработки: {url}")
-            scan_start_time = time.time()
+        return supervisor.run(urls, scan_url, on_result)
+    finally:
+        memory_manager.stop_sampling()
+        logger.info(f"Супервизор драйвера: {json.dumps(supervisor.get_stats(), ensure_ascii=False)}")
 
-            with driver_manager as driver:
 
-                if not driver:
-                    logger.error("Не удалось создать драйвер")
-                    continue
+def run_cdp_scans(urls, config, on_result=None):
+    """Параллельное сканирование через DevTools: много вкладок на несколько браузеров"""
+    import asyncio
+    from modules.cdp.pipeline import AsyncScanPipeline
+    from modules.screenshot.legend_builder import LegendBuilder
 
-                page_loader = PageLoader(driver, config)
+    logger = logging.getLogger(__name__)
 
-                ad_detector = AdDetector(driver, config)
+    def annotate(scan_data):
+        # Разметка — до записи в scan_data.jsonl и отчётов, как в последовательном режиме
+        logger.info(f"Статистика обнаружения {scan_data['main_domain']}: {json.dumps(scan_data['ad_summary'], indent=2)}")
+        if scan_data['detected_ads'] and scan_data.get('full_page_screenshot'):
+            scan_data['annotation_overlay'] = render_annotations(
+                config, scan_data['detected_ads'], scan_data['full_page_screenshot'], LegendBuilder.scan_key(scan_data)
+            )
+        if on_result:
+            on_result(scan_data)
 
-                screenshot_capturer = ScreenshotCapturer(driver, config)
+    return asyncio.run(AsyncScanPipeline(config).run(urls, annotate))
 
-                interaction_manager = InteractionManagerV1(driver, config)
 
-                screenshot_annotator = ScreenshotAnnotator(config)
- 
-                legend_builder = LegendBuilder(config)
+def generate_reports(config, all_scan_data, report_worker, summary_extra=None):
+    """
+    Завершение отчётов и итоговая сводка
 
-                if not page_loader.load_page(url):
-                    logger.error(f"Не удалось загрузить страницу.: {url}")
-                    continue
+    Отчёты по доменам строятся ReportWorker по мере поступления сканирований;
+    здесь только дожидается хвост очереди и собирается пакетный отчёт.
+    """
+    logger = logging.getLogger(__name__)
+    logger.info("Создание комплексных отчетов...")
+    reports = report_worker.finish()
+    logger.info(f"Хвост построения отчётов: {report_worker.stats['tail_seconds']} с")
 
-                page_loader.scroll_page(scroll_steps = 15)
+    final_summary = {
+        'total_domains_processed': len(all_scan_data),
+        'total_ads_detected': sum(len(scan.get('detected_ads', [])) for scan in all_scan_data),
+        'total_interactions': sum(len(scan.get('interaction_results', [])) for scan in all_scan_data),
+        'individual_reports': reports['individual_reports'],
+        'batch_report': reports['batch_report'],
+        **(summary_extra or {}),
+        'generated_at': time.time()
+    }
 
-                detected_ads = ad_detector.detect_ads()
-                logger.info(f"Обнаружено {len(detected_ads)} реклам на {url}")
+    summary_path = config.OUTPUT_DIR / "final_summary.json"
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(final_summary, f, indent=2, ensure_ascii=False)
+    return final_summary
 
-                full_page_screenshot = screenshot_capturer.capture_full_page()
-                annotated_screenshot = None
 
-                if detected_ads and full_page_screenshot:
-                    annotated_screenshot = screenshot_annotator.annotate_ads_on_screenshot(
-                        full_page_screenshot, detected_ads
-                    )
+def build_dashboard(config, path=None, output_dir=None):
+    """HTML-сводка пакета по scan_data.jsonl (читается потоково)"""
+    from modules.reporting.dashboard import DashboardBuilder
+
+    index_path = DashboardBuilder(config, output_dir).build_from_file(path)
+    logging.getLogger(__name__).info(f"HTML-сводка: {index_path}")
+    return index_path
+
+
+def wait_for_screenshots(config, scan_data):
+    """
+    Ожидание кодирования скриншотов сканирования в хранилище
+
+    Отчёты (миниатюры PDF) читают файлы с диска, поэтому сканирование
+    передаётся ReportWorker только после записи его снимков.
+    """
+    if not config.SCREENSHOT_STORAGE_ENABLED:
+        return
+    from modules.screenshot.storage import ScreenshotStorage
+
+    storage = ScreenshotStorage.get(config)
+    paths = [scan_data.get('full_page_screenshot')]
+    paths += [ad.get('screenshot_path') for ad in scan_data.get('detected_ads', [])]
+    paths += list((scan_data.get('ad_screenshots') or {}).values())
+    for path in dict.fromkeys(filter(None, paths)):
+        try:
+            storage.wait(path)
+        except Exception as e:
+            logging.getLogger(__name__).error(f"Ошибка записи скриншота {path}: {str(e)}")
+
+
+def load_scan_data(config, path=None):
+    """Результаты сканирований, сохранённые командой scan"""
+    from utils.file_utils import read_jsonl
+
+    path = path or config.SCAN_DATA_PATH
+    try:
+        return list(read_jsonl(path))
+    except FileNotFoundError:
+        logging.getLogger(__name__).error(f"Нет сохранённых данных сканирования: {path}")
+        return []
 
-                    comparison_image = screenshot_annotator.create_comparison_image(
-                        full_page_screenshot,
-                        annotated_screenshot
-                    )
 
-                    legend_builder.create_detailed_legend_image(detected_ads)
+def command_scan(config, args):
+    """Сканирование сайтов, сохранение scan_data.jsonl и отчёты"""
+    from config.rule_packs import RuleRegistry
+    from core.pacing_scheduler import PacingScheduler
+    from core.profile_template import ProfileTemplate
+    from modules.reporting.report_worker import ReportWorker
+    from utils.file_utils import JSONLWriter
 
-                    stats = legend_builder.create_summary_statistics(detected_ads)
-                    logger.info(f"Статистика обнаружения: {json.dumps(stats, indent=2)}")
+    logger = logging.getLogger(__name__)
+    urls = args.urls or DEFAULT_URLS
 
-                    screenshot_capturer.capture_ads_screenshots(detected_ads)
+    logger.info(f"Правила обнаружения: {RuleRegistry.current()}")
+    if config.RULES_HOT_RELOAD:
+        RuleRegistry.start_watching(config.RULES_RELOAD_INTERVAL)
 
-                interaction_results = interaction_manager.perform_complete_ad_interaction(detected_ads)
+    pacing = PacingScheduler(config)
+    
+    try:
+        if config.PROFILE_TEMPLATE_ENABLED:
+            # Прогретый профиль строится один раз и переиспользуется до PROFILE_TEMPLATE_MAX_AGE
+            ProfileTemplate(config).ensure_built(urls)
 
-                scan_data = {
-                    'url': url,
-                    'main_domain': url.split('//')[-1].split('/')[0],
-                    'scan_timestamp': time.time(),
-                    'scan_duration': time.time() - scan_start_time,
-                    'detected_ads': detected_ads,
-                    'interaction_results': interaction_results,
-                    'processed_urls': [url]
-                }
+        # Сырые данные (для команды report) и отчёты пишутся по мере завершения сканирований
+        with JSONLWriter(config.SCAN_DATA_PATH) as writer, ReportWorker(config) as report_worker:
 
-                all_scan_data.append(scan_data)
+            def on_result(scan_data):
+                writer.write(scan_data)
+                wait_for_screenshots(config, scan_data)
+                report_worker.submit(scan_data)
 
-                logger.info(f"Завершена обработка для {url}")
+            if config.BACKEND == "cdp":
+                all_scan_data = run_cdp_scans(urls, config, on_result)
+            else:
+                all_scan_data = run_selenium_scans(urls, config, pacing, on_result)
         
-        if all_scan_data:
-            logger.info("Создание комплексных отчетов...")
-            report_generator = ReportGenerator(config)
-
-            individual_reports = []
-            for scan_data in all_scan_data:
-                report_paths = report_generator.generate_comprehensive_report(scan_data)
-                individual_reports.append({
-                    'domain': scan_data.get('main_domain'),
-                    'report_paths': report_paths
-                })
-                logger.info(f"Generated reports for {scan_data.get('main_domain')}: {report_paths}")
-
-            batch_report_paths = report_generator.generate_batch_report(all_scan_data)
-
-            final_summary = {
-                'total_domains_processed': len(all_scan_data),
-                'total_ads_detected': sum(len(scan.get('detected_ads', [])) for scan in all_scan_data),
-                'total_interactions': sum(len(scan.get('interaction_results', [])) for scan in all_scan_data),
-                'individual_reports': individual_reports,
-                'batch_report': batch_report_paths,
-                'generated_at': time.time()
-            }
-
-            summary_path = config.OUTPUT_DIR / "final_summary.json"
-            with open(summary_path, 'w', encoding='utf-8') as f:
-                json.dump(final_summary, f, indent=2, ensure_ascii=False)
+            if all_scan_data:
+                generate_reports(config, all_scan_data, report_worker, {'pacing': pacing.get_report()})
         
-        else:
-            logger.warning("Данные сканирования не собираются — создание отчета пропускается")
+            else:
+                logger.warning("Данные сканирования не собираются — создание отчета пропускается")
+
+        if all_scan_data and config.DASHBOARD_ENABLED:
+            try:
+                build_dashboard(config)
+            except Exception as e:
+                # Сводка вторична: сканирования и отчёты уже сохранены
+                logger.error(f"Ошибка построения HTML-сводки: {str(e)}")
+
+    finally:
+        from utils.performance import get_startup_report
+
+        logger.info(f"Паузы и работа: {json.dumps(pacing.get_report(), ensure_ascii=False)}")
+        if config.SCREENSHOT_STORAGE_ENABLED:
+            from modules.screenshot.storage import ScreenshotStorage
+
+            storage = ScreenshotStorage.get(config)
+            storage.flush()
+            logger.info(f"Скриншоты: {json.dumps(storage.get_stats(), ensure_ascii=False)}")
+        if config.CREATIVE_STORE_ENABLED:
+            from modules.screenshot.creative_store import CreativeStore
+
+            logger.info(f"Креативы: {json.dumps(CreativeStore.get(config).get_stats(), ensure_ascii=False)}")
+        logger.info(f"Инициализация подсистем, мс: {json.dumps(get_startup_report(), ensure_ascii=False)}")
+
+
+def command_report(config, args):
+    """Повторное построение отчётов из сохранённых данных сканирования"""
+    from modules.reporting.report_worker import ReportWorker
+
+    logger = logging.getLogger(__name__)
+    all_scan_data = load_scan_data(config, args.input)
+    if not all_scan_data:
+        logger.warning("Данные сканирования не собираются — создание отчета пропускается")
+        return
+    with ReportWorker(config) as report_worker:
+        for scan_data in all_scan_data:
+            report_worker.submit(scan_data)
+        summary = generate_reports(config, all_scan_data, report_worker)
+    logger.info(f"Отчёты перестроены для {summary['total_domains_processed']} доменов")
+
+
+def command_analyze(config, args):
+    """Сравнительная статистика по сохранённым данным сканирования"""
+    from modules.reporting.statistics import StatisticsCalculator
+
+    logger = logging.getLogger(__name__)
+    all_scan_data = load_scan_data(config, args.input)
+    if not all_scan_data:
+        logger.warning("Данные сканирования не собираются — анализ не сохраняется")
+        return None
+    calculator = StatisticsCalculator()
+    analysis = {
+        'domains': {
+            scan.get('main_domain'): calculator.calculate_comprehensive_stats(scan) for scan in all_scan_data
+        },
+        'comparative': calculator.calculate_comparative_stats(all_scan_data),
+        'generated_at': time.time()
+    }
+
+    analysis_path = config.OUTPUT_DIR / "analysis.json"
+    with open(analysis_path, 'w', encoding='utf-8') as f:
+        json.dump(analysis, f, indent=2, ensure_ascii=False, default=str)
+    logger.info(f"Анализ сохранён: {analysis_path}")
+    return analysis
+
+
+def command_urls(config, args):
+    """Сводная аналитика посадочных URL по сохранённым данным за любой период"""
+    from modules.reporting.url_analytics import URLAnalytics
+
+    logger = logging.getLogger(__name__)
+    analytics = URLAnalytics(config)
+    try:
+        summary = analytics.run(args.input or [config.SCAN_DATA_PATH])
+    except OSError as e:
+        logger.error(f"Не удалось прочитать данные для аналитики URL: {e.filename or e}")
+        return None
+    if not summary.get('total_urls'):
+        logger.warning("Посадочные URL не найдены — аналитика не сохраняется")
+        return summary
+    logger.info(f"Аналитика URL сохранена: {analytics.save(summary)}")
+    return summary
+
+
+def command_render(config, args):
+    """Размеченные изображения по сохранённой разметке — только для выбранных сканирований"""
+    from modules.screenshot.annotator import ScreenshotAnnotator
+    from modules.screenshot.legend_builder import LegendBuilder
+
+    logger = logging.getLogger(__name__)
+    screenshot_annotator = ScreenshotAnnotator(config)
+    rendered = []
+    try:
+        for scan_data in load_scan_data(config, args.input):
+            screenshot = scan_data.get('full_page_screenshot')
+            if not screenshot or (args.domain and scan_data.get('main_domain') not in args.domain):
+                continue
+            try:
+                overlay_path = scan_data.get('annotation_overlay') or screenshot_annotator.overlay_path(
+                    screenshot, LegendBuilder.scan_key(scan_data)
+                )
+                overlay = screenshot_annotator.load_overlay(overlay_path)
+                if overlay is None:
+                    # Сканирования до появления разметки: она строится по detected_ads
+                    overlay = screenshot_annotator.build_overlay(scan_data.get('detected_ads', []), screenshot)
+                if args.html:
+                    screenshot_annotator.save_overlay(overlay, overlay_path, html=True)
+                    continue
+                images = render_overlay_images(config, overlay, comparison=args.comparison)
+                if not images:
+                    continue
+                if args.legend:
+                    images['legend'] = LegendBuilder(config).create_detailed_legend_image(
+                        scan_data.get('detected_ads', []), scan=LegendBuilder.scan_key(scan_data)
+                    )
+                rendered.append({'main_domain': scan_data.get('main_domain'), **images})
+                logger.info(f"Разметка {scan_data.get('main_domain')}: {json.dumps(images, ensure_ascii=False)}")
+            except Exception as e:
+                # Одна битая разметка или скриншот не прерывают остальные сканирования
+                logger.error(f"Ошибка отрисовки {scan_data.get('main_domain')}: {str(e)}")
+    finally:
+        if config.SCREENSHOT_STORAGE_ENABLED:
+            from modules.screenshot.storage import ScreenshotStorage
+
+            ScreenshotStorage.get(config).flush()
+    return rendered
+
+
+def command_legends(config, args):
+    """Легенды объявлений для всех сохранённых сканирований: лист или файлы"""
+    from modules.screenshot.legend_builder import LegendBuilder
+
+    all_scan_data = [scan for scan in load_scan_data(config, args.input) if scan.get('detected_ads')]
+    return LegendBuilder(config).render_batch(all_scan_data, mode=args.mode)
+
+
+def command_dashboard(config, args):
+    """HTML-сводка по сохранённым данным сканирования"""
+    try:
+        return build_dashboard(config, args.input, args.output)
+    except FileNotFoundError:
+        logging.getLogger(__name__).error(f"Нет сохранённых данных сканирования: {args.input or config.SCAN_DATA_PATH}")
+        return None
+
+
+COMMANDS = {
+    'scan': command_scan,
+    'report': command_report,
+    'analyze': command_analyze,
+    'urls': command_urls,
+    'render': command_render,
+    'legends': command_legends,
+    'dashboard': command_dashboard
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="adparser", description="Ad Parser: обнаружение и анализ рекламы на сайтах")
+    subparsers = parser.add_subparsers(dest="command")
+
+    scan_parser = subparsers.add_parser("scan", help="сканирование сайтов (по умолчанию)")
+    scan_parser.add_argument("urls", nargs="*", help="адреса страниц; по умолчанию встроенный список")
+
+    for name, help_text in (("report", "перестроить отчёты из scan_data.jsonl"),
+                            ("analyze", "сравнительная статистика по scan_data.jsonl")):
+        command_parser = subparsers.add_parser(name, help=help_text)
+        command_parser.add_argument("--input", help="файл данных сканирования (JSON Lines)")
+
+    urls_parser = subparsers.add_parser("urls", help="аналитика посадочных URL: кампании, трекинг, риск")
+    urls_parser.add_argument("--input", nargs="+", help="файлы scan_data.jsonl или списки URL")
+
+    render_parser = subparsers.add_parser("render", help="размеченные изображения по сохранённой разметке")
+    render_parser.add_argument("--input", help="файл данных сканирования (JSON Lines)")
+    render_parser.add_argument("--domain", nargs="+", help="только эти домены")
+    render_parser.add_argument("--comparison", action="store_true", help="также сравнительное изображение")
+    render_parser.add_argument("--legend", action="store_true", help="также изображение легенды")
+    render_parser.add_argument("--html", action="store_true",
+                               help="только HTML-просмотрщики: разметку рисует браузер")
+
+    legends_parser = subparsers.add_parser("legends", help="легенды объявлений по scan_data.jsonl")
+    legends_parser.add_argument("--input", help="файл данных сканирования (JSON Lines)")
+    legends_parser.add_argument("--mode", choices=("sheet", "files"), help="многостраничный лист или файл на сканирование")
+
+    dashboard_parser = subparsers.add_parser("dashboard", help="HTML-сводка по scan_data.jsonl")
+    dashboard_parser.add_argument("--input", help="файл данных сканирования (JSON Lines)")
+    dashboard_parser.add_argument("--output", help="каталог сводки; по умолчанию DASHBOARD_DIR")
+
+    return parser
+
+
+def parse_args(argv=None):
+    """Аргументы командной строки; без известной команды выполняется scan"""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or (argv[0] not in COMMANDS and not argv[0].startswith('-')):
+        argv = ["scan", *argv]
+    return build_parser().parse_args(argv)
+
+
+def main(argv=None):
+    """Основная функция приложения"""
+    args = parse_args(argv)
+
+    setup_logging()
+    logger = logging.getLogger(__name__)
+    
+    config = Settings()
+    logger.info(f"Запуск приложения Ad Parser: {args.command}")
+    
+    try:
+        COMMANDS[args.command](config, args)
 
     except Exception as e:
         logger.error(f"Ошибка приложения: {str(e)}")
@@ -143,4 +526,4 @@ def main():
         logger.info("Приложение Ad Parser завершено")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,9 +1,16 @@
-from .parser import PageLoader, HTMLAnalyzer
-from .detection import AdDetector, NetworkIdentifier
-from .screenshot import ScreenshotCapturer
-from .interaction import InteractionManager
-from .interaction_v1 import InteractionManagerV1
-from .reporting import ReportGenerator
+import importlib
+
+# Подпакеты тянут Selenium, PIL и NumPy: импортируются при первом обращении к имени
+_LAZY_EXPORTS = {
+    'PageLoader': '.parser',
+    'HTMLAnalyzer': '.parser',
+    'AdDetector': '.detection',
+    'NetworkIdentifier': '.detection',
+    'ScreenshotCapturer': '.screenshot',
+    'InteractionManager': '.interaction',
+    'InteractionManagerV1': '.interaction_v1',
+    'ReportGenerator': '.reporting'
+}
 
 __all__ = [
     'PageLoader',
@@ -16,3 +23,10 @@ __all__ = [
     'ReportGenerator'
 ]
 
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,33 @@
+import importlib
+
+_LAZY_EXPORTS = {
+    'CDPConnection': '.connection',
+    'CDPSession': '.connection',
+    'CDPError': '.connection',
+    'CDPBrowser': '.browser',
+    'AsyncPageLoader': '.page_loader',
+    'AsyncAdDetector': '.ad_detector',
+    'AsyncScreenshotCapturer': '.capturer',
+    'AsyncRedirectTracker': '.redirect_tracker',
+    'AsyncScanPipeline': '.pipeline'
+}
+
+__all__ = [
+    'CDPConnection',
+    'CDPSession',
+    'CDPError',
+    'CDPBrowser',
+    'AsyncPageLoader',
+    'AsyncAdDetector',
+    'AsyncScreenshotCapturer',
+    'AsyncRedirectTracker',
+    'AsyncScanPipeline'
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,165 @@
+import logging
+from config.settings import Settings
+from config.rule_packs import RuleRegistry
+from modules.detection.network_identifier import NetworkIdentifier
+from modules.detection.pattern_matcher import PatternMatcher
+from modules.detection.query_planner import QueryPlanner, QUERY_SCRIPT
+from modules.detection.feature_extractor import FeatureExtractor
+from modules.detection.ad_scorer import AdScorer
+from modules.detection.selector_cache import SelectorCache
+from .connection import CDPSession
+
+# QUERY_SCRIPT без изменений, но узлы заменяются на метку data-adparser-id:
+# DOM узлы не передаются по значению, а метка позволяет вернуться к элементу
+# при снятии скриншота и переходе по рекламе.
+MARKED_QUERY_SCRIPT = """
+var items = (function () {%s}).apply(null, arguments);
+return items.map(function (item) {
+    var node = item.element;
+    if (!node.hasAttribute('data-adparser-id')) {
+        window.__adParserSeq = (window.__adParserSeq || 0) + 1;
+        node.setAttribute('data-adparser-id', 'q' + window.__adParserSeq);
+    }
+    item.marker = node.getAttribute('data-adparser-id');
+    delete item.element;
+    return item;
+});
+""" % QUERY_SCRIPT
+
+
+def marker_selector(marker):
+    return f'[data-adparser-id="{marker}"]'
+
+
+class AsyncAdDetector:
+    """Асинхронный аналог AdDetector: один запрос к DOM, оценка пакетом"""
+
+    def __init__(self, session: CDPSession, config: Settings, selector_cache: SelectorCache = None):
+        self.session = session
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self.ad_scorer = AdScorer(config.SCORING_WEIGHTS_PATH)
+        # Общий кэш конвейера сохраняет сам конвейер, собственный — детектор
+        self.owns_cache = selector_cache is None
+        if selector_cache is None and config.SELECTOR_CACHE_ENABLED:
+            selector_cache = SelectorCache(config)
+        self.selector_cache = selector_cache
+        self.domain = None
+        self.rules = None
+
+    def _apply_rules(self, rules):
+        self.rules = rules
+        self.network_identifier = NetworkIdentifier(rules)
+        self.pattern_matcher = PatternMatcher(rules)
+        self.planner = QueryPlanner(('class_pattern', 'id_pattern'), rules)
+        self.feature_extractor = FeatureExtractor(rules=rules)
+
+    async def detect_ads(self):
+        """Основной метод обнаружения рекламы на странице"""
+        self.logger.info("Запуск процесса обнаружения рекламы (CDP)")
+        self.domain = SelectorCache.domain_from_url(await self.session.evaluate("location.href"))
+        self._apply_rules(RuleRegistry.current().for_domain(self.domain))
+
+        ads = []
+        full_sweep = True
+        cache = self.selector_cache
+        if cache and self.domain and not cache.needs_full_sweep(self.domain):
+            selectors = cache.get_selectors(self.domain)
+            ads = await self._detect_by_query(", ".join(selectors), 'selector_cache') if selectors else []
+            if ads:
+                cache.record_hit(self.domain)
+                full_sweep = False
+            else:
+                cache.record_miss(self.domain)
+
+        if full_sweep:
+            ads = await self._detect_by_query(self.planner.selector)
+
+        unique_ads = self._remove_duplicates(ads)
+        self.logger.info(f"Всего обнаружено уникальных объявлений: {len(unique_ads)}")
+
+        if cache and self.domain:
+            cache.remember(self.domain, unique_ads, full_sweep=full_sweep, rules=self.rules)
+            if self.owns_cache:
+                cache.save()
+
+        return unique_ads
+
+    async def _detect_by_query(self, selector, detection_method=None):
+        if not selector:
+            return []
+        try:
+            candidates = await self.session.call(
+                MARKED_QUERY_SCRIPT, selector,
+                self.planner.class_patterns, self.planner.id_patterns, self.planner.data_attributes
+            ) or []
+        except Exception as e:
+            self.logger.error(f"Error in element detection: {str(e)}")
+            return []
+
+        self.logger.info(f"Запрос вернул {len(candidates)} элементов")
+        scores = self._score_candidates(candidates)
+
+        ads = []
+        for candidate, ad_score in zip(candidates, scores):
+            families = candidate.get('families') or []
+            ad_data = self._build_ad(candidate, detection_method or (families[0] if families else 'pattern_query'), ad_score)
+            if ad_data:
+                ads.append(ad_data)
+        return ads
+
+    def _score_candidates(self, candidates):
+        if not candidates or not self.ad_scorer.is_loaded:
+            return [None] * len(candidates)
+        try:
+            return self.ad_scorer.score(self.feature_extractor.extract(candidates)).tolist()
+        except Exception as e:
+            self.logger.warning(f"Пакетная оценка не удалась, используются эвристики: {str(e)}")
+            return [None] * len(candidates)
+
+    def _build_ad(self, candidate, detection_method, ad_score):
+        """Запись об объявлении в формате AdDetector (без WebElement)"""
+        if not candidate.get('is_displayed'):
+            return None
+
+        attributes = candidate['attributes']
+        if ad_score is None:
+            ad_score = self.pattern_matcher.calculate_ad_score(
+                attributes.get('class', '').lower(), attributes.get('id', '').lower(), attributes
+            )
+        if ad_score < 0.3:
+            return None
+
+        network_info = self.network_identifier.identify_by_attributes(attributes)
+        element_info = {
+            'size': candidate['size'],
+            'location': candidate['location'],
+            'is_displayed': candidate['is_displayed'],
+            'attributes': attributes
+        }
+        return {
+            'id': candidate['marker'],
+            'selector': marker_selector(candidate['marker']),
+            'type': 'banner',
+            'network': network_info['network'] if network_info else 'unknown',
+            'confidence': max(ad_score, network_info['confidence'] if network_info else 0),
+            'size': candidate['size'],
+            'location': candidate['location'],
+            'is_displayed': candidate['is_displayed'],
+            'attributes': attributes,
+            'detection_method': detection_method,
+            'ad_score': ad_score,
+            'element_info': element_info,
+            'matched_families': candidate.get('families') or []
+        }
+
+    def _remove_duplicates(self, ads):
+        """Удаление дублей по положению и размеру, как в AdDetector"""
+        unique_ads = []
+        seen_locations = set()
+        for ad in ads:
+            location_key = f"{ad['location']['x']}_{ad['location']['y']}_{ad['size']['width']}_{ad['size']['height']}"
+            if location_key not in seen_locations:
+                seen_locations.add(location_key)
+                unique_ads.append(ad)
+        return unique_ads
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from config.settings import Settings
+from config.browser_config import BrowserConfig
+from core.profile_template import ProfileTemplate
+from .connection import CDPConnection, CDPSession
+
+CHROME_CANDIDATES = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome')
+
+
+class CDPBrowser:
+    """Процесс Chrome, управляемый напрямую через DevTools протокол"""
+
+    def __init__(self, config: Settings):
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self.process = None
+        self.connection = None
+        self.user_data_dir = None
+        self.pages = set()
+
+    @staticmethod
+    def find_chrome_binary(config: Settings):
+        binary = config.CHROME_BINARY
+        if binary:
+            return str(binary)
+        for candidate in CHROME_CANDIDATES:
+            path = shutil.which(candidate)
+            if path:
+                return path
+        raise FileNotFoundError("Chrome binary not found; set Settings.CHROME_BINARY")
+
+    async def start(self):
+        """Запуск Chrome с отладочным портом и подключение к нему"""
+        profile_template = ProfileTemplate(self.config) if self.config.PROFILE_TEMPLATE_ENABLED is True else None
+        # Копирование шаблона — файловый ввод-вывод, цикл событий не блокируется
+        profile_dir = await asyncio.to_thread(profile_template.clone) if profile_template else None
+        self.user_data_dir = profile_dir or tempfile.mkdtemp(prefix="adparser-cdp-")
+        arguments = [
+            self.find_chrome_binary(self.config),
+            *BrowserConfig.get_chrome_arguments(self.config),
+            "--remote-debugging-port=0",
+            f"--user-data-dir={self.user_data_dir}",
+            "about:blank"
+        ]
+        self.process = await asyncio.create_subprocess_exec(
+            *arguments, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+        )
+
+        websocket_url = await self._wait_for_endpoint()
+        self.connection = await CDPConnection.connect(websocket_url, self.config.CDP_COMMAND_TIMEOUT)
+        self.logger.info(f"Chrome (CDP) запущен: pid {self.process.pid}")
+        return self
+
+    async def _wait_for_endpoint(self):
+        """Адрес DevTools из файла DevToolsActivePort, который пишет Chrome"""
+        port_file = Path(self.user_data_dir) / "DevToolsActivePort"
+        deadline = time.monotonic() + self.config.CDP_STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.returncode is not None:
+                raise RuntimeError(f"Chrome exited with code {self.process.returncode}")
+            try:
+                port, path = port_file.read_text().split("\n")[:2]
+                return f"ws://127.0.0.1:{port.strip()}{path.strip()}"
+            except (FileNotFoundError, ValueError):
+                await asyncio.sleep(0.1)
+        raise TimeoutError("Chrome DevTools endpoint did not appear")
+
+    async def new_page(self, browser_context_id=None, url="about:blank"):
+        """
+        Новая вкладка с подключённым сеансом
+
+        Args:
+            browser_context_id (str): Изолированный контекст браузера
+            url (str): Начальный адрес вкладки
+
+        Returns:
+            CDPSession
+        """
+        params = {'url': url}
+        if browser_context_id:
+            params['browserContextId'] = browser_context_id
+        target_id = (await self.connection.send('Target.createTarget', params))['targetId']
+        return await self.attach(target_id, browser_context_id)
+
+    async def attach(self, target_id, browser_context_id=None):
+        """Подключение к существующей вкладке (например, открытой кликом)"""
+        result = await self.connection.send('Target.attachToTarget', {'targetId': target_id, 'flatten': True})
+        session = CDPSession(self.connection, result['sessionId'], target_id, browser_context_id)
+        await session.send('Page.enable')
+        await session.send('Emulation.setDeviceMetricsOverride', {
+            'width': self.config.WIDTH_WINDOW,
+            'height': self.config.HEIGHT_WINDOW,
+            'deviceScaleFactor': 1,
+            'mobile': False
+        })
+        self.pages.add(session)
+        return session
+
+    async def close_page(self, session: CDPSession):
+        self.pages.discard(session)
+        try:
+            await self.connection.send('Target.closeTarget', {'targetId': session.target_id})
+        except Exception as e:
+            self.logger.debug(f"Error closing target {session.target_id}: {e}")
+
+    async def close(self):
+        """Закрытие браузера и удаление временного профиля"""
+        try:
+            if self.connection:
+                try:
+                    await self.connection.send('Browser.close', timeout=5)
+                except Exception:
+                    pass
+                await self.connection.close()
+            if self.process and self.process.returncode is None:
+                try:
+                    await asyncio.wait_for(self.process.wait(), 10)
+                except asyncio.TimeoutError:
+                    self.process.kill()
+                    await self.process.wait()
+            self.logger.info("Chrome (CDP) закрыт")
+        except Exception as e:
+            self.logger.error(f"Ошибка закрытия Chrome (CDP): {e}")
+        finally:
+            if self.user_data_dir:
+                shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
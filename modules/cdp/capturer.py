@@ -0,0 +1,164 @@
+import asyncio
+import base64
+import logging
+import time
+from config.settings import Settings
+from utils.domain import registrable_domain
+from .connection import CDPSession
+
+ELEMENT_RECT_SCRIPT = """
+var node = document.querySelector(arguments[0]);
+if (!node) { return null; }
+var rect = node.getBoundingClientRect();
+return {x: rect.left + window.scrollX, y: rect.top + window.scrollY, width: rect.width, height: rect.height};
+"""
+
+HIDE_OVERLAY_SCRIPT = """
+var node = document.querySelector(arguments[0]);
+if (node) { node.style.visibility = 'hidden'; }
+return !!node;
+"""
+
+
+class AsyncScreenshotCapturer:
+    """
+    Асинхронный аналог ScreenshotCapturer
+
+    Полная страница снимается одной командой (captureBeyondViewport) без
+    изменения размера окна; объявления — по clip-прямоугольнику.
+    """
+
+    def __init__(self, session: CDPSession, config: Settings):
+        self.session = session
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+
+    async def _capture_png(self, clip):
+        result = await self.session.send('Page.captureScreenshot', {
+            'format': 'png',
+            'captureBeyondViewport': True,
+            'clip': {**clip, 'scale': 1}
+        })
+        return base64.b64decode(result['data'])
+
+    async def _capture(self, clip, filename):
+        screenshot_path = self.config.SCREENSHOT_DIR / filename
+        data = await self._capture_png(clip)
+        await asyncio.to_thread(screenshot_path.write_bytes, data)
+        return str(screenshot_path)
+
+    async def capture_full_page(self, filename=None, scan=None):
+        """Захват полной страницы; scan — ключ сканирования для манифеста хранилища"""
+        try:
+            use_storage = filename is None and self.config.SCREENSHOT_STORAGE_ENABLED
+            if filename is None:
+                filename = await self._generate_filename("fullpage")
+
+            metrics = await self.session.send('Page.getLayoutMetrics')
+            content = metrics.get('cssContentSize') or metrics['contentSize']
+            clip = {'x': 0, 'y': 0, 'width': self.config.WIDTH_WINDOW, 'height': content['height']}
+
+            if use_storage:
+                screenshot_path = await self._store(await self._capture_png(clip), 'full_page', scan)
+            else:
+                screenshot_path = await self._capture(clip, filename)
+            self.logger.info(f"Полный скриншот страницы сохранен: {screenshot_path}")
+            return screenshot_path
+
+        except Exception as e:
+            self.logger.error(f"Error capturing full page: {str(e)}")
+            return None
+
+    async def _store(self, data, role, scan=None):
+        """PNG в хранилище скриншотов; хеширование вынесено из цикла событий"""
+        from modules.screenshot.storage import ScreenshotStorage
+
+        scan = scan or f"{await self._get_safe_domain()}_{int(time.time())}"
+        return await asyncio.to_thread(ScreenshotStorage.get(self.config).submit, data, role, scan)
+
+    async def capture_element_screenshot(self, selector, filename=None):
+        """Захват скриншота элемента по CSS селектору"""
+        try:
+            if filename is None:
+                filename = await self._generate_filename("element")
+
+            rect = await self.session.call(ELEMENT_RECT_SCRIPT, selector)
+            if not rect or rect['width'] <= 0 or rect['height'] <= 0:
+                return None
+
+            screenshot_path = await self._capture(rect, filename)
+            self.logger.info(f"Element screenshot saved: {screenshot_path}")
+            return screenshot_path
+
+        except Exception as e:
+            self.logger.error(f"Error capturing element: {str(e)}")
+            return None
+
+    async def capture_creative(self, selector, ad):
+        """Снимок объявления в хранилище креативов (хеширование и запись — в потоке)"""
+        from modules.screenshot.creative_store import CreativeStore
+
+        try:
+            rect = await self.session.call(ELEMENT_RECT_SCRIPT, selector)
+            if not rect or rect['width'] <= 0 or rect['height'] <= 0:
+                return None
+            data = await self._capture_png(rect)
+            source = {'url': await self.session.evaluate("location.href"), 'network': ad.get('network')}
+            stored = await asyncio.to_thread(CreativeStore.get(self.config).add, data, source)
+        except Exception as e:
+            self.logger.error(f"Error capturing creative: {str(e)}")
+            return None
+        if not stored:
+            return None
+        ad['creative_id'] = stored['creative_id']
+        ad['screenshot_path'] = stored['path']
+        return {**stored, 'ad_data': ad}
+
+    async def capture_ads_screenshots(self, ads_data, base_filename=None):
+        """Захват отдельных скриншотов для каждого рекламного блока"""
+        screenshots = {}
+
+        try:
+            if not await self.session.call(HIDE_OVERLAY_SCRIPT, "div.widgets__b-slide"):
+                self.logger.info("Нижний виджет отсутствует")
+        except Exception:
+            self.logger.info("Нижний виджет отсутствует")
+
+        for i, ad in enumerate(ads_data, start=1):
+            selector = ad.get('selector')
+            if not selector:
+                continue
+
+            if self.config.CREATIVE_STORE_ENABLED:
+                stored = await self.capture_creative(selector, ad)
+                if stored:
+                    screenshots[f"ad_{i}"] = stored
+                continue
+
+            if base_filename:
+                filename = f"{base_filename}_ad_{i}.png"
+            else:
+                filename = await self._generate_filename(f"ad_{i}")
+
+            screenshot_path = await self.capture_element_screenshot(selector, filename)
+            if screenshot_path:
+                screenshots[f"ad_{i}"] = {
+                    'path': screenshot_path,
+                    'ad_data': ad
+                }
+
+        return screenshots
+
+    async def _generate_filename(self, prefix):
+        """Генерация имени файла с timestamp"""
+        timestamp = int(time.time())
+        domain = await self._get_safe_domain()
+        return f"{domain}_{prefix}_{timestamp}.png"
+
+    async def _get_safe_domain(self):
+        try:
+            domain = registrable_domain(await self.session.evaluate("location.href"))
+            domain = "".join(c for c in domain if c.isalnum() or c in ('-', '.'))
+            return domain[:50] or "page"
+        except Exception:
+            return "page"
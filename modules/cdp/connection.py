@@ -0,0 +1,179 @@
+import asyncio
+import itertools
+import json
+import logging
+from collections import defaultdict
+from .websocket import AsyncWebSocket, ConnectionClosed
+
+
+class CDPError(Exception):
+    """Ошибка, возвращённая протоколом DevTools"""
+
+    def __init__(self, method, error):
+        self.method = method
+        self.code = error.get('code')
+        super().__init__(f"{method}: {error.get('message')} ({self.code})")
+
+
+class CDPConnection:
+    """
+    Одно WebSocket соединение с браузером, мультиплексирующее все вкладки
+
+    Команды сопоставляются с ответами по id, события раздаются подписчикам
+    по паре (sessionId, метод). Вкладки подключаются в плоском режиме
+    (Target.attachToTarget flatten=True), поэтому отдельные соединения на
+    вкладку не нужны.
+    """
+
+    def __init__(self, websocket, timeout=30):
+        self.websocket = websocket
+        self.timeout = timeout
+        self.logger = logging.getLogger(__name__)
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._listeners = defaultdict(list)
+        self._reader_task = None
+
+    @classmethod
+    async def connect(cls, url, timeout=30):
+        connection = cls(await AsyncWebSocket.connect(url, timeout), timeout)
+        connection.start()
+        return connection
+
+    def start(self):
+        self._reader_task = asyncio.ensure_future(self._read_loop())
+
+    async def send(self, method, params=None, session_id=None, timeout=None):
+        """
+        Выполнение команды и ожидание её результата
+
+        Raises:
+            CDPError: Браузер вернул ошибку
+            asyncio.TimeoutError: Ответ не пришёл за timeout секунд
+        """
+        message_id = next(self._ids)
+        message = {'id': message_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = (method, future)
+        try:
+            await self.websocket.send(json.dumps(message))
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        finally:
+            self._pending.pop(message_id, None)
+
+    def on(self, method, callback, session_id=None):
+        """
+        Подписка на событие
+
+        Returns:
+            callable: Отписка
+        """
+        key = (session_id, method)
+        self._listeners[key].append(callback)
+
+        def unsubscribe():
+            if callback in self._listeners.get(key, []):
+                self._listeners[key].remove(callback)
+
+        return unsubscribe
+
+    def expect(self, method, session_id=None, predicate=None):
+        """
+        Future первого события, удовлетворяющего predicate
+
+        Подписку нужно оформить до команды, вызывающей событие.
+        """
+        future = asyncio.get_running_loop().create_future()
+
+        def listener(params):
+            if future.done() or (predicate and not predicate(params)):
+                return
+            future.set_result(params)
+            unsubscribe()
+
+        unsubscribe = self.on(method, listener, session_id)
+        future.add_done_callback(lambda _: unsubscribe())
+        return future
+
+    async def _read_loop(self):
+        try:
+            while True:
+                message = json.loads(await self.websocket.recv())
+
+                if 'id' in message:
+                    method, future = self._pending.get(message['id'], (None, None))
+                    if future is None or future.done():
+                        continue
+                    if 'error' in message:
+                        future.set_exception(CDPError(method, message['error']))
+                    else:
+                        future.set_result(message.get('result', {}))
+                    continue
+
+                key = (message.get('sessionId'), message.get('method'))
+                for callback in list(self._listeners.get(key, [])):
+                    try:
+                        callback(message.get('params', {}))
+                    except Exception as e:
+                        self.logger.error(f"Ошибка обработчика события {key[1]}: {e}")
+
+        except ConnectionClosed as e:
+            self.logger.info(f"Соединение DevTools закрыто: {e}")
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.logger.error(f"Ошибка чтения DevTools: {e}")
+        finally:
+            for method, future in list(self._pending.values()):
+                if not future.done():
+                    future.set_exception(ConnectionClosed(f"{method}: connection closed"))
+
+    async def close(self):
+        if self._reader_task:
+            self._reader_task.cancel()
+        await self.websocket.close()
+
+
+class CDPSession:
+    """Сеанс одной вкладки внутри общего соединения"""
+
+    def __init__(self, connection: CDPConnection, session_id, target_id, browser_context_id=None):
+        self.connection = connection
+        self.session_id = session_id
+        self.target_id = target_id
+        self.browser_context_id = browser_context_id
+
+    async def send(self, method, params=None, timeout=None):
+        return await self.connection.send(method, params, self.session_id, timeout)
+
+    def on(self, method, callback):
+        return self.connection.on(method, callback, self.session_id)
+
+    def expect(self, method, predicate=None):
+        return self.connection.expect(method, self.session_id, predicate)
+
+    async def evaluate(self, expression, await_promise=False):
+        """Вычисление выражения в странице с возвратом значения"""
+        result = await self.send('Runtime.evaluate', {
+            'expression': expression,
+            'returnByValue': True,
+            'awaitPromise': await_promise
+        })
+        if 'exceptionDetails' in result:
+            details = result['exceptionDetails']
+            text = details.get('exception', {}).get('description') or details.get('text')
+            raise CDPError('Runtime.evaluate', {'message': text, 'code': None})
+        return result.get('result', {}).get('value')
+
+    async def call(self, function_body, *args):
+        """
+        Выполнение тела функции в стиле WebDriver execute_script
+
+        Тело использует arguments[i] и return, поэтому скрипты синхронных
+        модулей (QUERY_SCRIPT и т.п.) переиспользуются без изменений.
+        """
+        expression = f"(function(){{{function_body}}}).apply(null, {json.dumps(list(args))})"
+        return await self.evaluate(expression)
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from urllib.parse import urlparse
+from config.settings import Settings
+from utils.url_validator import URLValidator
+from .connection import CDPSession, CDPError
+
+
+class AsyncPageLoader:
+    """Асинхронный аналог PageLoader поверх сеанса DevTools"""
+
+    def __init__(self, session: CDPSession, config: Settings):
+        self.session = session
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self.validator = URLValidator()
+
+    async def load_page(self, url, retries=None) -> bool:
+        """Загружает страницу с обработкой ошибок и повторными попытками"""
+        if retries is None:
+            retries = self.config.MAX_RETRIES
+
+        if not self.validator.is_valid_url(url):
+            self.logger.error(f"Неверный URL-адрес: {url}")
+            return False
+
+        for attempt in range(retries):
+            try:
+                self.logger.info(f"Загрузка страницы: {url} (попытка {attempt + 1}/{retries})")
+
+                loaded = self.session.expect('Page.loadEventFired')
+                result = await self.session.send('Page.navigate', {'url': url})
+                if result.get('errorText'):
+                    loaded.cancel()
+                    raise CDPError('Page.navigate', {'message': result['errorText']})
+
+                try:
+                    await asyncio.wait_for(loaded, self.config.PAGE_LOAD_TIMEOUT)
+                except asyncio.TimeoutError:
+                    self.logger.warning("Истекло время загрузки страницы — продолжаем с текущего состояния")
+
+                self.logger.info(f"Успешно загружено: {url}")
+                return True
+
+            except CDPError as e:
+                self.logger.warning(f"Ошибка навигации {url}: {str(e)}")
+            except Exception as e:
+                self.logger.error(f"Неожиданная ошибка загрузки {url}: {str(e)}")
+
+            if attempt < retries - 1:
+                await asyncio.sleep(self.config.RETRY_DELAY * (attempt + 1))
+
+        self.logger.error(f"Не удалось загрузить {url} после {retries} попытки")
+        return False
+
+    async def scroll_page(self, scroll_steps=3, scroll_pause_time=0.4) -> bool:
+        """Прокрутка страницы для загрузки динамического контента"""
+        try:
+            page_height = await self.session.evaluate("document.body.scrollHeight")
+            scroll_step = page_height / scroll_steps
+
+            for i in range(scroll_steps):
+                await self.session.evaluate(f"window.scrollTo(0, {scroll_step * (i + 1)})")
+                await asyncio.sleep(scroll_pause_time)
+
+            await asyncio.sleep(1)
+
+            for i in range(scroll_steps, 0, -1):
+                await self.session.evaluate(f"window.scrollTo(0, {scroll_step * i})")
+                await asyncio.sleep(scroll_pause_time)
+
+            await self.session.evaluate("window.scrollTo(0, 0)")
+
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error scrolling page: {e}")
+            return False
+
+    async def get_current_url(self):
+        return await self.session.evaluate("location.href")
+
+    async def get_page_info(self):
+        """Сбор основной информации о странице"""
+        try:
+            info = await self.session.evaluate(
+                "({url: location.href, title: document.title,"
+                " page_source_length: document.documentElement.outerHTML.length,"
+                " window_size: {width: window.innerWidth, height: window.innerHeight}})"
+            )
+            info['domain'] = urlparse(info['url']).netloc
+            cookies = await self.session.send('Network.getCookies')
+            info['cookies'] = len(cookies.get('cookies', []))
+            return info
+        except Exception as e:
+            self.logger.error(f"Error getting page info: {str(e)}")
+            return {}
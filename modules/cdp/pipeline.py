@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import Settings
+from config.browser_config import BrowserConfig
+from core.context_scheduler import ContextScheduler
+from modules.detection.selector_cache import SelectorCache
+from modules.reporting.statistics import StatisticsCalculator
+from utils.domain import registrable_domain, scan_key
+from .browser import CDPBrowser
+from .page_loader import AsyncPageLoader
+from .ad_detector import AsyncAdDetector
+from .capturer import AsyncScreenshotCapturer
+from .redirect_tracker import AsyncRedirectTracker
+
+
+class AsyncScanPipeline:
+    """
+    Конвейер сканирования страниц через DevTools
+
+    Несколько браузеров, в каждом по CDP_TABS_PER_BROWSER вкладок; каждая
+    вкладка берёт следующий URL из общей очереди. При CDP_ISOLATE_CONTEXTS
+    каждое сканирование идёт в собственном контексте браузера (отдельные
+    cookies и хранилище). Кэш селекторов один на конвейер: вкладки
+    обновляют его в памяти, на диск он пишется один раз в конце run().
+    Формат результата совпадает с scan_data последовательного режима.
+    """
+
+    def __init__(self, config: Settings, browser_count=None, tabs_per_browser=None):
+        self.config = config
+        self.browser_count = max(1, int(browser_count or config.CDP_BROWSERS))
+        self.tabs_per_browser = max(1, int(tabs_per_browser or config.CDP_TABS_PER_BROWSER))
+        self.isolate_contexts = config.CDP_ISOLATE_CONTEXTS is True
+        self.context_stats = []
+        self.selector_cache = SelectorCache(config) if config.SELECTOR_CACHE_ENABLED else None
+        self.logger = logging.getLogger(__name__)
+
+    async def run(self, urls, on_result=None):
+        """Сканирование всех URL; результаты в исходном порядке, on_result — по мере готовности"""
+        queue = asyncio.Queue()
+        for index, url in enumerate(urls):
+            queue.put_nowait((index, url))
+        results = [None] * len(urls)
+
+        browser_count = min(self.browser_count, max(1, len(urls)))
+        browsers = []
+        # on_result блокирует (запись JSONL, ожидание кодирования скриншотов) —
+        # вызывается вне цикла событий, в одном потоке по очереди
+        result_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scan-results") if on_result else None
+        try:
+            for browser in await asyncio.gather(
+                *(CDPBrowser(self.config).start() for _ in range(browser_count)), return_exceptions=True
+            ):
+                if isinstance(browser, Exception):
+                    self.logger.error(f"Не удалось запустить Chrome (CDP): {browser}")
+                else:
+                    browsers.append(browser)
+
+            schedulers = {
+                browser: ContextScheduler(browser, self.config) if self.isolate_contexts else None
+                for browser in browsers
+            }
+            workers = [
+                self._worker(browser, schedulers[browser], queue, results, on_result, result_executor)
+                for browser in browsers
+                for _ in range(self.tabs_per_browser)
+            ]
+            await asyncio.gather(*workers)
+            self.context_stats = [s.get_stats() for s in schedulers.values() if s]
+            if self.context_stats:
+                self.logger.info(f"Контексты браузера: {self.context_stats}")
+        finally:
+            await asyncio.gather(*(browser.close() for browser in browsers), return_exceptions=True)
+            if result_executor:
+                result_executor.shutdown(wait=True)
+            if self.selector_cache:
+                self.selector_cache.save()
+                self.logger.info(f"Кэш селекторов: {self.selector_cache.get_metrics()}")
+
+        return [scan_data for scan_data in results if scan_data]
+
+    async def _worker(self, browser, scheduler, queue, results, on_result=None, result_executor=None):
+        while True:
+            try:
+                index, url = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                if scheduler is None:
+                    results[index] = await self.scan(browser, url)
+                else:
+                    async with scheduler.context(registrable_domain(url)) as context_id:
+                        results[index] = await self.scan(browser, url, context_id)
+            except Exception as e:
+                self.logger.error(f"Ошибка сканирования {url}: {e}")
+                continue
+            if on_result and results[index]:
+                try:
+                    await asyncio.get_running_loop().run_in_executor(result_executor, on_result, results[index])
+                except Exception as e:
+                    self.logger.error(f"Ошибка обработки результата {url}: {e}")
+
+    async def scan(self, browser: CDPBrowser, url, browser_context_id=None):
+        """Полный цикл одной страницы в отдельной вкладке"""
+        self.logger.info(f"URL-адрес обработки: {url}")
+        scan_start_time = time.time()
+        key = scan_key(url, scan_start_time)
+        session = await browser.new_page(browser_context_id)
+        try:
+            if self.config.USER_AGENT_PIN_PER_DOMAIN is True:
+                # Браузер общий для всех доменов — UA закрепляется на уровне вкладки
+                user_agent = BrowserConfig.get_user_agent(self.config, registrable_domain(url))
+                await session.send('Emulation.setUserAgentOverride', {'userAgent': user_agent})
+
+            page_loader = AsyncPageLoader(session, self.config)
+            if not await page_loader.load_page(url):
+                self.logger.error(f"Не удалось загрузить страницу.: {url}")
+                return None
+
+            await page_loader.scroll_page(scroll_steps=15)
+
+            detected_ads = await AsyncAdDetector(session, self.config, self.selector_cache).detect_ads()
+            self.logger.info(f"Обнаружено {len(detected_ads)} реклам на {url}")
+
+            capturer = AsyncScreenshotCapturer(session, self.config)
+            full_page_screenshot = await capturer.capture_full_page(scan=key)
+            ad_screenshots = await capturer.capture_ads_screenshots(detected_ads) if detected_ads else {}
+
+            interaction_results = await AsyncRedirectTracker(browser, session, self.config).track_ads(detected_ads)
+
+            self.logger.info(f"Завершена обработка для {url}")
+            return {
+                'url': url,
+                'main_domain': registrable_domain(url),
+                'scan_key': key,
+                'scan_timestamp': time.time(),
+                'scan_duration': time.time() - scan_start_time,
+                'detected_ads': detected_ads,
+                'ad_summary': StatisticsCalculator().calculate_ad_summary(detected_ads),
+                'interaction_results': interaction_results,
+                'processed_urls': [url],
+                'full_page_screenshot': full_page_screenshot,
+                'ad_screenshots': {key: shot['path'] for key, shot in ad_screenshots.items()},
+                'creative_ids': {key: shot.get('creative_id') for key, shot in ad_screenshots.items()}
+            }
+        finally:
+            await browser.close_page(session)
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+from config.settings import Settings
+from modules.interaction.url_engine import URLAnalysisEngine
+from .browser import CDPBrowser
+from .connection import CDPSession
+
+RESOLVE_TARGET_SCRIPT = """
+var node = document.querySelector(arguments[0]);
+if (!node) { return null; }
+var link = node.closest('a[href]') || node.querySelector('a[href]');
+node.scrollIntoView({block: 'center'});
+var rect = node.getBoundingClientRect();
+return {
+    href: link && /^https?:/i.test(link.href) ? link.href : null,
+    x: rect.left + Math.min(20, rect.width / 2),
+    y: rect.top + Math.min(10, rect.height / 2)
+};
+"""
+
+
+class AsyncRedirectTracker:
+    """
+    Асинхронное отслеживание переходов по рекламе
+
+    Для каждого объявления открывается отдельная вкладка того же контекста
+    браузера; вкладки грузятся параллельно (не более concurrency), цепочка
+    HTTP-редиректов собирается по событиям Network.requestWillBeSent.
+    """
+
+    def __init__(self, browser: CDPBrowser, session: CDPSession, config: Settings, concurrency=None):
+        self.browser = browser
+        self.session = session
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self.semaphore = asyncio.Semaphore(max(1, int(concurrency or config.INTERACTION_CONCURRENCY)))
+        # Клики по исходной странице выполняются строго по одному
+        self._click_lock = asyncio.Lock()
+        self._discovering = False
+
+    async def track_ads(self, ads):
+        """
+        Переходы по всем объявлениям
+
+        Returns:
+            list: Результаты в формате InteractionManagerV1
+        """
+        results = await asyncio.gather(*(self._track_with_limit(ad) for ad in ads))
+        return [result for result in results if result]
+
+    async def _track_with_limit(self, ad):
+        async with self.semaphore:
+            try:
+                interaction = await self.track_ad(ad)
+            except Exception as e:
+                self.logger.error(f"Ошибка перехода по рекламе {ad.get('id')}: {e}")
+                return None
+        if not interaction:
+            return None
+        return {"ad_data": ad, "interaction": interaction}
+
+    async def track_ad(self, ad):
+        """Переход по одному объявлению: по ссылке или кликом, если ссылка недоступна"""
+        selector = ad.get('selector')
+        if not selector:
+            return None
+
+        async with self._click_lock:
+            target = await self.session.call(RESOLVE_TARGET_SCRIPT, selector)
+            if not target:
+                return None
+            if target['href']:
+                page = await self.browser.new_page(self.session.browser_context_id)
+                method = 'navigate'
+            else:
+                page = await self._click_for_new_page(target)
+                method = 'click'
+
+        if page is None:
+            self.logger.warning(f"Реклама {ad.get('id')}: новая вкладка не открылась")
+            return None
+
+        try:
+            return await self._follow(page, target['href'], method)
+        finally:
+            await self.browser.close_page(page)
+
+    async def _click_for_new_page(self, target):
+        """Клик по координатам блока и подключение к открытой им вкладке"""
+        connection = self.browser.connection
+        if not self._discovering:
+            await connection.send('Target.setDiscoverTargets', {'discover': True})
+            self._discovering = True
+
+        created = connection.expect(
+            'Target.targetCreated',
+            predicate=lambda p: p['targetInfo'].get('openerId') == self.session.target_id
+        )
+        for event_type in ('mousePressed', 'mouseReleased'):
+            await self.session.send('Input.dispatchMouseEvent', {
+                'type': event_type, 'x': target['x'], 'y': target['y'], 'button': 'left', 'clickCount': 1
+            })
+
+        try:
+            params = await asyncio.wait_for(created, 5)
+        except asyncio.TimeoutError:
+            return None
+        return await self.browser.attach(params['targetInfo']['targetId'], self.session.browser_context_id)
+
+    async def _follow(self, page: CDPSession, href, method):
+        redirect_chain = []
+
+        def on_request(params):
+            if params.get('type') == 'Document' and params.get('redirectResponse'):
+                redirect_chain.append({
+                    'url': params['redirectResponse'].get('url'),
+                    'status': params['redirectResponse'].get('status')
+                })
+
+        unsubscribe = page.on('Network.requestWillBeSent', on_request)
+        await page.send('Network.enable')
+        load_state = 'complete'
+        try:
+            if href:
+                loaded = page.expect('Page.loadEventFired')
+                await page.send('Page.navigate', {'url': href})
+                try:
+                    await asyncio.wait_for(loaded, self.config.INTERACTION_TAB_TIMEOUT)
+                except asyncio.TimeoutError:
+                    load_state = 'timeout'
+            else:
+                load_state = await self._wait_ready(page)
+            current_url = await page.evaluate("location.href")
+        finally:
+            unsubscribe()
+
+        return {
+            "utm_data": self.extract_utm_params(current_url),
+            "current_url": current_url,
+            "redirect_chain": redirect_chain,
+            "load_state": load_state,
+            "open_method": method
+        }
+
+    async def _wait_ready(self, page: CDPSession):
+        """Ожидание загрузки вкладки, открытой кликом (событие могло уже пройти)"""
+        deadline = asyncio.get_running_loop().time() + self.config.INTERACTION_TAB_TIMEOUT
+        while asyncio.get_running_loop().time() < deadline:
+            try:
+                if await page.evaluate("document.readyState") == 'complete':
+                    return 'complete'
+            except Exception:
+                pass
+            await asyncio.sleep(0.25)
+        return 'timeout'
+
+    @staticmethod
+    def extract_utm_params(url):
+        """Извлекает UTM-метки из URL"""
+        return dict(URLAnalysisEngine.get().analyze(url).utm)
@@ -0,0 +1,178 @@
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+import struct
+from urllib.parse import urlparse
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OPCODE_CONTINUATION = 0x0
+OPCODE_TEXT = 0x1
+OPCODE_BINARY = 0x2
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+
+class ConnectionClosed(ConnectionError):
+    """Соединение WebSocket закрыто"""
+
+
+def _mask(payload, mask):
+    """XOR полезной нагрузки с 4-байтовой маской (одной операцией над целыми)"""
+    if not payload:
+        return payload
+    length = len(payload)
+    repeated = (mask * (length // 4 + 1))[:length]
+    return (int.from_bytes(payload, 'big') ^ int.from_bytes(repeated, 'big')).to_bytes(length, 'big')
+
+
+def encode_frame(opcode, payload, mask=True):
+    """Кадр RFC 6455; кадры клиента обязаны быть замаскированы"""
+    header = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    length = len(payload)
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 1 << 16:
+        header.append(mask_bit | 126)
+        header += struct.pack('!H', length)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack('!Q', length)
+
+    if not mask:
+        return bytes(header) + payload
+    mask_key = os.urandom(4)
+    return bytes(header) + mask_key + _mask(payload, mask_key)
+
+
+class AsyncWebSocket:
+    """
+    Минимальный клиент WebSocket поверх asyncio streams
+
+    Достаточен для DevTools: текстовые сообщения, фрагментация, ping/pong,
+    закрытие. Сжатие и расширения не поддерживаются (Chrome их не требует).
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.closed = False
+        self._write_lock = asyncio.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    async def connect(cls, url, timeout=30):
+        """Открытие соединения и handshake"""
+        parsed = urlparse(url)
+        if parsed.scheme != 'ws':
+            raise ValueError(f"Only ws:// endpoints are supported: {url}")
+
+        host = parsed.hostname
+        port = parsed.port or 80
+        path = parsed.path or '/'
+        if parsed.query:
+            path += '?' + parsed.query
+
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+
+        key = base64.b64encode(os.urandom(16)).decode()
+        request = (
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {host}:{port}\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\n"
+            "Sec-WebSocket-Version: 13\r\n\r\n"
+        )
+        writer.write(request.encode())
+        await writer.drain()
+
+        response = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)
+        status_line, *header_lines = response.decode('latin-1').split("\r\n")
+        if ' 101 ' not in f"{status_line} ":
+            writer.close()
+            raise ConnectionError(f"WebSocket handshake failed: {status_line}")
+
+        headers = {}
+        for line in header_lines:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        expected = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        if headers.get('sec-websocket-accept') != expected:
+            writer.close()
+            raise ConnectionError("WebSocket handshake failed: bad Sec-WebSocket-Accept")
+
+        return cls(reader, writer)
+
+    async def send(self, message):
+        """Отправка текстового сообщения"""
+        await self._send_frame(OPCODE_TEXT, message.encode('utf-8'))
+
+    async def _send_frame(self, opcode, payload):
+        if self.closed:
+            raise ConnectionClosed("WebSocket is closed")
+        async with self._write_lock:
+            self.writer.write(encode_frame(opcode, payload))
+            await self.writer.drain()
+
+    async def _read_frame(self):
+        try:
+            first, second = await self.reader.readexactly(2)
+            length = second & 0x7F
+            if length == 126:
+                length = struct.unpack('!H', await self.reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack('!Q', await self.reader.readexactly(8))[0]
+            mask_key = await self.reader.readexactly(4) if second & 0x80 else None
+            payload = await self.reader.readexactly(length)
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            self.closed = True
+            raise ConnectionClosed(f"WebSocket connection lost: {e}") from e
+
+        if mask_key:
+            payload = _mask(payload, mask_key)
+        return bool(first & 0x80), first & 0x0F, payload
+
+    async def recv(self):
+        """
+        Получение следующего текстового сообщения
+
+        Управляющие кадры обрабатываются прозрачно; фрагменты склеиваются.
+        """
+        fragments = []
+        message_opcode = None
+        while True:
+            fin, opcode, payload = await self._read_frame()
+
+            if opcode == OPCODE_PING:
+                await self._send_frame(OPCODE_PONG, payload)
+                continue
+            if opcode == OPCODE_PONG:
+                continue
+            if opcode == OPCODE_CLOSE:
+                self.closed = True
+                raise ConnectionClosed("WebSocket closed by peer")
+
+            if opcode != OPCODE_CONTINUATION:
+                message_opcode = opcode
+            fragments.append(payload)
+            if fin:
+                data = b"".join(fragments)
+                return data.decode('utf-8') if message_opcode == OPCODE_TEXT else data
+
+    async def close(self):
+        """Закрытие соединения"""
+        if self.closed:
+            return
+        try:
+            await self._send_frame(OPCODE_CLOSE, struct.pack('!H', 1000))
+        except Exception as e:
+            self.logger.debug(f"WebSocket close frame not sent: {e}")
+        self.closed = True
+        self.writer.close()
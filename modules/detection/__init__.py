@@ -1,11 +1,31 @@
-from .ad_detector import AdDetector
-from .network_identifier import NetworkIdentifier
-from .pattern_matcher import PatternMatcher
-from .size_analyzer import SizeAnalyzer
+import importlib
+
+_LAZY_EXPORTS = {
+    'AdDetector': '.ad_detector',
+    'NetworkIdentifier': '.network_identifier',
+    'PatternMatcher': '.pattern_matcher',
+    'SizeAnalyzer': '.size_analyzer',
+    'AdMutationObserver': '.mutation_observer',
+    'QueryPlanner': '.query_planner',
+    'FeatureExtractor': '.feature_extractor',
+    'AdScorer': '.ad_scorer'
+}
 
 __all__ = [
     'AdDetector',
     'NetworkIdentifier',
     'PatternMatcher',
-    'SizeAnalyzer'
+    'SizeAnalyzer',
+    'AdMutationObserver',
+    'QueryPlanner',
+    'FeatureExtractor',
+    'AdScorer'
 ]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -1,12 +1,18 @@
+import json
 import logging
 from config.settings import Settings
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.common.exceptions import StaleElementReferenceException
-from config.ad_patterns import AdPatterns
+from config.rule_packs import RuleRegistry
 from modules.detection.network_identifier import NetworkIdentifier
 from modules.detection.size_analyzer import SizeAnalyzer
 from modules.detection.pattern_matcher import PatternMatcher
+from modules.detection.mutation_observer import AdMutationObserver
+from modules.detection.selector_cache import SelectorCache
+from modules.detection.query_planner import QueryPlanner
+from modules.detection.feature_extractor import FeatureExtractor
+from modules.detection.ad_scorer import AdScorer
 
 class AdDetector:
     """Основной класс для обнаружения рекламных элементов"""
@@ -14,14 +20,46 @@ class AdDetector:
         self.driver = driver
         self.config = config
         self.logger = logging.getLogger(__name__)
-        self.network_identifier = NetworkIdentifier()
-        self.size_analyzer = SizeAnalyzer()
-        self.pattern_matcher = PatternMatcher()
+        self.mutation_observer = AdMutationObserver(driver, config)
+        self.rules = None
+        self._apply_rules(RuleRegistry.current())
+        self.ad_scorer = AdScorer(config.SCORING_WEIGHTS_PATH)
+        self.selector_cache = SelectorCache(config) if config.SELECTOR_CACHE_ENABLED else None
+        self.domain = None
+        self._full_sweep_done = False
+        
+    def _apply_rules(self, rules):
+        """
+        Пересборка компонентов под снимок правил
+
+        Снимок фиксируется на всё сканирование страницы: горячая перезагрузка
+        пакетов подменяет правила только при следующем вызове detect_ads.
+        """
+        if self.rules is not None and self.rules.version == rules.version:
+            return
+        self.rules = rules
+        self.network_identifier = NetworkIdentifier(rules)
+        self.size_analyzer = SizeAnalyzer(rules)
+        self.pattern_matcher = PatternMatcher(rules)
+        self.element_planner = QueryPlanner(('class_pattern', 'id_pattern'), rules)
+        self.attribute_planner = QueryPlanner(('data_attribute',), rules)
+        self.feature_extractor = FeatureExtractor(rules=rules)
+        self.logger.debug(f"Правила обнаружения: {rules}")
+    
+    def start_observing(self):
+        """Установка наблюдателя мутаций сразу после загрузки страницы"""
+        if not self.config.OBSERVER_ENABLED:
+            return False
+        self._apply_rules(RuleRegistry.current().for_domain(self._get_current_domain()))
+        return self.mutation_observer.install(rules=self.rules)
         
     def detect_ads(self):
         """Основной метод обнаружения рекламы на странице"""
         self.logger.info("Запуск процесса обнаружения рекламы")
         all_ads = []
+        self.domain = self._get_current_domain()
+        self._full_sweep_done = False
+        self._apply_rules(RuleRegistry.current().for_domain(self.domain))
         
         detection_methods = [
             ("ПОИСК ПО ЭЛЕМЕНТАМ", self._detect_by_elements),
@@ -31,6 +69,9 @@ class AdDetector:
             # self._detect_by_size
         ]
         
+        if self.mutation_observer.is_installed:
+            detection_methods.append(("НАБЛЮДАТЕЛЬ МУТАЦИЙ", self._detect_by_observer))
+        
         for method_name, method in detection_methods:
             try:
                 ads = method()
@@ -42,8 +83,27 @@ class AdDetector:
         unique_ads = self._remove_duplicates(all_ads)
         self.logger.info(f"Всего обнаружено уникальных объявлений: {len(unique_ads)}")
         
+        self._update_selector_cache(unique_ads)
+        
         return unique_ads
     
+    def _get_current_domain(self):
+        """Домен текущей страницы для кэша селекторов"""
+        try:
+            return SelectorCache.domain_from_url(self.driver.current_url)
+        except Exception as e:
+            self.logger.debug(f"Error getting current domain: {str(e)}")
+            return None
+    
+    def _update_selector_cache(self, ads):
+        """Сохранение подтверждённых селекторов домена"""
+        if not self.selector_cache or not self.domain:
+            return
+        
+        self.selector_cache.remember(self.domain, ads, full_sweep=self._full_sweep_done, rules=self.rules)
+        self.selector_cache.save()
+        self.logger.info(f"Кэш селекторов: {self.selector_cache.get_metrics()}")
+    
     def _detect_by_iframe(self):
         """Обнаружение рекламы в iframe"""
         ads = []
@@ -166,54 +226,188 @@ class AdDetector:
     
     def _detect_by_elements(self):
         """Обнаружение рекламных элементов по классам и ID"""
+        cache = self.selector_cache
+        if cache and self.domain and not cache.needs_full_sweep(self.domain):
+            ads = self._detect_by_cached_selectors(cache.get_selectors(self.domain))
+            if ads:
+                cache.record_hit(self.domain)
+                return ads
+            cache.record_miss(self.domain)
+            self.logger.info(f"Кэш селекторов для {self.domain} не дал результатов — полный перебор")
+        
+        self._full_sweep_done = True
+        return self._detect_by_pattern_sweep()
+    
+    def _detect_by_cached_selectors(self, selectors):
+        """Обнаружение по точным селекторам из кэша одним запросом"""
+        if not selectors:
+            return []
+        return self._detect_by_query(self.element_planner, ", ".join(selectors), 'selector_cache')
+    
+    def _detect_by_pattern_sweep(self):
+        """Полный перебор паттернов классов и ID одним объединённым запросом"""
+        return self._detect_by_query(self.element_planner)
+    
+    def _detect_by_query(self, planner, selector=None, detection_method=None):
+        """Обнаружение по запросу планировщика: каждый элемент анализируется один раз"""
         ads = []
         try:
-            # Поиск по классам
-            for pattern in AdPatterns.AD_CLASS_PATTERNS:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, f"[class*='{pattern}']")
-                    for element in elements:
-                        ad_data = self._analyze_generic_element(element, 'class_pattern')
-                        if ad_data:
-                            ads.append(ad_data)
-                except Exception as e:
-                    self.logger.debug(f"Error searching class pattern {pattern}: {str(e)}")
+            candidates = planner.query(self.driver, selector)
+            self.logger.info(f"Запрос планировщика вернул {len(candidates)} элементов")
             
-            # Поиск по ID
-            for pattern in AdPatterns.AD_ID_PATTERNS:
+            prepared = []
+            for candidate in candidates:
                 try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, f"[id*='{pattern}']")
-                    for element in elements:
-                        ad_data = self._analyze_generic_element(element, 'id_pattern')
-                        if ad_data:
-                            ads.append(ad_data)
+                    item = self._prepare_candidate(planner, candidate)
+                    if item:
+                        prepared.append(item)
+                except StaleElementReferenceException:
+                    continue
                 except Exception as e:
-                    self.logger.debug(f"Error searching ID pattern {pattern}: {str(e)}")
+                    self.logger.debug(f"Error preparing query candidate: {str(e)}")
+            
+            scores = self._score_candidates(prepared)
+            
+            for item, ad_score in zip(prepared, scores):
+                families = item['families']
+                method = detection_method or (families[0] if families else 'pattern_query')
+                ad_data = self._analyze_generic_element(
+                    item['element'], method, item['element_info'], ad_score=ad_score
+                )
+                if ad_data:
+                    ad_data['matched_families'] = families
+                    ads.append(ad_data)
                     
         except Exception as e:
             self.logger.error(f"Error in element detection: {str(e)}")
             
         return ads
     
-    def _detect_by_attributes(self):
-        """Обнаружение по data атрибутам"""
-        ads = []
+    def _prepare_candidate(self, planner, candidate):
+        """Сведения о кандидате: из ответа планировщика или, при откате, через WebDriver"""
+        element = candidate['element']
+        families = candidate.get('families')
+        
+        if families is None:
+            element_info = self._get_element_info(element)
+            if not element_info:
+                return None
+            families = planner.tag_families(element_info['attributes'])
+        else:
+            element_info = {
+                'size': candidate['size'],
+                'location': candidate['location'],
+                'is_displayed': candidate['is_displayed'],
+                'attributes': candidate['attributes']
+            }
+        
+        return {'element': element, 'element_info': element_info, 'families': families}
+    
+    def _score_candidates(self, prepared):
+        """
+        Пакетная оценка кандидатов моделью AdScorer
+        
+        Returns:
+            list: Оценки по кандидатам; None означает откат на эвристики PatternMatcher
+        """
+        records = [{**item['element_info'], 'families': item['families']} for item in prepared]
+        self._record_scoring_history(records)
+        
+        if not prepared or not self.ad_scorer.is_loaded:
+            return [None] * len(prepared)
+        
         try:
-            for attr in AdPatterns.AD_DATA_ATTRIBUTES:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, f"[{attr}]")
-                    for element in elements:
-                        ad_data = self._analyze_generic_element(element, 'data_attribute')
-                        if ad_data:
-                            ads.append(ad_data)
-                except Exception as e:
-                    self.logger.debug(f"Error searching data attribute {attr}: {str(e)}")
-                    
+            features = self.feature_extractor.extract(records)
+            return self.ad_scorer.score(features).tolist()
         except Exception as e:
-            self.logger.error(f"Error in attribute detection: {str(e)}")
-            
+            self.logger.warning(f"Пакетная оценка не удалась, используются эвристики: {str(e)}")
+            return [None] * len(prepared)
+    
+    def _record_scoring_history(self, records):
+        """Запись неразмеченных кандидатов для последующей калибровки весов"""
+        if not records or self.config.SCORING_HISTORY_ENABLED is not True:
+            return
+        
+        try:
+            with open(self.config.SCORING_HISTORY_PATH, 'a', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps({**record, 'domain': self.domain, 'label': None}, ensure_ascii=False))
+                    f.write("\n")
+        except Exception as e:
+            self.logger.debug(f"Error writing scoring history: {str(e)}")
+    
+    def _detect_by_observer(self):
+        """Обнаружение по буферу наблюдателя мутаций (включая ротируемые и выгруженные блоки)"""
+        ads = []
+        records = self.mutation_observer.drain()
+        self.logger.info(f"Наблюдатель мутаций накопил {len(records)} узлов")
+        
+        prepared = []
+        for record in records:
+            rects = record.get('rects') or []
+            if not rects:
+                continue
+            last_rect = rects[-1]
+            size = {'width': last_rect['width'], 'height': last_rect['height']}
+            prepared.append({
+                'record': record,
+                'element_info': {
+                    'size': size,
+                    'location': {'x': last_rect['x'], 'y': last_rect['y']},
+                    'is_displayed': size['width'] > 0 and size['height'] > 0,
+                    'attributes': record.get('attributes') or {}
+                },
+                'families': None
+            })
+        
+        scores = self._score_candidates(prepared)
+        
+        for item, ad_score in zip(prepared, scores):
+            try:
+                ad_data = self._analyze_observer_record(item['record'], item['element_info'], ad_score)
+                if ad_data:
+                    ads.append(ad_data)
+            except Exception as e:
+                self.logger.debug(f"Error analyzing observer record: {str(e)}")
+                
         return ads
     
+    def _analyze_observer_record(self, record, element_info, ad_score=None):
+        """Анализ записи наблюдателя без дополнительных обращений к WebDriver"""
+        attributes = element_info['attributes']
+        
+        if ad_score is None:
+            class_attr = attributes.get('class', '').lower()
+            id_attr = attributes.get('id', '').lower()
+            ad_score = self.pattern_matcher.calculate_ad_score(class_attr, id_attr, attributes)
+        if ad_score < 0.3:
+            return None
+        
+        network_info = self.network_identifier.identify_by_attributes(attributes)
+        element = record.get('element')
+        
+        return {
+            'id': element.id.split('.').pop() if element else f"observer_{record.get('key')}",
+            'element': element,
+            'type': 'banner',
+            'network': network_info['network'] if network_info else 'unknown',
+            'confidence': max(ad_score, network_info['confidence'] if network_info else 0),
+            'size': element_info['size'],
+            'location': element_info['location'],
+            'is_displayed': element_info['is_displayed'],
+            'attributes': attributes,
+            'detection_method': 'mutation_observer',
+            'ad_score': ad_score,
+            'element_info': element_info,
+            'first_seen': record.get('first_seen'),
+            'rect_history': record.get('rects'),
+            'is_connected': record.get('connected', False)
+        }
+    
+    def _detect_by_attributes(self):
+        """Обнаружение по data атрибутам"""
+        return self._detect_by_query(self.attribute_planner)
+    
     def _detect_by_size(self):
         """Обнаружение по стандартным размерам рекламы"""
         ads = []
@@ -259,7 +453,7 @@ class AdDetector:
             
             # Проверка на рекламные ключевые слова
             has_ad_keywords = any(keyword in class_attr or keyword in id_attr 
-                                for keyword in AdPatterns.AD_KEYWORDS)
+                                for keyword in self.rules.keywords)
             
             confidence = 0.7 if has_ad_keywords else 0.5
             
@@ -282,10 +476,11 @@ class AdDetector:
             self.logger.debug(f"Error in size analysis: {str(e)}")
             return None
     
-    def _analyze_generic_element(self, element, detection_method):
+    def _analyze_generic_element(self, element, detection_method, element_info=None, ad_score=None):
         """Анализ общего элемента на признаки рекламы"""
         try:
-            element_info = self._get_element_info(element)
+            if element_info is None:
+                element_info = self._get_element_info(element)
             if not element_info or not element_info['is_displayed']:
                 return None
             
@@ -293,8 +488,9 @@ class AdDetector:
             class_attr = attributes.get('class', '').lower()
             id_attr = attributes.get('id', '').lower()
             
-            # Проверка на рекламные ключевые слова
-            ad_score = self.pattern_matcher.calculate_ad_score(class_attr, id_attr, attributes)
+            # Проверка на рекламные ключевые слова (если нет оценки модели)
+            if ad_score is None:
+                ad_score = self.pattern_matcher.calculate_ad_score(class_attr, id_attr, attributes)
             if ad_score < 0.3:
                 return None
             
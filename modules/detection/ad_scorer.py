@@ -0,0 +1,81 @@
+import json
+import logging
+import numpy as np
+from modules.detection.feature_extractor import FEATURE_NAMES
+
+
+class AdScorer:
+    """Векторная логистическая модель оценки рекламных кандидатов"""
+
+    def __init__(self, weights_path=None):
+        self.logger = logging.getLogger(__name__)
+        self.weights = None
+        self.bias = 0.0
+        self.metadata = {}
+        if weights_path is not None:
+            self.load(weights_path)
+
+    @property
+    def is_loaded(self):
+        return self.weights is not None
+
+    def load(self, weights_path):
+        """
+        Загрузка весов из JSON файла
+
+        Формат: {"model": "logistic", "bias": float, "weights": {feature: float}, ...}.
+        Признаки, отсутствующие в файле, получают нулевой вес.
+
+        Returns:
+            bool: Удалось ли загрузить веса
+        """
+        try:
+            with open(weights_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            if data.get('model', 'logistic') != 'logistic':
+                raise ValueError(f"Unsupported model type: {data.get('model')}")
+
+            unknown = set(data.get('weights', {})) - set(FEATURE_NAMES)
+            if unknown:
+                raise ValueError(f"Unknown features in weights file: {sorted(unknown)}")
+
+            self.weights = np.array(
+                [float(data['weights'].get(name, 0.0)) for name in FEATURE_NAMES], dtype=np.float64
+            )
+            self.bias = float(data.get('bias', 0.0))
+            self.metadata = {k: v for k, v in data.items() if k not in ('weights', 'bias')}
+            self.logger.info(f"Scoring weights loaded: {weights_path}")
+            return True
+
+        except Exception as e:
+            self.logger.warning(f"Scoring weights not loaded ({weights_path}): {str(e)}")
+            self.weights = None
+            return False
+
+    def score(self, features):
+        """
+        Оценка всего пакета одним матричным умножением
+
+        Args:
+            features (np.ndarray): Матрица признаков (n, len(FEATURE_NAMES))
+
+        Returns:
+            np.ndarray: Вероятности рекламы в диапазоне [0, 1]
+        """
+        if not self.is_loaded:
+            raise RuntimeError("Scoring weights are not loaded")
+        logits = features @ self.weights + self.bias
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    @staticmethod
+    def save(weights_path, weights, bias, **metadata):
+        """Сохранение весов в формате, который читает load()"""
+        data = {
+            'model': 'logistic',
+            **metadata,
+            'bias': float(bias),
+            'weights': {name: float(w) for name, w in zip(FEATURE_NAMES, weights)}
+        }
+        with open(weights_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
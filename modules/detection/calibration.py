@@ -0,0 +1,111 @@
+"""
+Офлайн калибровка весов AdScorer по размеченной истории сканирований
+
+История — JSON Lines, по одному кандидату на строку, в формате, который
+пишет AdDetector при включённом SCORING_HISTORY_ENABLED:
+    {"attributes": {...}, "size": {...}, "location": {...},
+     "is_displayed": true, "families": [...], "label": 1}
+Строки без метки (label = null) пропускаются.
+
+Запуск:
+    python -m modules.detection.calibration history.jsonl -o config/scoring_weights.json
+"""
+import argparse
+import json
+import logging
+import numpy as np
+from modules.detection.feature_extractor import FeatureExtractor, FEATURE_NAMES
+from modules.detection.ad_scorer import AdScorer
+
+logger = logging.getLogger(__name__)
+
+
+def load_labelled_history(history_path):
+    """
+    Чтение размеченных кандидатов
+
+    Returns:
+        tuple: (список кандидатов, np.ndarray меток)
+    """
+    candidates = []
+    labels = []
+    with open(history_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"Skipping malformed line {line_number}: {str(e)}")
+                continue
+            if record.get('label') is None:
+                continue
+            candidates.append(record)
+            labels.append(float(bool(record['label'])))
+    return candidates, np.array(labels, dtype=np.float64)
+
+
+def fit_weights(features, labels, l2=0.01, learning_rate=0.5, epochs=2000):
+    """
+    Обучение логистической регрессии полным градиентным спуском
+
+    Args:
+        features (np.ndarray): Матрица признаков (n, k)
+        labels (np.ndarray): Метки 0/1 длины n
+        l2 (float): Коэффициент L2 регуляризации весов
+        learning_rate (float): Шаг градиентного спуска
+        epochs (int): Число итераций
+
+    Returns:
+        tuple: (веса np.ndarray длины k, смещение float)
+    """
+    n, k = features.shape
+    if n == 0:
+        raise ValueError("No labelled samples to fit")
+
+    weights = np.zeros(k, dtype=np.float64)
+    bias = 0.0
+    for _ in range(epochs):
+        predictions = 1.0 / (1.0 + np.exp(-(features @ weights + bias)))
+        error = predictions - labels
+        weights -= learning_rate * (features.T @ error / n + l2 * weights)
+        bias -= learning_rate * error.mean()
+    return weights, bias
+
+
+def calibrate(history_path, output_path, **fit_options):
+    """Полный цикл: чтение истории, извлечение признаков, обучение, сохранение"""
+    candidates, labels = load_labelled_history(history_path)
+    features = FeatureExtractor().extract(candidates)
+    weights, bias = fit_weights(features, labels, **fit_options)
+
+    scorer = AdScorer()
+    scorer.weights, scorer.bias = weights, bias
+    accuracy = float(((scorer.score(features) >= 0.5) == (labels == 1)).mean())
+
+    AdScorer.save(
+        output_path, weights, bias,
+        samples=int(len(labels)),
+        positive_share=float(labels.mean()),
+        training_accuracy=accuracy
+    )
+    logger.info(f"Calibrated on {len(labels)} samples, accuracy {accuracy:.3f}: {output_path}")
+    return {'samples': len(labels), 'accuracy': accuracy, 'weights': dict(zip(FEATURE_NAMES, weights))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Калибровка весов модели оценки рекламы")
+    parser.add_argument('history', help="Размеченная история кандидатов (JSON Lines)")
+    parser.add_argument('-o', '--output', required=True, help="Путь для файла весов")
+    parser.add_argument('--l2', type=float, default=0.01)
+    parser.add_argument('--epochs', type=int, default=2000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    result = calibrate(args.history, args.output, l2=args.l2, epochs=args.epochs)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
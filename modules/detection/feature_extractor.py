@@ -0,0 +1,85 @@
+import logging
+import numpy as np
+from config.settings import Settings
+from modules.detection.network_identifier import NetworkIdentifier
+from modules.detection.pattern_matcher import PatternMatcher
+from modules.detection.size_analyzer import SizeAnalyzer
+
+FEATURE_NAMES = (
+    'class_pattern',
+    'id_pattern',
+    'data_attribute',
+    'other_attributes',
+    'network_confidence',
+    'standard_size',
+    'suspicious_size',
+    'log_aspect_ratio',
+    'viewport_offset',
+    'above_fold',
+    'is_displayed'
+)
+
+
+class FeatureExtractor:
+    """Преобразование пакета элементов-кандидатов в матрицу признаков NumPy"""
+
+    def __init__(self, viewport_height=Settings.HEIGHT_WINDOW, rules=None):
+        self.logger = logging.getLogger(__name__)
+        self.viewport_height = viewport_height
+        self.network_identifier = NetworkIdentifier(rules)
+        self.pattern_matcher = PatternMatcher(rules)
+        self.size_analyzer = SizeAnalyzer(rules)
+
+    def extract(self, candidates):
+        """
+        Построение матрицы признаков
+
+        Args:
+            candidates (list): Словари с ключами attributes, size, location,
+                is_displayed и необязательным families
+
+        Returns:
+            np.ndarray: Матрица формы (len(candidates), len(FEATURE_NAMES))
+        """
+        count = len(candidates)
+        features = np.zeros((count, len(FEATURE_NAMES)), dtype=np.float64)
+        if not count:
+            return features
+
+        widths = np.array([c.get('size', {}).get('width', 0) or 0 for c in candidates], dtype=np.float64)
+        heights = np.array([c.get('size', {}).get('height', 0) or 0 for c in candidates], dtype=np.float64)
+        offsets = np.array([c.get('location', {}).get('y', 0) or 0 for c in candidates], dtype=np.float64)
+
+        # Строковые признаки считаются поэлементно, числовые — векторно ниже
+        for row, candidate in enumerate(candidates):
+            attributes = candidate.get('attributes') or {}
+            families = candidate.get('families')
+            if families is None:
+                families = self._families_from_attributes(attributes)
+
+            features[row, 0] = 'class_pattern' in families
+            features[row, 1] = 'id_pattern' in families
+            features[row, 2] = 'data_attribute' in families
+            features[row, 3] = self.pattern_matcher.check_other_attributes(attributes)
+            network_info = self.network_identifier.identify_by_attributes(attributes)
+            features[row, 4] = network_info['confidence'] if network_info else 0.0
+            features[row, 10] = bool(candidate.get('is_displayed', False))
+
+        features[:, 5] = self.size_analyzer.standard_size_mask(widths, heights)
+        features[:, 6] = self.size_analyzer.suspicious_size_mask(widths, heights)
+        features[:, 7] = np.abs(np.log((widths + 1.0) / (heights + 1.0)))
+        features[:, 8] = np.clip(offsets / self.viewport_height, 0, 20)
+        features[:, 9] = offsets < self.viewport_height
+
+        return features
+
+    def _families_from_attributes(self, attributes):
+        """Семейства паттернов, если кандидат пришёл без тегов планировщика"""
+        families = []
+        if self.pattern_matcher.check_class_patterns(attributes.get('class', '')):
+            families.append('class_pattern')
+        if self.pattern_matcher.check_id_patterns(attributes.get('id', '')):
+            families.append('id_pattern')
+        if self.pattern_matcher.check_data_attributes(attributes):
+            families.append('data_attribute')
+        return families
@@ -0,0 +1,203 @@
+import logging
+from selenium.webdriver.remote.webdriver import WebDriver
+from config.settings import Settings
+from config.rule_packs import RuleRegistry
+
+# Скрипт устанавливается один раз на страницу. Новые и изменённые узлы
+# складываются в очередь и разбираются в requestIdleCallback, поэтому
+# сопоставление с селекторами не конкурирует с рендерингом страницы.
+INSTALL_OBSERVER_SCRIPT = """
+var selector = arguments[0], maxRecords = arguments[1], maxRects = arguments[2];
+if (window.__adParserObserver) { return true; }
+var state = {records: {}, order: [], pending: [], nextId: 1, dropped: 0, scheduled: false};
+window.__adParserObserver = state;
+
+var idle = window.requestIdleCallback ? function (cb) {
+    window.requestIdleCallback(cb, {timeout: 1000});
+} : function (cb) { setTimeout(function () { cb(null); }, 50); };
+
+function rectOf(node) {
+    var r = node.getBoundingClientRect();
+    return {
+        x: Math.round(r.left + window.scrollX), y: Math.round(r.top + window.scrollY),
+        width: Math.round(r.width), height: Math.round(r.height), t: Date.now()
+    };
+}
+
+function attrsOf(node) {
+    var attrs = {};
+    ['class', 'id', 'src', 'href', 'style', 'width', 'height'].forEach(function (name) {
+        attrs[name] = node.getAttribute(name) || '';
+    });
+    for (var i = 0; i < node.attributes.length; i++) {
+        var a = node.attributes[i];
+        if (a.name.indexOf('data-ad') === 0 && a.name !== 'data-adparser-id') { attrs[a.name] = a.value; }
+    }
+    return attrs;
+}
+
+var resizeObserver = new ResizeObserver(function (entries) {
+    entries.forEach(function (entry) { state.pending.push([entry.target, false]); });
+    schedule();
+});
+
+function evict() {
+    while (state.order.length > maxRecords) {
+        var key = state.order.shift();
+        var rec = state.records[key];
+        if (rec) {
+            resizeObserver.unobserve(rec.node);
+            // Вытесненный узел при следующей мутации записывается заново
+            rec.node.removeAttribute('data-adparser-id');
+        }
+        delete state.records[key];
+        state.dropped++;
+    }
+}
+
+function record(node) {
+    var key = node.getAttribute('data-adparser-id');
+    if (!key) {
+        key = String(state.nextId++);
+        node.setAttribute('data-adparser-id', key);
+        resizeObserver.observe(node);
+    }
+    var rec = state.records[key];
+    if (!rec) {
+        rec = {key: key, tag: node.tagName.toLowerCase(), first_seen: Date.now(), rects: [], node: node};
+        state.records[key] = rec;
+        state.order.push(key);
+        evict();
+    }
+    rec.attributes = attrsOf(node);
+    var rect = rectOf(node), last = rec.rects[rec.rects.length - 1];
+    if (!last || last.x !== rect.x || last.y !== rect.y ||
+        last.width !== rect.width || last.height !== rect.height) {
+        rec.rects.push(rect);
+        if (rec.rects.length > maxRects) { rec.rects.shift(); }
+    }
+}
+
+function scan(root, deep) {
+    if (!root || root.nodeType !== 1) { return; }
+    if (root.matches(selector)) { record(root); }
+    if (!deep) { return; }
+    var found = root.querySelectorAll(selector);
+    for (var i = 0; i < found.length; i++) { record(found[i]); }
+}
+
+function flush(deadline) {
+    state.scheduled = false;
+    while (state.pending.length && (!deadline || deadline.didTimeout || deadline.timeRemaining() > 1)) {
+        var item = state.pending.shift();
+        scan(item[0], item[1]);
+    }
+    if (state.pending.length) { schedule(); }
+}
+
+function schedule() {
+    if (!state.scheduled) { state.scheduled = true; idle(flush); }
+}
+
+state.flush = function () { flush(null); };
+
+new MutationObserver(function (mutations) {
+    mutations.forEach(function (m) {
+        if (m.type === 'childList') {
+            m.addedNodes.forEach(function (n) { if (n.nodeType === 1) { state.pending.push([n, true]); } });
+        } else {
+            state.pending.push([m.target, false]);
+        }
+    });
+    schedule();
+}).observe(document.documentElement, {
+    childList: true, subtree: true, attributes: true, attributeFilter: ['class', 'id', 'style']
+});
+
+state.pending.push([document.documentElement, true]);
+schedule();
+return true;
+"""
+
+DRAIN_OBSERVER_SCRIPT = """
+var state = window.__adParserObserver;
+if (!state) { return null; }
+state.flush();
+var records = state.order.map(function (key) {
+    var rec = state.records[key];
+    var connected = rec.node.isConnected;
+    return {
+        key: rec.key, tag: rec.tag, first_seen: rec.first_seen, rects: rec.rects,
+        attributes: rec.attributes, connected: connected, element: connected ? rec.node : null
+    };
+});
+var dropped = state.dropped;
+state.records = {};
+state.order = [];
+state.dropped = 0;
+return {records: records, dropped: dropped};
+"""
+
+
+class AdMutationObserver:
+    """Наблюдатель за DOM, накапливающий рекламные узлы прямо на странице"""
+
+    def __init__(self, driver: WebDriver, config: Settings):
+        self.driver = driver
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self.is_installed = False
+
+    @staticmethod
+    def build_selector(rules=None):
+        """Единый CSS селектор из паттернов классов и ID текущих правил"""
+        return (rules or RuleRegistry.current()).element_selector
+
+    def install(self, selector=None, rules=None):
+        """
+        Установка наблюдателя на текущую страницу
+
+        Вызывается сразу после load_page: все подходящие узлы, вставленные
+        или изменившие размер во время прокрутки, попадут в буфер страницы.
+
+        Returns:
+            bool: Удалось ли установить наблюдатель
+        """
+        try:
+            self.is_installed = bool(self.driver.execute_script(
+                INSTALL_OBSERVER_SCRIPT,
+                selector or self.build_selector(rules),
+                self.config.OBSERVER_BUFFER_SIZE,
+                self.config.OBSERVER_RECT_HISTORY
+            ))
+        except Exception as e:
+            self.logger.warning(f"Не удалось установить наблюдатель мутаций: {e}")
+            self.is_installed = False
+
+        return self.is_installed
+
+    def drain(self):
+        """
+        Забирает накопленные записи одним вызовом и очищает буфер страницы
+
+        Returns:
+            list: Записи вида {key, tag, first_seen, rects, attributes, connected, element}
+        """
+        if not self.is_installed:
+            return []
+
+        try:
+            result = self.driver.execute_script(DRAIN_OBSERVER_SCRIPT)
+        except Exception as e:
+            self.logger.warning(f"Ошибка чтения буфера наблюдателя: {e}")
+            return []
+
+        if not isinstance(result, dict):
+            self.logger.warning("Буфер наблюдателя недоступен — страница была перезагружена?")
+            self.is_installed = False
+            return []
+
+        if result.get('dropped'):
+            self.logger.warning(f"Буфер наблюдателя переполнен, вытеснено записей: {result['dropped']}")
+
+        return result.get('records') or []
@@ -1,27 +1,26 @@
-import re
 import logging
-from config.ad_patterns import AdPatterns
+from config.rule_packs import RuleRegistry
 
 class NetworkIdentifier:
     """Класс для идентификации рекламных сетей"""
     
-    def __init__(self):
+    def __init__(self, rules=None):
         self.logger = logging.getLogger(__name__)
+        self.rules = rules or RuleRegistry.current()
     
     def identify_by_domain(self, url):
         """Идентификация рекламной сети по домену"""
         if not url:
             return None
         
-        for network, domains in AdPatterns.AD_NETWORKS.items():
-            for domain in domains:
-                if re.search(domain, url, re.IGNORECASE):
-                    confidence = 0.9 if network in ['yandex_ads'] else 0.8
-                    return {
-                        'network': network,
-                        'confidence': confidence,
-                        'matched_domain': domain
-                    }
+        for network, confidence, domains_regex in self.rules.networks:
+            match = domains_regex.search(url)
+            if match:
+                return {
+                    'network': network,
+                    'confidence': confidence,
+                    'matched_domain': match.group(0)
+                }
         
         return None
     
@@ -32,7 +31,7 @@ class NetworkIdentifier:
             
         content_lower = content.lower()
         
-        for pattern in AdPatterns.AD_SCRIPT_PATTERNS:
+        for pattern in self.rules.script_patterns:
             if pattern in content_lower:
                 network = self._map_script_to_network(pattern)
                 return {
@@ -50,20 +49,9 @@ class NetworkIdentifier:
         src_attr: str = attributes.get('src', '')
         
         # Проверка на конкретные рекламные сети по классам/ID
-        if re.search('adsbygoogle', class_attr, re.IGNORECASE):
-
-            return {'network': 'google_ads', 'confidence': 0.9}
-        
-        elif re.search('yandex_rtb_', class_attr, re.IGNORECASE) or \
-            re.search('yandex_rtb_', id_attr, re.IGNORECASE) or \
-            re.search('adfox_', id_attr, re.IGNORECASE) or \
-            re.search('adfox_', id_attr, re.IGNORECASE):
-
-            return {'network': 'yandex_ads', 'confidence': 0.9}
-        
-        elif re.search('fb-ad', class_attr, re.IGNORECASE):
-
-            return {'network': 'meta_ads', 'confidence': 0.8}
+        for network, confidence, patterns_regex in self.rules.attribution:
+            if patterns_regex.search(class_attr) or patterns_regex.search(id_attr):
+                return {'network': network, 'confidence': confidence}
         
         # Проверка по src
         if src_attr:
@@ -1,35 +1,36 @@
 import logging
-from config.ad_patterns import AdPatterns
+from config.rule_packs import RuleRegistry
 
 class PatternMatcher:
     """Класс для сопоставления с рекламными паттернами"""
     
-    def __init__(self):
+    def __init__(self, rules=None):
         self.logger = logging.getLogger(__name__)
+        self.rules = rules or RuleRegistry.current()
     
     def calculate_ad_score(self, class_attr, id_attr, attributes):
         """Расчет confidence score для элемента"""
         score = 0.0
         
         # Проверка классов
-        class_score = self._check_class_patterns(class_attr)
+        class_score = self.check_class_patterns(class_attr)
         score = max(score, class_score)
         
         # Проверка ID
-        id_score = self._check_id_patterns(id_attr)
+        id_score = self.check_id_patterns(id_attr)
         score = max(score, id_score)
         
         # Проверка data атрибутов
-        data_score = self._check_data_attributes(attributes)
+        data_score = self.check_data_attributes(attributes)
         score = max(score, data_score)
         
         # Проверка других атрибутов
-        other_score = self._check_other_attributes(attributes)
+        other_score = self.check_other_attributes(attributes)
         score = max(score, other_score)
         
         return score
     
-    def _check_class_patterns(self, class_attr):
+    def check_class_patterns(self, class_attr):
         """Проверка классов на рекламные паттерны"""
         if not class_attr:
             return 0.0
@@ -37,7 +38,7 @@ class PatternMatcher:
         class_lower = class_attr.lower()
         
         # Точные совпадения
-        for pattern in AdPatterns.AD_CLASS_PATTERNS:
+        for pattern in self.rules.class_patterns:
             if pattern in class_lower:
                 if len(pattern) > 3:
                     return 0.8
@@ -46,28 +47,28 @@ class PatternMatcher:
         
         return 0.0
     
-    def _check_id_patterns(self, id_attr):
+    def check_id_patterns(self, id_attr):
         """Проверка ID на рекламные паттерны"""
         if not id_attr:
             return 0.0
             
         id_lower = id_attr.lower()
         
-        for pattern in AdPatterns.AD_ID_PATTERNS:
+        for pattern in self.rules.id_patterns:
             if pattern in id_lower:
                 return 0.7
                 
         return 0.0
     
-    def _check_data_attributes(self, attributes):
+    def check_data_attributes(self, attributes):
         """Проверка data атрибутов"""
         for attr_name, attr_value in attributes.items():
-            if attr_name.startswith('data-') and any(ad_attr in attr_name for ad_attr in AdPatterns.AD_DATA_ATTRIBUTES):
+            if attr_name.startswith('data-') and any(ad_attr in attr_name for ad_attr in self.rules.data_attributes):
                 return 0.9
                 
         return 0.0
     
-    def _check_other_attributes(self, attributes):
+    def check_other_attributes(self, attributes):
         """Проверка других атрибутов"""
         score = 0.0
         
@@ -78,7 +79,7 @@ class PatternMatcher:
         
         # Проверка href атрибута
         href = attributes.get('href', '').lower()
-        if href and any(keyword in href for keyword in AdPatterns.AD_KEYWORDS):
+        if href and any(keyword in href for keyword in self.rules.keywords):
             score = max(score, 0.5)
         
         return score
\ No newline at end of file
@@ -0,0 +1,117 @@
+import logging
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webdriver import WebDriver
+from config.rule_packs import RuleRegistry
+
+# Один проход по DOM: нативный querySelectorAll по объединённому селектору,
+# затем для каждого узла сразу собираются семейства совпавших паттернов,
+# атрибуты, геометрия и видимость. Всё возвращается одним ответом WebDriver.
+QUERY_SCRIPT = """
+var selector = arguments[0], classPatterns = arguments[1], idPatterns = arguments[2], dataAttrs = arguments[3];
+var nodes = document.querySelectorAll(selector);
+var result = [];
+for (var i = 0; i < nodes.length; i++) {
+    var node = nodes[i];
+    var cls = (node.getAttribute('class') || '');
+    var id = (node.getAttribute('id') || '');
+    var families = [];
+    if (classPatterns.some(function (p) { return cls.indexOf(p) !== -1; })) { families.push('class_pattern'); }
+    if (idPatterns.some(function (p) { return id.indexOf(p) !== -1; })) { families.push('id_pattern'); }
+    if (dataAttrs.some(function (a) { return node.hasAttribute(a); })) { families.push('data_attribute'); }
+
+    var attrs = {};
+    ['class', 'id', 'src', 'href', 'style', 'width', 'height'].forEach(function (name) {
+        attrs[name] = node.getAttribute(name) || '';
+    });
+    for (var j = 0; j < node.attributes.length; j++) {
+        var a = node.attributes[j];
+        if (a.name.indexOf('data-ad') === 0 && a.name !== 'data-adparser-id') { attrs[a.name] = a.value; }
+    }
+
+    var rect = node.getBoundingClientRect();
+    var style = window.getComputedStyle(node);
+    result.push({
+        element: node,
+        tag: node.tagName.toLowerCase(),
+        families: families,
+        attributes: attrs,
+        size: {width: Math.round(rect.width), height: Math.round(rect.height)},
+        location: {x: Math.round(rect.left + window.scrollX), y: Math.round(rect.top + window.scrollY)},
+        is_displayed: rect.width > 0 && rect.height > 0 &&
+            style.display !== 'none' && style.visibility !== 'hidden' && style.opacity !== '0'
+    });
+}
+return result;
+"""
+
+PATTERN_FAMILIES = ('class_pattern', 'id_pattern', 'data_attribute')
+
+
+class QueryPlanner:
+    """Компиляция рекламных паттернов в единый запрос к DOM"""
+
+    def __init__(self, families=PATTERN_FAMILIES, rules=None):
+        self.logger = logging.getLogger(__name__)
+        self.families = tuple(f for f in PATTERN_FAMILIES if f in families)
+        self.rules = rules or RuleRegistry.current()
+        # Тегирование всегда идёт по всем семействам, выборка — только по включённым
+        self.class_patterns = list(self.rules.class_patterns)
+        self.id_patterns = list(self.rules.id_patterns)
+        self.data_attributes = list(self.rules.data_attributes)
+        self.selector = self._compile_selector()
+
+    def _compile_selector(self):
+        """Объединение всех включённых паттернов в один селектор через запятую"""
+        selectors = []
+        if 'class_pattern' in self.families:
+            selectors += [f"[class*='{pattern}']" for pattern in self.class_patterns]
+        if 'id_pattern' in self.families:
+            selectors += [f"[id*='{pattern}']" for pattern in self.id_patterns]
+        if 'data_attribute' in self.families:
+            selectors += [f"[{attr}]" for attr in self.data_attributes]
+        return ", ".join(selectors)
+
+    def tag_families(self, attributes):
+        """Определение семейств паттернов, которым соответствуют атрибуты элемента"""
+        class_attr = attributes.get('class', '')
+        id_attr = attributes.get('id', '')
+        families = []
+        if any(pattern in class_attr for pattern in self.class_patterns):
+            families.append('class_pattern')
+        if any(pattern in id_attr for pattern in self.id_patterns):
+            families.append('id_pattern')
+        if any(attr in attributes for attr in self.data_attributes):
+            families.append('data_attribute')
+        return families
+
+    def query(self, driver: WebDriver, selector=None):
+        """
+        Выполнение запроса: каждый элемент возвращается ровно один раз
+
+        Args:
+            driver: WebDriver
+            selector (str): Переопределение селектора (например, точные селекторы из кэша)
+
+        Returns:
+            list: Кандидаты {element, families, attributes, size, location, is_displayed}.
+                  Если скрипт недоступен, кандидаты содержат только element и families=None,
+                  сведения об элементе собираются вызывающей стороной.
+        """
+        selector = selector or self.selector
+        if not selector:
+            return []
+
+        try:
+            result = driver.execute_script(
+                QUERY_SCRIPT, selector, self.class_patterns, self.id_patterns, self.data_attributes
+            )
+            if isinstance(result, list):
+                return result
+            self.logger.debug("Query script returned no list, falling back to find_elements")
+        except Exception as e:
+            self.logger.debug(f"Query script failed, falling back to find_elements: {str(e)}")
+
+        return [
+            {'element': element, 'families': None}
+            for element in driver.find_elements(By.CSS_SELECTOR, selector)
+        ]
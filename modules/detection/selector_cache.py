@@ -0,0 +1,220 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from urllib.parse import urlparse
+from config.settings import Settings
+from config.rule_packs import RuleRegistry
+from utils.domain import registrable_domain
+
+_CSS_IDENT = re.compile(r'^-?[A-Za-z_][A-Za-z0-9_-]*$')
+
+
+class SelectorCache:
+    """Персистентный кэш конкретных селекторов, подтвердившихся на домене"""
+
+    CACHE_VERSION = 1
+
+    def __init__(self, config: Settings):
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self.cache_path = config.CACHE_DIR / "selector_cache.json"
+        self.max_domains = config.SELECTOR_CACHE_MAX_DOMAINS
+        self.max_selectors = config.SELECTOR_CACHE_MAX_SELECTORS
+        self.max_age = config.SELECTOR_CACHE_MAX_AGE_DAYS * 24 * 3600
+        self.full_sweep_every = config.SELECTOR_CACHE_FULL_SWEEP_EVERY
+        self.metrics = {'hits': 0, 'misses': 0, 'full_sweeps': 0, 'evicted': 0}
+        self._domains = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def domain_from_url(url):
+        """Ключ кэша для URL: регистрируемый домен (eTLD+1)"""
+        if not isinstance(url, str):
+            return None
+        return registrable_domain(url) or None
+
+    @property
+    def domains(self):
+        if self._domains is None:
+            self._domains = self._load()
+            self.evict_expired()
+        return self._domains
+
+    def _load(self):
+        """Загрузка кэша с диска (пустой кэш при любой ошибке)"""
+        try:
+            if not os.path.exists(self.cache_path):
+                return {}
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != self.CACHE_VERSION:
+                return {}
+            return data.get('domains', {})
+        except Exception as e:
+            self.logger.debug(f"Selector cache not loaded: {str(e)}")
+            return {}
+
+    def save(self):
+        """Атомарная запись кэша на диск; запись одного экземпляра сериализуется блокировкой"""
+        if self._domains is None:
+            return
+        with self._lock:
+            try:
+                tmp_path = f"{self.cache_path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'version': self.CACHE_VERSION, 'domains': self._domains}, f, ensure_ascii=False)
+                os.replace(tmp_path, self.cache_path)
+            except Exception as e:
+                self.logger.debug(f"Selector cache not saved: {str(e)}")
+
+    def get_selectors(self, domain):
+        """Кэшированные селекторы домена, начиная с самых результативных"""
+        entry = self.domains.get(domain) if domain else None
+        if not entry:
+            return []
+
+        selectors = sorted(
+            entry['selectors'].items(),
+            key=lambda item: (item[1]['hits'], item[1]['last_seen']),
+            reverse=True
+        )
+        return [selector for selector, _ in selectors]
+
+    def needs_full_sweep(self, domain):
+        """Полный перебор паттернов нужен при пустом кэше и периодически"""
+        entry = self.domains.get(domain) if domain else None
+        if not entry or not entry['selectors']:
+            return True
+        return entry['scans_since_sweep'] >= self.full_sweep_every
+
+    def record_hit(self, domain):
+        self.metrics['hits'] += 1
+        entry = self.domains.get(domain)
+        if entry:
+            entry['hits'] += 1
+
+    def record_miss(self, domain):
+        self.metrics['misses'] += 1
+        entry = self.domains.get(domain)
+        if entry:
+            entry['misses'] += 1
+
+    def remember(self, domain, ads, full_sweep=False, rules=None):
+        """
+        Запоминание селекторов подтверждённых объявлений: #id, .class и
+        iframe[src^=...] по адресу фрейма без запроса
+
+        Args:
+            domain (str): Ключ домена
+            ads (list): Итоговые (дедуплицированные) объявления
+            full_sweep (bool): Был ли выполнен полный перебор паттернов
+            rules (CompiledRules): Правила, по которым отбираются селекторы
+        """
+        if not domain:
+            return
+
+        now = time.time()
+        entry = self.domains.setdefault(domain, {
+            'selectors': {},
+            'hits': 0,
+            'misses': 0,
+            'scans_since_sweep': 0,
+            'last_seen': now
+        })
+        entry['last_seen'] = now
+
+        if full_sweep:
+            self.metrics['full_sweeps'] += 1
+            entry['scans_since_sweep'] = 0
+        else:
+            entry['scans_since_sweep'] += 1
+
+        for ad in ads:
+            attributes = ad.get('attributes') or {}
+            for selector in self.build_selectors(attributes, rules):
+                stats = entry['selectors'].setdefault(selector, {'hits': 0, 'last_seen': now})
+                stats['hits'] += 1
+                stats['last_seen'] = now
+
+            frame_path = self._frame_path(ad)
+            if frame_path:
+                selector = "iframe[src^='{}']".format(frame_path.replace("'", "\\'"))
+                stats = entry['selectors'].setdefault(selector, {'hits': 0, 'last_seen': now})
+                stats['hits'] += 1
+                stats['last_seen'] = now
+
+        self._enforce_limits(entry)
+
+    @staticmethod
+    def build_selectors(attributes, rules=None):
+        """Точные селекторы (#id, .class) вместо подстрочных [class*='...']"""
+        rules = rules or RuleRegistry.current()
+        selectors = []
+
+        element_id = attributes.get('id', '')
+        if element_id and any(p in element_id.lower() for p in rules.id_patterns):
+            if _CSS_IDENT.match(element_id):
+                selectors.append(f"#{element_id}")
+            else:
+                selectors.append('[id="{}"]'.format(element_id.replace('"', '\\"')))
+
+        for token in attributes.get('class', '').split():
+            if _CSS_IDENT.match(token) and any(p in token.lower() for p in rules.class_patterns):
+                selectors.append(f".{token}")
+
+        return selectors
+
+    def _frame_path(self, ad):
+        if ad.get('type') != 'iframe':
+            return None
+        src = ad.get('src') or (ad.get('attributes') or {}).get('src')
+        return self._strip_query(src) if src else None
+
+    @staticmethod
+    def _strip_query(url):
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+
+    def _enforce_limits(self, entry):
+        """Ограничение числа селекторов на домен и числа доменов"""
+        if len(entry['selectors']) > self.max_selectors:
+            ranked = sorted(
+                entry['selectors'].items(),
+                key=lambda item: (item[1]['hits'], item[1]['last_seen']),
+                reverse=True
+            )
+            self.metrics['evicted'] += len(ranked) - self.max_selectors
+            entry['selectors'] = dict(ranked[:self.max_selectors])
+
+        if len(self.domains) > self.max_domains:
+            oldest = sorted(self.domains, key=lambda d: self.domains[d]['last_seen'])
+            for domain in oldest[:len(self.domains) - self.max_domains]:
+                del self.domains[domain]
+                self.metrics['evicted'] += 1
+
+    def evict_expired(self):
+        """Удаление записей, не подтверждавшихся дольше SELECTOR_CACHE_MAX_AGE_DAYS"""
+        cutoff = time.time() - self.max_age
+        for domain in list(self._domains):
+            entry = self._domains[domain]
+            if entry['last_seen'] < cutoff:
+                del self._domains[domain]
+                self.metrics['evicted'] += 1
+                continue
+            expired = [s for s, stats in entry['selectors'].items() if stats['last_seen'] < cutoff]
+            for selector in expired:
+                del entry['selectors'][selector]
+            self.metrics['evicted'] += len(expired)
+
+    def get_metrics(self):
+        """Метрики эффективности кэша"""
+        lookups = self.metrics['hits'] + self.metrics['misses']
+        return {
+            **self.metrics,
+            'hit_rate': self.metrics['hits'] / lookups if lookups else 0,
+            'domains': len(self.domains),
+            'selectors': sum(len(entry['selectors']) for entry in self.domains.values())
+        }
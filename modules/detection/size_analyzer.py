@@ -1,11 +1,13 @@
 import logging
-from config.ad_patterns import AdPatterns
+import numpy as np
+from config.rule_packs import RuleRegistry
 
 class SizeAnalyzer:
     """Класс для анализа размеров элементов на соответствие рекламным стандартам"""
     
-    def __init__(self):
+    def __init__(self, rules=None):
         self.logger = logging.getLogger(__name__)
+        self.rules = rules or RuleRegistry.current()
     
     def is_standard_ad_size(self, width, height, tolerance=5):
         """
@@ -19,7 +21,7 @@ class SizeAnalyzer:
         Returns:
             str or None: Название стандартного размера или None
         """
-        for std_width, std_height in AdPatterns.STANDARD_AD_SIZES:
+        for std_width, std_height in self.rules.standard_sizes:
             if (abs(width - std_width) <= tolerance and 
                 abs(height - std_height) <= tolerance):
                 return f"{std_width}x{std_height}"
@@ -72,4 +74,37 @@ class SizeAnalyzer:
         if area < 100 or area > 1000000:  # 1x100 или 1000x1000
             return True
             
-        return False
\ No newline at end of file
+        return False
+    
+    def standard_size_mask(self, widths, heights, tolerance=5):
+        """
+        Векторная проверка стандартных размеров для пакета элементов
+        
+        Args:
+            widths (np.ndarray): Ширины элементов
+            heights (np.ndarray): Высоты элементов
+            tolerance (int): Допустимое отклонение в пикселях
+            
+        Returns:
+            np.ndarray: Булев массив совпадений со стандартными размерами
+        """
+        sizes = np.asarray(self.rules.standard_sizes, dtype=float).reshape(-1, 2)
+        width_match = np.abs(widths[:, None] - sizes[None, :, 0]) <= tolerance
+        height_match = np.abs(heights[:, None] - sizes[None, :, 1]) <= tolerance
+        return (width_match & height_match).any(axis=1)
+    
+    def suspicious_size_mask(self, widths, heights):
+        """
+        Векторный аналог is_suspicious_size для пакета элементов
+        
+        Args:
+            widths (np.ndarray): Ширины элементов
+            heights (np.ndarray): Высоты элементов
+            
+        Returns:
+            np.ndarray: Булев массив подозрительных размеров
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(heights > 0, widths / np.where(heights > 0, heights, 1), 1.0)
+        area = widths * heights
+        return (heights > 0) & ((ratio > 10) | (ratio < 0.1)) | (area < 100) | (area > 1000000)
@@ -1,15 +1,31 @@
-from .click_emulator import ClickEmulator
-from .redirect_tracker import RedirectTracker
-from .url_analyzer import URLAnalyzer
-from .interaction_manager import InteractionManager
-from .simple_interaction_manager import SimpleInteractionManager
-from .utm_analyzer import UTMAnalyzer
+import importlib
+
+_LAZY_EXPORTS = {
+    'ClickEmulator': '.click_emulator',
+    'RedirectTracker': '.redirect_tracker',
+    'URLAnalyzer': '.url_analyzer',
+    'URLAnalysisEngine': '.url_engine',
+    'URLRecord': '.url_engine',
+    'InteractionManager': '.interaction_manager',
+    'SimpleInteractionManager': '.simple_interaction_manager',
+    'UTMAnalyzer': '.utm_analyzer'
+}
 
 __all__ = [
     'ClickEmulator',
     'RedirectTracker',
     'URLAnalyzer',
+    'URLAnalysisEngine',
+    'URLRecord',
     'InteractionManager',
     'SimpleInteractionManager',
     'UTMAnalyzer'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -1,7 +1,7 @@
 import logging
 import time
-from urllib.parse import urlparse, parse_qs
 from config.settings import Settings
+from modules.interaction.url_engine import URLAnalysisEngine
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.support.ui import WebDriverWait
@@ -15,6 +15,7 @@ class InteractionManager:
         self.driver = driver
         self.config = config
         self.logger = logging.getLogger(__name__)
+        self.url_engine = URLAnalysisEngine.get()
 
     def perform_complete_ad_interaction(self, ads):
         """Выполнение полного цикла взаимодействия с рекламным блоком"""
@@ -113,22 +114,17 @@ class InteractionManager:
     def _analyze_url(self, url):
         """Анализ URL"""
         try:
-            parsed = urlparse(url)
-            query_params = parse_qs(parsed.query)
-            
-            utm_params = {}
-            for key, value in query_params.items():
-                if key.startswith('utm_'):
-                    utm_params[key] = value[0] if value else ''
+            record = self.url_engine.analyze(url)
+            utm_params = dict(record.utm)
 
             self.logger.info(utm_params)
 
             return {
-                'domain': parsed.netloc,
-                'path': parsed.path,
+                'domain': record.netloc,
+                'path': record.path,
                 'has_utm': len(utm_params) > 0,
                 'utm_params': utm_params,
-                'query_params_count': len(query_params)
+                'query_params_count': len(record.query_params)
             }
         except:
             return {}
@@ -235,8 +231,7 @@ class InteractionManager:
                 if current_url.startswith('http'):
                     analysis['is_redirect'] = True
                     
-                    parsed_current = urlparse(current_url)
-                    query_params = parse_qs(parsed_current.query)
+                    query_params = self.url_engine.analyze(current_url).query_params
                     
                     redirect_keys = ['redirect', 'return', 'next', 'goto', 'url']
                     has_redirect_param = any(key in query_params for key in redirect_keys)
@@ -1,9 +1,9 @@
 import logging
 import time
-from urllib.parse import urlparse, parse_qs
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.support.ui import WebDriverWait
 from modules.screenshot.capturer import ScreenshotCapturer
+from modules.interaction.url_engine import URLAnalysisEngine
 
 class RedirectTracker:
     """Класс для отслеживания и анализа редиректов после клика"""
@@ -12,6 +12,7 @@ class RedirectTracker:
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.screenshot_capturer = ScreenshotCapturer(driver, config)
+        self.url_engine = URLAnalysisEngine.get()
     
     def track_redirect(self, attempt_number, original_window, original_windows, original_url, timeout=15):
         """Отслеживание редиректов после клика"""
@@ -119,27 +120,16 @@ class RedirectTracker:
     def _analyze_url_parameters(self, url, redirect_info):
         """Анализ параметров URL на наличие UTM и tracking параметров"""
         try:
-            parsed_url = urlparse(url)
-            query_params = parse_qs(parsed_url.query)
-            
-            utm_params = {}
-            for key, value in query_params.items():
-                if key.startswith('utm_'):
-                    utm_params[key] = value[0] if value else ''
+            record = self.url_engine.analyze(url)
+            utm_params = dict(record.utm)
+            tracking_params = dict(record.tracking)
             
             redirect_info['utm_parameters'] = utm_params
-            
-            tracking_keys = ['gclid', 'fbclid', 'msclkid', 'trk', 'tracking', 'ref', 'source']
-            tracking_params = {}
-            
-            for key, value in query_params.items():
-                if any(track_key in key.lower() for track_key in tracking_keys):
-                    tracking_params[key] = value[0] if value else ''
-            
             redirect_info['tracking_parameters'] = tracking_params
+            redirect_info['click_ids'] = dict(record.click_ids)
             
             redirect_info['parameter_analysis'] = {
-                'total_parameters': len(query_params),
+                'total_parameters': len(record.query_params),
                 'utm_count': len(utm_params),
                 'tracking_count': len(tracking_params),
                 'has_tracking': len(utm_params) > 0 or len(tracking_params) > 0
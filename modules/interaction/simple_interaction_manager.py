@@ -1,6 +1,5 @@
 import logging
 import time
-from urllib.parse import urlparse, parse_qs
 from selenium.common.exceptions import (
     ElementClickInterceptedException,
     StaleElementReferenceException,
@@ -10,6 +9,7 @@ from selenium.common.exceptions import (
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from modules.interaction.url_engine import URLAnalysisEngine
 
 class SimpleInteractionManager:
     """Простой и надежный менеджер взаимодействия с рекламой"""
@@ -19,6 +19,7 @@ class SimpleInteractionManager:
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.wait = WebDriverWait(driver, 10)
+        self.url_engine = URLAnalysisEngine.get()
     
     def analyze_ad_element(self, element, ad_data=None):
         """
@@ -163,21 +164,15 @@ class SimpleInteractionManager:
     def _analyze_url(self, url):
         """Анализ URL"""
         try:
-            parsed = urlparse(url)
-            query_params = parse_qs(parsed.query)
-            
-            # Ищем UTM параметры
-            utm_params = {}
-            for key, value in query_params.items():
-                if key.startswith('utm_'):
-                    utm_params[key] = value[0] if value else ''
+            record = self.url_engine.analyze(url)
+            utm_params = dict(record.utm)
             
             return {
-                'domain': parsed.netloc,
-                'path': parsed.path,
+                'domain': record.netloc,
+                'path': record.path,
                 'has_utm': len(utm_params) > 0,
                 'utm_params': utm_params,
-                'query_params_count': len(query_params),
+                'query_params_count': len(record.query_params),
                 'is_external': self._is_external_url(url)
             }
         except:
@@ -186,8 +181,8 @@ class SimpleInteractionManager:
     def _is_external_url(self, url):
         """Проверка, является ли URL внешним"""
         try:
-            current_domain = urlparse(self.driver.current_url).netloc
-            url_domain = urlparse(url).netloc
+            current_domain = self.url_engine.analyze(self.driver.current_url).domain
+            url_domain = self.url_engine.analyze(url).domain
             return current_domain != url_domain
         except:
             return True
@@ -312,8 +307,7 @@ class SimpleInteractionManager:
                     analysis['is_redirect'] = True
                     
                     # Ищем редиректные параметры
-                    parsed_current = urlparse(current_url)
-                    query_params = parse_qs(parsed_current.query)
+                    query_params = self.url_engine.analyze(current_url).query_params
                     
                     redirect_keys = ['redirect', 'return', 'next', 'goto', 'url']
                     has_redirect_param = any(key in query_params for key in redirect_keys)
@@ -1,12 +1,14 @@
 import logging
-import re
-from urllib.parse import urlparse, parse_qs, unquote
+from urllib.parse import unquote
+from modules.interaction.url_engine import URLAnalysisEngine
+from utils.domain import public_suffix
 
 class URLAnalyzer:
     """Класс для детального анализа URL и UTM параметров"""
     
-    def __init__(self):
+    def __init__(self, engine=None):
         self.logger = logging.getLogger(__name__)
+        self.engine = engine or URLAnalysisEngine.get()
         self.utm_patterns = self._initialize_utm_patterns()
     
     def _initialize_utm_patterns(self):
@@ -26,14 +28,15 @@ class URLAnalyzer:
     def analyze_ad_url(self, url, element_info=None):
         """Комплексный анализ рекламного URL"""
         try:
+            record = self.engine.analyze(url)
             analysis = {
                 'url': url,
-                'is_valid': self._validate_url(url),
-                'parsed_components': self._parse_url_components(url),
-                'utm_analysis': self._analyze_utm_parameters(url),
-                'security_analysis': self._analyze_url_security(url),
-                'redirect_analysis': self._analyze_redirect_patterns(url),
-                'ad_network_indicators': self._find_ad_network_indicators(url),
+                'is_valid': record.is_valid,
+                'parsed_components': self._parse_url_components(record),
+                'utm_analysis': self._analyze_utm_parameters(record),
+                'security_analysis': self._analyze_url_security(record),
+                'redirect_analysis': dict(record.redirect),
+                'ad_network_indicators': self._find_ad_network_indicators(record),
                 'element_context': element_info
             }
             
@@ -47,204 +50,81 @@ class URLAnalyzer:
                 'is_valid': False
             }
     
-    def _validate_url(self, url):
-        """Валидация URL"""
-        try:
-            parsed = urlparse(url)
-            return all([parsed.scheme, parsed.netloc])
-        except:
-            return False
-    
-    def _parse_url_components(self, url):
-        """Парсинг компонентов URL"""
-        try:
-            parsed = urlparse(url)
-            query_params = parse_qs(parsed.query)
-            
-            return {
-                'scheme': parsed.scheme,
-                'netloc': parsed.netloc,
-                'path': parsed.path,
-                'params': parsed.params,
-                'query': parsed.query,
-                'fragment': parsed.fragment,
-                'domain': parsed.netloc,
-                'tld': self._extract_tld(parsed.netloc),
-                'query_parameters': {k: v[0] if len(v) == 1 else v for k, v in query_params.items()},
-                'query_parameter_count': len(query_params)
-            }
-        except Exception as e:
-            self.logger.error(f"Error parsing URL components: {str(e)}")
-            return {}
-    
-    def _extract_tld(self, netloc):
-        """Извлечение TLD (Top-Level Domain)"""
-        try:
-            parts = netloc.split('.')
-            if len(parts) >= 2:
-                return '.'.join(parts[-2:])
-            return netloc
-        except:
-            return netloc
+    def _parse_url_components(self, record):
+        """Компоненты URL из записи движка"""
+        return {
+            'scheme': record.scheme,
+            'netloc': record.netloc,
+            'path': record.path,
+            'params': record.params,
+            'query': record.query,
+            'fragment': record.fragment,
+            'domain': record.netloc,
+            'tld': record.domain,
+            'public_suffix': public_suffix(record.netloc),
+            'query_parameters': record.first_params(),
+            'query_parameter_count': len(record.query_params)
+        }
     
-    def _analyze_utm_parameters(self, url):
+    def _analyze_utm_parameters(self, record):
         """Анализ UTM параметров"""
-        try:
-            parsed = urlparse(url)
-            query_params = parse_qs(parsed.query)
-            
-            utm_analysis = {
-                'has_utm': False,
-                'utm_parameters': {},
-                'utm_completeness': 0,
-                'missing_required': [],
-                'found_optional': []
-            }
-            
-            found_utms = {}
-            required_found = 0
-            total_required = 0
-            
-            for utm_key, utm_info in self.utm_patterns.items():
-                if utm_info['required']:
-                    total_required += 1
-                
-                if utm_key in query_params:
-                    values = query_params[utm_key]
-                    found_utms[utm_key] = {
-                        'value': values[0] if values else '',
-                        'description': utm_info['description'],
-                        'required': utm_info['required']
-                    }
-                    
-                    if utm_info['required']:
-                        required_found += 1
-                    else:
-                        utm_analysis['found_optional'].append(utm_key)
-            
-            utm_analysis['utm_parameters'] = found_utms
-            utm_analysis['has_utm'] = len(found_utms) > 0
-            
-            if total_required > 0:
-                utm_analysis['utm_completeness'] = (required_found / total_required) * 100
-            
-            for utm_key, utm_info in self.utm_patterns.items():
-                if utm_info['required'] and utm_key not in found_utms:
-                    utm_analysis['missing_required'].append(utm_key)
-            
-            return utm_analysis
-            
-        except Exception as e:
-            self.logger.error(f"Error analyzing UTM parameters: {str(e)}")
-            return {'error': str(e)}
-    
-    def _analyze_url_security(self, url):
-        """Анализ безопасности URL"""
-        try:
-            parsed = urlparse(url)
-            
-            security_indicators = {
-                'is_https': parsed.scheme == 'https',
-                'suspicious_tld': self._check_suspicious_tld(parsed.netloc),
-                'ip_address': bool(re.match(r'^\d+\.\d+\.\d+\.\d+$', parsed.netloc)),
-                'suspicious_keywords': self._find_suspicious_keywords(url),
-                'url_length': len(url),
-                'has_encoded_chars': '%' in url,
-                'multiple_subdomains': parsed.netloc.count('.') > 2
-            }
-            
-            # Расчет общего score безопасности
-            risk_score = 0
-            if not security_indicators['is_https']:
-                risk_score += 30
-            if security_indicators['suspicious_tld']:
-                risk_score += 25
-            if security_indicators['ip_address']:
-                risk_score += 20
-            if security_indicators['suspicious_keywords']:
-                risk_score += 15
-            if security_indicators['has_encoded_chars']:
-                risk_score += 10
-            
-            security_indicators['security_risk_score'] = min(risk_score, 100)
-            security_indicators['security_level'] = (
-                'high' if risk_score < 20 else 
-                'medium' if risk_score < 50 else 
-                'low'
-            )
-            
-            return security_indicators
-            
-        except Exception as e:
-            self.logger.error(f"Error analyzing URL security: {str(e)}")
-            return {'error': str(e)}
-    
-    def _check_suspicious_tld(self, netloc):
-        """Проверка на подозрительные TLD"""
-        suspicious_tlds = [
-            '.tk', '.ml', '.ga', '.cf', '.xyz', '.top', '.loan', 
-            '.win', '.review', '.club', '.work', '.site'
-        ]
+        utm_analysis = {
+            'has_utm': False,
+            'utm_parameters': {},
+            'utm_completeness': 0,
+            'missing_required': [],
+            'found_optional': []
+        }
         
-        return any(netloc.endswith(tld) for tld in suspicious_tlds)
-    
-    def _find_suspicious_keywords(self, url):
-        """Поиск подозрительных ключевых слов в URL"""
-        suspicious_keywords = [
-            'login', 'password', 'bank', 'paypal', 'account',
-            'verify', 'confirm', 'security', 'update', 'alert'
-        ]
+        found_utms = {}
+        required_found = 0
+        total_required = 0
         
-        url_lower = url.lower()
-        return any(keyword in url_lower for keyword in suspicious_keywords)
-    
-    def _analyze_redirect_patterns(self, url):
-        """Анализ паттернов редиректа"""
-        try:
-            # Эвристический анализ для определения возможных редиректов
-            redirect_indicators = {
-                'has_redirect_params': any(param in url.lower() for param in ['redirect', 'return', 'next', 'goto']),
-                'has_url_param': 'url=' in url.lower(),
-                'has_http_in_param': re.search(r'=https?://', url) is not None,
-                'encoded_url': re.search(r'%2F%2F|%3A%2F%2F', url) is not None
-            }
-            
-            redirect_indicators['likely_redirect'] = (
-                redirect_indicators['has_redirect_params'] or
-                redirect_indicators['has_url_param'] or
-                redirect_indicators['has_http_in_param'] or
-                redirect_indicators['encoded_url']
-            )
-            
-            return redirect_indicators
-            
-        except Exception as e:
-            self.logger.error(f"Error analyzing redirect patterns: {str(e)}")
-            return {'error': str(e)}
-    
-    def _find_ad_network_indicators(self, url):
-        """Поиск индикаторов рекламных сетей в URL"""
-        ad_network_patterns = {
-            'google_ads': [r'doubleclick\.net', r'googleadservices\.com', r'googlesyndication\.com'],
-            'facebook_ads': [r'facebook\.com/tr/', r'fbcdn\.net', r'atdmt\.com'],
-            'yandex_ads': [r'yandex\.ru/ads', r'an\.yandex\.ru', r'yandexadexchange\.net'],
-            'taboola': [r'taboola\.com'],
-            'outbrain': [r'outbrain\.com'],
-            'criteo': [r'criteo\.com']
-        }
+        for utm_key, utm_info in self.utm_patterns.items():
+            if utm_info['required']:
+                total_required += 1
+            
+            if utm_key in record.utm:
+                found_utms[utm_key] = {
+                    'value': record.utm[utm_key],
+                    'description': utm_info['description'],
+                    'required': utm_info['required']
+                }
+                
+                if utm_info['required']:
+                    required_found += 1
+                else:
+                    utm_analysis['found_optional'].append(utm_key)
+            elif utm_info['required']:
+                utm_analysis['missing_required'].append(utm_key)
+        
+        utm_analysis['utm_parameters'] = found_utms
+        utm_analysis['has_utm'] = len(found_utms) > 0
         
-        detected_networks = []
+        if total_required > 0:
+            utm_analysis['utm_completeness'] = (required_found / total_required) * 100
         
-        for network, patterns in ad_network_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, url, re.IGNORECASE):
-                    detected_networks.append(network)
-                    break
+        return utm_analysis
+    
+    def _analyze_url_security(self, record):
+        """Анализ безопасности URL"""
+        security_indicators = dict(record.security)
+        risk_score = record.risk_score
+        security_indicators['security_risk_score'] = risk_score
+        security_indicators['security_level'] = (
+            'high' if risk_score < 20 else 
+            'medium' if risk_score < 50 else 
+            'low'
+        )
         
+        return security_indicators
+    
+    def _find_ad_network_indicators(self, record):
+        """Индикаторы рекламных сетей в URL"""
         return {
-            'detected_networks': detected_networks,
-            'is_ad_network_url': len(detected_networks) > 0,
-            'primary_network': detected_networks[0] if detected_networks else None
+            'detected_networks': list(record.networks),
+            'is_ad_network_url': len(record.networks) > 0,
+            'primary_network': record.network
         }
     
     def generate_utm_report(self, utm_analysis):
@@ -0,0 +1,225 @@
+import logging
+import re
+import threading
+from functools import lru_cache
+from types import MappingProxyType
+from typing import NamedTuple, Optional, Tuple, Mapping
+from urllib.parse import urlparse, parse_qs
+from config.settings import Settings
+from utils.domain import registrable_domain
+
+EMPTY = MappingProxyType({})
+
+# Обязательные UTM-метки
+UTM_REQUIRED = ('utm_source', 'utm_medium', 'utm_campaign')
+
+# Идентификаторы клика рекламных систем
+CLICK_ID_PARAMS = frozenset((
+    'gclid', 'gbraid', 'wbraid', 'dclid', 'fbclid', 'msclkid', 'yclid', 'ysclid',
+    'ttclid', 'twclid', 'li_fat_id', 'epik', 'irclickid', 'vkclid'
+))
+
+# Подстроки имён параметров отслеживания (как в RedirectTracker)
+TRACKING_KEYS = ('gclid', 'fbclid', 'msclkid', 'trk', 'tracking', 'ref', 'source')
+
+AD_NETWORK_PATTERNS = {
+    'google_ads': re.compile(r'doubleclick\.net|googleadservices\.com|googlesyndication\.com', re.IGNORECASE),
+    'facebook_ads': re.compile(r'facebook\.com/tr/|fbcdn\.net|atdmt\.com', re.IGNORECASE),
+    'yandex_ads': re.compile(r'yandex\.ru/ads|an\.yandex\.ru|yandexadexchange\.net', re.IGNORECASE),
+    'taboola': re.compile(r'taboola\.com', re.IGNORECASE),
+    'outbrain': re.compile(r'outbrain\.com', re.IGNORECASE),
+    'criteo': re.compile(r'criteo\.com', re.IGNORECASE)
+}
+
+SUSPICIOUS_TLDS = (
+    '.tk', '.ml', '.ga', '.cf', '.xyz', '.top', '.loan',
+    '.win', '.review', '.club', '.work', '.site'
+)
+SUSPICIOUS_KEYWORDS = re.compile(
+    r'login|password|bank|paypal|account|verify|confirm|security|update|alert', re.IGNORECASE
+)
+IP_ADDRESS = re.compile(r'^\d+\.\d+\.\d+\.\d+$')
+REDIRECT_PARAM = re.compile(r'redirect|return|next|goto', re.IGNORECASE)
+HTTP_IN_PARAM = re.compile(r'=https?://')
+ENCODED_URL = re.compile(r'%2F%2F|%3A%2F%2F')
+
+
+class URLRecord(NamedTuple):
+    """Результат однократного разбора URL; словари доступны только для чтения"""
+    url: str
+    is_valid: bool
+    scheme: str
+    netloc: str
+    domain: str
+    path: str
+    params: str
+    query: str
+    fragment: str
+    query_params: Mapping[str, Tuple[str, ...]]
+    utm: Mapping[str, str]
+    click_ids: Mapping[str, str]
+    tracking: Mapping[str, str]
+    networks: Tuple[str, ...]
+    network: Optional[str]
+    security: Mapping[str, object]
+    redirect: Mapping[str, bool]
+    risk_score: int
+
+    def first_params(self):
+        """Параметры запроса: первое значение, либо список при нескольких"""
+        return {k: v[0] if len(v) == 1 else list(v) for k, v in self.query_params.items()}
+
+    def to_dict(self):
+        """Обычный словарь для JSON-отчётов"""
+        return {
+            'url': self.url,
+            'is_valid': self.is_valid,
+            'host': self.netloc,
+            'domain': self.domain,
+            'path': self.path,
+            'utm': dict(self.utm),
+            'click_ids': dict(self.click_ids),
+            'tracking': dict(self.tracking),
+            'networks': list(self.networks),
+            'network': self.network,
+            'risk_score': self.risk_score
+        }
+
+
+class URLAnalysisEngine:
+    """
+    Единый разбор рекламных URL
+
+    Каждый URL разбирается один раз (urlparse + parse_qs) в компактную
+    запись URLRecord: компоненты, UTM-метки, идентификаторы клика,
+    рекламная сеть и оценка риска. Шаблоны скомпилированы на уровне
+    модуля, результаты кэшируются LRU. URLAnalyzer, UTMAnalyzer и все
+    пути взаимодействия используют общий экземпляр get().
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, cache_size=None):
+        self.logger = logging.getLogger(__name__)
+        self.cache_size = cache_size or Settings.URL_ANALYSIS_CACHE_SIZE
+        self._analyze_cached = lru_cache(maxsize=self.cache_size)(self._parse)
+
+    @classmethod
+    def get(cls):
+        """Общий движок процесса (один LRU-кэш на все модули взаимодействия)"""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def analyze(self, url) -> URLRecord:
+        """Разбор URL (из кэша, если он уже встречался)"""
+        return self._analyze_cached(url or '')
+
+    def analyze_batch(self, urls):
+        """
+        Пакетный разбор URL
+
+        Повторяющиеся адреса разбираются один раз; порядок сохраняется.
+
+        Returns:
+            list: URLRecord для каждого входного URL
+        """
+        unique = {url: self.analyze(url) for url in dict.fromkeys(u or '' for u in urls)}
+        return [unique[url or ''] for url in urls]
+
+    def summarize(self, records):
+        """Сводка по пакету: сети, доля UTM и идентификаторов клика, средний риск"""
+        records = list(records)
+        networks = {}
+        for record in records:
+            if record.network:
+                networks[record.network] = networks.get(record.network, 0) + 1
+        total = len(records)
+        return {
+            'total_urls': total,
+            'with_utm': sum(1 for r in records if r.utm),
+            'with_click_ids': sum(1 for r in records if r.click_ids),
+            'networks': networks,
+            'average_risk_score': sum(r.risk_score for r in records) / total if total else 0
+        }
+
+    def cache_info(self):
+        return self._analyze_cached.cache_info()
+
+    def _parse(self, url) -> URLRecord:
+        try:
+            parts = urlparse(url)
+            query_params = {k: tuple(v) for k, v in parse_qs(parts.query).items()}
+        except ValueError as e:
+            self.logger.debug(f"Неразборчивый URL {url[:100]}: {str(e)}")
+            parts, query_params = urlparse(''), {}
+
+        netloc = parts.netloc
+
+        utm, click_ids, tracking = {}, {}, {}
+        for key, values in query_params.items():
+            value = values[0] if values else ''
+            lowered = key.lower()
+            if key.startswith('utm_'):
+                utm[key] = value
+            if lowered in CLICK_ID_PARAMS:
+                click_ids[key] = value
+            if any(track_key in lowered for track_key in TRACKING_KEYS):
+                tracking[key] = value
+
+        networks = tuple(name for name, pattern in AD_NETWORK_PATTERNS.items() if pattern.search(url))
+
+        security = {
+            'is_https': parts.scheme == 'https',
+            'suspicious_tld': netloc.endswith(SUSPICIOUS_TLDS),
+            'ip_address': bool(IP_ADDRESS.match(netloc)),
+            'suspicious_keywords': bool(SUSPICIOUS_KEYWORDS.search(url)),
+            'url_length': len(url),
+            'has_encoded_chars': '%' in url,
+            'multiple_subdomains': netloc.count('.') > 2
+        }
+        risk_score = 0
+        if not security['is_https']:
+            risk_score += 30
+        if security['suspicious_tld']:
+            risk_score += 25
+        if security['ip_address']:
+            risk_score += 20
+        if security['suspicious_keywords']:
+            risk_score += 15
+        if security['has_encoded_chars']:
+            risk_score += 10
+        risk_score = min(risk_score, 100)
+
+        lowered_url = url.lower()
+        redirect = {
+            'has_redirect_params': bool(REDIRECT_PARAM.search(url)),
+            'has_url_param': 'url=' in lowered_url,
+            'has_http_in_param': HTTP_IN_PARAM.search(url) is not None,
+            'encoded_url': ENCODED_URL.search(url) is not None
+        }
+        redirect['likely_redirect'] = any(redirect.values())
+
+        return URLRecord(
+            url=url,
+            is_valid=bool(parts.scheme and netloc),
+            scheme=parts.scheme,
+            netloc=netloc,
+            domain=registrable_domain(netloc),
+            path=parts.path,
+            params=parts.params,
+            query=parts.query,
+            fragment=parts.fragment,
+            query_params=MappingProxyType(query_params) if query_params else EMPTY,
+            utm=MappingProxyType(utm) if utm else EMPTY,
+            click_ids=MappingProxyType(click_ids) if click_ids else EMPTY,
+            tracking=MappingProxyType(tracking) if tracking else EMPTY,
+            networks=networks,
+            network=networks[0] if networks else None,
+            security=MappingProxyType(security),
+            redirect=MappingProxyType(redirect),
+            risk_score=risk_score
+        )
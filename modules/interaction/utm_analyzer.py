@@ -1,6 +1,7 @@
 import logging
 import re
-from urllib.parse import urlparse, parse_qs, unquote
+from urllib.parse import unquote
+from modules.interaction.url_engine import URLAnalysisEngine
 
 class UTMAnalyzer:
     """Простой анализатор UTM параметров"""
@@ -19,22 +20,8 @@ class UTMAnalyzer:
             dict: UTM параметры
         """
         try:
-            parsed = urlparse(url)
-            query_params = parse_qs(parsed.query)
-            
-            utm_params = {}
-            standard_utm = [
-                'utm_source', 'utm_medium', 'utm_campaign',
-                'utm_term', 'utm_content', 'utm_id'
-            ]
-            
-            for key, value in query_params.items():
-                if key in standard_utm:
-                    utm_params[key] = unquote(value[0]) if value else ''
-                elif key.startswith('utm_'):
-                    utm_params[key] = unquote(value[0]) if value else ''
-            
-            return utm_params
+            utm = URLAnalysisEngine.get().analyze(url).utm
+            return {key: unquote(value) for key, value in utm.items()}
             
         except Exception as e:
             self.logger.error(f"Error extracting UTM params: {str(e)}")
@@ -1,7 +1,21 @@
-from .interaction_manager_v1 import InteractionManagerV1
-from .redirect_manager import RedirectManager
+import importlib
+
+_LAZY_EXPORTS = {
+    'InteractionManagerV1': '.interaction_manager_v1',
+    'RedirectManager': '.redirect_manager',
+    'TabPool': '.tab_pool'
+}
 
 __all__ = [
     'InteractionManagerV1',
-    'RedirectManager'
-]
\ No newline at end of file
+    'RedirectManager',
+    'TabPool'
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -1,10 +1,11 @@
 import logging
 import time
 import json
-import random
-from urllib.parse import urlparse, parse_qs
 from config.settings import Settings
+from core.pacing_scheduler import PacingScheduler
+from modules.interaction.url_engine import URLAnalysisEngine
 from .redirect_manager import RedirectManager
+from .tab_pool import TabPool
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.support.ui import WebDriverWait
@@ -14,12 +15,14 @@ from selenium.webdriver.common.by import By
 
 class InteractionManagerV1:
     """Главный класс для управления всем процессом взаимодействия с рекламой"""
-    def __init__(self, driver: WebDriver, config: Settings):
+    def __init__(self, driver: WebDriver, config: Settings, pacing: PacingScheduler = None):
         self.driver = driver
         self.config = config
+        self.pacing = pacing or PacingScheduler(config)
         self.action_chain = ActionChains(self.driver)
         self.wait = WebDriverWait(self.driver, 30)
         self.logger = logging.getLogger(__name__)
+        self.url_engine = URLAnalysisEngine.get()
 
     def click_elements(self, ads_data):
         self.logger.info("Начинаем клики по рекламным элементам")
@@ -62,17 +65,7 @@ class InteractionManagerV1:
         """Извлекает UTM-метки из URL"""
         try:
             self.logger.info(f"Извлекает UTM-метки из URL элемента")
-            parsed_url = urlparse(url)
-            query_params = parse_qs(parsed_url.query)
-            utm_params = {}
-
-            for key, value in query_params.items():
-
-                if key.startswith('utm_'):
-
-                    utm_params[key] = value[0]
-            
-            return utm_params
+            return dict(self.url_engine.analyze(url).utm)
 
         except Exception as e:
             self.logger.error(f"Ошибка при извлечении UTM-метки: {e}")
@@ -80,11 +73,9 @@ class InteractionManagerV1:
     def _wait_load_page(self):
         """Ожидания рагрузки рекламной страницы"""
         try:
-            self.action_chain.pause(random.uniform(2.3, 3.7))
-
             self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
 
-            self.action_chain.pause(random.uniform(2.3, 3.7))
+            self.pacing.delay('page_settle')
 
         except TimeoutException:
             self.logger.warning("Страница не загрузиласть полностью")
@@ -101,15 +92,15 @@ class InteractionManagerV1:
                 'error': None,
             }
 
-            self.action_chain.pause(random.uniform(1.33, 2.55))
+            self.pacing.delay('before_scroll')
 
             self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", element)
 
-            self.action_chain.pause(random.uniform(1.33, 2.55))
+            self.pacing.delay('before_click')
 
-            self.action_chain.move_to_element_with_offset(element, -20, -10).click().perform()
+            ActionChains(self.driver).move_to_element_with_offset(element, -20, -10).click().perform()
 
-            self.action_chain.pause(random.uniform(2.77, 3.55))
+            self.pacing.delay('after_click')
 
             self.logger.info(f"Клик по {i} элементу")
 
@@ -170,26 +161,81 @@ class InteractionManagerV1:
                 if not element:
                     continue
                 
-                redirect_manager = RedirectManager(self.driver, element, original_window)
+                redirect_manager = RedirectManager(self.driver, element, original_window, pacing=self.pacing)
 
                 with redirect_manager as redirect:
                     current_url = redirect.current_url
 
                 self.logger.info(current_url)
 
-                utm_data = self.extract_utm_params(current_url)
+                # Разбор посадочной страницы выполняется во время следующей паузы
+                self.pacing.defer(self._record_interaction, results, ad, current_url)
+            except Exception as e:
+                self.logger.error(f"Ошибка: {e}")
 
-                self.logger.info(utm_data)
+        self.pacing.flush()
+        return results
 
-                ad_data = {
+    def _record_interaction(self, results, ad, current_url):
+        """Анализ посадочной страницы и запись результата взаимодействия"""
+        utm_data = self.extract_utm_params(current_url)
+
+        self.logger.info(utm_data)
+
+        results.append({
+            "ad_data": ad,
+            "interaction": {
+                "utm_data": utm_data,
+                "current_url": current_url
+            },
+        })
+
+    def perform_concurrent_ad_interaction(self, data, concurrency=None):
+        """
+        Параллельное взаимодействие: вкладки пачки открываются подряд,
+        загружаются одновременно и опрашиваются одним циклом
+
+        Args:
+            data (list): Обнаруженные объявления
+            concurrency (int): Число одновременно открытых вкладок
+
+        Returns:
+            list: Результаты в формате perform_complete_ad_interaction
+        """
+        concurrency = max(1, int(concurrency or self.config.INTERACTION_CONCURRENCY))
+        original_window = self.driver.current_window_handle
+        ads = [ad for ad in data if ad.get('element')]
+        self.logger.info(f"Параллельное взаимодействие: {len(ads)} объявлений, по {concurrency} вкладок")
+        results = []
+
+        for start in range(0, len(ads), concurrency):
+            batch = ads[start:start + concurrency]
+
+            with TabPool(self.driver, original_window, timeout=self.config.INTERACTION_TAB_TIMEOUT) as pool:
+                for index, ad in enumerate(batch):
+                    try:
+                        pool.open(index, ad['element'])
+                    except Exception as e:
+                        self.logger.error(f"Ошибка открытия рекламы: {e}")
+
+                tabs = pool.harvest()
+
+            for index, ad in enumerate(batch):
+                tab = tabs.get(index)
+                if not tab:
+                    continue
+
+                current_url = tab['current_url']
+                results.append({
                     "ad_data": ad,
                     "interaction": {
-                        "utm_data": utm_data,
-                        "current_url": current_url
+                        "utm_data": self.extract_utm_params(current_url) if current_url else {},
+                        "current_url": current_url,
+                        "load_state": tab['load_state'],
+                        "open_method": tab['method'],
+                        "elapsed": tab['elapsed']
                     },
-                }
+                })
 
-                results.append(ad_data)
-            except Exception as e:
-                self.logger.error(f"Ошибка: {e}")
+        self.logger.info(f"Параллельное взаимодействие завершено: {len(results)} переходов")
         return results
\ No newline at end of file
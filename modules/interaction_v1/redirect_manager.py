@@ -9,13 +9,14 @@ from selenium.common.exceptions import (TimeoutException,
                                         ElementNotInteractableException)
 from typing import Optional
 import logging
-import time
-import random
+from core.pacing_scheduler import PacingScheduler
+from config.settings import Settings
 
 class RedirectManager:
     """Контекстный менеджер для безопасного управления переходами между окнами/вкладками в Selenium."""
 
-    def __init__(self, driver: WebDriver, element: WebElement, original_window: str, timeout: int = 30):
+    def __init__(self, driver: WebDriver, element: WebElement, original_window: str, timeout: int = 30,
+                 pacing: PacingScheduler = None):
         if not element:
             raise ValueError("Должен быть указан element")
         
@@ -23,6 +24,7 @@ class RedirectManager:
         self.element = element
         self.timeout = timeout
         self.original_window = original_window
+        self.pacing = pacing or PacingScheduler(Settings)
 
         self.original_handles = None
         self.new_window_handle = None
@@ -97,15 +99,11 @@ class RedirectManager:
         """Выполняем действие для открытия нового окна"""
         action_chain = ActionChains(self.driver)
 
-        action_chain.pause(random.uniform(1.5, 2))
+        self.pacing.delay('redirect_action')
 
         if self.element:
             self._click(self.element, action_chain)
 
-        action_chain.pause(random.uniform(1.5, 2))
-
-        action_chain.perform()
-
     def _click(self, element: WebElement, action_chain: ActionChains) -> None:
         """Безопасный клик с обработкой различных случаев"""
         self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", element)
@@ -114,7 +112,7 @@ class RedirectManager:
             lambda d: element.is_displayed() and element.is_enabled()
         )
 
-        action_chain.pause(random.uniform(1, 2))
+        self.pacing.delay('before_click')
 
         action_chain.move_to_element_with_offset(element, -20, -10).click().perform()
 
@@ -0,0 +1,176 @@
+import logging
+import time
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.common.action_chains import ActionChains
+
+# Ссылка, на которую ведёт рекламный блок: сам элемент, его родитель или потомок
+RESOLVE_HREF_SCRIPT = """
+var el = arguments[0];
+var link = el.closest('a[href]') || el.querySelector('a[href]');
+if (!link) { return null; }
+var href = link.href;
+return /^https?:/i.test(href) ? href : null;
+"""
+
+# Начальный адрес новой вкладки до перехода на посадочную страницу
+BLANK_URLS = ('', 'about:blank', 'data:,')
+
+
+class TabPool:
+    """
+    Пакет вкладок рекламных переходов внутри одного браузера
+
+    Клики (или открытие href) выполняются подряд без ожиданий, посадочные
+    страницы грузятся параллельно, затем все новые вкладки опрашиваются
+    одним циклом и закрываются по мере готовности.
+    """
+
+    def __init__(self, driver: WebDriver, original_window: str, timeout: int = 30,
+                 open_timeout: float = 2.0, poll_interval: float = 0.25):
+        self.driver = driver
+        self.original_window = original_window
+        self.timeout = timeout
+        self.open_timeout = open_timeout
+        self.poll_interval = poll_interval
+        self.tabs = {}
+        self.logger = logging.getLogger(__name__)
+
+    def open(self, key, element: WebElement):
+        """
+        Открытие посадочной страницы рекламы в новой вкладке
+
+        Args:
+            key: Ключ, по которому вернётся результат вкладки
+            element: Рекламный элемент
+
+        Returns:
+            str or None: Handle новой вкладки
+        """
+        known_handles = set(self.driver.window_handles)
+
+        try:
+            href = self.driver.execute_script(RESOLVE_HREF_SCRIPT, element)
+        except Exception as e:
+            self.logger.debug(f"Не удалось получить ссылку рекламы {key}: {e}")
+            href = None
+
+        method = 'window.open'
+        if href:
+            self.driver.execute_script("window.open(arguments[0], '_blank');", href)
+        else:
+            method = 'click'
+            self._click(element)
+
+        handle = self._wait_new_handle(known_handles)
+        if not handle:
+            self.logger.warning(f"Реклама {key}: новая вкладка не открылась ({method})")
+            self._restore_original()
+            return None
+
+        self.tabs[handle] = {
+            'key': key,
+            'method': method,
+            'href': href,
+            'opened_at': time.monotonic(),
+            'last_url': None
+        }
+        self._restore_original()
+        return handle
+
+    def _click(self, element: WebElement):
+        """Клик без пауз: скрытые от скрипта ссылки (iframe) открываются самим блоком"""
+        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+        ActionChains(self.driver).move_to_element_with_offset(element, -20, -10).click().perform()
+
+    def _wait_new_handle(self, known_handles):
+        deadline = time.monotonic() + self.open_timeout
+        while True:
+            new_handles = [h for h in self.driver.window_handles if h not in known_handles]
+            if new_handles:
+                return new_handles[-1]
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(self.poll_interval)
+
+    def _restore_original(self):
+        try:
+            if self.driver.current_window_handle != self.original_window:
+                self.driver.switch_to.window(self.original_window)
+        except Exception as e:
+            self.logger.warning(f"Не удалось вернуться в исходное окно: {e}")
+
+    def harvest(self):
+        """
+        Опрос всех открытых вкладок до готовности или таймаута
+
+        Вкладка готова, когда document.readyState == 'complete' и URL не
+        изменился с прошлого прохода (завершились JS-редиректы трекеров).
+        Пустая вкладка (about:blank) готовой не считается: переход на
+        посадочную страницу ещё не начался.
+
+        Returns:
+            dict: key -> {current_url, load_state, method, elapsed}
+        """
+        results = {}
+        deadline = time.monotonic() + self.timeout
+
+        while self.tabs:
+            timed_out = time.monotonic() >= deadline
+            for handle in list(self.tabs):
+                tab = self.tabs[handle]
+                try:
+                    self.driver.switch_to.window(handle)
+                    current_url = self.driver.current_url
+                    ready = self.driver.execute_script("return document.readyState") == 'complete'
+                except Exception as e:
+                    self.logger.warning(f"Вкладка {tab['key']} недоступна: {e}")
+                    results[tab['key']] = self._result(tab, tab['last_url'], 'error')
+                    self.tabs.pop(handle)
+                    continue
+
+                settled = ready and current_url == tab['last_url'] and (current_url or '') not in BLANK_URLS
+                tab['last_url'] = current_url
+                if settled or timed_out:
+                    results[tab['key']] = self._result(tab, current_url, 'complete' if settled else 'timeout')
+                    self._close(handle)
+
+            if self.tabs:
+                self._restore_original()
+                time.sleep(self.poll_interval)
+
+        self._restore_original()
+        return results
+
+    @staticmethod
+    def _result(tab, current_url, load_state):
+        return {
+            'current_url': current_url,
+            'load_state': load_state,
+            'method': tab['method'],
+            'elapsed': round(time.monotonic() - tab['opened_at'], 2)
+        }
+
+    def _close(self, handle):
+        self.tabs.pop(handle, None)
+        try:
+            self.driver.close()
+        except Exception as e:
+            self.logger.warning(f"Ошибка закрытия вкладки: {e}")
+
+    def close_all(self):
+        """Закрытие оставшихся вкладок и возврат в исходное окно"""
+        for handle in list(self.tabs):
+            try:
+                self.driver.switch_to.window(handle)
+            except Exception:
+                self.tabs.pop(handle, None)
+                continue
+            self._close(handle)
+        self._restore_original()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close_all()
@@ -1,7 +1,19 @@
-from .page_loader import PageLoader
-from .html_analyzer import HTMLAnalyzer
+import importlib
+
+_LAZY_EXPORTS = {
+    'PageLoader': '.page_loader',
+    'HTMLAnalyzer': '.html_analyzer'
+}
 
 __all__ = [
     'PageLoader',
     'HTMLAnalyzer'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -1,23 +1,23 @@
 import logging
 import time
 import pickle
-import random
 from urllib.parse import urlparse
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
-from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from core.error_handler import ErrorHandler
+from core.error_handler import ErrorHandler, DriverCrashedError
 from utils.url_validator import URLValidator
 from config.settings import Settings
+from core.pacing_scheduler import PacingScheduler
 
 class PageLoader:
     """Класс для загрузки и управления веб-страницами с обработкой ошибок"""
-    def __init__(self, driver: WebDriver, config: Settings):
+    def __init__(self, driver: WebDriver, config: Settings, pacing: PacingScheduler = None):
         self.driver = driver
         self.config = config
+        self.pacing = pacing or PacingScheduler(config)
         self.logger = logging.getLogger(__name__)
         self.validator = URLValidator()
         self.wait = WebDriverWait(driver, self.config.PAGE_LOAD_TIMEOUT)
@@ -50,12 +50,17 @@ class PageLoader:
                     return False
                     
             except WebDriverException as e:
+                if ErrorHandler.is_fatal_driver_error(e):
+                    # Повторы на мёртвом сеансе бессмысленны — драйвер заменит супервизор
+                    raise DriverCrashedError(f"Сеанс потерян при загрузке {url}: {str(e)}") from e
                 error_type = ErrorHandler.handle_driver_error(e)
                 self.logger.warning(f"Ошибка веб-драйвера ({error_type}) загрузка {url}: {str(e)}")
                 if attempt == retries - 1:
                     return False
                     
             except Exception as e:
+                if ErrorHandler.is_fatal_driver_error(e):
+                    raise DriverCrashedError(f"chromedriver не отвечает при загрузке {url}: {str(e)}") from e
                 self.logger.error(f"Неожиданная ошибка загрузки {url}: {str(e)}")
                 if attempt == retries - 1:
                     return False
@@ -175,4 +180,4 @@ class PageLoader:
 
         self.driver.refresh()
 
-        ActionChains.pause(random.uniform(2.2, 2.8))
+        self.pacing.delay('after_refresh')
@@ -1,13 +1,31 @@
-from .report_generator import ReportGenerator
-from .statistics import StatisticsCalculator
-from .exporters.csv_exporter import CSVExporter
-from .exporters.json_exporter import JSONExporter
-from .exporters.pdf_exporter import PDFExporter
+import importlib
+
+_LAZY_EXPORTS = {
+    'ReportGenerator': '.report_generator',
+    'StatisticsCalculator': '.statistics',
+    'CSVExporter': '.exporters.csv_exporter',
+    'JSONExporter': '.exporters.json_exporter',
+    'PDFExporter': '.exporters.pdf_exporter',
+    'ReportWorker': '.report_worker',
+    'URLAnalytics': '.url_analytics',
+    'DashboardBuilder': '.dashboard'
+}
 
 __all__ = [
     'ReportGenerator',
     'StatisticsCalculator',
     'JSONExporter',
     'CSVExporter',
-    'PDFExporter'
-]
\ No newline at end of file
+    'PDFExporter',
+    'ReportWorker',
+    'URLAnalytics',
+    'DashboardBuilder'
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,338 @@
+import json
+import logging
+import os
+import time
+from collections import Counter
+from pathlib import Path
+from config.settings import Settings
+from utils.file_utils import read_jsonl
+
+# Колонки строк в чанках: строки хранятся массивами, имена — один раз в пакете данных
+DOMAIN_COLUMNS = ['domain', 'url', 'ads', 'networks', 'avg_confidence', 'interactions', 'scanned_at',
+                  'screenshot', 'overlay']
+AD_COLUMNS = ['domain', 'id', 'network', 'type', 'confidence', 'method', 'creative_id', 'thumbnail']
+
+DASHBOARD_HTML = """<!DOCTYPE html>
+<html lang="ru">
+<head>
+<meta charset="utf-8">
+<title>Ad Parser dashboard</title>
+<style>
+body { margin: 0; font: 13px Arial, sans-serif; color: #222; background: #f5f6f8; }
+header { padding: 14px 20px; background: #1f2933; color: #fff; }
+header h1 { margin: 0 0 6px; font-size: 18px; }
+main { padding: 16px 20px; }
+section { margin-bottom: 20px; padding: 12px; background: #fff; border-radius: 4px; }
+h2 { margin: 0 0 10px; font-size: 15px; }
+table { width: 100%; border-collapse: collapse; }
+th, td { padding: 4px 6px; border-bottom: 1px solid #e4e7eb; text-align: left; vertical-align: middle; }
+th { background: #f0f2f5; }
+td.num { text-align: right; }
+td img { max-width: 96px; max-height: 72px; display: block; }
+a.domain { cursor: pointer; color: #0b61a4; }
+.bar { height: 12px; background: #3e7bd6; display: inline-block; vertical-align: middle; }
+#filters input, #filters select { margin-right: 10px; padding: 3px; }
+.pager { margin-top: 8px; }
+.pager button { margin-right: 6px; }
+.muted { color: #7b8794; }
+</style>
+</head>
+<body>
+<header><h1>Ad Parser dashboard</h1><div id="summary" class="muted"></div></header>
+<main>
+<section id="filters">
+  <input id="f-text" placeholder="домен, сеть, креатив">
+  <select id="f-network"><option value="">все сети</option></select>
+  <label>уверенность от <input id="f-confidence" type="number" min="0" max="1" step="0.1" value="0" style="width:60px"></label>
+</section>
+<section><h2>Сети</h2><table id="networks"></table></section>
+<section><h2>Домены</h2><table id="domains"></table><div class="pager" id="domains-pager"></div></section>
+<section><h2>Объявления</h2><table id="ads"></table><div class="pager" id="ads-pager"></div></section>
+</main>
+<script>
+var bundle = null, chunks = {}, waiting = {};
+function dashboardBundle(data) { bundle = data; start(); }
+function dashboardChunk(kind, index, rows) {
+  chunks[kind + index] = rows;
+  (waiting[kind + index] || []).forEach(function (done) { done(rows); });
+  delete waiting[kind + index];
+}
+function loadChunk(kind, index, done) {
+  var key = kind + index;
+  if (chunks[key]) { return done(chunks[key]); }
+  if (!waiting[key]) {
+    waiting[key] = [];
+    var script = document.createElement('script');
+    script.src = 'data/' + bundle.chunks[kind][index].file;
+    document.body.appendChild(script);
+  }
+  waiting[key].push(done);
+}
+function esc(value) {
+  return String(value == null ? '' : value).replace(/[&<>"]/g, function (c) {
+    return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c];
+  });
+}
+function filters() {
+  return {
+    text: document.getElementById('f-text').value.trim().toLowerCase(),
+    network: document.getElementById('f-network').value,
+    confidence: parseFloat(document.getElementById('f-confidence').value) || 0
+  };
+}
+function matches(kind, row, f) {
+  var c = bundle.columns[kind];
+  if (kind === 'ads') {
+    if (f.network && row[c.indexOf('network')] !== f.network) { return false; }
+    if (row[c.indexOf('confidence')] < f.confidence) { return false; }
+  } else if (f.network && !(f.network in row[c.indexOf('networks')])) {
+    return false;
+  }
+  if (!f.text) { return true; }
+  return row.some(function (value) { return typeof value === 'string' && value.toLowerCase().indexOf(f.text) >= 0; });
+}
+// Постраничный просмотр с фильтром: чанки подгружаются по одному, пока страница не заполнится
+function View(kind, render) {
+  this.kind = kind; this.render = render; this.page = 0; this.token = 0;
+}
+View.prototype.show = function (page) {
+  var view = this, f = filters(), size = bundle.page_size, need = (page + 1) * size, found = [];
+  var token = ++this.token, index = 0, total = bundle.chunks[this.kind].length;
+  this.page = page;
+  (function next() {
+    if (token !== view.token) { return; }
+    if (found.length > need || index >= total) {
+      view.render(found.slice(page * size, need));
+      view.pager(page > 0, found.length > need || index < total);
+      return;
+    }
+    loadChunk(view.kind, index++, function (rows) {
+      rows.forEach(function (row) { if (matches(view.kind, row, f)) { found.push(row); } });
+      setTimeout(next, 0);
+    });
+  })();
+};
+View.prototype.pager = function (hasPrevious, hasNext) {
+  var view = this, pager = document.getElementById(this.kind + '-pager');
+  pager.innerHTML = '<button ' + (hasPrevious ? '' : 'disabled') + '>&larr;</button>' +
+    '<span class="muted">страница ' + (this.page + 1) + '</span> ' +
+    '<button ' + (hasNext ? '' : 'disabled') + '>&rarr;</button>';
+  pager.children[0].onclick = function () { view.show(view.page - 1); };
+  pager.children[2].onclick = function () { view.show(view.page + 1); };
+};
+function renderDomains(rows) {
+  var c = bundle.columns.domains;
+  document.getElementById('domains').innerHTML = '<tr><th>Домен</th><th>Объявлений</th><th>Сети</th>' +
+    '<th>Уверенность</th><th>Взаимодействий</th><th>Скриншот</th></tr>' + rows.map(function (row) {
+      var networks = Object.keys(row[c.indexOf('networks')]).map(function (name) {
+        return esc(name) + ': ' + row[c.indexOf('networks')][name];
+      }).join(', ');
+      var shot = row[c.indexOf('overlay')] || row[c.indexOf('screenshot')];
+      return '<tr><td><a class="domain" data-domain="' + esc(row[0]) + '">' + esc(row[0]) + '</a></td>' +
+        '<td class="num">' + row[c.indexOf('ads')] + '</td><td>' + networks + '</td>' +
+        '<td class="num">' + row[c.indexOf('avg_confidence')].toFixed(2) + '</td>' +
+        '<td class="num">' + row[c.indexOf('interactions')] + '</td>' +
+        '<td>' + (shot ? '<a href="' + esc(shot) + '" target="_blank">открыть</a>' : '') + '</td></tr>';
+    }).join('');
+  Array.prototype.forEach.call(document.querySelectorAll('a.domain'), function (link) {
+    link.onclick = function () { document.getElementById('f-text').value = link.dataset.domain; refresh(); };
+  });
+}
+function renderAds(rows) {
+  var c = bundle.columns.ads;
+  document.getElementById('ads').innerHTML = '<tr><th></th><th>Домен</th><th>#</th><th>Сеть</th><th>Тип</th>' +
+    '<th>Уверенность</th><th>Метод</th><th>Креатив</th></tr>' + rows.map(function (row) {
+      var thumb = row[c.indexOf('thumbnail')];
+      return '<tr><td>' + (thumb ? '<img loading="lazy" src="' + esc(thumb) + '" alt="">' : '') + '</td>' +
+        '<td>' + esc(row[c.indexOf('domain')]) + '</td><td>' + esc(row[c.indexOf('id')]) + '</td>' +
+        '<td>' + esc(row[c.indexOf('network')]) + '</td><td>' + esc(row[c.indexOf('type')]) + '</td>' +
+        '<td class="num">' + row[c.indexOf('confidence')].toFixed(2) + '</td>' +
+        '<td>' + esc(row[c.indexOf('method')]) + '</td><td>' + esc(row[c.indexOf('creative_id')]) + '</td></tr>';
+    }).join('');
+}
+var domainsView, adsView;
+function refresh() { domainsView.show(0); adsView.show(0); }
+function start() {
+  var s = bundle.summary, max = 0;
+  document.getElementById('summary').textContent = s.scans + ' сканирований, ' + s.ads + ' объявлений, ' +
+    s.interactions + ' взаимодействий; создан ' + bundle.generated_at;
+  var networks = Object.keys(bundle.networks).sort(function (a, b) { return bundle.networks[b] - bundle.networks[a]; });
+  networks.forEach(function (name) { max = Math.max(max, bundle.networks[name]); });
+  document.getElementById('networks').innerHTML = networks.map(function (name) {
+    var count = bundle.networks[name];
+    return '<tr><td>' + esc(name) + '</td><td class="num">' + count + '</td><td style="width:60%">' +
+      '<span class="bar" style="width:' + (100 * count / max).toFixed(1) + '%"></span></td></tr>';
+  }).join('');
+  document.getElementById('f-network').innerHTML += networks.map(function (name) {
+    return '<option>' + esc(name) + '</option>';
+  }).join('');
+  domainsView = new View('domains', renderDomains);
+  adsView = new View('ads', renderAds);
+  var timer = null;
+  ['f-text', 'f-network', 'f-confidence'].forEach(function (id) {
+    document.getElementById(id).addEventListener('input', function () {
+      clearTimeout(timer); timer = setTimeout(refresh, 200);
+    });
+  });
+  refresh();
+}
+</script>
+<script src="data/bundle.js"></script>
+</body>
+</html>
+"""
+
+
+class _ChunkWriter:
+    """Строки одного вида по страницам page_size в data/<вид>_<номер>.js (JSONP)"""
+
+    def __init__(self, data_dir, kind, page_size):
+        self.data_dir = data_dir
+        self.kind = kind
+        self.page_size = page_size
+        self.rows = []
+        self.chunks = []
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.page_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        index = len(self.chunks)
+        name = f"{self.kind}_{index:04d}.js"
+        payload = json.dumps(self.rows, ensure_ascii=False, separators=(',', ':'))
+        (self.data_dir / name).write_text(f'dashboardChunk("{self.kind}",{index},{payload});\n', encoding='utf-8')
+        self.chunks.append({'file': name, 'rows': len(self.rows)})
+        self.rows = []
+
+
+class DashboardBuilder:
+    """
+    Статическая HTML-сводка пакета сканирований
+
+    Результаты читаются из scan_data.jsonl по одному; строки доменов и
+    объявлений сразу пишутся страницами (data/domains_NNNN.js,
+    data/ads_NNNN.js), в памяти остаются только итоги, распределение по
+    сетям и множество имён доменов (одно на домен, не на сканирование).
+    Пакет данных (bundle.json, для index.html — bundle.js) содержит
+    сводку, колонки и список страниц. Файлы данных подключаются как
+    JSONP, поэтому index.html открывается прямо с диска; страницы
+    подгружаются по мере просмотра и фильтрации, миниатюры креативов —
+    с loading="lazy".
+    """
+
+    def __init__(self, config: Settings, output_dir=None, page_size=None):
+        self.config = config
+        self.output_dir = Path(output_dir or config.DASHBOARD_DIR)
+        self.page_size = page_size or config.DASHBOARD_PAGE_SIZE
+        self.logger = logging.getLogger(__name__)
+
+    def build(self, scans):
+        """
+        Построение сводки
+
+        Args:
+            scans (iterable): Данные сканирований (можно генератор read_jsonl)
+
+        Returns:
+            str: Путь к index.html
+        """
+        data_dir = self.output_dir / "data"
+        data_dir.mkdir(parents=True, exist_ok=True)
+        for stale in data_dir.glob("*.js"):
+            stale.unlink()
+
+        domains = _ChunkWriter(data_dir, 'domains', self.page_size)
+        ads = _ChunkWriter(data_dir, 'ads', self.page_size)
+        networks = Counter()
+        summary = {'scans': 0, 'ads': 0, 'interactions': 0, 'domains': 0}
+        seen_domains = set()
+
+        for scan_data in scans:
+            domain_row, ad_rows = self._rows(scan_data)
+            domains.add(domain_row)
+            for row in ad_rows:
+                ads.add(row)
+                networks[row[2]] += 1
+            summary['scans'] += 1
+            summary['ads'] += len(ad_rows)
+            summary['interactions'] += domain_row[5]
+            seen_domains.add(domain_row[0])
+        domains.flush()
+        ads.flush()
+        summary['domains'] = len(seen_domains)
+
+        bundle = {
+            'generated_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+            'summary': summary,
+            'networks': dict(networks.most_common()),
+            'page_size': self.page_size,
+            'columns': {'domains': DOMAIN_COLUMNS, 'ads': AD_COLUMNS},
+            'chunks': {'domains': domains.chunks, 'ads': ads.chunks}
+        }
+        payload = json.dumps(bundle, ensure_ascii=False, separators=(',', ':'))
+        (self.output_dir / "bundle.json").write_text(payload, encoding='utf-8')
+        (data_dir / "bundle.js").write_text(f"dashboardBundle({payload});\n", encoding='utf-8')
+
+        index_path = self.output_dir / "index.html"
+        index_path.write_text(DASHBOARD_HTML, encoding='utf-8')
+        self.logger.info(
+            f"HTML-сводка: {summary['scans']} сканирований, {summary['ads']} объявлений, "
+            f"{len(domains.chunks) + len(ads.chunks)} страниц данных — {index_path}"
+        )
+        return str(index_path)
+
+    def build_from_file(self, path=None):
+        """Сводка по scan_data.jsonl, читаемому потоково"""
+        return self.build(read_jsonl(path or self.config.SCAN_DATA_PATH))
+
+    def _rows(self, scan_data):
+        """Строка домена и строки объявлений одного сканирования"""
+        domain = scan_data.get('main_domain') or 'unknown'
+        detected_ads = scan_data.get('detected_ads', [])
+        ad_summary = scan_data.get('ad_summary') or {}
+        networks = ad_summary.get('networks') or dict(Counter(ad.get('network', 'unknown') for ad in detected_ads))
+        confidences = [ad.get('confidence') or 0 for ad in detected_ads]
+
+        domain_row = [
+            domain,
+            scan_data.get('url') or '',
+            len(detected_ads),
+            networks,
+            round(sum(confidences) / len(confidences), 3) if confidences else 0,
+            len(scan_data.get('interaction_results', [])),
+            scan_data.get('scan_timestamp'),
+            self._link(scan_data.get('full_page_screenshot')),
+            self._link(self._overlay_viewer(scan_data.get('annotation_overlay')))
+        ]
+        ad_rows = [[
+            domain,
+            ad.get('id'),
+            ad.get('network', 'unknown'),
+            ad.get('type', 'unknown'),
+            round(ad.get('confidence') or 0, 3),
+            ad.get('detection_method', 'unknown'),
+            ad.get('creative_id') or '',
+            self._link(ad.get('screenshot_path'))
+        ] for ad in detected_ads]
+        return domain_row, ad_rows
+
+    @staticmethod
+    def _overlay_viewer(overlay_path):
+        """HTML-просмотрщик разметки, если он был сохранён рядом с JSON"""
+        if not overlay_path:
+            return None
+        viewer = Path(overlay_path).with_suffix('.html')
+        return str(viewer) if viewer.exists() else None
+
+    def _link(self, path):
+        """Путь к файлу относительно index.html"""
+        if not path:
+            return None
+        try:
+            return Path(os.path.relpath(Path(path).resolve(), self.output_dir.resolve())).as_posix()
+        except ValueError:
+            return Path(path).resolve().as_uri()
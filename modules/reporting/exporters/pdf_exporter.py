@@ -1,89 +1,277 @@
 import logging
 from pathlib import Path
-from typing import Dict, Any
-from datetime import datetime
+from typing import Dict, Any, List
+from modules.reporting.exporters.pdf_writer import PDFWriter, pdf_text, text_width
+
+MARGIN = 40
+LINE = 14
+
+
+class _PageFlow:
+    """Вёрстка сверху вниз с переносом на новую страницу; готовая страница сразу пишется в файл"""
+
+    def __init__(self, writer: PDFWriter):
+        self.writer = writer
+        self.canvas = None
+        self.y = 0
+        self.new_page()
+
+    @property
+    def width(self):
+        return self.canvas.width - MARGIN * 2
+
+    def new_page(self):
+        if self.canvas is not None and self.canvas.ops:
+            self.writer.add_page(self.canvas)
+        self.canvas = self.writer.new_page()
+        self.y = MARGIN
+
+    def ensure(self, height):
+        if self.y + height > self.canvas.height - MARGIN:
+            self.new_page()
+
+    def heading(self, text, size=14):
+        self.ensure(size + LINE)
+        self.y += size + 4
+        self.canvas.text(MARGIN, self.y, text, size=size, bold=True)
+        self.y += 6
+
+    def line(self, text, size=10, indent=0, bold=False, color=(0, 0, 0)):
+        """Строка с переносом по ширине страницы"""
+        max_chars = max(int((self.width - indent) / text_width('x', size)), 10)
+        text = pdf_text(text)
+        while text:
+            self.ensure(LINE)
+            self.y += LINE
+            self.canvas.text(MARGIN + indent, self.y, text[:max_chars], size=size, bold=bold, color=color)
+            text = text[max_chars:]
+
+    def finish(self):
+        if self.canvas.ops:
+            self.writer.add_page(self.canvas)
+        self.canvas = None
+
 
 class PDFExporter:
-    """Класс для экспорта отчетов в PDF формате (базовая реализация)"""
-    
+    """
+    Класс для экспорта отчетов в PDF формате
+
+    Страницы верстаются по одной и сразу записываются PDFWriter, поэтому
+    пакетный отчёт на сотни сканирований строится в ограниченной памяти.
+    Миниатюры снимков объявлений и страниц уменьшаются при чтении; один
+    креатив встраивается в файл один раз.
+    """
+
     def __init__(self, config):
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.reports_dir = config.OUTPUT_DIR / "reports"
-    
+        self.thumbnail_size = tuple(getattr(config, 'PDF_THUMBNAIL_SIZE', (96, 72)))
+
     def export_report(self, report_data: Dict[str, Any], filename: str) -> str:
         """
         Экспорт отчета в PDF формате
-        
+
         Args:
             report_data (dict): Данные отчета
             filename (str): Имя файла
-            
+
         Returns:
             str: Путь к сохраненному файлу
         """
         try:
-            # В реальной реализации здесь будет код для генерации PDF
-            # С использованием библиотек типа reportlab или weasyprint
-            
             file_path = self.reports_dir / filename
-            
-            # Заглушка для реализации PDF экспорта
-            self.logger.warning("PDF export is not fully implemented yet")
-            
-            # Создание простого текстового файла как временное решение
-            text_content = self._generate_text_content(report_data)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(text_content)
-            
-            self.logger.info(f"PDF report (text placeholder) exported: {file_path}")
+
+            with PDFWriter(file_path) as writer:
+                flow = _PageFlow(writer)
+                self._write_scan(flow, report_data, {})
+                flow.finish()
+
+            self.logger.info(f"PDF report exported: {file_path} ({writer.page_count} pages)")
             return str(file_path)
-            
+
         except Exception as e:
             self.logger.error(f"Error exporting PDF report: {str(e)}")
             return ""
-    
-    def _generate_text_content(self, report_data: Dict[str, Any]) -> str:
-        """Генерация текстового содержимого для PDF (временное решение)"""
-        content = []
-        
-        # Заголовок
-        content.append("AD DETECTION REPORT")
-        content.append("=" * 50)
-        content.append("")
-        
-        # Метаданные
-        metadata = report_data.get('metadata', {})
-        content.append(f"Generated: {metadata.get('generated_at', 'N/A')}")
-        content.append(f"Tool: {metadata.get('tool_name', 'N/A')}")
-        content.append("")
-        
-        # Сводка сканирования
+
+    def export_batch_report(self, batch_data: Dict[str, Any], filename: str) -> str:
+        """
+        Экспорт batch отчета в PDF формате: сводка и раздел на каждое сканирование
+
+        Args:
+            batch_data (dict): Данные batch отчета
+            filename (str): Имя файла
+
+        Returns:
+            str: Путь к сохраненному файлу
+        """
+        try:
+            file_path = self.reports_dir / filename
+
+            with PDFWriter(file_path) as writer:
+                flow = _PageFlow(writer)
+                self._write_batch_summary(flow, batch_data)
+
+                # Миниатюры общие для всего файла: повторный креатив не встраивается заново
+                thumbnails = {}
+                for report_data in batch_data.get('individual_reports', []):
+                    flow.new_page()
+                    self._write_scan(flow, report_data, thumbnails)
+                flow.finish()
+
+            self.logger.info(f"PDF batch report exported: {file_path} ({writer.page_count} pages)")
+            return str(file_path)
+
+        except Exception as e:
+            self.logger.error(f"Error exporting PDF batch report: {str(e)}")
+            return ""
+
+    def _write_batch_summary(self, flow: _PageFlow, batch_data: Dict[str, Any]):
+        """Сводка batch отчета и сравнение сканирований"""
+        flow.heading("BATCH AD DETECTION REPORT", size=18)
+        flow.line(f"Generated: {batch_data.get('metadata', {}).get('generated_at', 'N/A')}")
+
+        batch_summary = batch_data.get('batch_summary', {})
+        flow.line(f"Scans: {batch_summary.get('total_scans', 0)}")
+        flow.line(f"URLs Processed: {batch_summary.get('total_urls_processed', 0)}")
+        flow.line(f"Ads Detected: {batch_summary.get('total_ads_detected', 0)}")
+        flow.line(f"Interactions: {batch_summary.get('total_interactions', 0)}")
+        flow.line(f"Average Ads per URL: {batch_summary.get('average_ads_per_url', 0):.2f}")
+
+        comparison = batch_data.get('comparative_analysis', {}).get('scan_comparison', [])
+        if comparison:
+            flow.heading("SCAN COMPARISON", size=12)
+            self._table_row(flow, ["Domain", "Ads", "Networks", "Avg Confidence"], [220, 80, 80, 100], bold=True)
+            for scan in comparison:
+                self._table_row(flow, [
+                    scan.get('domain', 'unknown'),
+                    scan.get('total_ads', 0),
+                    scan.get('networks_found', 0),
+                    f"{scan.get('avg_confidence', 0):.2f}"
+                ], [220, 80, 80, 100])
+
+    def _write_scan(self, flow: _PageFlow, report_data: Dict[str, Any], thumbnails: Dict[str, Any]):
+        """Раздел одного сканирования"""
         scan_summary = report_data.get('scan_summary', {})
-        content.append("SCAN SUMMARY:")
-        content.append(f"- URLs Processed: {scan_summary.get('total_urls_processed', 0)}")
-        content.append(f"- Ads Detected: {scan_summary.get('total_ads_detected', 0)}")
-        content.append(f"- Successful Interactions: {scan_summary.get('successful_interactions', 0)}")
-        content.append("")
-        
-        # Статистика рекламы
+        flow.heading(f"AD DETECTION REPORT: {scan_summary.get('main_domain', 'N/A')}", size=16)
+
+        top = flow.y
+        full_page = self._thumbnail(flow.writer, (report_data.get('screenshots') or {}).get('full_page'),
+                                    (160, 120), thumbnails)
+        if full_page:
+            flow.canvas.image(full_page['name'], flow.canvas.width - MARGIN - full_page['width'], top + 4,
+                              full_page['width'], full_page['height'])
+
+        metadata = report_data.get('metadata', {})
+        flow.line(f"Generated: {metadata.get('generated_at', 'N/A')}")
+        flow.line(f"Tool: {metadata.get('tool_name', 'N/A')}")
+        flow.line(f"URLs Processed: {scan_summary.get('total_urls_processed', 0)}")
+        flow.line(f"Ads Detected: {scan_summary.get('total_ads_detected', 0)}")
+        flow.line(f"Successful Interactions: {scan_summary.get('successful_interactions', 0)}")
+        if full_page:
+            flow.y = max(flow.y, top + full_page['height'] + 8)
+
         ads_data = report_data.get('ads_detection', {})
-        content.append("ADS STATISTICS:")
-        content.append(f"- Total Ads: {ads_data.get('total_ads', 0)}")
-        
         networks = ads_data.get('networks_distribution', {})
         if networks:
-            content.append("- Networks Distribution:")
+            flow.heading("NETWORKS", size=12)
             for network, count in networks.items():
-                content.append(f"  * {network}: {count}")
-        
-        content.append("")
-        
-        # Рекомендации
+                flow.line(f"{network}: {count}", indent=10)
+
+        ads = ads_data.get('ads', [])
+        if ads:
+            flow.heading("DETECTED ADS", size=12)
+            # Колонка миниатюры фиксирована, остальные делят оставшуюся ширину страницы
+            widths = self._fit_widths([self.thumbnail_size[0] + 8, 30, 110, 80, 70, 90, 110], flow.width, fixed=1)
+            self._table_row(flow, ["", "#", "Network", "Type", "Confidence", "Method", "Creative"], widths, bold=True)
+            for ad in ads:
+                thumbnail = self._thumbnail(flow.writer, ad.get('screenshot_path'), self.thumbnail_size, thumbnails)
+                self._table_row(flow, [
+                    "",
+                    ad.get('id', 'N/A'),
+                    ad.get('network', 'unknown'),
+                    ad.get('type', 'unknown'),
+                    f"{ad.get('confidence', 0):.2f}",
+                    ad.get('detection_method', 'unknown'),
+                    (ad.get('creative_id') or '')[:16]
+                ], widths, thumbnail=thumbnail)
+
         recommendations = report_data.get('recommendations', [])
         if recommendations:
-            content.append("RECOMMENDATIONS:")
+            flow.heading("RECOMMENDATIONS", size=12)
             for rec in recommendations:
-                content.append(f"- [{rec.get('priority', 'medium').upper()}] {rec.get('message', '')}")
-        
-        return "\n".join(content)
\ No newline at end of file
+                flow.line(f"[{rec.get('priority', 'medium').upper()}] {rec.get('message', '')}", indent=10)
+
+    @staticmethod
+    def _fit_widths(widths: List[float], total: float, fixed=0) -> List[float]:
+        """Пропорциональное сжатие колонок (кроме первых fixed), чтобы таблица уместилась в total"""
+        flexible = sum(widths[fixed:])
+        available = total - sum(widths[:fixed])
+        if flexible <= available:
+            return list(widths)
+        scale = max(available, 0) / flexible
+        return list(widths[:fixed]) + [width * scale for width in widths[fixed:]]
+
+    @staticmethod
+    def _table_row(flow: _PageFlow, cells: List[Any], widths: List[int], bold=False, thumbnail=None):
+        height = max(LINE + 4, thumbnail['height'] + 6 if thumbnail else 0)
+        flow.ensure(height)
+        x = MARGIN
+        for cell, width in zip(cells, widths):
+            max_chars = max(int((width - 4) / text_width('x', 9)), 1)
+            flow.canvas.text(x, flow.y + min(height, LINE + 4) - 5, pdf_text(cell)[:max_chars], size=9, bold=bold)
+            x += width
+        if thumbnail:
+            flow.canvas.image(thumbnail['name'], MARGIN, flow.y + 3, thumbnail['width'], thumbnail['height'])
+        flow.y += height
+        flow.canvas.line(MARGIN, flow.y, MARGIN + sum(widths), flow.y, color=(200, 200, 200))
+
+    def _thumbnail(self, writer: PDFWriter, path, size, thumbnails: Dict[str, Any]):
+        """Миниатюра снимка (встраивается один раз на файл) или None, если снимка нет"""
+        if not path:
+            return None
+        key = f"{path}:{size}"
+        if key not in thumbnails:
+            thumbnails[key] = None
+            try:
+                image = self._load_thumbnail(path, size)
+                if image is not None:
+                    thumbnails[key] = {'name': writer.add_image(image), 'width': image.width, 'height': image.height}
+            except Exception as e:
+                self.logger.debug(f"Thumbnail unavailable for {path}: {str(e)}")
+        return thumbnails[key]
+
+    def _load_thumbnail(self, path, size):
+        """
+        Уменьшенный снимок; для страницы из хранилища — её готовая
+        миниатюра, иначе у высокой страницы берётся верхняя часть,
+        прочитанная первой полосой без декодирования всей страницы
+        """
+        from PIL import Image
+        from modules.screenshot.storage import ScreenshotStorage
+        from modules.screenshot.tiling import image_strips
+
+        # Снимки хранилища записаны до постановки отчёта в очередь (main.wait_for_screenshots)
+        if not Path(path).exists():
+            return None
+
+        stored_thumbnail = ScreenshotStorage.thumbnail_path(path)
+        if stored_thumbnail.exists():
+            with Image.open(stored_thumbnail) as image:
+                image = image.convert('RGB')
+                image.thumbnail(size)
+                return image
+
+        with Image.open(path) as image:
+            width, height = image.size
+            aspect = size[1] / size[0]
+            if height > width * aspect * 2:
+                # Верх страницы в пропорциях миниатюры
+                for _, strip in image_strips(path, int(width * aspect)):
+                    image = strip
+                    break
+            else:
+                image.draft('RGB', size)
+                image = image.convert('RGB')
+            image.thumbnail(size)
+            return image
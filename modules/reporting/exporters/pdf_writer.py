@@ -0,0 +1,221 @@
+import io
+import os
+import re
+import zlib
+from pathlib import Path
+
+# A4 в пунктах
+PAGE_SIZE = (595, 842)
+
+# Стандартные шрифты PDF: встраивание не нужно, текст в WinAnsiEncoding
+FONTS = {'regular': ('F1', 'Helvetica'), 'bold': ('F2', 'Helvetica-Bold')}
+
+# Средняя ширина символа Helvetica в долях кегля (для переноса строк)
+CHAR_WIDTH = 0.52
+
+# Слово с символами вне Latin-1 — кандидат в хост IDN (домен.рф)
+IDN_HOST = re.compile(r"[^\s/\\()\[\]?#:@,;'\"<>]*[^\x00-\xff][^\s/\\()\[\]?#:@,;'\"<>]*")
+
+
+def _to_idna(match):
+    host = match.group(0)
+    if '.' not in host.strip('.'):
+        return host
+    try:
+        return host.encode('idna').decode('ascii')
+    except UnicodeError:
+        return host
+
+
+def pdf_text(text):
+    """Текст для стандартных шрифтов: хосты IDN записываются в punycode (xn--), а не '?'"""
+    return IDN_HOST.sub(_to_idna, str(text))
+
+
+def _escape(text):
+    """Строка PDF: хосты IDN — в punycode, остальные символы вне cp1252 заменяются на '?'"""
+    text = pdf_text(text).encode('cp1252', 'replace').decode('latin-1')
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)').replace('\r', ' ').replace('\n', ' ')
+
+
+def _color(rgb):
+    return " ".join(f"{channel / 255:.3f}" for channel in rgb)
+
+
+def text_width(text, size):
+    return len(str(text)) * size * CHAR_WIDTH
+
+
+class PDFCanvas:
+    """
+    Содержимое одной страницы
+
+    Координаты — от левого верхнего угла страницы (y вниз), в пунктах;
+    в операторы PDF они переводятся при записи.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.ops = []
+        self.images = set()
+
+    def text(self, x, y, text, size=10, bold=False, color=(0, 0, 0)):
+        """Строка текста; y — базовая линия"""
+        font = FONTS['bold' if bold else 'regular'][0]
+        self.ops.append(
+            f"BT {_color(color)} rg /{font} {size} Tf {x:.2f} {self.height - y:.2f} Td ({_escape(text)}) Tj ET"
+        )
+
+    def rect(self, x, y, width, height, fill=None, stroke=None, line_width=0.5):
+        if fill is None and stroke is None:
+            return
+        parts = ["q"]
+        if fill is not None:
+            parts.append(f"{_color(fill)} rg")
+        if stroke is not None:
+            parts.append(f"{_color(stroke)} RG {line_width} w")
+        operator = 'B' if fill is not None and stroke is not None else 'f' if fill is not None else 'S'
+        parts.append(f"{x:.2f} {self.height - y - height:.2f} {width:.2f} {height:.2f} re {operator} Q")
+        self.ops.append(" ".join(parts))
+
+    def line(self, x1, y1, x2, y2, color=(0, 0, 0), line_width=0.5):
+        self.ops.append(
+            f"q {_color(color)} RG {line_width} w {x1:.2f} {self.height - y1:.2f} m {x2:.2f} {self.height - y2:.2f} l S Q"
+        )
+
+    def image(self, name, x, y, width, height):
+        """Изображение, добавленное через PDFWriter.add_image"""
+        self.images.add(name)
+        self.ops.append(f"q {width:.2f} 0 0 {height:.2f} {x:.2f} {self.height - y - height:.2f} cm /{name} Do Q")
+
+    def content(self):
+        return "\n".join(self.ops).encode('latin-1')
+
+
+class PDFWriter:
+    """
+    Потоковая запись PDF
+
+    Объекты (шрифты, изображения, страницы) пишутся в файл сразу; в памяти
+    остаются только смещения объектов для таблицы xref и номера страниц.
+    Дерево страниц и каталог записываются в close(). Файл пишется во
+    временный и переименовывается после завершения.
+    """
+
+    def __init__(self, path, page_size=PAGE_SIZE, compress=True):
+        self.path = Path(path)
+        self.page_size = page_size
+        self.compress = compress
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._temporary = self.path.with_name(self.path.name + '.tmp')
+        self._file = open(self._temporary, 'wb')
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._offsets = {}
+        self._next_id = 3  # 1 — каталог, 2 — дерево страниц
+        self._pages = []
+        self._images = 0
+        self._fonts = {}
+        for name, base_font in FONTS.values():
+            self._fonts[name] = self._add_object(
+                f"<< /Type /Font /Subtype /Type1 /BaseFont /{base_font} /Encoding /WinAnsiEncoding >>".encode()
+            )
+        self._image_ids = {}
+
+    @property
+    def page_count(self):
+        return len(self._pages)
+
+    def _reserve(self):
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _write_object(self, obj_id, body, stream=None):
+        self._offsets[obj_id] = self._file.tell()
+        self._file.write(f"{obj_id} 0 obj\n".encode())
+        self._file.write(body)
+        if stream is not None:
+            self._file.write(b"\nstream\n")
+            self._file.write(stream)
+            self._file.write(b"\nendstream")
+        self._file.write(b"\nendobj\n")
+
+    def _add_object(self, body, stream=None):
+        obj_id = self._reserve()
+        self._write_object(obj_id, body, stream)
+        return obj_id
+
+    def add_image(self, image, quality=75):
+        """
+        Встраивание изображения (JPEG, DCTDecode)
+
+        Returns:
+            str: Имя XObject для PDFCanvas.image
+        """
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=quality)
+        data = buffer.getvalue()
+        self._images += 1
+        name = f"Im{self._images}"
+        self._image_ids[name] = self._add_object(
+            f"<< /Type /XObject /Subtype /Image /Width {image.width} /Height {image.height} "
+            f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode /Length {len(data)} >>".encode(),
+            data
+        )
+        return name
+
+    def new_page(self):
+        return PDFCanvas(*self.page_size)
+
+    def add_page(self, canvas):
+        """Запись страницы; холст после этого больше не нужен"""
+        content = canvas.content()
+        if self.compress:
+            content = zlib.compress(content, 6)
+            content_id = self._add_object(f"<< /Length {len(content)} /Filter /FlateDecode >>".encode(), content)
+        else:
+            content_id = self._add_object(f"<< /Length {len(content)} >>".encode(), content)
+
+        fonts = " ".join(f"/{name} {obj_id} 0 R" for name, obj_id in self._fonts.items())
+        images = " ".join(f"/{name} {self._image_ids[name]} 0 R" for name in sorted(canvas.images))
+        resources = f"/Font << {fonts} >>" + (f" /XObject << {images} >>" if images else "")
+        self._pages.append(self._add_object(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {canvas.width} {canvas.height}] "
+            f"/Resources << {resources} >> /Contents {content_id} 0 R >>".encode()
+        ))
+
+    def close(self):
+        if self._file.closed:
+            return
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._pages)
+        self._write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._pages)} >>".encode())
+        self._write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        info_id = self._add_object(b"<< /Producer (Ad Parser) >>")
+
+        xref_offset = self._file.tell()
+        self._file.write(f"xref\n0 {self._next_id}\n".encode())
+        self._file.write(b"0000000000 65535 f \n")
+        for obj_id in range(1, self._next_id):
+            self._file.write(f"{self._offsets[obj_id]:010d} 00000 n \n".encode())
+        self._file.write(
+            f"trailer\n<< /Size {self._next_id} /Root 1 0 R /Info {info_id} 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n".encode()
+        )
+        self._file.close()
+        os.replace(self._temporary, self.path)
+
+    def abort(self):
+        self._file.close()
+        self._temporary.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
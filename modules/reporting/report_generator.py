@@ -2,6 +2,7 @@ import logging
 import json
 import csv
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any
@@ -13,7 +14,7 @@ from modules.reporting.statistics import StatisticsCalculator
 
 class ReportGenerator:
     """Основной класс для генерации комплексных отчетов о рекламе"""
-    def __init__(self, config: Settings):
+    def __init__(self, config: Settings, reports_dir=None):
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.statistics_calculator = StatisticsCalculator()
@@ -21,36 +22,41 @@ class ReportGenerator:
         self.csv_exporter = CSVExporter(config)
         self.pdf_exporter = PDFExporter(config)
         
-        self.reports_dir = config.OUTPUT_DIR / "reports"
-        self.reports_dir.mkdir(exist_ok=True)
+        self.reports_dir = Path(reports_dir) if reports_dir else config.OUTPUT_DIR / "reports"
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        for exporter in (self.json_exporter, self.csv_exporter, self.pdf_exporter):
+            exporter.reports_dir = self.reports_dir
+
+        # Подготовленные данные отчётов: пакетный отчёт их только агрегирует
+        self._prepared_reports = {}
     
-    def generate_comprehensive_report(self, scan_data: Dict[str, Any]) -> Dict[str, str]:
-        """Генерация комплексного отчета по всем данным сканирования"""
+    def generate_comprehensive_report(self, scan_data: Dict[str, Any], report_data: Dict[str, Any] = None) -> Dict[str, str]:
+        """
+        Генерация комплексного отчета по всем данным сканирования
+
+        Args:
+            scan_data (dict): Данные сканирования
+            report_data (dict): Уже подготовленные данные отчёта (из рабочего процесса)
+        """
         try:
             self.logger.info("Начало формирования комплексного отчета")
             
-            report_data = self._prepare_report_data(scan_data)
+            if report_data is None:
+                report_data = self.prepare_report(scan_data)
+            else:
+                self._prepared_reports[self._scan_key(scan_data)] = report_data
             
+            # Домен в имени: отчёты нескольких сканирований пишутся в одну секунду
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            report_base_name = f"ad_report_{timestamp}"
+            domain = "".join(c for c in str(scan_data.get('main_domain') or 'scan') if c.isalnum() or c in '.-')
+            report_base_name = f"ad_report_{domain}_{timestamp}"
             
-            report_paths = {}
-            
-            json_report_path = self.json_exporter.export_report(
-                report_data, f"{report_base_name}.json"
-            )
-            report_paths['json'] = json_report_path
-            
-            csv_report_path = self.csv_exporter.export_report(
-                report_data, f"{report_base_name}.csv"
-            )
-            report_paths['csv'] = csv_report_path
-            
-            # PDF отчет
-            # pdf_report_path = self.pdf_exporter.export_report(
-            #     report_data, f"{report_base_name}.pdf"
-            # )
-            # report_paths['pdf'] = pdf_report_path
+            report_paths = self._run_exporters({
+                # Копия: экспортёр дописывает export_metadata, а данные ещё нужны пакетному отчёту
+                'json': lambda: self.json_exporter.export_report(dict(report_data), f"{report_base_name}.json"),
+                'csv': lambda: self.csv_exporter.export_report(report_data, f"{report_base_name}.csv"),
+                'pdf': lambda: self.pdf_exporter.export_report(report_data, f"{report_base_name}.pdf")
+            })
             
             # # Сводный отчет
             # summary_report_path = self._generate_summary_report(report_data, report_base_name)
@@ -63,6 +69,30 @@ class ReportGenerator:
             self.logger.error(f"Error generating comprehensive report: {str(e)}")
             return {'error': str(e)}
     
+    def _run_exporters(self, exports: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Экспорт в форматы REPORT_FORMATS параллельно в потоках
+
+        PDF (сжатие страниц и миниатюр) идёт одновременно с JSON и CSV.
+        """
+        exports = {fmt: export for fmt, export in exports.items() if fmt in self.config.REPORT_FORMATS}
+        if len(exports) < 2:
+            return {fmt: export() for fmt, export in exports.items()}
+        with ThreadPoolExecutor(max_workers=len(exports), thread_name_prefix="report-export") as executor:
+            futures = {fmt: executor.submit(export) for fmt, export in exports.items()}
+            return {fmt: future.result() for fmt, future in futures.items()}
+
+    @staticmethod
+    def _scan_key(scan_data: Dict[str, Any]):
+        return (scan_data.get('url'), scan_data.get('scan_timestamp'))
+
+    def prepare_report(self, scan_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Подготовленные данные отчёта; вычисляются один раз на сканирование"""
+        key = self._scan_key(scan_data)
+        if key not in self._prepared_reports:
+            self._prepared_reports[key] = self._prepare_report_data(scan_data)
+        return self._prepared_reports[key]
+
     def _prepare_report_data(self, scan_data: Dict[str, Any]) -> Dict[str, Any]:
         """Подготовка и обогащение данных для отчета"""
         try:
@@ -73,11 +103,16 @@ class ReportGenerator:
 
                 # 'url_analysis': scan_data.get('url_analysis', {}),
 
-                'ads_detection': self._process_ads_data(scan_data.get('detected_ads', [])),
+                'ads_detection': self._process_ads_data(
+                    scan_data.get('detected_ads', []), self.statistics_calculator.get_ad_summary(scan_data)
+                ),
 
                 'interaction_results': self._process_interaction_data(scan_data.get('interaction_results', [])),
 
-                'screenshots': scan_data.get('screenshots', {}),
+                'screenshots': scan_data.get('screenshots') or {
+                    'full_page': scan_data.get('full_page_screenshot'),
+                    'annotation_overlay': scan_data.get('annotation_overlay')
+                },
 
                 'statistics': self.statistics_calculator.calculate_comprehensive_stats(scan_data),
 
@@ -115,7 +150,7 @@ class ReportGenerator:
             'main_domain': scan_data.get('main_domain', 'N/A')
         }
     
-    def _process_ads_data(self, ads_data: List[Dict]) -> Dict[str, Any]:
+    def _process_ads_data(self, ads_data: List[Dict], ad_summary: Dict[str, Any] = None) -> Dict[str, Any]:
         """Обработка данных о рекламных блоках"""
         if not ads_data:
             return {'total_ads': 0}
@@ -129,16 +164,20 @@ class ReportGenerator:
                 'confidence': ad.get('confidence', 0),
                 'detection_method': ad.get('detection_method', 'unknown'),
                 'element_info': ad.get('element_info', {}),
-                'screenshot_path': ad.get('screenshot_path', '')
+                'screenshot_path': ad.get('screenshot_path', ''),
+                'creative_id': ad.get('creative_id')
             }
             processed_ads.append(processed_ad)
         
+        if ad_summary is None:
+            ad_summary = self.statistics_calculator.calculate_ad_summary(ads_data)
+        
         return {
             'total_ads': len(processed_ads),
             'ads': processed_ads,
-            'networks_distribution': self.statistics_calculator.calculate_network_distribution(ads_data),
-            'types_distribution': self.statistics_calculator.calculate_type_distribution(ads_data),
-            'confidence_stats': self.statistics_calculator.calculate_confidence_stats(ads_data)
+            'networks_distribution': ad_summary['networks'],
+            'types_distribution': ad_summary['types'],
+            'confidence_stats': ad_summary['confidence_stats']
         }
     
     def _process_interaction_data(self, interaction_data: List[Dict]) -> Dict[str, Any]:
@@ -278,12 +317,15 @@ class ReportGenerator:
             self.logger.error(f"Error generating summary report: {str(e)}")
             return ""
     
-    def generate_batch_report(self, multiple_scan_data: List[Dict[str, Any]]) -> Dict[str, str]:
+    def generate_batch_report(self, multiple_scan_data: List[Dict[str, Any]],
+                              prepared_reports: List[Dict[str, Any]] = None) -> Dict[str, str]:
         """
         Генерация отчета по множественным сканированиям
         
         Args:
             multiple_scan_data (list): Данные множественных сканирований
+            prepared_reports (list): Подготовленные данные отчётов в том же порядке;
+                                     недостающие берутся из кэша или вычисляются
             
         Returns:
             dict: Пути к сгенерированным отчетам
@@ -299,27 +341,22 @@ class ReportGenerator:
             }
             
             # Обработка каждого отдельного сканирования
-            for scan_data in multiple_scan_data:
-                individual_report = self._prepare_report_data(scan_data)
+            for index, scan_data in enumerate(multiple_scan_data):
+                if prepared_reports and index < len(prepared_reports) and prepared_reports[index]:
+                    individual_report = prepared_reports[index]
+                else:
+                    individual_report = self.prepare_report(scan_data)
                 batch_report_data['individual_reports'].append(individual_report)
             
             # Генерация batch отчетов
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             batch_base_name = f"batch_report_{timestamp}"
             
-            batch_report_paths = {}
-            
-            # JSON batch отчет
-            json_batch_path = self.json_exporter.export_batch_report(
-                batch_report_data, f"{batch_base_name}.json"
-            )
-            batch_report_paths['json'] = json_batch_path
-            
-            # CSV batch отчет
-            csv_batch_path = self.csv_exporter.export_batch_report(
-                batch_report_data, f"{batch_base_name}.csv"
-            )
-            batch_report_paths['csv'] = csv_batch_path
+            batch_report_paths = self._run_exporters({
+                'json': lambda: self.json_exporter.export_batch_report(dict(batch_report_data), f"{batch_base_name}.json"),
+                'csv': lambda: self.csv_exporter.export_batch_report(batch_report_data, f"{batch_base_name}.csv"),
+                'pdf': lambda: self.pdf_exporter.export_batch_report(batch_report_data, f"{batch_base_name}.pdf")
+            })
             
             self.logger.info(f"Batch reports generated: {list(batch_report_paths.keys())}")
             return batch_report_paths
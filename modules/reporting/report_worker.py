@@ -0,0 +1,124 @@
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from config.settings import Settings
+from utils.file_utils import to_serializable
+
+# Генератор отчётов рабочего процесса (создаётся инициализатором пула)
+_generator = None
+
+
+def _init_worker(config, reports_dir):
+    global _generator
+    from modules.reporting.report_generator import ReportGenerator
+
+    _generator = ReportGenerator(config, reports_dir)
+
+
+def _build_report(scan_data):
+    """Подготовка данных и экспорт отчётов одного сканирования в рабочем процессе"""
+    report_data = _generator.prepare_report(scan_data)
+    report_paths = _generator.generate_comprehensive_report(scan_data, report_data)
+    return report_paths, report_data
+
+
+class ReportWorker:
+    """
+    Фоновое построение отчётов по мере завершения сканирований
+
+    Каждое сканирование отправляется в пул процессов сразу после
+    завершения, поэтому экспорт JSON/CSV идёт параллельно обходу. Рабочий
+    процесс возвращает подготовленные данные отчёта; finish() только
+    дожидается хвоста очереди и собирает пакетный отчёт из готовых данных.
+    При REPORT_WORKERS = 0 отчёты строятся в текущем процессе.
+    """
+
+    def __init__(self, config: Settings, max_workers=None, reports_dir=None):
+        self.config = config
+        self.max_workers = config.REPORT_WORKERS if max_workers is None else max_workers
+        self.reports_dir = reports_dir or config.OUTPUT_DIR / "reports"
+        self.logger = logging.getLogger(__name__)
+        self._executor = None
+        self._generator = None
+        self._jobs = []
+        self.stats = {'submitted': 0, 'failed': 0, 'tail_seconds': 0.0}
+
+    def _get_executor(self):
+        if self._executor is None and self.max_workers > 0:
+            try:
+                # spawn: в основном процессе работают потоки (замеры памяти, перечитывание правил)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(self.config, self.reports_dir)
+                )
+            except Exception as e:
+                self.logger.warning(f"Пул процессов отчётов недоступен, отчёты строятся в основном процессе: {str(e)}")
+                self.max_workers = 0
+        return self._executor
+
+    def _get_generator(self):
+        if self._generator is None:
+            from modules.reporting.report_generator import ReportGenerator
+
+            self._generator = ReportGenerator(self.config, self.reports_dir)
+        return self._generator
+
+    def submit(self, scan_data):
+        """Постановка отчёта сканирования в очередь"""
+        # Объекты WebDriver не передаются между процессами
+        scan_data = to_serializable(scan_data)
+        executor = self._get_executor()
+        future = None
+        if executor is not None:
+            try:
+                future = executor.submit(_build_report, scan_data)
+            except Exception as e:
+                self.logger.warning(f"Отчёт {scan_data.get('main_domain')} будет построен в основном процессе: {str(e)}")
+        self._jobs.append((scan_data, future))
+        self.stats['submitted'] += 1
+
+    def _result(self, scan_data, future):
+        if future is not None:
+            try:
+                return future.result()
+            except Exception as e:
+                self.stats['failed'] += 1
+                self.logger.error(f"Ошибка построения отчёта {scan_data.get('main_domain')}: {str(e)}")
+        generator = self._get_generator()
+        report_data = generator.prepare_report(scan_data)
+        return generator.generate_comprehensive_report(scan_data, report_data), report_data
+
+    def finish(self):
+        """
+        Ожидание оставшихся отчётов и пакетный отчёт из подготовленных данных
+
+        Returns:
+            dict: individual_reports (domain, report_paths) и batch_report
+        """
+        started = time.perf_counter()
+        individual_reports, prepared, all_scan_data = [], [], []
+        for scan_data, future in self._jobs:
+            report_paths, report_data = self._result(scan_data, future)
+            self.logger.info(f"Generated reports for {scan_data.get('main_domain')}: {report_paths}")
+            individual_reports.append({'domain': scan_data.get('main_domain'), 'report_paths': report_paths})
+            prepared.append(report_data)
+            all_scan_data.append(scan_data)
+
+        batch_report = self._get_generator().generate_batch_report(all_scan_data, prepared) if all_scan_data else {}
+        self.stats['tail_seconds'] = round(time.perf_counter() - started, 3)
+        self.close()
+        return {'individual_reports': individual_reports, 'batch_report': batch_report}
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
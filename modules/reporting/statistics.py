@@ -22,11 +22,12 @@ class StatisticsCalculator:
         try:
             detected_ads = scan_data.get('detected_ads', [])
             interaction_results = scan_data.get('interaction_results', [])
+            ad_summary = self.get_ad_summary(scan_data)
             
             stats = {
                 'ads_statistics': self._calculate_ads_statistics(detected_ads),
                 'interaction_statistics': self._calculate_interaction_statistics(interaction_results),
-                'network_analysis': self._calculate_network_analysis(detected_ads),
+                'network_analysis': self._calculate_network_analysis(ad_summary['networks']),
                 'performance_metrics': self._calculate_performance_metrics(scan_data),
                 'quality_metrics': self._calculate_quality_metrics(detected_ads)
             }
@@ -109,16 +110,16 @@ class StatisticsCalculator:
             'most_common_redirect': redirect_counter.most_common(1)[0] if redirect_counter else None
         }
     
-    def _calculate_network_analysis(self, ads_data: List[Dict]) -> Dict[str, Any]:
-        """Анализ рекламных сетей"""
-        networks = [ad.get('network', 'unknown') for ad in ads_data]
-        network_counter = Counter(networks)
+    def _calculate_network_analysis(self, network_distribution: Dict[str, int]) -> Dict[str, Any]:
+        """Анализ рекламных сетей по распределению из сводки"""
+        network_counter = Counter(network_distribution)
+        total = sum(network_counter.values())
         
         return {
-            'total_networks': len(set(networks)),
+            'total_networks': len(network_counter),
             'network_distribution': dict(network_counter),
             'dominant_network': network_counter.most_common(1)[0] if network_counter else None,
-            'network_diversity_index': len(set(networks)) / len(networks) if networks else 0
+            'network_diversity_index': len(network_counter) / total if total else 0
         }
     
     def _calculate_performance_metrics(self, scan_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -159,7 +160,10 @@ class StatisticsCalculator:
     
     def calculate_confidence_stats(self, ads_data: List[Dict]) -> Dict[str, float]:
         """Расчет статистики confidence"""
-        confidences = [ad.get('confidence', 0) for ad in ads_data]
+        return self._confidence_stats([ad.get('confidence', 0) for ad in ads_data])
+    
+    @staticmethod
+    def _confidence_stats(confidences: List[float]) -> Dict[str, float]:
         if not confidences:
             return {}
         
@@ -171,6 +175,67 @@ class StatisticsCalculator:
             'max': max(confidences)
         }
     
+    def calculate_ad_summary(self, ads_data: List[Dict]) -> Dict[str, Any]:
+        """
+        Сводка по объявлениям сканирования за один проход
+        
+        Считается один раз на сканирование (scan_data['ad_summary']) и
+        используется легендой, отчётами и сравнительной статистикой.
+        
+        Args:
+            ads_data (list): Обнаруженные объявления
+            
+        Returns:
+            dict: Распределения по сетям, типам, методам, размерам и уверенности
+        """
+        networks, types, methods, sizes = Counter(), Counter(), Counter(), Counter()
+        confidence_distribution = {'high': 0, 'medium': 0, 'low': 0}
+        confidences = []
+        
+        for ad in ads_data:
+            networks[ad.get('network', 'unknown')] += 1
+            types[ad.get('type', 'unknown')] += 1
+            methods[ad.get('detection_method', 'unknown')] += 1
+            
+            confidence = ad.get('confidence', 0)
+            confidences.append(confidence)
+            if confidence > 0.7:
+                confidence_distribution['high'] += 1
+            elif confidence > 0.4:
+                confidence_distribution['medium'] += 1
+            else:
+                confidence_distribution['low'] += 1
+            
+            size = ad.get('size', {})
+            sizes[self._size_category(size.get('width', 0) * size.get('height', 0))] += 1
+        
+        return {
+            'total_ads': len(ads_data),
+            'networks': dict(networks),
+            'types': dict(types),
+            'confidence_distribution': confidence_distribution,
+            'size_categories': dict(sizes),
+            'detection_methods': dict(methods),
+            'confidence_stats': self._confidence_stats(confidences)
+        }
+    
+    @staticmethod
+    def _size_category(area: float) -> str:
+        if area < 10000:
+            return 'very_small'
+        if area < 50000:
+            return 'small'
+        if area < 200000:
+            return 'medium'
+        return 'large'
+    
+    def get_ad_summary(self, scan_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Сводка из данных сканирования; для данных без неё считается заново, данные не изменяются"""
+        ad_summary = scan_data.get('ad_summary')
+        if ad_summary is None:
+            ad_summary = self.calculate_ad_summary(scan_data.get('detected_ads', []))
+        return ad_summary
+    
     def calculate_comparative_stats(self, multiple_scan_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Расчет сравнительной статистики по множественным сканированиям
@@ -189,15 +254,12 @@ class StatisticsCalculator:
             }
             
             for scan_data in multiple_scan_data:
+                ad_summary = self.get_ad_summary(scan_data)
                 scan_stats = {
                     'domain': scan_data.get('main_domain', 'unknown'),
-                    'total_ads': len(scan_data.get('detected_ads', [])),
-                    'avg_confidence': self.calculate_confidence_stats(
-                        scan_data.get('detected_ads', [])
-                    ).get('mean', 0),
-                    'networks_found': len(self.calculate_network_distribution(
-                        scan_data.get('detected_ads', [])
-                    )),
+                    'total_ads': ad_summary['total_ads'],
+                    'avg_confidence': ad_summary['confidence_stats'].get('mean', 0),
+                    'networks_found': len(ad_summary['networks']),
                     'interaction_success_rate': self._calculate_interaction_statistics(
                         scan_data.get('interaction_results', [])
                     ).get('success_rate_stats', {}).get('average', 0)
@@ -0,0 +1,261 @@
+import logging
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+import pandas as pd
+from config.settings import Settings
+from modules.interaction.url_engine import URLAnalysisEngine
+from utils.file_utils import read_jsonl
+
+NETWORK_COLUMNS = ['urls', 'with_utm', 'with_click_ids', 'redirect_known', 'redirected', 'via_tracking', 'risk_sum']
+
+
+def iter_landings(path):
+    """
+    Посадочные URL из сохранённых данных
+
+    Поддерживаются scan_data.jsonl (interaction_results всех бэкендов) и
+    текстовые файлы с одним URL в строке. Файл читается построчно.
+    Если бэкенд не записал цепочку редиректов (InteractionManagerV1),
+    она восстанавливается по начальному URL (initial_url или href
+    объявления); без него редирект считается неизвестным.
+
+    Yields:
+        dict: url, network, hops (URL промежуточных редиректов), redirect_known
+    """
+    path = Path(path)
+    if path.suffix != '.jsonl':
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield {'url': line.strip(), 'network': None, 'hops': (), 'redirect_known': False}
+        return
+
+    for scan in read_jsonl(path):
+        for result in scan.get('interaction_results') or ():
+            if not isinstance(result, dict):
+                continue
+            ad = result.get('ad_data') or {}
+            interaction = result.get('interaction') or result.get('analyze_redirect') or {}
+            redirect = result.get('redirect_analysis') or {}
+            url = interaction.get('current_url') or redirect.get('final_url')
+            if not url:
+                continue
+            if 'redirect_chain' in interaction or 'redirect_chain' in redirect:
+                chain = interaction.get('redirect_chain') or redirect.get('redirect_chain') or ()
+                hops = [hop.get('url') if isinstance(hop, dict) else hop for hop in chain]
+                known = True
+            else:
+                initial = (interaction.get('initial_url') or redirect.get('initial_url')
+                           or (ad.get('attributes') or {}).get('href'))
+                hops = [initial] if initial and initial != url else []
+                known = bool(initial)
+            yield {'url': url, 'network': ad.get('network'), 'hops': tuple(hop for hop in hops if hop),
+                   'redirect_known': known}
+
+
+def _is_tracking_hop(engine, url, tracking_domains):
+    record = engine.analyze(url)
+    host = record.netloc.lower()
+    return bool(record.networks) or any(host == d or host.endswith('.' + d) for d in tracking_domains)
+
+
+def _analyze_chunk(rows, tracking_domains):
+    """
+    Разбор пачки посадочных URL и частичная агрегация (в рабочем процессе)
+
+    Returns:
+        dict: networks, campaigns, risk и domains — маленькие таблицы pandas
+    """
+    engine = URLAnalysisEngine.get()
+    records = []
+    for row in rows:
+        record = engine.analyze(row['url'])
+        network = row['network'] if row['network'] not in (None, 'unknown') else record.network
+        records.append({
+            'network': network or 'unknown',
+            'campaign': record.utm.get('utm_campaign'),
+            'domain': record.domain or 'unknown',
+            'with_utm': bool(record.utm),
+            'with_click_ids': bool(record.click_ids),
+            'redirect_known': row['redirect_known'],
+            'redirected': bool(row['hops']),
+            'via_tracking': any(_is_tracking_hop(engine, hop, tracking_domains) for hop in row['hops']),
+            'risk_score': record.risk_score
+        })
+
+    frame = pd.DataFrame.from_records(records)
+    networks = frame.groupby('network').agg(
+        urls=('risk_score', 'size'),
+        with_utm=('with_utm', 'sum'),
+        with_click_ids=('with_click_ids', 'sum'),
+        redirect_known=('redirect_known', 'sum'),
+        redirected=('redirected', 'sum'),
+        via_tracking=('via_tracking', 'sum'),
+        risk_sum=('risk_score', 'sum')
+    )
+    campaigns = frame.dropna(subset=['campaign']).groupby(['network', 'campaign']).size()
+    risk = (frame['risk_score'] // 10 * 10).value_counts()
+    domains = frame['domain'].value_counts()
+    return {'networks': networks, 'campaigns': campaigns, 'risk': risk, 'domains': domains}
+
+
+class URLAnalytics:
+    """
+    Пакетная аналитика посадочных URL за произвольный период
+
+    Сохранённые URL читаются потоком и делятся на пачки по
+    URL_ANALYTICS_CHUNK_SIZE; пачки разбираются в пуле процессов, каждая
+    возвращает уже сгруппированные таблицы. В основном процессе хранятся
+    только суммы по сетям, кампаниям, посадочным доменам (eTLD+1) и
+    интервалам риска, а в очереди — не
+    больше двух пачек на процесс, поэтому память не зависит от числа URL.
+    """
+
+    def __init__(self, config: Settings, chunk_size=None, max_workers=None):
+        self.config = config
+        self.chunk_size = chunk_size or config.URL_ANALYTICS_CHUNK_SIZE
+        self.max_workers = config.URL_ANALYTICS_WORKERS if max_workers is None else max_workers
+        self.tracking_domains = tuple(config.URL_TRACKING_DOMAINS)
+        self.logger = logging.getLogger(__name__)
+        self._reset()
+
+    def _reset(self):
+        self.networks = pd.DataFrame(columns=NETWORK_COLUMNS, dtype='int64', index=pd.Index([], name='network'))
+        self.campaigns = pd.Series(dtype='int64', index=pd.MultiIndex.from_tuples([], names=['network', 'campaign']))
+        self.risk = pd.Series(dtype='int64')
+        self.domains = pd.Series(dtype='int64')
+        self.chunks = 0
+
+    def _merge(self, part):
+        self.networks = self.networks.add(part['networks'], fill_value=0)
+        self.campaigns = self.campaigns.add(part['campaigns'], fill_value=0)
+        self.risk = self.risk.add(part['risk'], fill_value=0)
+        self.domains = self.domains.add(part['domains'], fill_value=0)
+        self.chunks += 1
+
+    def _chunks(self, paths):
+        rows = (row for path in paths for row in iter_landings(path))
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def run(self, paths):
+        """
+        Анализ всех посадочных URL из указанных файлов
+
+        Args:
+            paths (list): Файлы scan_data.jsonl или списки URL
+
+        Returns:
+            dict: Сводка (см. summarize)
+
+        Raises:
+            OSError: Входной файл не найден или не читается
+        """
+        started = time.perf_counter()
+        self._reset()
+        chunks = self._chunks(paths)
+
+        if self.max_workers > 0:
+            try:
+                with ProcessPoolExecutor(max_workers=self.max_workers,
+                                         mp_context=multiprocessing.get_context('spawn')) as executor:
+                    pending = deque()
+                    for chunk in chunks:
+                        pending.append(executor.submit(_analyze_chunk, chunk, self.tracking_domains))
+                        if len(pending) >= self.max_workers * 2:
+                            self._merge(pending.popleft().result())
+                    while pending:
+                        self._merge(pending.popleft().result())
+            except OSError:
+                # Ошибка чтения входных файлов, а не пула — решает вызывающий
+                raise
+            except Exception as e:
+                self.logger.error(f"Ошибка пула процессов аналитики URL: {str(e)}")
+                return {}
+        else:
+            for chunk in chunks:
+                self._merge(_analyze_chunk(chunk, self.tracking_domains))
+
+        summary = self.summarize()
+        summary['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+        self.logger.info(f"Аналитика URL: {summary['total_urls']} URL, {self.chunks} пачек за {summary['elapsed_seconds']} с")
+        return summary
+
+    def summary_table(self):
+        """
+        Сводная таблица по сетям: доли UTM, редиректов, трекинга и средний риск
+
+        Доля редиректов считается среди URL с известной цепочкой; без таких
+        URL она не определена (NaN).
+        """
+        table = self.networks.astype('int64')
+        if table.empty:
+            return table
+        urls = table['urls']
+        table = table.assign(
+            utm_share=(table['with_utm'] / urls).round(3),
+            redirect_share=(table['redirected'] / table['redirect_known'].where(table['redirect_known'] > 0)).round(3),
+            tracking_share=(table['via_tracking'] / urls).round(3),
+            avg_risk=(table['risk_sum'] / urls).round(1)
+        ).drop(columns=['risk_sum'])
+        leaders = {network: entries[0]['campaign'] for network, entries in self.top_campaigns(1).items()}
+        table['top_campaign'] = table.index.map(leaders)
+        return table.sort_values('urls', ascending=False)
+
+    def top_campaigns(self, top=5):
+        """Самые частые utm_campaign каждой сети"""
+        result = {}
+        for (network, campaign), count in self.campaigns.astype('int64').sort_values(ascending=False).items():
+            entries = result.setdefault(network, [])
+            if len(entries) < top:
+                entries.append({'campaign': campaign, 'count': int(count)})
+        return result
+
+    def summarize(self, top=5):
+        """
+        Сводка для отчёта
+
+        Returns:
+            dict: total_urls, redirect_coverage, redirect_share (None, если цепочки
+                неизвестны), tracking_redirect_share, by_network, top_campaigns, risk_distribution
+        """
+        table = self.summary_table()
+        total = int(table['urls'].sum()) if not table.empty else 0
+        known = int(table['redirect_known'].sum()) if total else 0
+        redirected = int(table['redirected'].sum()) if total else 0
+        by_network = table.reset_index(names='network')
+
+        return {
+            'total_urls': total,
+            'redirect_coverage': round(known / total, 3) if total else 0,
+            'redirect_share': round(redirected / known, 3) if known else None,
+            'tracking_redirect_share': round(int(table['via_tracking'].sum()) / redirected, 3) if redirected else 0,
+            'by_network': by_network.astype(object).where(by_network.notna(), None).to_dict('records') if total else [],
+            'top_campaigns': self.top_campaigns(top),
+            'top_landing_domains': {domain: int(count) for domain, count
+                                    in self.domains.astype('int64').nlargest(top * 2).items()},
+            # Риск ограничен 100: верхний интервал состоит из одного значения
+            'risk_distribution': {(f"{int(low)}-{int(low) + 9}" if low < 100 else "100"): int(count)
+                                  for low, count in self.risk.sort_index().items()}
+        }
+
+    def save(self, summary, output_dir=None):
+        """Сохранение сводной таблицы (CSV) и сводки (JSON)"""
+        import json
+
+        output_dir = Path(output_dir or self.config.REPORTS_DIR)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime('%Y%m%d_%H%M%S')
+        table_path = output_dir / f"url_analytics_{stamp}.csv"
+        summary_path = output_dir / f"url_analytics_{stamp}.json"
+        self.summary_table().to_csv(table_path, encoding='utf-8')
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False, default=str)
+        return {'table': str(table_path), 'summary': str(summary_path)}
@@ -1,9 +1,25 @@
-from .capturer import ScreenshotCapturer
-from .annotator import ScreenshotAnnotator
-from .legend_builder import LegendBuilder
+import importlib
+
+_LAZY_EXPORTS = {
+    'ScreenshotCapturer': '.capturer',
+    'ScreenshotAnnotator': '.annotator',
+    'LegendBuilder': '.legend_builder',
+    'CreativeStore': '.creative_store',
+    'ScreenshotStorage': '.storage'
+}
 
 __all__ = [
     'ScreenshotCapturer',
     'ScreenshotAnnotator',
-    'LegendBuilder'
-]
\ No newline at end of file
+    'LegendBuilder',
+    'CreativeStore',
+    'ScreenshotStorage'
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
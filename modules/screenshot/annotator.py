@@ -1,8 +1,80 @@
+import hashlib
+import html
+import json
 import logging
+import os
 from config.settings import Settings
+from itertools import zip_longest
 from pathlib import Path
 from PIL import Image, ImageDraw, ImageFont
 import random
+from modules.screenshot.tiling import PNGStripWriter, image_strips
+
+OVERLAY_VERSION = 1
+
+# Запас над рамкой под метку и высота зоны заголовка, px
+LABEL_MARGIN = 40
+
+# Просмотрщик разметки: слой с рамками масштабируется вместе со скриншотом
+OVERLAY_HTML = """<!DOCTYPE html>
+<html lang="ru">
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+body { margin: 0; font: 12px Arial, sans-serif; background: #f4f4f4; }
+#page { position: relative; display: inline-block; }
+#page img { display: block; max-width: 100vw; }
+#layer { position: absolute; left: 0; top: 0; transform-origin: 0 0; pointer-events: none; }
+.box { position: absolute; box-sizing: border-box; border: 3px solid; }
+.label { position: absolute; left: 0; top: -22px; padding: 2px 5px; white-space: nowrap; }
+.box.inside .label { top: 5px; }
+#title { position: fixed; top: 10px; left: 50%; transform: translateX(-50%); padding: 6px 8px;
+         background: rgba(0, 0, 0, .8); color: #fff; font-size: 16px; }
+#legend { position: fixed; left: 10px; bottom: 10px; padding: 10px; background: rgba(255, 255, 255, .86); }
+#legend span { display: inline-block; width: 15px; height: 15px; margin-right: 5px; vertical-align: middle; }
+</style>
+</head>
+<body>
+<div id="title">__TITLE__</div>
+<div id="page"><img id="screenshot" src="__SOURCE__" alt=""><div id="layer"></div></div>
+<div id="legend"><b>Ad Networks Legend:</b></div>
+<script>
+var overlay = __OVERLAY__;
+function rgba(c) { return 'rgba(' + c[0] + ',' + c[1] + ',' + c[2] + ',' + (c[3] / 255).toFixed(2) + ')'; }
+var layer = document.getElementById('layer'), img = document.getElementById('screenshot');
+overlay.boxes.forEach(function (b) {
+  var box = document.createElement('div'), label = document.createElement('div');
+  box.className = 'box' + (b.y < 22 ? ' inside' : '');
+  box.style.cssText = 'left:' + b.x + 'px;top:' + b.y + 'px;width:' + b.width + 'px;height:' + b.height +
+    'px;border-color:' + rgba(b.color);
+  label.className = 'label';
+  label.textContent = b.label;
+  label.style.background = rgba(overlay.colors.background);
+  label.style.color = rgba(overlay.colors.text);
+  box.appendChild(label);
+  layer.appendChild(box);
+});
+overlay.legend.forEach(function (entry) {
+  var row = document.createElement('div'), swatch = document.createElement('span');
+  swatch.style.background = rgba(entry.color);
+  row.appendChild(swatch);
+  row.appendChild(document.createTextNode(entry.name));
+  document.getElementById('legend').appendChild(row);
+});
+function fit() {
+  if (!img.naturalWidth) { return; }
+  layer.style.width = img.naturalWidth + 'px';
+  layer.style.height = img.naturalHeight + 'px';
+  layer.style.transform = 'scale(' + img.clientWidth / img.naturalWidth + ')';
+}
+img.addEventListener('load', fit);
+window.addEventListener('resize', fit);
+fit();
+</script>
+</body>
+</html>
+"""
 
 class ScreenshotAnnotator:
     """Класс для добавления аннотаций на скриншоты"""
@@ -46,53 +118,220 @@ class ScreenshotAnnotator:
     def annotate_ads_on_screenshot(self, screenshot_path, ads_data, output_path=None):
         """Добавление аннотаций рекламных блоков на скриншот"""
         try:
-            image = Image.open(screenshot_path)
-            draw = ImageDraw.Draw(image, 'RGBA')
-            
-            for ad in ads_data:
-                self._annotate_ad(draw, ad, image.size)
-            
-            self._add_legend(draw, ads_data, image.size)
-            
-            self._add_title(draw, f"Detected Ads: {len(ads_data)}", image.size)
-            
-            if output_path is None:
-                original_path = Path(screenshot_path)
-                output_path = original_path.parent / f"annotated_{original_path.name}"
-            
-            image.save(output_path, quality=95)
-            self.logger.info(f"Annotated screenshot saved: {output_path}")
-            
-            return str(output_path)
-            
+            return self.render_overlay(self.build_overlay(ads_data, screenshot_path), output_path)
         except Exception as e:
             self.logger.error(f"Error annotating screenshot: {str(e)}")
             return None
     
-    def _annotate_ad(self, draw, ad, image_size):
-        """Добавление аннотации для одного рекламного блока"""
+    def build_overlay(self, ads_data, screenshot_path=None):
+        """
+        Описание разметки скриншота без отрисовки
+        
+        Args:
+            ads_data (list): Обнаруженные объявления
+            screenshot_path (str): Скриншот, на который ложится разметка
+            
+        Returns:
+            dict: Рамки, подписи, цвета и легенда (сериализуется в JSON)
+        """
+        boxes = [box for box in map(self._overlay_box, ads_data) if box]
+        
+        # Легенда: уникальные сети в порядке появления, не больше 6
+        legend = {}
+        for ad in ads_data:
+            network = ad.get('network', 'unknown')
+            if network not in legend and len(legend) < 6:
+                legend[network] = {
+                    'network': network,
+                    'name': network.replace('_ads', '').title(),
+                    'color': list(self.colors.get(network, self.colors['unknown']))
+                }
+        
+        return {
+            'version': OVERLAY_VERSION,
+            'screenshot': str(screenshot_path) if screenshot_path else None,
+            'title': f"Detected Ads: {len(ads_data)}",
+            'boxes': boxes,
+            'legend': list(legend.values()),
+            'colors': {name: list(self.colors[name]) for name in ('text', 'background')}
+        }
+    
+    def _overlay_box(self, ad):
+        """Рамка одного объявления или None, если у блока нет видимой области"""
         try:
-            ad_number = ad.get('id')
             location = ad.get('location', {})
             size = ad.get('size', {})
             network = ad.get('network', 'unknown')
             confidence = ad.get('confidence', 0)
-
             
             x, y = location.get('x', 0), location.get('y', 0)
             width, height = size.get('width', 0), size.get('height', 0)
             
             if x < 0 or y < 0 or width <= 0 or height <= 0:
-                return
-            
-            color = self.colors.get(network, self.colors['unknown'])
-            
-            self._draw_bounding_box(draw, x, y, width, height, color, ad_number)
-            
-            self._draw_ad_label(draw, x, y, width, height, ad_number, network, confidence, color)
+                return None
+            
+            return {
+                'id': ad.get('id'),
+                'x': x, 'y': y, 'width': width, 'height': height,
+                'network': network,
+                'color': list(self.colors.get(network, self.colors['unknown'])),
+                'label': f"{ad.get('id')}. {network} ({confidence:.1f})"
+            }
+        except Exception as e:
+            self.logger.debug(f"Error building overlay for ad {ad.get('id')}: {str(e)}")
+            return None
+    
+    def render_overlay(self, overlay, output_path=None, screenshot_path=None):
+        """
+        Отрисовка сохранённой разметки поверх скриншота
+        
+        Args:
+            overlay (dict): Результат build_overlay
+            output_path (str): Путь для сохранения
+            screenshot_path (str): Скриншот, если он переехал после build_overlay
             
+        Returns:
+            str: Путь к размеченному скриншоту
+        """
+        screenshot_path = screenshot_path or overlay['screenshot']
+        image = self._open(screenshot_path)
+        if image.height > self.config.ANNOTATION_TILE_THRESHOLD:
+            size = image.size
+            image.close()
+            return self._render_overlay_tiled(overlay, screenshot_path, size, output_path)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        draw = ImageDraw.Draw(image, 'RGBA')
+        
+        self._draw_overlay(draw, overlay, image.size)
+        
+        if output_path is None and self.config.SCREENSHOT_STORAGE_ENABLED:
+            output_path = self._store(image, 'annotated', screenshot_path)
+        elif output_path is None:
+            original_path = Path(screenshot_path)
+            output_path = original_path.parent / f"annotated_{original_path.name}"
+            image.save(output_path)
+        else:
+            image.save(output_path)
+        self.logger.info(f"Annotated screenshot saved: {output_path}")
+        
+        return str(output_path)
+    
+    def _draw_overlay(self, draw, overlay, image_size, top=0, bottom=None):
+        """Рамки, метки, легенда и заголовок; для полосы [top, bottom) — только пересекающие её"""
+        bottom = image_size[1] if bottom is None else bottom
+        
+        for box in overlay['boxes']:
+            # Метка может стоять над рамкой
+            if box['y'] - LABEL_MARGIN >= bottom or box['y'] + box['height'] + 1 < top:
+                continue
+            color = tuple(box['color'])
+            self._draw_bounding_box(draw, box['x'], box['y'], box['width'], box['height'], color, box['id'])
+            self._draw_ad_label(draw, box['x'], box['y'], box['label'])
+        
+        if bottom > image_size[1] - 160:
+            self._add_legend(draw, overlay['legend'], image_size)
+        
+        if top < LABEL_MARGIN:
+            self._add_title(draw, overlay['title'], image_size)
+    
+    def _render_overlay_tiled(self, overlay, screenshot_path, size, output_path=None):
+        """
+        Отрисовка разметки полосами ANNOTATION_STRIP_HEIGHT: в памяти одна
+        полоса исходника и результата, PNG пишется на диск по мере готовности
+        """
+        key = json.dumps(overlay, sort_keys=True)
+        output_path, storage = self._tiled_output('annotated', screenshot_path, key, output_path)
+        if output_path.exists() and storage is not None:
+            return str(output_path)
+        
+        width, height = size
+        with PNGStripWriter(output_path, width, height) as writer:
+            for top, strip in image_strips(screenshot_path, self.config.ANNOTATION_STRIP_HEIGHT):
+                strip = strip.convert('RGB')
+                draw = _StripDraw(ImageDraw.Draw(strip, 'RGBA'), top)
+                self._draw_overlay(draw, overlay, size, top, top + strip.height)
+                writer.write(strip)
+        
+        if storage is not None:
+            storage.register(output_path, 'annotated', storage.scan_of(screenshot_path))
+        self.logger.info(f"Annotated screenshot saved (tiled): {output_path}")
+        return str(output_path)
+    
+    def _tiled_output(self, role, source_path, key, output_path=None):
+        """Путь PNG для потоковой записи и хранилище, если файл учитывается в нём"""
+        if output_path is not None:
+            return Path(output_path), None
+        if self.config.SCREENSHOT_STORAGE_ENABLED:
+            from modules.screenshot.storage import ScreenshotStorage
+            
+            storage = ScreenshotStorage.get(self.config)
+            digest = hashlib.sha256(f"{role}:{Path(source_path).name}:{key}".encode()).hexdigest()
+            return storage.path_for(digest, 'png'), storage
+        original_path = Path(source_path)
+        return original_path.parent / f"{role}_{original_path.stem}.png", None
+    
+    @staticmethod
+    def overlay_path(screenshot_path, scan=None):
+        """Файл разметки рядом со скриншотом: <сканирование>.overlay.json (без scan — <имя скриншота>.overlay.json)"""
+        path = Path(screenshot_path)
+        return path.with_name(f"{scan or path.stem}.overlay.json")
+    
+    def save_overlay(self, overlay, path=None, html=None):
+        """
+        Сохранение разметки в JSON и (ANNOTATION_HTML_VIEWER) HTML-просмотрщика
+        
+        Returns:
+            str: Путь к JSON разметки или None при ошибке
+        """
+        try:
+            path = Path(path or self.overlay_path(overlay['screenshot']))
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(overlay, f, ensure_ascii=False)
+            if self.config.ANNOTATION_HTML_VIEWER if html is None else html:
+                self.export_overlay_html(overlay, path.with_suffix('.html'))
+            return str(path)
         except Exception as e:
-            self.logger.debug(f"Error annotating ad {ad_number}: {str(e)}")
+            self.logger.error(f"Error saving overlay: {str(e)}")
+            return None
+    
+    def load_overlay(self, path):
+        """Чтение разметки; None, если файла нет"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    def export_overlay_html(self, overlay, output_path):
+        """
+        HTML-просмотрщик: разметка рисуется браузером поверх исходного
+        скриншота, растровое изображение с рамками не создаётся
+        """
+        output_path = Path(output_path)
+        screenshot = Path(overlay['screenshot'])
+        source = Path(os.path.relpath(screenshot.resolve(), output_path.parent.resolve())).as_posix()
+        page = OVERLAY_HTML.replace('__TITLE__', html.escape(overlay['title']))
+        page = page.replace('__SOURCE__', html.escape(source, quote=True))
+        page = page.replace('__OVERLAY__', json.dumps(overlay, ensure_ascii=False).replace('</', '<\\/'))
+        output_path.write_text(page, encoding='utf-8')
+        return str(output_path)
+    
+    def _open(self, path):
+        """Открытие скриншота; файл хранилища может ещё кодироваться"""
+        if self.config.SCREENSHOT_STORAGE_ENABLED:
+            from modules.screenshot.storage import ScreenshotStorage
+
+            return ScreenshotStorage.get(self.config).open(path)
+        return Image.open(path)
+    
+    def _store(self, image, role, source_path):
+        """Запись производного изображения в хранилище под сканированием исходного снимка"""
+        from modules.screenshot.storage import ScreenshotStorage
+
+        storage = ScreenshotStorage.get(self.config)
+        return storage.submit(image, role, storage.scan_of(source_path))
     
     def _draw_bounding_box(self, draw, x, y, width, height, color, ad_number):
         """Рисование ограничивающей рамки"""
@@ -110,10 +349,8 @@ class ScreenshotAnnotator:
         # Правый нижний
         draw.rectangle([x + width - marker_size, y + height - marker_size, x + width, y + height], fill=color)
     
-    def _draw_ad_label(self, draw, x, y, width, height, ad_number, network, confidence, color):
+    def _draw_ad_label(self, draw, x, y, label_text):
         """Добавление текстовой метки"""
-        label_text = f"{ad_number}. {network} ({confidence:.1f})"
-        
         # Расчет позиции метки
         text_bbox = draw.textbbox((0, 0), label_text, font=self.fonts['small'])
         text_width = text_bbox[2] - text_bbox[0]
@@ -139,7 +376,7 @@ class ScreenshotAnnotator:
         # Текст
         draw.text((label_x, label_y), label_text, fill=self.colors['text'], font=self.fonts['small'])
     
-    def _add_legend(self, draw, ads_data, image_size):
+    def _add_legend(self, draw, legend, image_size):
         """Добавление легенды на скриншот"""
         try:
             legend_x = 20
@@ -157,26 +394,15 @@ class ScreenshotAnnotator:
             
             legend_y += 25
             
-            # Сбор уникальных сетей
-            networks = {}
-            for ad in ads_data:
-                network = ad.get('network', 'unknown')
-                if network not in networks:
-                    networks[network] = self.colors.get(network, self.colors['unknown'])
-            
-            # Ограничение количества элементов в легенде
-            networks = dict(list(networks.items())[:6])
-            
             # Элементы легенды
-            for i, (network, color) in enumerate(networks.items()):
+            for i, entry in enumerate(legend):
                 y_pos = legend_y + (i * 20)
                 
                 # Цветной квадрат
-                draw.rectangle([legend_x, y_pos, legend_x + 15, y_pos + 15], fill=color)
+                draw.rectangle([legend_x, y_pos, legend_x + 15, y_pos + 15], fill=tuple(entry['color']))
                 
                 # Текст
-                network_name = network.replace('_ads', '').title()
-                draw.text((legend_x + 20, y_pos), network_name, 
+                draw.text((legend_x + 20, y_pos), entry['name'], 
                          fill=(0, 0, 0, 255), font=self.fonts['small'])
         
         except Exception as e:
@@ -217,8 +443,15 @@ class ScreenshotAnnotator:
             str: Путь к сравнительному изображению
         """
         try:
-            original_img = Image.open(original_path)
-            annotated_img = Image.open(annotated_path)
+            original_img = self._open(original_path)
+            annotated_img = self._open(annotated_path)
+            
+            if max(original_img.height, annotated_img.height) > self.config.ANNOTATION_TILE_THRESHOLD:
+                widths = original_img.width, annotated_img.width
+                height = max(original_img.height, annotated_img.height)
+                original_img.close()
+                annotated_img.close()
+                return self._create_comparison_tiled(original_path, annotated_path, widths, height, output_path)
             
             # Создание нового изображения для сравнения
             comparison_width = original_img.width + annotated_img.width
@@ -231,30 +464,79 @@ class ScreenshotAnnotator:
             comparison_img.paste(annotated_img, (original_img.width, 0))
             
             # Добавление подписей
-            draw = ImageDraw.Draw(comparison_img)
-            
-            # Подпись для оригинального изображения
-            orig_text = "Original"
-            orig_bbox = draw.textbbox((0, 0), orig_text, font=self.fonts['medium'])
-            orig_x = (original_img.width - (orig_bbox[2] - orig_bbox[0])) // 2
-            draw.text((orig_x, 10), orig_text, fill=(0, 0, 0), font=self.fonts['medium'])
-            
-            # Подпись для аннотированного изображения
-            ann_text = "Annotated (Ads Highlighted)"
-            ann_bbox = draw.textbbox((0, 0), ann_text, font=self.fonts['medium'])
-            ann_x = original_img.width + (annotated_img.width - (ann_bbox[2] - ann_bbox[0])) // 2
-            draw.text((ann_x, 10), ann_text, fill=(0, 0, 0), font=self.fonts['medium'])
+            self._draw_comparison_captions(ImageDraw.Draw(comparison_img), original_img.width, annotated_img.width)
             
             # Сохранение
-            if output_path is None:
+            if output_path is None and self.config.SCREENSHOT_STORAGE_ENABLED:
+                output_path = self._store(comparison_img, 'comparison', original_path)
+            elif output_path is None:
                 original_path_obj = Path(original_path)
                 output_path = original_path_obj.parent / f"comparison_{original_path_obj.name}"
-            
-            comparison_img.save(output_path, quality=95)
+                comparison_img.save(output_path)
+            else:
+                comparison_img.save(output_path)
             self.logger.info(f"Comparison image saved: {output_path}")
             
             return str(output_path)
             
         except Exception as e:
             self.logger.error(f"Error creating comparison image: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+    
+    def _draw_comparison_captions(self, draw, original_width, annotated_width):
+        """Подписи над половинами сравнительного изображения"""
+        # Подпись для оригинального изображения
+        orig_text = "Original"
+        orig_bbox = draw.textbbox((0, 0), orig_text, font=self.fonts['medium'])
+        orig_x = (original_width - (orig_bbox[2] - orig_bbox[0])) // 2
+        draw.text((orig_x, 10), orig_text, fill=(0, 0, 0), font=self.fonts['medium'])
+        
+        # Подпись для аннотированного изображения
+        ann_text = "Annotated (Ads Highlighted)"
+        ann_bbox = draw.textbbox((0, 0), ann_text, font=self.fonts['medium'])
+        ann_x = original_width + (annotated_width - (ann_bbox[2] - ann_bbox[0])) // 2
+        draw.text((ann_x, 10), ann_text, fill=(0, 0, 0), font=self.fonts['medium'])
+    
+    def _create_comparison_tiled(self, original_path, annotated_path, widths, height, output_path=None):
+        """Сравнительное изображение полосами: обе половины читаются и пишутся потоково"""
+        output_path, storage = self._tiled_output('comparison', original_path, Path(annotated_path).name, output_path)
+        if output_path.exists() and storage is not None:
+            return str(output_path)
+        
+        strip_height = self.config.ANNOTATION_STRIP_HEIGHT
+        originals = image_strips(original_path, strip_height)
+        annotated = image_strips(annotated_path, strip_height)
+        with PNGStripWriter(output_path, sum(widths), height) as writer:
+            for (_, original_strip), (_, annotated_strip) in zip_longest(originals, annotated, fillvalue=(None, None)):
+                top = writer.rows
+                strip = Image.new('RGB', (sum(widths), min(strip_height, height - top)), 'white')
+                if original_strip is not None:
+                    strip.paste(original_strip, (0, 0))
+                if annotated_strip is not None:
+                    strip.paste(annotated_strip, (widths[0], 0))
+                if top < LABEL_MARGIN:
+                    self._draw_comparison_captions(_StripDraw(ImageDraw.Draw(strip), top), *widths)
+                writer.write(strip)
+        
+        if storage is not None:
+            storage.register(output_path, 'comparison', storage.scan_of(original_path))
+        self.logger.info(f"Comparison image saved (tiled): {output_path}")
+        return str(output_path)
+
+
+class _StripDraw:
+    """ImageDraw полосы страницы: координаты y задаются относительно всей страницы"""
+    
+    def __init__(self, draw, top):
+        self.draw = draw
+        self.top = top
+    
+    def rectangle(self, xy, **kwargs):
+        x0, y0, x1, y1 = xy
+        self.draw.rectangle([x0, y0 - self.top, x1, y1 - self.top], **kwargs)
+    
+    def text(self, xy, text, **kwargs):
+        self.draw.text((xy[0], xy[1] - self.top), text, **kwargs)
+    
+    def textbbox(self, xy, text, **kwargs):
+        return self.draw.textbbox(xy, text, **kwargs)
\ No newline at end of file
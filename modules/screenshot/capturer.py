@@ -7,6 +7,7 @@ from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.common.exceptions import WebDriverException
 from PIL import Image
 import io
+from utils.domain import registrable_domain
 
 class ScreenshotCapturer:
     """Класс для захвата скриншотов веб-страниц"""
@@ -18,6 +19,9 @@ class ScreenshotCapturer:
     def capture_visible_area(self, filename=None):
         """Захват видимой области страницы"""
         try:
+            if filename is None and self.config.SCREENSHOT_STORAGE_ENABLED:
+                return self._store(self.driver.get_screenshot_as_png(), 'visible')
+            
             if filename is None:
                 filename = self._generate_filename("visible")
             
@@ -32,9 +36,10 @@ class ScreenshotCapturer:
             self.logger.error(f"Error capturing visible area: {str(e)}")
             return None
     
-    def capture_full_page(self, filename=None):
-        """Захват полной страницы (с прокруткой)"""
+    def capture_full_page(self, filename=None, scan=None):
+        """Захват полной страницы (с прокруткой); scan — ключ сканирования для манифеста хранилища"""
         try:
+            use_storage = filename is None and self.config.SCREENSHOT_STORAGE_ENABLED
             if filename is None:
                 filename = self._generate_filename("fullpage")
             
@@ -45,7 +50,10 @@ class ScreenshotCapturer:
             
             self.driver.set_window_size(self.config.WIDTH_WINDOW, total_height+100)
             
-            self.driver.save_screenshot(str(screenshot_path))
+            if use_storage:
+                screenshot_path = self._store(self.driver.get_screenshot_as_png(), 'full_page', scan)
+            else:
+                self.driver.save_screenshot(str(screenshot_path))
 
             self.driver.set_window_size(self.config.WIDTH_WINDOW,self.config.HEIGHT_WINDOW)
             
@@ -90,6 +98,12 @@ class ScreenshotCapturer:
                 if not element:
                     continue
                 
+                if self.config.CREATIVE_STORE_ENABLED:
+                    stored = self._store_creative(element.screenshot_as_png, ad)
+                    if stored:
+                        screenshots[f"ad_{i}"] = stored
+                    continue
+                
                 if base_filename:
                     filename = f"{base_filename}_ad_{i}.png"
                 else:
@@ -108,6 +122,24 @@ class ScreenshotCapturer:
         
         return screenshots
     
+    def _store(self, png_data, role, scan=None):
+        """PNG браузера в хранилище скриншотов; кодирование продолжается в фоне"""
+        from modules.screenshot.storage import ScreenshotStorage
+
+        scan = scan or f"{self._get_safe_domain()}_{int(time.time())}"
+        return ScreenshotStorage.get(self.config).submit(png_data, role, scan)
+    
+    def _store_creative(self, png_data, ad):
+        """Снимок объявления в хранилище креативов; повторный креатив не записывается"""
+        from modules.screenshot.creative_store import CreativeStore
+
+        stored = CreativeStore.get(self.config).add(png_data, {'url': self.driver.current_url, 'network': ad.get('network')})
+        if not stored:
+            return None
+        ad['creative_id'] = stored['creative_id']
+        ad['screenshot_path'] = stored['path']
+        return {**stored, 'ad_data': ad}
+    
     def _generate_filename(self, prefix):
         """Генерация имени файла с timestamp"""
         timestamp = int(time.time())
@@ -117,7 +149,7 @@ class ScreenshotCapturer:
     def _get_safe_domain(self):
         """Получение безопасного имени домена для файла"""
         try:
-            domain = self.driver.current_url.split('//')[-1].split('/')[0]
+            domain = registrable_domain(self.driver.current_url)
             # Замена недопустимых символов
             domain = "".join(c for c in domain if c.isalnum() or c in ('-', '.'))
             return domain[:50]  # Ограничение длины
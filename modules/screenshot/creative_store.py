@@ -0,0 +1,235 @@
+import io
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+import numpy as np
+from PIL import Image
+from config.settings import Settings
+
+HASH_SIZE = 8
+PHASH_SIZE = 32
+
+
+def _grayscale(image, width, height):
+    if isinstance(image, (bytes, bytearray)):
+        image = Image.open(io.BytesIO(image))
+    return np.asarray(image.convert('L').resize((width, height), Image.Resampling.LANCZOS), dtype=np.float64)
+
+
+def _to_int(bits):
+    return int(np.packbits(bits.flatten()).view('>u8')[0])
+
+
+def average_hash(image):
+    """aHash: 8x8 пикселей выше среднего"""
+    pixels = _grayscale(image, HASH_SIZE, HASH_SIZE)
+    return _to_int(pixels > pixels.mean())
+
+
+def difference_hash(image):
+    """dHash: знак разности соседних пикселей строки (9x8)"""
+    pixels = _grayscale(image, HASH_SIZE + 1, HASH_SIZE)
+    return _to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+def _dct_matrix(size):
+    k = np.arange(size)
+    matrix = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * size))
+    matrix[0] *= 1 / np.sqrt(2)
+    return matrix * np.sqrt(2 / size)
+
+
+_DCT = _dct_matrix(PHASH_SIZE)
+
+
+def perceptual_hash(image):
+    """pHash: низкие частоты DCT 32x32 относительно медианы"""
+    pixels = _grayscale(image, PHASH_SIZE, PHASH_SIZE)
+    low = (_DCT @ pixels @ _DCT.T)[:HASH_SIZE, :HASH_SIZE]
+    return _to_int(low > np.median(low.flatten()[1:]))
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """
+    BK-дерево по расстоянию Хэмминга
+
+    Поиск соседей в радиусе r обходит только поддеревья, ребро которых
+    лежит в [d - r, d + r] (неравенство треугольника).
+    """
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def add(self, value, item):
+        self.size += 1
+        if self.root is None:
+            self.root = (value, item, {})
+            return
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, item, {})
+                return
+            node = child
+
+    def search(self, value, radius):
+        """
+        Returns:
+            list: (расстояние, item), ближайшие первыми
+        """
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node_value, item, children = stack.pop()
+            distance = hamming(value, node_value)
+            if distance <= radius:
+                found.append((distance, item))
+            for edge, child in children.items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return sorted(found, key=lambda pair: pair[0])
+
+
+class CreativeStore:
+    """
+    Хранилище уникальных рекламных креативов
+
+    Для каждого снимка объявления считаются pHash и dHash; почти
+    совпадающий креатив ищется в BK-дереве по pHash и подтверждается
+    dHash и размерами (хеши считаются по уменьшенному изображению, поэтому
+    одноцветные 300x250 и 728x90 неразличимы по ним). Новый креатив записывается один раз в
+    CREATIVES_DIR/<2 символа id>/<id>.png, повтор только учитывается —
+    файл не пишется. Индекс (index.jsonl) дописывается построчно и
+    загружается при первом обращении.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, root, max_distance=6, size_tolerance=2):
+        self.root = Path(root)
+        self.max_distance = max_distance
+        self.size_tolerance = size_tolerance
+        self.index_path = self.root / "index.jsonl"
+        self.logger = logging.getLogger(__name__)
+        self.creatives = {}
+        self.tree = BKTree()
+        self._write_lock = threading.Lock()
+        self.stats = {'new': 0, 'duplicates': 0, 'bytes_written': 0, 'bytes_saved': 0, 'write_seconds': 0.0}
+        self._load()
+
+    @classmethod
+    def get(cls, config: Settings = Settings):
+        """Общее хранилище процесса"""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls(config.CREATIVES_DIR, config.CREATIVE_HASH_DISTANCE,
+                                        config.CREATIVE_SIZE_TOLERANCE)
+        return cls._instance
+
+    def _load(self):
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self.creatives[entry['creative_id']] = entry
+                self.tree.add(int(entry['phash'], 16), entry['creative_id'])
+        self.logger.info(f"Загружено {len(self.creatives)} креативов из {self.index_path}")
+
+    def find(self, phash, dhash, size=None):
+        """Ближайший известный креатив того же размера (с допуском size_tolerance) или None"""
+        for _, creative_id in self.tree.search(phash, self.max_distance):
+            entry = self.creatives[creative_id]
+            if hamming(dhash, int(entry['dhash'], 16)) > self.max_distance * 2:
+                continue
+            if size is not None and (abs(entry.get('width', 0) - size[0]) > self.size_tolerance
+                                     or abs(entry.get('height', 0) - size[1]) > self.size_tolerance):
+                continue
+            return entry
+        return None
+
+    def _new_id(self, phash, dhash):
+        """Id нового креатива: pHash, при совпадении — pHash+dHash, затем с порядковым суффиксом"""
+        creative_id = f"{phash:016x}"
+        if creative_id not in self.creatives:
+            return creative_id
+        base = creative_id = f"{phash:016x}{dhash:016x}"
+        number = 1
+        while creative_id in self.creatives:
+            creative_id = f"{base}-{number}"
+            number += 1
+        return creative_id
+
+    def add(self, png_data, source=None):
+        """
+        Сохранение снимка объявления
+
+        Args:
+            png_data (bytes): PNG снимка
+            source (dict): Откуда снимок (url, network), пишется только для нового креатива
+
+        Returns:
+            dict: creative_id, path, is_new или None для пустого изображения
+        """
+        started = time.perf_counter()
+        image = Image.open(io.BytesIO(png_data))
+        image.load()
+        if not image.width or not image.height:
+            return None
+        phash, dhash = perceptual_hash(image), difference_hash(image)
+
+        with self._write_lock:
+            existing = self.find(phash, dhash, image.size)
+            if existing:
+                self.stats['duplicates'] += 1
+                self.stats['bytes_saved'] += len(png_data)
+                return {'creative_id': existing['creative_id'], 'path': str(self.root / existing['path']), 'is_new': False}
+
+            creative_id = self._new_id(phash, dhash)
+            relative = Path(creative_id[:2]) / f"{creative_id}.png"
+            path = self.root / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_suffix('.tmp')
+            temporary.write_bytes(png_data)
+            os.replace(temporary, path)
+
+            entry = {
+                'creative_id': creative_id,
+                'phash': f"{phash:016x}",
+                'dhash': f"{dhash:016x}",
+                'width': image.width,
+                'height': image.height,
+                'path': relative.as_posix(),
+                'first_seen': time.time(),
+                'source': source or {}
+            }
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.creatives[creative_id] = entry
+            self.tree.add(phash, creative_id)
+            self.stats['new'] += 1
+            self.stats['bytes_written'] += len(png_data)
+            self.stats['write_seconds'] += time.perf_counter() - started
+        return {'creative_id': creative_id, 'path': str(path), 'is_new': True}
+
+    def get_stats(self):
+        return {**self.stats, 'creatives': len(self.creatives), 'write_seconds': round(self.stats['write_seconds'], 3)}
+
+    @classmethod
+    def reset(cls):
+        cls._instance = None
@@ -1,120 +1,196 @@
 import logging
-from PIL import Image, ImageDraw
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from types import SimpleNamespace
+from PIL import Image, ImageDraw, ImageFont
+from modules.reporting.statistics import StatisticsCalculator
+
+LEGEND_WIDTH = 600
+LINE_HEIGHT = 25
+PADDING = 20
+HEADERS = ["#", "Network", "Type", "Size", "Confidence", "Method"]
+# Настройки, которые передаются в процесс пула вместе со страницей
+WORKER_SETTINGS = ("LEGEND_DIR", "LEGEND_GLYPH_CACHE_SIZE", "LEGEND_PAGE_HEIGHT")
+
+# Построитель в процессе пула: кэш глифов живёт между страницами
+_worker_builder = None
+
+
+def _render_page_job(job):
+    """Отрисовка одной страницы или файла легенды в процессе пула по настройкам вызывающего"""
+    global _worker_builder
+    path, sections, settings = job
+    if _worker_builder is None or vars(_worker_builder.config) != settings:
+        _worker_builder = LegendBuilder(SimpleNamespace(**settings))
+    return _worker_builder.render_page(sections, path)
+
 
 class LegendBuilder:
-    """Класс для построения детализированных легенд и отчетов"""
+    """
+    Класс для построения детализированных легенд и отчетов
+
+    Легенда сканирования — таблица объявлений; для пачки сканирований
+    (render_batch) легенды собираются в многостраничный лист
+    (legend_sheet_001.png, ...) или пишутся отдельными файлами, страницы
+    рисуются в пуле процессов. Надписи растеризуются один раз: маски
+    текста кэшируются, повторяющиеся сети, типы и номера вставляются
+    готовыми.
+    """
     def __init__(self, config):
         self.config = config
         self.logger = logging.getLogger(__name__)
-    
-    def create_detailed_legend_image(self, ads_data, output_path=None):
+        self.statistics_calculator = StatisticsCalculator()
+        self.font = ImageFont.load_default()
+        self._text_mask = lru_cache(maxsize=getattr(config, 'LEGEND_GLYPH_CACHE_SIZE', 4096))(self._render_text_mask)
+
+    @staticmethod
+    def scan_key(scan_data):
+        """Имя сканирования для файлов легенды: scan_key записи или <домен>_<время> для старых данных"""
+        if scan_data.get('scan_key'):
+            return scan_data['scan_key']
+        return f"{scan_data.get('main_domain') or 'scan'}_{int(scan_data.get('scan_timestamp') or 0)}"
+
+    def create_detailed_legend_image(self, ads_data, output_path=None, scan=None):
         """Создание детализированного изображения с информацией о рекламных блоках"""
         try:
-            width = 600
-            line_height = 25
-            padding = 20
-            
-            height = padding * 2 + (len(ads_data) + 2) * line_height
-            
-            image = Image.new('RGB', (width, height), 'white')
-            draw = ImageDraw.Draw(image)
-            
-            title = "Ad Detection Report"
-            draw.text((padding, padding), title, fill=(0, 0, 0))
-            
-            y_position = padding + line_height * 1.5
-            
-            headers = ["#", "Network", "Type", "Size", "Confidence", "Method"]
-            header_x = padding
-            col_width = (width - padding * 2) // len(headers)
-            
-            for i, header in enumerate(headers):
-                draw.text((header_x + i * col_width, y_position), header, fill=(0, 0, 0))
-            
-            y_position += line_height
-            
-            for i, ad in enumerate(ads_data):
-                row_y = y_position + i * line_height
-                
-                draw.text((padding, row_y), str(i+1), fill=(0, 0, 0))
-                
-                network = ad.get('network', 'unknown')
-                draw.text((padding + col_width, row_y), network, fill=(0, 0, 0))
-                
-                ad_type = ad.get('type', 'unknown')
-                draw.text((padding + col_width * 2, row_y), ad_type, fill=(0, 0, 0))
-                
-                size = ad.get('size', {})
-                size_str = f"{size.get('width', 0)}x{size.get('height', 0)}"
-                draw.text((padding + col_width * 3, row_y), size_str, fill=(0, 0, 0))
-                
-                confidence = ad.get('confidence', 0)
-                confidence_str = f"{confidence:.2f}"
-                confidence_color = (0, 128, 0) if confidence > 0.7 else (255, 165, 0) if confidence > 0.4 else (255, 0, 0)
-                draw.text((padding + col_width * 4, row_y), confidence_str, fill=confidence_color)
-                
-                method = ad.get('detection_method', 'unknown')
-                draw.text((padding + col_width * 5, row_y), method, fill=(0, 0, 0))
-            
             if output_path is None:
-                output_path = self.config.SCREENSHOT_DIR / "ad_detection_legend.png"
-            
-            image.save(output_path)
-            self.logger.info(f"Detailed legend saved: {output_path}")
-            
-            return str(output_path)
-            
+                name = f"{scan}_legend.png" if scan else "ad_detection_legend.png"
+                output_path = Path(self.config.LEGEND_DIR) / name
+
+            return self.render_page([self.build_section(ads_data)], output_path)
+
         except Exception as e:
             self.logger.error(f"Error creating detailed legend: {str(e)}")
             return None
-    
-    def create_summary_statistics(self, ads_data):
-        """Создание статистики обнаружения рекламы"""
-        stats = {
-            'total_ads': len(ads_data),
-            'networks': {},
-            'types': {},
-            'confidence_distribution': {
-                'high': 0,
-                'medium': 0,
-                'low': 0
-            },
-            'size_categories': {},
-            'detection_methods': {}
-        }
-        
-        for ad in ads_data:
-            network = ad.get('network', 'unknown')
-            stats['networks'][network] = stats['networks'].get(network, 0) + 1
-            
-            ad_type = ad.get('type', 'unknown')
-            stats['types'][ad_type] = stats['types'].get(ad_type, 0) + 1
-            
-            confidence = ad.get('confidence', 0)
-            if confidence > 0.7:
-                stats['confidence_distribution']['high'] += 1
-            elif confidence > 0.4:
-                stats['confidence_distribution']['medium'] += 1
-            else:
-                stats['confidence_distribution']['low'] += 1
-            
-            method = ad.get('detection_method', 'unknown')
-            stats['detection_methods'][method] = stats['detection_methods'].get(method, 0) + 1
-            
+
+    def build_section(self, ads_data, title="Ad Detection Report"):
+        """
+        Раскладка таблицы легенды без отрисовки
+
+        Returns:
+            dict: Заголовок и строки ячеек (текст, цвет) — передаются в пул процессов
+        """
+        rows = []
+        for i, ad in enumerate(ads_data):
             size = ad.get('size', {})
-            width = size.get('width', 0)
-            height = size.get('height', 0)
-            area = width * height
-            
-            if area < 10000:
-                category = 'very_small'
-            elif area < 50000:
-                category = 'small'
-            elif area < 200000:
-                category = 'medium'
+            confidence = ad.get('confidence', 0)
+            confidence_color = (0, 128, 0) if confidence > 0.7 else (255, 165, 0) if confidence > 0.4 else (255, 0, 0)
+            rows.append([
+                (str(i + 1), (0, 0, 0)),
+                (ad.get('network', 'unknown'), (0, 0, 0)),
+                (ad.get('type', 'unknown'), (0, 0, 0)),
+                (f"{size.get('width', 0)}x{size.get('height', 0)}", (0, 0, 0)),
+                (f"{confidence:.2f}", confidence_color),
+                (ad.get('detection_method', 'unknown'), (0, 0, 0))
+            ])
+        return {'title': title, 'rows': rows}
+
+    @staticmethod
+    def section_height(section):
+        return PADDING * 2 + (len(section['rows']) + 2) * LINE_HEIGHT
+
+    def render_page(self, sections, output_path):
+        """Отрисовка секций легенды друг под другом в один файл"""
+        height = sum(self.section_height(section) for section in sections)
+        image = Image.new('RGB', (LEGEND_WIDTH, height), 'white')
+        col_width = (LEGEND_WIDTH - PADDING * 2) // len(HEADERS)
+
+        top = 0
+        for section in sections:
+            self._draw_text(image, (PADDING, top + PADDING), section['title'], (0, 0, 0))
+
+            y_position = top + PADDING + int(LINE_HEIGHT * 1.5)
+            for i, header in enumerate(HEADERS):
+                self._draw_text(image, (PADDING + i * col_width, y_position), header, (0, 0, 0))
+
+            y_position += LINE_HEIGHT
+            for i, row in enumerate(section['rows']):
+                for column, (text, color) in enumerate(row):
+                    self._draw_text(image, (PADDING + column * col_width, y_position + i * LINE_HEIGHT), text, color)
+
+            top += self.section_height(section)
+            if top < height:
+                ImageDraw.Draw(image).line([(0, top - 1), (LEGEND_WIDTH, top - 1)], fill=(200, 200, 200))
+
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        image.save(output_path)
+        self.logger.info(f"Detailed legend saved: {output_path}")
+
+        return str(output_path)
+
+    def _render_text_mask(self, text):
+        """Маска надписи и её смещение; кэшируется по тексту"""
+        left, top, right, bottom = self.font.getbbox(text)
+        mask = Image.new('L', (max(right - left, 1), max(bottom - top, 1)))
+        ImageDraw.Draw(mask).text((-left, -top), text, fill=255, font=self.font)
+        return mask, (left, top)
+
+    def _draw_text(self, image, xy, text, color):
+        mask, (left, top) = self._text_mask(text)
+        image.paste(color, (int(xy[0]) + left, int(xy[1]) + top), mask)
+
+    def render_batch(self, scans, mode=None, output_dir=None, max_workers=None):
+        """
+        Легенды для пачки сканирований
+
+        Args:
+            scans (list): Данные сканирований (scan_data.jsonl)
+            mode (str): "sheet" — многостраничный лист, "files" — файл на сканирование
+            output_dir (str): Каталог (по умолчанию LEGEND_DIR)
+            max_workers (int): Процессов отрисовки; 0 — в текущем процессе
+
+        Returns:
+            list: Пути к созданным файлам
+        """
+        mode = mode or self.config.LEGEND_MODE
+        output_dir = Path(output_dir or self.config.LEGEND_DIR)
+        max_workers = self.config.LEGEND_WORKERS if max_workers is None else max_workers
+
+        sections = []
+        for scan_data in scans:
+            title = f"{scan_data.get('main_domain', 'unknown')}: {len(scan_data.get('detected_ads', []))} ads"
+            sections.append((self.scan_key(scan_data), self.build_section(scan_data.get('detected_ads', []), title)))
+
+        if mode == "files":
+            jobs = [(output_dir / f"{key}_legend.png", [section]) for key, section in sections]
+        else:
+            jobs = [
+                (output_dir / f"legend_sheet_{number:03d}.png", page)
+                for number, page in enumerate(self._paginate([section for _, section in sections]), start=1)
+            ]
+
+        settings = {name: getattr(self.config, name) for name in WORKER_SETTINGS}
+        try:
+            if max_workers > 0 and len(jobs) > 1:
+                with ProcessPoolExecutor(max_workers=max_workers,
+                                         mp_context=multiprocessing.get_context('spawn')) as executor:
+                    paths = list(executor.map(_render_page_job, [(str(path), page, settings) for path, page in jobs]))
             else:
-                category = 'large'
-            
-            stats['size_categories'][category] = stats['size_categories'].get(category, 0) + 1
-        
-        return stats
\ No newline at end of file
+                paths = [self.render_page(page, path) for path, page in jobs]
+        except Exception as e:
+            self.logger.error(f"Error rendering legends: {str(e)}")
+            return []
+
+        self.logger.info(f"Легенды: {len(sections)} сканирований, {len(paths)} файлов в {output_dir}")
+        return paths
+
+    def _paginate(self, sections):
+        """Секции по страницам высотой до LEGEND_PAGE_HEIGHT; длинная секция занимает страницу одна"""
+        page, height = [], 0
+        for section in sections:
+            section_height = self.section_height(section)
+            if page and height + section_height > self.config.LEGEND_PAGE_HEIGHT:
+                yield page
+                page, height = [], 0
+            page.append(section)
+            height += section_height
+        if page:
+            yield page
+
+    def create_summary_statistics(self, ads_data):
+        """Создание статистики обнаружения рекламы (сводка StatisticsCalculator)"""
+        ad_summary = self.statistics_calculator.calculate_ad_summary(ads_data)
+        return {key: value for key, value in ad_summary.items() if key != 'confidence_stats'}
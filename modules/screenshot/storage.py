@@ -0,0 +1,261 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from PIL import Image, features
+from config.settings import Settings
+
+# Параметры кодировщиков Pillow; расширение файла — первая часть имени формата
+ENCODERS = {
+    'png': ('PNG', {'optimize': False, 'compress_level': 6}),
+    'webp_lossless': ('WEBP', {'lossless': True, 'quality': 60, 'method': 4}),
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'avif': ('AVIF', {'quality': 50, 'speed': 8})
+}
+
+# Предельная сторона изображения WebP
+WEBP_MAX_SIDE = 16383
+# Роли, для которых при кодировании пишется миниатюра (<хеш>.thumb.jpg)
+THUMBNAIL_ROLES = ('full_page',)
+
+
+class ScreenshotStorage:
+    """
+    Хранилище скриншотов с адресацией по содержимому
+
+    Изображение получает имя по SHA-256 исходных данных
+    (SCREENSHOT_DIR/<2 символа>/<хеш>.<формат>) сразу, а кодирование в
+    формат роли (SCREENSHOT_FORMATS) идёт в пуле потоков. Одинаковые
+    снимки записываются один раз. Страницы выше ANNOTATION_TILE_THRESHOLD
+    сохраняются в PNG: его полосы читаются потоково (tiling.image_strips),
+    а WebP декодируется только целиком и к тому же ограничен стороной
+    16383 px. open() дожидается кодирования
+    нужного файла. В manifest.jsonl для каждого файла пишутся сканирование и роль.
+    Для полной страницы рядом пишется миниатюра её верха: отчёты берут её,
+    не декодируя всю страницу.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, config: Settings, root=None, max_workers=None):
+        self.config = config
+        self.root = Path(root or config.SCREENSHOT_DIR)
+        self.formats = dict(config.SCREENSHOT_FORMATS)
+        if not features.check('avif'):
+            self.formats = {role: 'webp' if fmt == 'avif' else fmt for role, fmt in self.formats.items()}
+        self.manifest_path = self.root / "manifest.jsonl"
+        self.logger = logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or config.SCREENSHOT_ENCODE_WORKERS, thread_name_prefix="screenshot-encode"
+        )
+        self._pending = {}
+        self._scans = {}
+        self._state_lock = threading.Lock()
+        self.stats = {
+            'stored': 0, 'duplicates': 0, 'fallbacks': 0, 'bytes_out': 0,
+            'png_bytes_in': 0, 'png_bytes_out': 0, 'encode_seconds': 0.0
+        }
+
+    @classmethod
+    def get(cls, config: Settings = Settings):
+        """Общее хранилище процесса"""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls(config)
+        return cls._instance
+
+    @staticmethod
+    def _digest(source):
+        if isinstance(source, (bytes, bytearray)):
+            return hashlib.sha256(source).hexdigest()
+        digest = hashlib.sha256(f"{source.mode}:{source.size}".encode())
+        digest.update(source.tobytes())
+        return digest.hexdigest()
+
+    def submit(self, source, role, scan=None):
+        """
+        Постановка изображения в очередь кодирования
+
+        Args:
+            source (bytes | PIL.Image): PNG от браузера или готовое изображение
+                (после передачи изображение не изменяется)
+            role (str): full_page, visible, annotated, comparison
+            scan (str): Ключ сканирования для манифеста
+
+        Returns:
+            str: Путь, по которому будет записан файл
+        """
+        fmt = self._format_for(role, source)
+        path = self.path_for(self._digest(source), fmt)
+        key = str(path)
+
+        with self._state_lock:
+            self._scans[key] = scan
+            if key in self._pending or path.exists():
+                self.stats['duplicates'] += 1
+                self._append_manifest({'scan': scan, 'role': role, 'blob': self._blob(path), 'duplicate': True})
+                return key
+            self._pending[key] = self._executor.submit(self._encode, source, fmt, path, role, scan)
+        return key
+
+    def path_for(self, digest, fmt):
+        """Путь файла в хранилище по хешу и формату"""
+        return self.root / digest[:2] / f"{digest}.{fmt.split('_')[0]}"
+
+    def register(self, path, role, scan=None, fmt='png'):
+        """
+        Учёт файла, записанного в хранилище напрямую (потоковая запись
+        полосами минует пул кодирования)
+        """
+        path = Path(path)
+        with Image.open(path) as image:
+            width, height = image.size
+        size = path.stat().st_size
+        with self._state_lock:
+            self._scans[str(path)] = scan
+            self._append_manifest({
+                'scan': scan, 'role': role, 'blob': self._blob(path), 'format': fmt,
+                'width': width, 'height': height, 'bytes': size
+            })
+            self.stats['stored'] += 1
+            self.stats['bytes_out'] += size
+        return str(path)
+
+    def _format_for(self, role, source):
+        fmt = self.formats.get(role, 'png')
+        if fmt != 'png':
+            # Размер PNG читается из заголовка, без декодирования
+            size = Image.open(io.BytesIO(source)).size if isinstance(source, (bytes, bytearray)) else source.size
+            if size[1] > self.config.ANNOTATION_TILE_THRESHOLD or (fmt.startswith('webp') and max(size) > WEBP_MAX_SIDE):
+                self.stats['fallbacks'] += 1
+                return 'png'
+        return fmt
+
+    def store(self, source, role, scan=None):
+        """Запись изображения с ожиданием кодирования"""
+        path = self.submit(source, role, scan)
+        self.wait(path)
+        return path
+
+    def _encode(self, source, fmt, path, role, scan):
+        started = time.perf_counter()
+        bytes_in = len(source) if isinstance(source, (bytes, bytearray)) else None
+        image = Image.open(io.BytesIO(source)) if bytes_in is not None else source
+        if fmt != 'avif' and image.mode not in ('RGB', 'RGBA', 'L'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+        data = self._save(image, fmt)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if role in THUMBNAIL_ROLES:
+            self._save_thumbnail(image, path)
+        temporary = path.with_name(path.name + '.tmp')
+        temporary.write_bytes(data)
+        os.replace(temporary, path)
+
+        entry = {
+            'scan': scan, 'role': role, 'blob': self._blob(path), 'format': fmt,
+            'width': image.width, 'height': image.height, 'bytes': len(data)
+        }
+        with self._state_lock:
+            self._append_manifest(entry)
+            self.stats['stored'] += 1
+            self.stats['bytes_out'] += len(data)
+            if bytes_in is not None:
+                # Степень сжатия считается только относительно PNG от браузера
+                self.stats['png_bytes_in'] += bytes_in
+                self.stats['png_bytes_out'] += len(data)
+            self.stats['encode_seconds'] += time.perf_counter() - started
+        return str(path)
+
+    def _save_thumbnail(self, image, path):
+        """Миниатюра верха страницы в пропорциях SCREENSHOT_THUMBNAIL_SIZE из уже декодированного изображения"""
+        size = tuple(self.config.SCREENSHOT_THUMBNAIL_SIZE)
+        top = image.width * size[1] // size[0]
+        thumbnail = image.crop((0, 0, image.width, top)) if image.height > top * 2 else image.copy()
+        thumbnail = thumbnail.convert('RGB')
+        thumbnail.thumbnail(size)
+        target = self.thumbnail_path(path)
+        temporary = target.with_name(target.name + '.tmp')
+        thumbnail.save(temporary, format='JPEG', quality=85)
+        os.replace(temporary, target)
+
+    @staticmethod
+    def thumbnail_path(path):
+        """Файл миниатюры рядом со снимком: <хеш>.thumb.jpg"""
+        path = Path(path)
+        return path.with_name(f"{path.stem}.thumb.jpg")
+
+    def _blob(self, path):
+        return path.relative_to(self.root).as_posix()
+
+    def _append_manifest(self, entry):
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({**entry, 'created': time.time()}, ensure_ascii=False) + "\n")
+
+    @staticmethod
+    def _save(image, fmt):
+        pil_format, options = ENCODERS[fmt]
+        buffer = io.BytesIO()
+        if pil_format == 'AVIF' and image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGB')
+        image.save(buffer, format=pil_format, **options)
+        return buffer.getvalue()
+
+    def wait(self, path):
+        """Ожидание кодирования файла (если оно ещё идёт)"""
+        future = self._pending.get(str(path))
+        if future is not None:
+            future.result()
+            with self._state_lock:
+                self._pending.pop(str(path), None)
+
+    def open(self, path):
+        """Открытие изображения после завершения его кодирования"""
+        self.wait(path)
+        return Image.open(path)
+
+    def scan_of(self, path):
+        """Сканирование, к которому относится файл"""
+        return self._scans.get(str(path))
+
+    def scan_blobs(self, scan):
+        """Записи манифеста для сканирования"""
+        if not self.manifest_path.exists():
+            return []
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            return [entry for entry in map(json.loads, f) if entry.get('scan') == scan]
+
+    def flush(self):
+        """Ожидание всех файлов в очереди"""
+        for path in list(self._pending):
+            try:
+                self.wait(path)
+            except Exception as e:
+                self.logger.error(f"Ошибка записи скриншота {path}: {str(e)}")
+                self._pending.pop(path, None)
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats['encode_seconds'] = round(stats['encode_seconds'], 3)
+        stats['compression_ratio'] = (
+            round(stats['png_bytes_in'] / stats['png_bytes_out'], 2) if stats['png_bytes_out'] else None
+        )
+        return stats
+
+    def close(self):
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+    @classmethod
+    def reset(cls):
+        if cls._instance is not None:
+            cls._instance.close()
+        cls._instance = None
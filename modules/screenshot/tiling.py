@@ -0,0 +1,219 @@
+import io
+import os
+import struct
+import zlib
+from pathlib import Path
+import numpy as np
+from PIL import Image
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Байт на пиксель для 8-битных PNG по типу цвета (L, RGB, палитра, LA, RGBA)
+BYTES_PER_PIXEL = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# Сжатых данных IDAT, читаемых из файла за раз
+READ_SIZE = 64 * 1024
+
+# Фильтр строки PNG «Up»: разность с предыдущей строкой
+FILTER_UP = 2
+
+
+def _chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+class PNGStripReader:
+    """
+    Потоковое чтение PNG горизонтальными полосами
+
+    Данные IDAT распаковываются по частям; отфильтрованные строки полосы
+    вместе с уже восстановленной предыдущей строкой (фильтр None)
+    собираются в маленький PNG, который декодирует Pillow. Так фильтры
+    Sub/Up/Average/Paeth восстанавливаются в C, а в памяти находится только
+    одна полоса. Поддерживаются 8-битные PNG без чересстрочности —
+    такие снимает браузер и пишет хранилище скриншотов.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.header = None
+        self.extra = []
+        with open(self.path, 'rb') as f:
+            if f.read(8) != PNG_SIGNATURE:
+                return
+            while True:
+                head = f.read(8)
+                if len(head) < 8:
+                    return
+                length, kind = struct.unpack('>I4s', head)
+                if kind == b'IDAT':
+                    break
+                data = f.read(length)
+                f.seek(4, os.SEEK_CUR)
+                if kind == b'IHDR':
+                    self.header = struct.unpack('>IIBBBBB', data)
+                elif kind in (b'PLTE', b'tRNS'):
+                    self.extra.append(_chunk(kind, data))
+
+    @property
+    def supported(self):
+        if self.header is None:
+            return False
+        _, _, depth, color, _, _, interlace = self.header
+        return depth == 8 and interlace == 0 and color in BYTES_PER_PIXEL
+
+    @property
+    def size(self):
+        return self.header[0], self.header[1]
+
+    def _idat(self, f):
+        """Сжатые данные всех IDAT частями не больше READ_SIZE"""
+        f.seek(8)
+        while True:
+            head = f.read(8)
+            if len(head) < 8:
+                return
+            length, kind = struct.unpack('>I4s', head)
+            if kind == b'IEND':
+                return
+            if kind != b'IDAT':
+                f.seek(length + 4, os.SEEK_CUR)
+                continue
+            while length:
+                piece = f.read(min(length, READ_SIZE))
+                length -= len(piece)
+                yield piece
+            f.seek(4, os.SEEK_CUR)
+
+    def strips(self, strip_height):
+        """
+        Returns:
+            iterator: (верхняя строка, PIL.Image полосы) сверху вниз
+        """
+        width, height = self.size
+        stride = width * BYTES_PER_PIXEL[self.header[3]] + 1
+        limit = stride * strip_height
+        inflater = zlib.decompressobj()
+        previous = bytes(stride - 1)
+        buffer = bytearray()
+        top = 0
+
+        with open(self.path, 'rb') as f:
+            for piece in self._idat(f):
+                while piece:
+                    buffer += inflater.decompress(piece, limit)
+                    piece = inflater.unconsumed_tail
+                    while len(buffer) >= limit and top < height:
+                        count = min(strip_height, height - top)
+                        strip, previous = self._decode(bytes(buffer[:stride * count]), count, previous)
+                        del buffer[:stride * count]
+                        yield top, strip
+                        top += count
+        buffer += inflater.flush()
+
+        if top < height:
+            count = height - top
+            if len(buffer) < stride * count:
+                raise ValueError(f"Обрезанный PNG: {self.path}")
+            strip, _ = self._decode(bytes(buffer[:stride * count]), count, previous)
+            yield top, strip
+
+    def _decode(self, rows, count, previous):
+        width, _, depth, color, _, _, _ = self.header
+        data = b'\x00' + previous + rows
+        mini = b''.join([
+            PNG_SIGNATURE,
+            _chunk(b'IHDR', struct.pack('>IIBBBBB', width, count + 1, depth, color, 0, 0, 0)),
+            *self.extra,
+            # Без сжатия: данные лишь упаковываются в zlib-поток для декодера
+            _chunk(b'IDAT', zlib.compress(data, 0)),
+            _chunk(b'IEND', b'')
+        ])
+        image = Image.open(io.BytesIO(mini))
+        image.load()
+        last = image.crop((0, count, width, count + 1)).tobytes()
+        return image.crop((0, 1, width, count + 1)), last
+
+
+def image_strips(path, strip_height):
+    """
+    Полосы изображения сверху вниз
+
+    PNG читается потоково (PNGStripReader); остальные форматы (WebP, AVIF)
+    частичного декодирования не поддерживают и декодируются целиком.
+    """
+    reader = PNGStripReader(path)
+    if reader.supported:
+        yield from reader.strips(strip_height)
+        return
+    image = Image.open(path)
+    image.load()
+    for top in range(0, image.height, strip_height):
+        yield top, image.crop((0, top, image.width, min(top + strip_height, image.height)))
+
+
+class PNGStripWriter:
+    """
+    Потоковая запись RGB PNG полосами
+
+    Строки кодируются фильтром Up (векторно, NumPy) и сжимаются одним
+    zlib.compressobj; готовые IDAT сразу пишутся во временный файл,
+    который после close() переименовывается в целевой.
+    """
+
+    def __init__(self, path, width, height, level=6):
+        self.path = Path(path)
+        self.width = width
+        self.height = height
+        self.rows = 0
+        self._previous = np.zeros((1, width * 3), dtype=np.uint8)
+        self._deflater = zlib.compressobj(level)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._temporary = self.path.with_name(self.path.name + '.tmp')
+        self._file = open(self._temporary, 'wb')
+        self._file.write(PNG_SIGNATURE + _chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        self.bytes_written = self._file.tell()
+
+    def write(self, strip):
+        """Добавление следующей полосы ширины width"""
+        if strip.mode != 'RGB':
+            strip = strip.convert('RGB')
+        rows = np.asarray(strip, dtype=np.uint8).reshape(strip.height, self.width * 3)
+        filtered = np.empty((strip.height, self.width * 3 + 1), dtype=np.uint8)
+        filtered[:, 0] = FILTER_UP
+        filtered[:, 1:] = rows - np.vstack((self._previous, rows[:-1]))
+        self._previous = rows[-1:].copy()
+        self.rows += strip.height
+        self._write_idat(self._deflater.compress(filtered.tobytes()))
+
+    def _write_idat(self, data):
+        if data:
+            chunk = _chunk(b'IDAT', data)
+            self._file.write(chunk)
+            self.bytes_written += len(chunk)
+
+    def close(self):
+        if self._file.closed:
+            return
+        try:
+            if self.rows != self.height:
+                raise ValueError(f"Записано {self.rows} строк из {self.height}")
+            self._write_idat(self._deflater.flush())
+            self._file.write(_chunk(b'IEND', b''))
+            self._file.close()
+            os.replace(self._temporary, self.path)
+        finally:
+            if not self._file.closed:
+                self._file.close()
+            if self._temporary.exists():
+                self._temporary.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+            self._temporary.unlink(missing_ok=True)
@@ -1,7 +1,20 @@
 import pytest
 from unittest.mock import MagicMock, patch
+from selenium.webdriver.remote.webelement import WebElement
 from config.settings import Settings
+from config.rule_packs import RuleRegistry
 
+# Сети объявлений make_scan: чередуются по номеру объявления
+SCAN_NETWORKS = ['yandex_ads', 'google_ads', 'mytarget_ads', 'unknown']
+
+
+@pytest.fixture(autouse=True)
+def rules_cache_dir(tmp_path_factory):
+    """Кэш скомпилированных правил во временном каталоге, а не в OUTPUT_DIR"""
+    cache_dir = tmp_path_factory.getbasetemp() / "rules_cache"
+    RuleRegistry.configure(cache_dir=cache_dir)
+    yield cache_dir
+    RuleRegistry.configure(cache_dir=cache_dir)
 
 @pytest.fixture
 def mock_config():
@@ -12,6 +25,37 @@ def mock_config():
     config.MAX_RETRIES = 3
     return config
 
+@pytest.fixture
+def make_scan():
+    """
+    Фабрика данных сканирования, как их пишет команда scan
+
+    make_scan(domain, ads=1, timestamp=..., creative=None, interactions=0, element=False):
+    у объявлений чередуются сеть, уверенность ((i % 10) / 10) и высота (50 * (i % 5));
+    element=True добавляет WebElement, который не сериализуется в JSON.
+    """
+    def factory(domain, ads=1, timestamp=1700000000, creative=None, interactions=0, element=False):
+        url = f"https://{domain}/"
+        detected_ads = [{
+            'id': i + 1, 'network': SCAN_NETWORKS[i % len(SCAN_NETWORKS)], 'type': 'banner',
+            'confidence': (i % 10) / 10, 'detection_method': 'selector',
+            'size': {'width': 300, 'height': 50 * (i % 5)}, 'location': {'x': 10, 'y': 400 + 300 * i},
+            'creative_id': f"{i:016x}", 'screenshot_path': str(creative) if creative else None
+        } for i in range(ads)]
+        if element:
+            for ad in detected_ads:
+                ad['element'] = WebElement(MagicMock(), "f.1.d.2.e.3")
+        return {
+            'url': url,
+            'main_domain': domain,
+            'scan_timestamp': timestamp,
+            'scan_duration': 12.5,
+            'detected_ads': detected_ads,
+            'interaction_results': [{}] * interactions,
+            'processed_urls': [url]
+        }
+    return factory
+
 @pytest.fixture
 def mock_driver():
     """Фикстура для мока Selenium WebDriver"""
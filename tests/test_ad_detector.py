@@ -5,6 +5,7 @@ from unittest.mock import Mock, MagicMock, patch
 from selenium.webdriver.common.by import By
 from modules.detection.ad_detector import AdDetector
 from config.ad_patterns import AdPatterns
+from config.settings import Settings
 
 @allure.epic("Detection Module")
 @allure.feature("Ad Detector")
@@ -74,4 +75,141 @@ class TestAdDetector:
         assert 'size' in element_info
         assert 'location' in element_info
         assert 'is_displayed' in element_info
-        assert 'attributes' in element_info
\ No newline at end of file
+        assert 'attributes' in element_info
+
+    @allure.title("Test mutation observer buffer drain")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_detect_by_observer(self, mock_driver, mock_config):
+        """Тест разбора буфера наблюдателя мутаций"""
+
+        mock_config.OBSERVER_ENABLED = True
+        mock_driver.execute_script.side_effect = [
+            True,
+            {
+                'records': [
+                    {
+                        'key': '1',
+                        'tag': 'div',
+                        'first_seen': 1700000000000,
+                        'rects': [
+                            {'x': 0, 'y': 900, 'width': 0, 'height': 0, 't': 1700000000000},
+                            {'x': 10, 'y': 900, 'width': 728, 'height': 90, 't': 1700000000500}
+                        ],
+                        'attributes': {'class': 'yandex_rtb_R-A-1', 'id': 'adfox_123'},
+                        'connected': False,
+                        'element': None
+                    },
+                    {
+                        'key': '2',
+                        'tag': 'div',
+                        'first_seen': 1700000001000,
+                        'rects': [{'x': 0, 'y': 0, 'width': 100, 'height': 100, 't': 1700000001000}],
+                        'attributes': {'class': 'content', 'id': ''},
+                        'connected': True,
+                        'element': None
+                    }
+                ],
+                'dropped': 0
+            }
+        ]
+
+        ad_detector = AdDetector(mock_driver, mock_config)
+
+        assert ad_detector.start_observing() is True
+
+        ads = ad_detector._detect_by_observer()
+
+        assert len(ads) == 1
+        assert ads[0]['id'] == 'observer_1'
+        assert ads[0]['network'] == 'yandex_ads'
+        assert ads[0]['size'] == {'width': 728, 'height': 90}
+        assert len(ads[0]['rect_history']) == 2
+
+    @allure.title("Test per-domain selector cache")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_selector_cache_hit(self, mock_driver, mock_config, tmp_path):
+        """Тест повторного сканирования домена по кэшированным селекторам"""
+
+        mock_config.CACHE_DIR = tmp_path
+        mock_config.SELECTOR_CACHE_ENABLED = True
+        mock_config.SELECTOR_CACHE_MAX_DOMAINS = 10
+        mock_config.SELECTOR_CACHE_MAX_SELECTORS = 10
+        mock_config.SELECTOR_CACHE_MAX_AGE_DAYS = 30
+        mock_config.SELECTOR_CACHE_FULL_SWEEP_EVERY = 5
+        mock_driver.current_url = "https://www.rbc.ru/"
+
+        first_scan = AdDetector(mock_driver, mock_config)
+        assert len(first_scan.detect_ads()) == 1
+        assert (tmp_path / "selector_cache.json").exists()
+
+        mock_driver.find_elements.reset_mock()
+
+        second_scan = AdDetector(mock_driver, mock_config)
+        assert len(second_scan.detect_ads()) == 1
+
+        mock_driver.find_elements.assert_called_once_with(
+            By.CSS_SELECTOR, "#adfox_09876543, .yandex_rtb_78654387654"
+        )
+        assert second_scan.selector_cache.get_metrics()['hit_rate'] == 1.0
+
+    @allure.title("Test single combined pattern query")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_detect_by_combined_query(self, mock_driver, mock_config):
+        """Тест единого запроса по всем паттернам классов и ID"""
+
+        element = MagicMock()
+        element.id = "f.1A2B.d.3C4D.e.77"
+        mock_driver.execute_script.return_value = [{
+            'element': element,
+            'tag': 'div',
+            'families': ['class_pattern', 'id_pattern'],
+            'attributes': {'class': 'yandex_rtb_R-A-1', 'id': 'adfox_123', 'data-ad-slot': '42'},
+            'size': {'width': 300, 'height': 250},
+            'location': {'x': 10, 'y': 20},
+            'is_displayed': True
+        }]
+
+        ad_detector = AdDetector(mock_driver, mock_config)
+
+        ads = ad_detector._detect_by_pattern_sweep()
+
+        assert len(ads) == 1
+        assert ads[0]['id'] == '77'
+        assert ads[0]['detection_method'] == 'class_pattern'
+        assert ads[0]['matched_families'] == ['class_pattern', 'id_pattern']
+        assert ads[0]['ad_score'] == 0.9
+        selector = mock_driver.execute_script.call_args[0][1]
+        assert selector.count(',') == len(AdPatterns.AD_CLASS_PATTERNS) + len(AdPatterns.AD_ID_PATTERNS) - 1
+        mock_driver.find_elements.assert_not_called()
+        element.get_attribute.assert_not_called()
+
+    @allure.title("Test batch scoring with loaded model weights")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_detect_with_model_scoring(self, mock_driver, mock_config):
+        """Тест оценки кандидатов моделью AdScorer вместо эвристик"""
+
+        mock_config.SCORING_WEIGHTS_PATH = Settings.SCORING_WEIGHTS_PATH
+        mock_config.SCORING_HISTORY_ENABLED = False
+        candidate = {
+            'tag': 'div',
+            'families': ['class_pattern', 'id_pattern'],
+            'attributes': {'class': 'yandex_rtb_R-A-1', 'id': 'adfox_123'},
+            'size': {'width': 300, 'height': 250},
+            'location': {'x': 10, 'y': 20},
+            'is_displayed': True
+        }
+        mock_driver.execute_script.return_value = [{**candidate, 'element': MagicMock(id="f.1.d.2.e.5")}]
+
+        ad_detector = AdDetector(mock_driver, mock_config)
+        assert ad_detector.ad_scorer.is_loaded
+
+        ads = ad_detector._detect_by_pattern_sweep()
+
+        expected = ad_detector.ad_scorer.score(ad_detector.feature_extractor.extract([candidate]))[0]
+        assert len(ads) == 1
+        assert ads[0]['ad_score'] == pytest.approx(expected)
+        assert ads[0]['ad_score'] != 0.9
@@ -0,0 +1,81 @@
+import json
+import pytest
+import allure
+import numpy as np
+from allure_commons.types import Severity
+from config.settings import Settings
+from modules.detection.ad_scorer import AdScorer
+from modules.detection.feature_extractor import FeatureExtractor, FEATURE_NAMES
+from modules.detection.calibration import calibrate
+
+YANDEX_SLOT = {
+    'attributes': {'class': 'yandex_rtb_R-A-1', 'id': 'adfox_1'},
+    'size': {'width': 300, 'height': 250},
+    'location': {'x': 0, 'y': 400},
+    'is_displayed': True,
+    'families': ['class_pattern', 'id_pattern']
+}
+
+PLAIN_BLOCK = {
+    'attributes': {'class': 'article', 'id': 'content'},
+    'size': {'width': 1200, 'height': 3000},
+    'location': {'x': 0, 'y': 0},
+    'is_displayed': True,
+    'families': []
+}
+
+@allure.epic("Detection Module")
+@allure.feature("Ad Scorer")
+class TestAdScorer:
+
+    @allure.title("Test batch feature extraction")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_extract_features(self):
+        """Тест построения матрицы признаков"""
+
+        features = FeatureExtractor().extract([YANDEX_SLOT, PLAIN_BLOCK])
+
+        assert features.shape == (2, len(FEATURE_NAMES))
+        row = dict(zip(FEATURE_NAMES, features[0]))
+        assert row['class_pattern'] == 1
+        assert row['standard_size'] == 1
+        assert row['network_confidence'] == pytest.approx(0.9)
+        assert features[1, FEATURE_NAMES.index('standard_size')] == 0
+
+    @allure.title("Test default weights score the whole batch")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_default_weights_score(self):
+        """Тест оценки пакета весами по умолчанию"""
+
+        scorer = AdScorer(Settings.SCORING_WEIGHTS_PATH)
+        assert scorer.is_loaded
+
+        scores = scorer.score(FeatureExtractor().extract([YANDEX_SLOT, PLAIN_BLOCK]))
+
+        assert scores[0] > 0.9
+        assert scores[1] < 0.3
+
+    @allure.title("Test offline calibration on labelled history")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_calibration(self, tmp_path):
+        """Тест калибровки весов по размеченной истории"""
+
+        history_path = tmp_path / "history.jsonl"
+        with open(history_path, 'w', encoding='utf-8') as f:
+            for _ in range(20):
+                f.write(json.dumps({**YANDEX_SLOT, 'label': 1}) + "\n")
+                f.write(json.dumps({**PLAIN_BLOCK, 'label': 0}) + "\n")
+            f.write(json.dumps({**PLAIN_BLOCK, 'label': None}) + "\n")
+
+        weights_path = tmp_path / "weights.json"
+        result = calibrate(history_path, weights_path, epochs=500)
+
+        assert result['samples'] == 40
+        assert result['accuracy'] == 1.0
+
+        scorer = AdScorer(weights_path)
+        scores = scorer.score(FeatureExtractor().extract([YANDEX_SLOT, PLAIN_BLOCK]))
+        assert np.all(np.diff(scores) < 0)
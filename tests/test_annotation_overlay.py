@@ -0,0 +1,150 @@
+import json
+import argparse
+import pytest
+import allure
+from PIL import Image
+from allure_commons.types import Severity
+from config.settings import Settings
+from modules.screenshot.annotator import ScreenshotAnnotator
+import main
+
+ADS = [
+    {'id': 1, 'network': 'yandex_ads', 'confidence': 0.9,
+     'location': {'x': 100, 'y': 150}, 'size': {'width': 300, 'height': 250}},
+    {'id': 2, 'network': 'google_ads', 'confidence': 0.65,
+     'location': {'x': 500, 'y': 0}, 'size': {'width': 728, 'height': 90}},
+    {'id': 3, 'network': 'unknown', 'confidence': 0.4,
+     'location': {'x': 10, 'y': 10}, 'size': {'width': 0, 'height': 0}}
+]
+
+
+@pytest.fixture
+def screenshot(tmp_path):
+    path = tmp_path / "ria.ru_fullpage.png"
+    Image.new('RGB', (1280, 900), 'white').save(path)
+    return path
+
+
+@pytest.fixture
+def annotator(mock_config):
+    mock_config.SCREENSHOT_STORAGE_ENABLED = False
+    mock_config.ANNOTATION_HTML_VIEWER = True
+    mock_config.ANNOTATION_TILE_THRESHOLD = Settings.ANNOTATION_TILE_THRESHOLD
+    return ScreenshotAnnotator(mock_config)
+
+
+@allure.epic("Screenshot")
+@allure.feature("Annotation Overlay")
+class TestAnnotationOverlay:
+
+    @allure.title("Test overlay describes visible ads with annotator colours")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_build_and_save(self, annotator, screenshot):
+        """Тест описания разметки и HTML-просмотрщика"""
+
+        overlay = annotator.build_overlay(ADS, screenshot)
+        path = annotator.save_overlay(overlay)
+
+        assert path == str(screenshot.with_name("ria.ru_fullpage.overlay.json"))
+        assert annotator.load_overlay(path) == overlay
+        assert [box['id'] for box in overlay['boxes']] == [1, 2]
+        assert overlay['boxes'][0]['color'] == [0, 0, 255, 180]
+        assert overlay['boxes'][1]['label'] == "2. google_ads (0.7)"
+        assert [entry['name'] for entry in overlay['legend']] == ['Yandex', 'Google', 'Unknown']
+
+        page = screenshot.with_name("ria.ru_fullpage.overlay.html").read_text(encoding='utf-8')
+        assert 'src="ria.ru_fullpage.png"' in page
+        assert '"label": "1. yandex_ads (0.9)"' in page
+
+    @allure.title("Test rendering a stored overlay matches eager annotation")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_render_matches_annotate(self, annotator, screenshot, tmp_path):
+        """Тест отрисовки сохранённой разметки"""
+
+        eager = annotator.annotate_ads_on_screenshot(str(screenshot), ADS, tmp_path / "eager.png")
+        overlay = annotator.load_overlay(annotator.save_overlay(annotator.build_overlay(ADS, screenshot)))
+        lazy = annotator.render_overlay(overlay, tmp_path / "lazy.png")
+
+        assert Image.open(lazy).tobytes() == Image.open(eager).tobytes()
+        assert Image.open(lazy).getpixel((100, 300)) == (75, 75, 255)
+
+    @allure.title("Test render command draws only the requested domains")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_render_command(self, mock_config, screenshot, tmp_path):
+        """Тест команды render по scan_data.jsonl"""
+
+        mock_config.SCREENSHOT_STORAGE_ENABLED = False
+        mock_config.ANNOTATION_TILE_THRESHOLD = Settings.ANNOTATION_TILE_THRESHOLD
+        scan_data = tmp_path / "scan_data.jsonl"
+        with open(scan_data, 'w', encoding='utf-8') as f:
+            for domain in ('ria.ru', 'rbc.ru'):
+                f.write(json.dumps({'main_domain': domain, 'detected_ads': ADS,
+                                    'full_page_screenshot': str(screenshot)}) + "\n")
+
+        args = argparse.Namespace(input=str(scan_data), domain=['ria.ru'], comparison=True, legend=False, html=False)
+        rendered = main.command_render(mock_config, args)
+
+        assert len(rendered) == 1
+        assert Image.open(rendered[0]['annotated']).size == (1280, 900)
+        assert Image.open(rendered[0]['comparison']).size == (2560, 900)
+
+    @allure.title("Test overlays are keyed by scan and a broken scan does not stop render")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_overlay_per_scan(self, mock_config, screenshot, tmp_path, monkeypatch):
+        """Тест разметки по сканированию и пропуска битого сканирования"""
+
+        mock_config.SCREENSHOT_STORAGE_ENABLED = False
+        mock_config.ANNOTATION_HTML_VIEWER = False
+        mock_config.ANNOTATION_MODE = "overlay"
+        mock_config.ANNOTATION_TILE_THRESHOLD = Settings.ANNOTATION_TILE_THRESHOLD
+
+        first = main.render_annotations(mock_config, ADS, str(screenshot), "ria.ru_100")
+        second = main.render_annotations(mock_config, ADS[:1], str(screenshot), "ria.ru_200")
+        assert first == str(screenshot.with_name("ria.ru_100.overlay.json"))
+        assert len(json.loads(open(first, encoding='utf-8').read())['boxes']) == 2
+        assert len(json.loads(open(second, encoding='utf-8').read())['boxes']) == 1
+        with monkeypatch.context() as patch:
+            patch.setattr(ScreenshotAnnotator, 'build_overlay', lambda *args: 1 / 0)
+            assert main.render_annotations(mock_config, ADS, str(screenshot), "rbc.ru_100") is None
+
+        scan_data = tmp_path / "scan_data.jsonl"
+        with open(scan_data, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'main_domain': 'rbc.ru', 'detected_ads': ADS,
+                                'full_page_screenshot': str(tmp_path / "missing.png")}) + "\n")
+            f.write(json.dumps({'main_domain': 'ria.ru', 'detected_ads': ADS, 'annotation_overlay': first,
+                                'full_page_screenshot': str(screenshot)}) + "\n")
+
+        args = argparse.Namespace(input=str(scan_data), domain=None, comparison=False, legend=False, html=False)
+        rendered = main.command_render(mock_config, args)
+
+        assert [entry['main_domain'] for entry in rendered] == ['ria.ru']
+
+    @allure.title("Test CDP scans are annotated before they are written")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_cdp_overlay_before_write(self, mock_config, screenshot, monkeypatch):
+        """Тест разметки сканирования DevTools до записи результата"""
+
+        from modules.cdp.pipeline import AsyncScanPipeline
+
+        mock_config.SCREENSHOT_STORAGE_ENABLED = False
+        mock_config.ANNOTATION_HTML_VIEWER = False
+        mock_config.ANNOTATION_MODE = "overlay"
+        mock_config.ANNOTATION_TILE_THRESHOLD = Settings.ANNOTATION_TILE_THRESHOLD
+        scan_data = {'main_domain': 'ria.ru', 'scan_key': 'ria.ru_1700000000', 'ad_summary': {},
+                     'detected_ads': ADS, 'full_page_screenshot': str(screenshot)}
+        written = []
+
+        async def run(self, urls, on_result=None):
+            on_result(scan_data)
+            return [scan_data]
+
+        monkeypatch.setattr(AsyncScanPipeline, '__init__', lambda self, config: None)
+        monkeypatch.setattr(AsyncScanPipeline, 'run', run)
+        main.run_cdp_scans(['https://ria.ru/'], mock_config, lambda data: written.append(data.get('annotation_overlay')))
+
+        assert written == [str(screenshot.with_name("ria.ru_1700000000.overlay.json"))]
@@ -0,0 +1,247 @@
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import time
+import pytest
+import allure
+from allure_commons.types import Severity
+from config.settings import Settings
+from modules.cdp.websocket import AsyncWebSocket, encode_frame, WEBSOCKET_GUID, OPCODE_TEXT, OPCODE_PING, OPCODE_CONTINUATION
+from modules.cdp.connection import CDPConnection, CDPSession, CDPError
+from modules.cdp.ad_detector import AsyncAdDetector
+from modules.cdp.pipeline import AsyncScanPipeline
+from modules.detection.selector_cache import SelectorCache
+
+
+async def read_client_frame(reader):
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack('!H', await reader.readexactly(2))[0]
+    mask = await reader.readexactly(4)
+    payload = bytes(b ^ mask[i % 4] for i, b in enumerate(await reader.readexactly(length)))
+    return first & 0x0F, payload
+
+
+class FakeWebSocket:
+    """Браузер в памяти: отвечает на команды и шлёт события"""
+
+    def __init__(self):
+        self.incoming = asyncio.Queue()
+        self.closed = False
+
+    async def send(self, message):
+        message = json.loads(message)
+        if message['method'] == 'Broken.method':
+            await self.incoming.put({'id': message['id'], 'error': {'code': -32601, 'message': 'not found'}})
+            return
+        await self.incoming.put({'method': 'Page.loadEventFired', 'sessionId': message.get('sessionId'),
+                                 'params': {'timestamp': 1}})
+        await self.incoming.put({'id': message['id'], 'result': {'echo': message['params']}})
+
+    async def recv(self):
+        return json.dumps(await self.incoming.get())
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    """Сеанс вкладки, возвращающий заранее заданных кандидатов"""
+
+    def __init__(self, candidates, url="https://ria.ru/"):
+        self.candidates = candidates
+        self.url = url
+        self.calls = []
+
+    async def evaluate(self, expression, await_promise=False):
+        return self.url
+
+    async def call(self, function_body, *args):
+        self.calls.append(args)
+        return self.candidates
+
+
+@allure.epic("CDP Module")
+@allure.feature("Async DevTools backend")
+class TestCDP:
+
+    @allure.title("Test websocket handshake, masking, ping and fragmentation")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_websocket_roundtrip(self):
+        """Тест клиента WebSocket против локального сервера"""
+
+        received = {}
+
+        async def handler(reader, writer):
+            request = (await reader.readuntil(b"\r\n\r\n")).decode()
+            key = [l.split(':', 1)[1].strip() for l in request.split("\r\n") if l.lower().startswith('sec-websocket-key')][0]
+            accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+            writer.write(f"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                         f"Connection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n\r\n".encode())
+            opcode, payload = await read_client_frame(reader)
+            received['message'] = payload.decode()
+
+            reply = ("echo:" + payload.decode() * 100).encode()
+            writer.write(encode_frame(OPCODE_PING, b"p", mask=False))
+            writer.write(bytes([OPCODE_TEXT]) + encode_frame(OPCODE_TEXT, reply[:10], mask=False)[1:])
+            writer.write(encode_frame(OPCODE_CONTINUATION, reply[10:], mask=False))
+            await writer.drain()
+            received['pong'] = await read_client_frame(reader)
+
+        async def scenario():
+            server = await asyncio.start_server(handler, '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                websocket = await AsyncWebSocket.connect(f"ws://127.0.0.1:{port}/devtools/browser/x")
+                await websocket.send("hello")
+                reply = await websocket.recv()
+                await asyncio.sleep(0.05)
+                await websocket.close()
+                return reply
+
+        reply = asyncio.run(scenario())
+
+        assert received['message'] == "hello"
+        assert reply == "echo:" + "hello" * 100
+        assert received['pong'] == (0xA, b"p")
+
+    @allure.title("Test commands, session events and errors are multiplexed over one connection")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_connection_routing(self):
+        """Тест сопоставления ответов и событий по сеансам"""
+
+        async def scenario():
+            connection = CDPConnection(FakeWebSocket(), timeout=2)
+            connection.start()
+            first, second = CDPSession(connection, 'S1', 'T1'), CDPSession(connection, 'S2', 'T2')
+
+            loaded = second.expect('Page.loadEventFired')
+            results = await asyncio.gather(
+                first.send('Page.navigate', {'url': 'a'}),
+                second.send('Page.navigate', {'url': 'b'})
+            )
+            event = await asyncio.wait_for(loaded, 1)
+
+            with pytest.raises(CDPError, match="Broken.method"):
+                await first.send('Broken.method')
+            await connection.close()
+            return results, event
+
+        results, event = asyncio.run(scenario())
+
+        assert [r['echo']['url'] for r in results] == ['a', 'b']
+        assert event == {'timestamp': 1}
+
+    @allure.title("Test async detector scores marked candidates in one batch")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_async_detect_ads(self, mock_config):
+        """Тест асинхронного обнаружения рекламы"""
+
+        mock_config.SELECTOR_CACHE_ENABLED = False
+        mock_config.SCORING_WEIGHTS_PATH = Settings.SCORING_WEIGHTS_PATH
+        slot = {
+            'marker': 'q1', 'tag': 'div', 'families': ['class_pattern'], 'is_displayed': True,
+            'attributes': {'class': 'yandex_rtb_R-A-1', 'id': ''},
+            'size': {'width': 300, 'height': 250}, 'location': {'x': 10, 'y': 400}
+        }
+        session = FakeSession([slot, {**slot, 'marker': 'q2'}])
+
+        ads = asyncio.run(AsyncAdDetector(session, mock_config).detect_ads())
+
+        assert len(session.calls) == 1
+        assert len(ads) == 1
+        assert ads[0]['selector'] == '[data-adparser-id="q1"]'
+        assert ads[0]['network'] == 'yandex_ads'
+        assert 'element' not in ads[0]
+
+    @allure.title("Test tabs share one selector cache saved once")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_shared_selector_cache(self, mock_config, tmp_path):
+        """Тест общего кэша селекторов для вкладок с разными доменами"""
+
+        mock_config.CACHE_DIR = tmp_path
+        mock_config.SELECTOR_CACHE_ENABLED = True
+        mock_config.SELECTOR_CACHE_MAX_DOMAINS = 10
+        mock_config.SELECTOR_CACHE_MAX_SELECTORS = 10
+        mock_config.SELECTOR_CACHE_MAX_AGE_DAYS = 30
+        mock_config.SELECTOR_CACHE_FULL_SWEEP_EVERY = 5
+        mock_config.SCORING_WEIGHTS_PATH = Settings.SCORING_WEIGHTS_PATH
+        slot = {
+            'marker': 'q1', 'tag': 'div', 'families': ['class_pattern'], 'is_displayed': True,
+            'attributes': {'class': 'yandex_rtb_R-A-1', 'id': ''},
+            'size': {'width': 300, 'height': 250}, 'location': {'x': 10, 'y': 400}
+        }
+        cache = SelectorCache(mock_config)
+
+        async def scenario():
+            return await asyncio.gather(
+                AsyncAdDetector(FakeSession([slot], "https://ria.ru/"), mock_config, cache).detect_ads(),
+                AsyncAdDetector(FakeSession([slot], "https://www.rbc.ru/"), mock_config, cache).detect_ads()
+            )
+
+        asyncio.run(scenario())
+        assert not (tmp_path / "selector_cache.json").exists()
+
+        cache.save()
+        with open(tmp_path / "selector_cache.json", encoding='utf-8') as f:
+            saved = json.load(f)['domains']
+        assert set(saved) == {'ria.ru', 'rbc.ru'}
+        assert set(saved['ria.ru']) == {'selectors', 'hits', 'misses', 'scans_since_sweep', 'last_seen'}
+
+    @allure.title("Test result callback runs off the event loop")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_result_callback_off_loop(self, mock_config):
+        """Тест вызова on_result вне цикла событий: вкладки не ждут записи"""
+
+        mock_config.CDP_BROWSERS = 1
+        mock_config.CDP_TABS_PER_BROWSER = 2
+        mock_config.CDP_ISOLATE_CONTEXTS = False
+        mock_config.SELECTOR_CACHE_ENABLED = False
+        pipeline = AsyncScanPipeline(mock_config)
+        handled = []
+
+        async def scan(browser, url, browser_context_id=None):
+            await asyncio.sleep(0)
+            return {'url': url}
+
+        def on_result(scan_data):
+            if scan_data['url'] == 'https://a.ru/':
+                raise TypeError("not JSON serializable")
+            time.sleep(0.2)
+            handled.append((scan_data['url'], threading.current_thread() is threading.main_thread()))
+
+        async def scenario():
+            queue = asyncio.Queue()
+            for index, url in enumerate(['https://a.ru/', 'https://b.ru/', 'https://c.ru/']):
+                queue.put_nowait((index, url))
+            results = [None] * 3
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while len(handled) < 2:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                await asyncio.gather(ticker(), *(
+                    pipeline._worker(None, None, queue, results, on_result, executor) for _ in range(2)
+                ))
+            return results, ticks
+
+        pipeline.scan = scan
+        results, ticks = asyncio.run(scenario())
+
+        assert [scan_data['url'] for scan_data in results] == ['https://a.ru/', 'https://b.ru/', 'https://c.ru/']
+        assert sorted(handled) == [('https://b.ru/', False), ('https://c.ru/', False)]
+        assert ticks > 10
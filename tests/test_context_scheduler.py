@@ -0,0 +1,75 @@
+import asyncio
+import pytest
+import allure
+from allure_commons.types import Severity
+from core.context_scheduler import ContextScheduler
+
+
+class FakeBrowserConnection:
+    """Соединение браузера с хранилищем cookies по контекстам"""
+
+    def __init__(self):
+        self.contexts = {}
+        self.created = 0
+
+    async def send(self, method, params=None, session_id=None, timeout=None):
+        params = params or {}
+        if method == 'Target.createBrowserContext':
+            self.created += 1
+            context_id = f"ctx{self.created}"
+            self.contexts[context_id] = []
+            return {'browserContextId': context_id}
+        if method == 'Storage.setCookies':
+            self.contexts[params['browserContextId']].extend(params['cookies'])
+            return {}
+        if method == 'Storage.getCookies':
+            return {'cookies': self.contexts[params['browserContextId']]}
+        if method == 'Target.disposeBrowserContext':
+            del self.contexts[params['browserContextId']]
+            return {}
+        raise AssertionError(method)
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connection = FakeBrowserConnection()
+
+
+@allure.epic("Core")
+@allure.feature("Context Scheduler")
+class TestContextScheduler:
+
+    @allure.title("Test each scan gets its own disposable context and cookie jar")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_context_isolation(self, mock_config, tmp_path):
+        """Тест изоляции контекстов и сохранения cookies по доменам"""
+
+        mock_config.COOKIES_DIR = tmp_path
+        mock_config.CONTEXT_PERSIST_COOKIES = True
+        browser = FakeBrowser()
+        scheduler = ContextScheduler(browser, mock_config, max_contexts=2)
+        seen = {}
+
+        async def scan(domain, cookie):
+            async with scheduler.context(domain) as context_id:
+                seen[domain] = list(browser.connection.contexts[context_id])
+                browser.connection.contexts[context_id].extend([
+                    {'name': 'sid', 'value': cookie, 'domain': f".{domain}"},
+                    {'name': 'tracker', 'value': '1', 'domain': '.ads.example'},
+                    {'name': 'suffix', 'value': '1', 'domain': '.a.ru'}
+                ])
+                await asyncio.sleep(0.01)
+
+        async def scenario():
+            await asyncio.gather(scan('ria.ru', 'a'), scan('rbc.ru', 'b'), scan('tass.ru', 'c'))
+            await scan('ria.ru', 'd')
+
+        asyncio.run(scenario())
+
+        stats = scheduler.get_stats()
+        assert stats['created'] == stats['disposed'] == 4
+        assert stats['peak_active'] == 2
+        assert browser.connection.contexts == {}
+        # Вторая сессия ria.ru получила только свои cookies первой сессии
+        assert seen['ria.ru'] == [{'name': 'sid', 'value': 'a', 'domain': '.ria.ru'}]
@@ -0,0 +1,109 @@
+import io
+import random
+import numpy as np
+import pytest
+import allure
+from PIL import Image, ImageDraw
+from allure_commons.types import Severity
+from modules.screenshot.creative_store import (
+    BKTree, CreativeStore, average_hash, difference_hash, hamming, perceptual_hash
+)
+
+
+def make_creative(seed, size=(300, 250), noise=0):
+    """Баннер из случайных прямоугольников; noise — шум JPEG-подобного пересжатия"""
+    rng = random.Random(seed)
+    image = Image.new('RGB', size, (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(6):
+        x, y = rng.randrange(size[0] - 60), rng.randrange(size[1] - 40)
+        draw.rectangle([x, y, x + rng.randrange(20, 60), y + rng.randrange(10, 40)],
+                       fill=(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    if noise:
+        pixels = np.asarray(image, dtype=np.int16)
+        pixels = pixels + np.random.default_rng(seed).integers(-noise, noise + 1, pixels.shape)
+        image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@allure.epic("Screenshot")
+@allure.feature("Creative Store")
+class TestCreativeStore:
+
+    @allure.title("Test perceptual hashes tolerate re-rendering noise")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_hashes(self):
+        """Тест устойчивости хешей к шуму и масштабу"""
+
+        original = Image.open(io.BytesIO(make_creative(1)))
+        noisy = Image.open(io.BytesIO(make_creative(1, noise=8)))
+        scaled = original.resize((600, 500))
+        other = Image.open(io.BytesIO(make_creative(2)))
+
+        for hash_function in (average_hash, difference_hash, perceptual_hash):
+            assert hamming(hash_function(original), hash_function(noisy)) <= 6
+            assert hamming(hash_function(original), hash_function(scaled)) <= 6
+        assert hamming(perceptual_hash(original), perceptual_hash(other)) > 12
+
+    @allure.title("Test BK-tree radius search matches brute force")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_bk_tree(self):
+        """Тест поиска соседей в BK-дереве"""
+
+        rng = random.Random(3)
+        values = [rng.getrandbits(64) for _ in range(500)]
+        tree = BKTree()
+        for index, value in enumerate(values):
+            tree.add(value, index)
+
+        query = values[10] ^ 0b1011
+        expected = sorted(i for i, v in enumerate(values) if hamming(query, v) <= 8)
+        assert sorted(item for _, item in tree.search(query, 8)) == expected
+        assert tree.search(query, 8)[0] == (3, 10)
+
+    @allure.title("Test repeated creatives are stored once and keep their id")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_dedup(self, tmp_path):
+        """Тест дедупликации креативов между сканированиями"""
+
+        store = CreativeStore(tmp_path, max_distance=6)
+        first = store.add(make_creative(1), {'url': 'https://ria.ru/'})
+        again = store.add(make_creative(1, noise=6), {'url': 'https://rbc.ru/'})
+        other = store.add(make_creative(2))
+
+        assert first['is_new'] and other['is_new']
+        assert not again['is_new']
+        assert again['creative_id'] == first['creative_id'] != other['creative_id']
+        assert len(list(tmp_path.glob('*/*.png'))) == 2
+
+        reloaded = CreativeStore(tmp_path)
+        assert reloaded.add(make_creative(1))['creative_id'] == first['creative_id']
+        assert reloaded.get_stats()['duplicates'] == 1
+        assert reloaded.get_stats()['creatives'] == 2
+
+    @allure.title("Test creatives with equal hashes but different sizes are kept apart")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_dedup_requires_size(self, tmp_path):
+        """Тест одноцветных креативов разных размеров"""
+
+        def solid(size):
+            buffer = io.BytesIO()
+            Image.new('RGB', size, (200, 30, 30)).save(buffer, format='PNG')
+            return buffer.getvalue()
+
+        store = CreativeStore(tmp_path, max_distance=6, size_tolerance=2)
+        rectangle = store.add(solid((300, 250)))
+        leaderboard = store.add(solid((728, 90)))
+        skyscraper = store.add(solid((160, 600)))
+
+        assert rectangle['is_new'] and leaderboard['is_new'] and skyscraper['is_new']
+        assert len({rectangle['creative_id'], leaderboard['creative_id'], skyscraper['creative_id']}) == 3
+        assert len(list(tmp_path.glob('*/*.png'))) == 3
+        assert store.add(solid((728, 91)))['creative_id'] == leaderboard['creative_id']
+        assert store.add(solid((300, 250)))['creative_id'] == rectangle['creative_id']
@@ -0,0 +1,85 @@
+import argparse
+import json
+import pytest
+import allure
+from allure_commons.types import Severity
+from modules.reporting.dashboard import AD_COLUMNS, DOMAIN_COLUMNS, DashboardBuilder
+import main
+
+
+def read_chunk(path):
+    text = path.read_text(encoding='utf-8')
+    return json.loads(text[text.index('['):text.rindex(']') + 1])
+
+
+@allure.epic("Reporting")
+@allure.feature("HTML Dashboard")
+class TestDashboard:
+
+    @allure.title("Test dashboard writes a bundle and paged data chunks")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_bundle_and_chunks(self, mock_config, make_scan, tmp_path):
+        """Тест пакета данных и страниц строк"""
+
+        creative = tmp_path / "creatives" / "ab" / "ab12.png"
+        creative.parent.mkdir(parents=True)
+        creative.write_bytes(b"png")
+        builder = DashboardBuilder(mock_config, tmp_path / "dashboard", page_size=100)
+        index = builder.build(
+            make_scan(f"site{i}.ru", ads=40, timestamp=1700000000 + i, creative=creative, interactions=2) for i in range(30)
+        )
+
+        bundle = json.loads((tmp_path / "dashboard" / "bundle.json").read_text(encoding='utf-8'))
+        assert index.endswith("index.html")
+        assert bundle['summary'] == {'scans': 30, 'ads': 1200, 'interactions': 60, 'domains': 30}
+        assert bundle['networks'] == {'yandex_ads': 300, 'google_ads': 300, 'mytarget_ads': 300, 'unknown': 300}
+        assert [chunk['rows'] for chunk in bundle['chunks']['ads']] == [100] * 12
+        assert len(bundle['chunks']['domains']) == 1
+
+        rows = read_chunk(tmp_path / "dashboard" / "data" / "ads_0003.js")
+        assert len(rows) == 100 and rows[0][0] == "site7.ru"
+        assert rows[0][AD_COLUMNS.index('thumbnail')] == "../creatives/ab/ab12.png"
+
+    @allure.title("Test scans are streamed: chunks are written while results are still read")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_streaming(self, mock_config, make_scan, tmp_path):
+        """Тест потоковой обработки результатов"""
+
+        data_dir = tmp_path / "data"
+        written = []
+
+        def scans():
+            for i in range(20):
+                written.append(len(list(data_dir.glob("ads_*.js"))) if data_dir.exists() else 0)
+                yield make_scan(f"site{i}.ru", ads=50)
+
+        DashboardBuilder(mock_config, tmp_path, page_size=100).build(scans())
+
+        assert written[-1] == 9
+        assert len(list(data_dir.glob("ads_*.js"))) == 10
+
+    @allure.title("Test dashboard command builds the page from scan_data.jsonl")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_command(self, mock_config, make_scan, tmp_path):
+        """Тест команды dashboard"""
+
+        mock_config.DASHBOARD_PAGE_SIZE = 500
+        scan_data = tmp_path / "scan_data.jsonl"
+        with open(scan_data, 'w', encoding='utf-8') as f:
+            for i in range(3):
+                f.write(json.dumps(make_scan(f"site{i}.ru", ads=5)) + "\n")
+            unscored = make_scan("site3.ru", ads=2)
+            unscored['detected_ads'][0]['confidence'] = None
+            f.write(json.dumps(unscored) + "\n")
+
+        index = main.command_dashboard(mock_config, argparse.Namespace(input=str(scan_data), output=str(tmp_path / "out")))
+
+        page = (tmp_path / "out" / "index.html").read_text(encoding='utf-8')
+        assert index == str(tmp_path / "out" / "index.html")
+        assert '<script src="data/bundle.js"></script>' in page
+        assert (tmp_path / "out" / "data" / "bundle.js").read_text(encoding='utf-8').startswith("dashboardBundle({")
+        rows = read_chunk(tmp_path / "out" / "data" / "domains_0000.js")
+        assert rows[-1][DOMAIN_COLUMNS.index('avg_confidence')] == 0.05
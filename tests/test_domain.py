@@ -0,0 +1,69 @@
+import time
+import pytest
+import allure
+from allure_commons.types import Severity
+from modules.detection.selector_cache import SelectorCache
+from modules.interaction.url_analyzer import URLAnalyzer
+from utils.domain import PublicSuffixList, hostname, public_suffix, registrable_domain
+from utils.url_validator import URLValidator
+
+
+@allure.epic("Utils")
+@allure.feature("Domain Normalisation")
+class TestDomain:
+
+    @allure.title("Test eTLD+1 follows public suffix, wildcard and exception rules")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    @pytest.mark.parametrize("url, expected", [
+        ("https://news.bbc.co.uk/world", "bbc.co.uk"),
+        ("https://www.rbc.ru/", "rbc.ru"),
+        ("http://user@Sub.Example.COM.:8080/a", "example.com"),
+        ("foo.bar.kawasaki.jp", "foo.bar.kawasaki.jp"),
+        ("city.kawasaki.jp", "city.kawasaki.jp"),
+        ("a.b.blogspot.com", "b.blogspot.com"),
+        ("https://xn--d1acufc.xn--p1ai/", "домен.рф"),
+        ("http://192.168.0.1/", "192.168.0.1"),
+        ("co.uk", "co.uk"),
+        ("example.com?q=http://evil.com/", "example.com"),
+        ("www.host.ru/p?u=https://x.com", "host.ru"),
+        ("", "")
+    ])
+    def test_registrable_domain(self, url, expected):
+        """Тест извлечения регистрируемого домена"""
+
+        assert registrable_domain(url) == expected
+
+    @allure.title("Test modules share the same domain normaliser")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_call_sites(self):
+        """Тест единообразного извлечения домена в модулях"""
+
+        components = URLAnalyzer().analyze_ad_url("https://news.bbc.co.uk/?utm_source=x")['parsed_components']
+
+        assert components['tld'] == 'bbc.co.uk'
+        assert components['public_suffix'] == 'co.uk'
+        assert SelectorCache.domain_from_url("https://www.news.bbc.co.uk/a") == 'bbc.co.uk'
+        assert URLValidator.extract_domain("https://WWW.rbc.ru:443/x") == 'www.rbc.ru'
+        assert URLValidator.extract_domain("https://www.rbc.ru/", "http://www.rbc.ru:80/")
+        assert URLValidator.extract_registrable_domain("https://www.rbc.ru/") == 'rbc.ru'
+        assert hostname("https://[::1]:8080/") == '::1'
+
+    @allure.title("Test cached lookups stay sub-microsecond")
+    @allure.severity(Severity.MINOR)
+    @pytest.mark.unit
+    def test_lookup_speed(self):
+        """Тест скорости повторных обращений"""
+
+        assert PublicSuffixList.get().rule_count > 9000
+        hosts = [f"https://s{i}.example.co.uk/" for i in range(100)]
+        for host in hosts:
+            registrable_domain(host)
+
+        started = time.perf_counter()
+        for _ in range(1000):
+            for host in hosts:
+                registrable_domain(host)
+        assert (time.perf_counter() - started) / 100000 < 1e-6
+        assert public_suffix(hosts[0]) == 'co.uk'
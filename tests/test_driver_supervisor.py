@@ -0,0 +1,122 @@
+import subprocess
+import sys
+import time
+import psutil
+import pytest
+import allure
+from unittest.mock import MagicMock
+from allure_commons.types import Severity
+from selenium.common.exceptions import WebDriverException, TimeoutException
+from urllib3.exceptions import ReadTimeoutError
+from core.driver_supervisor import DriverSupervisor
+from core.error_handler import ErrorHandler, DriverCrashedError
+from core.memory_manager import MemoryManager
+
+
+class FakeDriverManager:
+    """DriverManager, выдающий пронумерованные драйверы"""
+
+    def __init__(self):
+        self.driver = None
+        self.created = 0
+        self.memory_manager = MemoryManager()
+
+    def create_driver(self, domain=None):
+        self.created += 1
+        self.driver = MagicMock(session_id=f"s{self.created}")
+        self.driver.execute_script.return_value = 1
+        self.driver.service.process.pid = -1
+        return self.driver
+
+    def quit_driver(self):
+        self.driver = None
+
+
+@pytest.fixture
+def supervisor_config(mock_config):
+    mock_config.SUPERVISOR_PROBE_TIMEOUT = 0.2
+    mock_config.SUPERVISOR_MAX_REQUEUES = 1
+    mock_config.SUPERVISOR_BACKOFF = 0
+    return mock_config
+
+
+@allure.epic("Core")
+@allure.feature("Driver Supervisor")
+class TestDriverSupervisor:
+
+    @allure.title("Test crashed scans are re-queued on a fresh driver")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_requeue_after_crash(self, supervisor_config):
+        """Тест повторной постановки URL после потери сеанса"""
+
+        manager = FakeDriverManager()
+        supervisor = DriverSupervisor(manager, supervisor_config)
+        attempts = []
+
+        def scan(driver, url):
+            attempts.append((url, driver.session_id))
+            if url == 'https://a.ru/' and len(attempts) == 1:
+                raise DriverCrashedError("chrome not reachable")
+            if url == 'https://c.ru/':
+                raise WebDriverException("invalid session id")
+            if url == 'https://b.ru/':
+                raise ValueError("page error")
+            return {'url': url}
+
+        def on_result(scan_data):
+            raise TypeError("Object of type WebElement is not JSON serializable")
+
+        results = supervisor.run(['https://a.ru/', 'https://b.ru/', 'https://c.ru/'], scan, on_result)
+        stats = supervisor.get_stats()
+
+        assert results == [{'url': 'https://a.ru/'}]
+        assert [url for url, _ in attempts].count('https://a.ru/') == 2
+        assert [url for url, _ in attempts].count('https://b.ru/') == 1
+        assert stats['abandoned'] == ['https://c.ru/']
+        assert stats['failures'] == {'SESSION_LOST': 3, 'UNKNOWN_ERROR': 1}
+        assert len({session for _, session in attempts}) == len(attempts)
+
+    @allure.title("Test liveness probe detects hung and closed sessions")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_probe(self, supervisor_config):
+        """Тест быстрой проверки живости драйвера"""
+
+        supervisor = DriverSupervisor(FakeDriverManager(), supervisor_config)
+        driver = MagicMock(session_id='s1')
+        driver.execute_script.return_value = 1
+        assert supervisor.probe(driver)
+
+        driver.execute_script.side_effect = lambda script: time.sleep(1)
+        started = time.monotonic()
+        assert not supervisor.probe(driver)
+        assert time.monotonic() - started < 0.9
+
+        assert not supervisor.probe(MagicMock(session_id=None))
+        with pytest.raises(DriverCrashedError):
+            supervisor.check(MagicMock(session_id=None))
+
+    @allure.title("Test failure classification and process tree kill")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_kill_process_tree(self, supervisor_config):
+        """Тест классификации отказов и завершения дерева процессов"""
+
+        assert ErrorHandler.classify_driver_failure(ReadTimeoutError(None, None, "Read timed out")) == "DRIVER_HUNG"
+        assert ErrorHandler.classify_driver_failure(WebDriverException("disconnected: not connected")) == "SESSION_LOST"
+        assert ErrorHandler.classify_driver_failure(TimeoutException()) == "TIMEOUT_ERROR"
+
+        parent = subprocess.Popen([sys.executable, '-c', (
+            "import subprocess, sys, time; "
+            "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)']); time.sleep(30)"
+        )])
+        deadline = time.monotonic() + 5
+        while not psutil.Process(parent.pid).children() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        child = psutil.Process(parent.pid).children()[0]
+
+        supervisor = DriverSupervisor(FakeDriverManager(), supervisor_config)
+        assert supervisor.kill_process_tree(parent.pid) == 2
+        parent.wait(timeout=5)
+        assert not child.is_running()
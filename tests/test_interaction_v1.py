@@ -0,0 +1,92 @@
+import pytest
+import allure
+from allure_commons.types import Severity
+from unittest.mock import MagicMock
+from modules.interaction_v1.interaction_manager_v1 import InteractionManagerV1
+from modules.interaction_v1.tab_pool import TabPool
+
+
+class FakeTabDriver:
+    """Драйвер с вкладками: window.open создаёт вкладку, готовую со второго опроса"""
+
+    def __init__(self, blank_polls=0):
+        self.blank_polls = blank_polls
+        self.targets = {}
+        self.window_handles = ['main']
+        self.current_window_handle = 'main'
+        self.urls = {'main': 'https://ria.ru/'}
+        self.polls = {}
+        self.switch_to = MagicMock()
+        self.switch_to.window = MagicMock(side_effect=self._switch)
+
+    def _switch(self, handle):
+        self.current_window_handle = handle
+
+    @property
+    def current_url(self):
+        return self.urls[self.current_window_handle]
+
+    def execute_script(self, script, *args):
+        if 'closest' in script:
+            return args[0].href
+        if 'window.open' in script:
+            handle = f"tab{len(self.window_handles)}"
+            self.window_handles.append(handle)
+            self.urls[handle] = 'about:blank' if self.blank_polls else args[0]
+            self.targets[handle] = args[0]
+            return None
+        if 'readyState' in script:
+            handle = self.current_window_handle
+            self.polls[handle] = self.polls.get(handle, 0) + 1
+            if self.polls[handle] <= self.blank_polls:
+                return 'complete'
+            self.urls[handle] = self.targets[handle]
+            return 'complete' if self.polls[handle] > self.blank_polls + 1 else 'loading'
+        return None
+
+    def close(self):
+        self.window_handles.remove(self.current_window_handle)
+
+
+@allure.epic("Interaction Module")
+@allure.feature("Concurrent Interaction")
+class TestConcurrentInteraction:
+
+    @allure.title("Test ads are opened in parallel tabs and harvested in one sweep")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_concurrent_interaction(self, mock_config):
+        """Тест параллельного взаимодействия с пачками вкладок"""
+
+        mock_config.INTERACTION_TAB_TIMEOUT = 5
+        driver = FakeTabDriver()
+        ads = []
+        for i in range(5):
+            element = MagicMock()
+            element.href = f"https://shop.ru/item{i}?utm_source=yandex&utm_campaign=c{i}"
+            ads.append({'element': element, 'id': f"ad_{i}"})
+
+        manager = InteractionManagerV1(driver, mock_config)
+        results = manager.perform_concurrent_ad_interaction(ads, concurrency=2)
+
+        assert [r['ad_data']['id'] for r in results] == [f"ad_{i}" for i in range(5)]
+        assert results[3]['interaction']['utm_data'] == {'utm_source': 'yandex', 'utm_campaign': 'c3'}
+        assert all(r['interaction']['load_state'] == 'complete' for r in results)
+        assert driver.window_handles == ['main']
+        assert driver.current_window_handle == 'main'
+
+    @allure.title("Test a blank tab is not harvested before the landing page commits")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_blank_tab_not_settled(self):
+        """Тест ожидания перехода вкладки с about:blank"""
+
+        driver = FakeTabDriver(blank_polls=3)
+        element = MagicMock(href="https://shop.ru/landing")
+
+        with TabPool(driver, 'main', timeout=5, poll_interval=0.01) as pool:
+            pool.open('ad_1', element)
+            results = pool.harvest()
+
+        assert results['ad_1']['current_url'] == "https://shop.ru/landing"
+        assert results['ad_1']['load_state'] == 'complete'
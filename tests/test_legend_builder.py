@@ -0,0 +1,80 @@
+import pytest
+import allure
+from PIL import Image
+from allure_commons.types import Severity
+from modules.reporting.statistics import StatisticsCalculator
+from modules.screenshot import legend_builder
+from modules.screenshot.legend_builder import LegendBuilder
+
+
+@pytest.fixture
+def builder(mock_config, tmp_path):
+    mock_config.LEGEND_DIR = tmp_path
+    mock_config.LEGEND_MODE = "sheet"
+    mock_config.LEGEND_WORKERS = 0
+    mock_config.LEGEND_PAGE_HEIGHT = 1000
+    mock_config.LEGEND_GLYPH_CACHE_SIZE = 256
+    return LegendBuilder(mock_config)
+
+
+@allure.epic("Screenshot")
+@allure.feature("Legend Builder")
+class TestLegendBuilder:
+
+    @allure.title("Test ad summary is computed once and shared with reporting")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_shared_summary(self, builder, make_scan):
+        """Тест общей сводки по объявлениям"""
+
+        scan = make_scan('ria.ru', ads=12)
+        calculator = StatisticsCalculator()
+        ad_summary = calculator.get_ad_summary(scan)
+
+        assert 'ad_summary' not in scan
+        assert calculator.get_ad_summary({**scan, 'ad_summary': ad_summary}) is ad_summary
+        assert ad_summary['networks'] == calculator.calculate_network_distribution(scan['detected_ads'])
+        assert ad_summary['confidence_stats'] == calculator.calculate_confidence_stats(scan['detected_ads'])
+        assert ad_summary['confidence_distribution'] == {'high': 2, 'medium': 3, 'low': 7}
+        assert ad_summary['size_categories'] == {'very_small': 3, 'small': 7, 'medium': 2}
+        assert builder.create_summary_statistics(scan['detected_ads'])['networks'] == ad_summary['networks']
+        assert calculator.calculate_comparative_stats([scan])['scan_comparison'][0]['networks_found'] == 4
+
+    @allure.title("Test legends are written per scan or paginated into a sheet")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_batch_modes(self, builder, make_scan, tmp_path):
+        """Тест файлов легенд на сканирование и многостраничного листа"""
+
+        scans = [make_scan(f"site{i}.ru", ads=10 + i, timestamp=1700000000 + i) for i in range(6)]
+
+        files = builder.render_batch(scans, mode="files")
+        sheet = builder.render_batch(scans, mode="sheet", output_dir=tmp_path / "sheet")
+
+        assert [path.rsplit('/', 1)[1] for path in files[:2]] == [
+            "site0.ru_1700000000_legend.png", "site1.ru_1700000001_legend.png"
+        ]
+        assert Image.open(files[0]).size == (600, LegendBuilder.section_height(builder.build_section(scans[0]['detected_ads'])))
+        assert len(sheet) == 3
+        assert all(Image.open(path).height <= 1000 for path in sheet)
+        assert builder._text_mask.cache_info().hits > 10 * builder._text_mask.cache_info().misses
+
+    @allure.title("Test worker pool renders the same pages as the main process")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_worker_pool(self, builder, make_scan, tmp_path):
+        """Тест отрисовки листа легенд в пуле процессов"""
+
+        scans = [make_scan(f"site{i}.ru", ads=12) for i in range(4)]
+
+        inline = builder.render_batch(scans, output_dir=tmp_path / "inline")
+        pooled = builder.render_batch(scans, output_dir=tmp_path / "pooled", max_workers=2)
+
+        assert len(pooled) == len(inline) == 2
+        for first, second in zip(inline, pooled):
+            assert Image.open(first).tobytes() == Image.open(second).tobytes()
+
+        settings = {'LEGEND_DIR': tmp_path, 'LEGEND_GLYPH_CACHE_SIZE': 8, 'LEGEND_PAGE_HEIGHT': 1000}
+        page = [builder.build_section(scans[0]['detected_ads'])]
+        legend_builder._render_page_job((str(tmp_path / "job.png"), page, settings))
+        assert legend_builder._worker_builder._text_mask.cache_info().maxsize == 8
@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+import pytest
+import allure
+from unittest.mock import MagicMock
+from allure_commons.types import Severity
+from core.memory_manager import MemoryManager
+
+
+def make_sample(total_mb):
+    return {
+        'timestamp': 0, 'python_rss_mb': 100.0, 'browser_rss_mb': total_mb, 'browser_pss_mb': total_mb - 100,
+        'browser_processes': 5, 'total_pss_mb': total_mb
+    }
+
+
+@allure.epic("Core")
+@allure.feature("Memory Manager")
+class TestMemoryManager:
+
+    @allure.title("Test process tree memory includes child processes")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_process_tree_usage(self):
+        """Тест суммирования памяти дерева процессов"""
+
+        child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+        try:
+            own = MemoryManager.process_tree_usage([child.pid])
+            tree = MemoryManager.process_tree_usage([os.getpid()])
+        finally:
+            child.kill()
+            child.wait()
+
+        assert own['processes'] == 1
+        assert own['rss_mb'] > 0
+        assert tree['processes'] >= 2
+        assert tree['rss_mb'] > own['rss_mb']
+        assert MemoryManager.process_tree_usage([child.pid])['processes'] == 0
+
+    @allure.title("Test graded pressure actions and per-scan peak")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_pressure_actions(self):
+        """Тест ступенчатых действий при превышении бюджета"""
+
+        manager = MemoryManager(budget_mb=1000)
+        manager.sample = lambda: manager._record(make_sample(600)) or manager.last_sample
+        driver = MagicMock()
+        driver.current_window_handle = 'main'
+        driver.window_handles = ['main', 'popup']
+
+        manager.begin_scan()
+        assert manager.relieve_pressure(driver) == 'none'
+
+        manager._record(make_sample(750))
+        assert manager.relieve_pressure(driver) == 'close_windows'
+        driver.close.assert_called_once()
+        driver.execute_cdp_cmd.assert_not_called()
+
+        manager._record(make_sample(900))
+        assert manager.relieve_pressure(driver) == 'clear_caches'
+        driver.execute_cdp_cmd.assert_any_call('Network.clearBrowserCache', {})
+
+        manager._record(make_sample(1300))
+        assert manager.relieve_pressure(driver) == 'pause'
+
+        usage = manager.end_scan()
+        assert usage['peak_total_pss_mb'] == 1300
+        assert usage['actions'] == ['close_windows', 'clear_caches', 'pause']
+        assert usage['budget_mb'] == 1000
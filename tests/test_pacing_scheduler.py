@@ -0,0 +1,68 @@
+import random
+import pytest
+import allure
+from allure_commons.types import Severity
+from core.pacing_scheduler import PacingScheduler
+
+
+class FakeClock:
+    """Часы, которые двигает только sleep и «работа»"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@allure.epic("Core")
+@allure.feature("Pacing Scheduler")
+class TestPacingScheduler:
+
+    @allure.title("Test fast profile never sleeps")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_fast_profile(self, mock_config, clock):
+        """Тест профиля без задержек"""
+
+        mock_config.PACING_DOMAIN_BUDGET = 60
+        pacing = PacingScheduler(mock_config, profile='fast', clock=clock, sleep=clock.sleep)
+
+        assert pacing.delay('after_click') == 0.0
+        assert clock.now == 0.0
+
+    @allure.title("Test deferred work overlaps with delays and budget caps a domain")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_overlap_and_budget(self, mock_config, clock):
+        """Тест совмещения пауз с работой и бюджета домена"""
+
+        mock_config.PACING_DOMAIN_BUDGET = 5
+        pacing = PacingScheduler(mock_config, profile='stealth', rng=random.Random(1),
+                                 clock=clock, sleep=clock.sleep)
+        pacing.set_domain('ria.ru')
+
+        done = []
+        pacing.defer(lambda: (clock.sleep(1.0), done.append('landing')))
+        first = pacing.delay('after_click')
+
+        assert done == ['landing']
+        assert clock.now == pytest.approx(first)
+
+        for _ in range(5):
+            pacing.delay('after_click')
+
+        report = pacing.get_report()
+        assert report['domains']['ria.ru'] == pytest.approx(5.0)
+        assert report['exhausted_domains'] == ['ria.ru']
+        assert report['overlapped_work_seconds'] == pytest.approx(1.0)
+        assert report['delay_seconds'] == pytest.approx(4.0)
+        assert report['work_seconds'] == pytest.approx(1.0)
@@ -0,0 +1,148 @@
+import re
+import zlib
+import pytest
+import allure
+from PIL import Image
+from allure_commons.types import Severity
+from config.settings import Settings
+from modules.reporting.exporters.pdf_exporter import PDFExporter, MARGIN
+from modules.reporting.exporters.pdf_writer import PDFWriter, PAGE_SIZE
+from modules.reporting.report_generator import ReportGenerator
+from modules.screenshot import tiling
+from modules.screenshot.storage import ScreenshotStorage
+
+
+def check_structure(path):
+    """Смещения xref указывают на объекты; возвращает содержимое файла"""
+    data = path.read_bytes()
+    assert data.startswith(b"%PDF-1.4") and data.rstrip().endswith(b"%%EOF")
+    xref = int(re.search(rb"startxref\n(\d+)", data).group(1))
+    entries = data[xref:].split(b"\n")[3:]
+    for obj_id, entry in enumerate(entries[:int(data[xref:].split(b"\n")[1].split()[1]) - 1], start=1):
+        offset = int(entry[:10])
+        assert data[offset:].startswith(f"{obj_id} 0 obj".encode())
+    return data
+
+
+def page_count(data):
+    return int(re.search(rb"/Type /Pages /Kids \[[^\]]*\] /Count (\d+)", data).group(1))
+
+
+def make_report(domain, creative, full_page=None):
+    return {
+        'metadata': {'generated_at': '2026-10-19T10:00:00', 'tool_name': 'Advanced Ad Parser'},
+        'scan_summary': {'main_domain': domain, 'total_urls_processed': 1, 'total_ads_detected': 2},
+        'ads_detection': {
+            'total_ads': 2,
+            'networks_distribution': {'yandex_ads': 2},
+            'ads': [{'id': i, 'network': 'yandex_ads', 'type': 'banner', 'confidence': 0.9,
+                     'detection_method': 'selector', 'screenshot_path': str(creative), 'creative_id': 'abc'}
+                    for i in (1, 2)]
+        },
+        'screenshots': {'full_page': str(full_page) if full_page else None},
+        'recommendations': [{'priority': 'low', 'message': 'UTM parameters (utm_source) found.'}]
+    }
+
+
+@allure.epic("Reporting")
+@allure.feature("PDF Export")
+class TestPDFExporter:
+
+    @allure.title("Test streamed PDF has a valid xref, pages and escaped text")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_writer(self, tmp_path):
+        """Тест потоковой записи PDF"""
+
+        path = tmp_path / "out.pdf"
+        with PDFWriter(path) as writer:
+            name = writer.add_image(Image.new('RGB', (40, 30), 'red'))
+            for number in range(3):
+                canvas = writer.new_page()
+                canvas.text(40, 60, f"Page {number} (ria.ru) \\ ok")
+                canvas.text(40, 120, "AD DETECTION REPORT: домен.рф")
+                canvas.image(name, 40, 80, 40, 30)
+                writer.add_page(canvas)
+
+        data = check_structure(path)
+        assert page_count(data) == 3
+        assert data.count(b"/Subtype /Image") == 1
+        stream = re.search(rb"/FlateDecode >>\nstream\n(.*?)\nendstream", data, re.S).group(1)
+        assert b"(Page 0 \\(ria.ru\\) \\\\ ok) Tj" in zlib.decompress(stream)
+        assert b"(AD DETECTION REPORT: xn--d1acufc.xn--p1ai) Tj" in zlib.decompress(stream)
+
+    @allure.title("Test batch PDF embeds each thumbnail once across hundreds of scans")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_batch(self, mock_config, tmp_path):
+        """Тест пакетного PDF с миниатюрами"""
+
+        mock_config.OUTPUT_DIR = tmp_path
+        mock_config.SCREENSHOT_STORAGE_ENABLED = False
+        mock_config.PDF_THUMBNAIL_SIZE = (96, 72)
+        creative = tmp_path / "creative.png"
+        Image.new('RGB', (300, 250), 'blue').save(creative)
+        full_page = tmp_path / "page.png"
+        Image.new('RGB', (1280, 9000), 'white').save(full_page)
+
+        exporter = PDFExporter(mock_config)
+        exporter.reports_dir = tmp_path
+        reports = [make_report(f"site{i}.ru", creative, full_page) for i in range(200)]
+        path = exporter.export_batch_report({'batch_summary': {'total_scans': 200}, 'individual_reports': reports},
+                                            "batch.pdf")
+
+        data = check_structure(tmp_path / "batch.pdf")
+        assert path.endswith("batch.pdf")
+        assert page_count(data) == 201
+        assert data.count(b"/Subtype /Image") == 2
+        assert b"/Width 86 /Height 72" in data and b"/Width 160 /Height 120" in data
+
+        # Текст таблицы и линейки строк не выходят за правое поле страницы
+        right = PAGE_SIZE[0] - MARGIN
+        for stream in re.findall(rb"/FlateDecode >>\nstream\n(.*?)\nendstream", data, re.S):
+            content = zlib.decompress(stream)
+            for x in re.findall(rb"([\d.]+) [\d.]+ Td", content) + re.findall(rb"([\d.]+) [\d.]+ l S", content):
+                assert float(x) <= right + 0.01
+
+    @allure.title("Test page thumbnails come from storage without decoding the page")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_storage_thumbnail(self, mock_config, tmp_path, monkeypatch):
+        """Тест миниатюры страницы, записанной хранилищем при кодировании"""
+
+        storage = ScreenshotStorage(Settings, root=tmp_path / "screenshots", max_workers=1)
+        page = Image.new('RGB', (1280, 6000), 'white')
+        page.paste((200, 40, 40), (0, 0, 1280, 200))
+        try:
+            path = storage.store(page, 'full_page', 'ria.ru_1')
+        finally:
+            storage.close()
+
+        def decode_whole_page(*args, **kwargs):
+            raise AssertionError("page decoded")
+
+        monkeypatch.setattr(tiling, 'image_strips', decode_whole_page)
+        thumbnail = PDFExporter(mock_config)._load_thumbnail(path, (160, 120))
+
+        assert path.endswith('.webp')
+        assert ScreenshotStorage.thumbnail_path(path).exists()
+        assert thumbnail.size == (160, 120)
+        assert thumbnail.getpixel((80, 2))[0] > 150 and thumbnail.getpixel((80, 100)) > (240, 240, 240)
+
+    @allure.title("Test report generator exports JSON, CSV and PDF together")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_report_formats(self, tmp_path):
+        """Тест параллельного экспорта всех форматов"""
+
+        scan = {'url': 'https://ria.ru/', 'main_domain': 'ria.ru', 'scan_timestamp': 1000.0,
+                'detected_ads': [{'id': 1, 'network': 'yandex_ads', 'confidence': 0.8}],
+                'interaction_results': [], 'processed_urls': ['https://ria.ru/']}
+
+        generator = ReportGenerator(Settings, tmp_path)
+        paths = generator.generate_comprehensive_report(scan)
+        batch = generator.generate_batch_report([scan])
+
+        assert list(paths) == list(batch) == ['json', 'csv', 'pdf']
+        assert page_count(check_structure(tmp_path / paths['pdf'].rsplit('/', 1)[1])) == 1
+        assert page_count(check_structure(tmp_path / batch['pdf'].rsplit('/', 1)[1])) == 2
@@ -0,0 +1,71 @@
+import os
+import pytest
+import allure
+from pathlib import Path
+from unittest.mock import MagicMock
+from allure_commons.types import Severity
+from core.profile_template import ProfileTemplate
+
+
+def fake_driver_factory(user_data_dir):
+    """Драйвер, который пишет в профиль то же, что Chrome после прогрева"""
+    root = Path(user_data_dir)
+    (root / "Default" / "Cache" / "Cache_Data").mkdir(parents=True)
+    (root / "Default" / "Cache" / "Cache_Data" / "a1b2_0").write_bytes(b"cached asset")
+    (root / "Default" / "Cache" / "Cache_Data" / "index").write_bytes(b"index")
+    (root / "Default" / "Preferences").write_text("{}")
+    (root / "Default" / "Sessions").mkdir()
+    (root / "DevToolsActivePort").write_text("9222")
+
+    driver = MagicMock()
+    driver.execute_script.return_value = 'принять'
+    return driver
+
+
+@allure.epic("Core")
+@allure.feature("Profile Template")
+class TestProfileTemplate:
+
+    @allure.title("Test warmed profile is built once and cloned per driver")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_build_and_clone(self, mock_config, tmp_path):
+        """Тест построения шаблона профиля и его клонирования"""
+
+        mock_config.PROFILE_TEMPLATE_DIR = tmp_path / "template"
+        mock_config.PROFILE_CLONES_DIR = tmp_path / "profiles"
+        mock_config.PROFILE_TEMPLATE_MAX_AGE = 3600
+        mock_config.PROFILE_WARMUP_SETTLE = 0
+        mock_config.CONSENT_BUTTON_TEXTS = ('принять',)
+        mock_config.COOKIES_DIR = tmp_path
+        template = ProfileTemplate(mock_config)
+
+        assert template.clone() is None
+        assert template.ensure_built(["https://ria.ru/"], fake_driver_factory)
+        assert template.get_info()['consents'] == {'ria.ru': 'принять'}
+        assert not (template.template_dir / "DevToolsActivePort").exists()
+        assert not (template.template_dir / "Default" / "Sessions").exists()
+
+        profile = Path(template.clone())
+        entry = profile / "Default" / "Cache" / "Cache_Data" / "a1b2_0"
+        index = profile / "Default" / "Cache" / "Cache_Data" / "index"
+        source = template.template_dir / "Default" / "Cache" / "Cache_Data"
+        assert entry.read_bytes() == b"cached asset"
+        assert (profile / "Default" / "Preferences").read_text() == "{}"
+        assert not (profile / ProfileTemplate.MARKER).exists()
+        # Chrome меняет кэш клона на месте: ни один файл не связан с шаблоном
+        assert not os.path.samefile(entry, source / "a1b2_0")
+        assert not os.path.samefile(index, source / "index")
+        entry.write_bytes(b"evicted")
+        assert (source / "a1b2_0").read_bytes() == b"cached asset"
+        stats = template.get_stats()
+        assert stats['reflinked'] + stats['copied'] == 3
+
+        template.release(str(profile))
+        assert not profile.exists()
+        # Cookies восстанавливаются только для домена и его поддоменов
+        cookies = [{'name': 'a', 'domain': '.ria.ru'}, {'name': 'b', 'domain': 'a.ru'}]
+        assert template._restore_cookies(MagicMock(), cookies, 'www.ria.ru') == 1
+
+        # Свежий шаблон не перестраивается
+        assert template.ensure_built(["https://ria.ru/"], lambda path: pytest.fail("rebuilt"))
@@ -0,0 +1,58 @@
+import json
+import pytest
+import allure
+from unittest.mock import patch
+from allure_commons.types import Severity
+from config.settings import Settings
+from modules.reporting.report_generator import ReportGenerator
+from modules.reporting.report_worker import ReportWorker
+
+
+@allure.epic("Reporting")
+@allure.feature("Report Worker")
+class TestReportWorker:
+
+    @allure.title("Test reports are built in worker processes as scans arrive")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_process_pool_reports(self, make_scan, tmp_path):
+        """Тест построения отчётов в пуле процессов"""
+
+        scans = [make_scan(domain, timestamp=1000.0 + i, element=True) for i, domain in enumerate(['ria.ru', 'rbc.ru', 'tass.ru'])]
+
+        with ReportWorker(Settings, max_workers=2, reports_dir=tmp_path) as worker:
+            for scan in scans:
+                worker.submit(scan)
+            reports = worker.finish()
+
+        assert worker.stats == {'submitted': 3, 'failed': 0, 'tail_seconds': worker.stats['tail_seconds']}
+        assert [r['domain'] for r in reports['individual_reports']] == ['ria.ru', 'rbc.ru', 'tass.ru']
+        json_paths = {r['report_paths']['json'] for r in reports['individual_reports']}
+        assert len(json_paths) == 3
+        with open(reports['batch_report']['json'], encoding='utf-8') as f:
+            batch = json.load(f)
+        assert len(batch['individual_reports']) == 3
+        assert batch['batch_summary']['total_ads_detected'] == 3
+
+    @allure.title("Test batch report reuses prepared report data")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_batch_reuses_prepared_reports(self, make_scan, tmp_path):
+        """Тест однократной подготовки данных отчёта на сканирование"""
+
+        scans = [make_scan('ria.ru', timestamp=1000.0, element=True), make_scan('rbc.ru', timestamp=1001.0, element=True)]
+        original = ReportGenerator._prepare_report_data
+
+        with patch.object(ReportGenerator, '_prepare_report_data', autospec=True, side_effect=original) as prepare:
+            with ReportWorker(Settings, max_workers=0, reports_dir=tmp_path) as worker:
+                for scan in scans:
+                    worker.submit(scan)
+                reports = worker.finish()
+
+            generator = ReportGenerator(Settings, tmp_path)
+            generator.generate_comprehensive_report(scans[0])
+            generator.generate_batch_report(scans)
+
+        assert reports['batch_report']['json']
+        # 2 сканирования через рабочий + по одному на каждое в новом генераторе
+        assert prepare.call_count == 4
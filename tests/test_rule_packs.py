@@ -0,0 +1,124 @@
+import json
+import pytest
+import allure
+from allure_commons.types import Severity
+from config.rule_packs import RulePackLoader, RulePackError, RuleRegistry
+from modules.detection.network_identifier import NetworkIdentifier
+
+
+def write_pack(path, **pack):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(pack, f)
+
+
+@pytest.fixture
+def rules_dir(tmp_path):
+    """Каталог с минимальным набором пакетов правил"""
+    rules = tmp_path / "rules"
+    write_pack(rules / "common.json", name="common", kind="common",
+               data_attributes=["data-ad"], keywords=["ad"], standard_sizes=[[300, 250]])
+    write_pack(rules / "networks" / "yandex_ads.json", name="yandex_ads", kind="network",
+               confidence=0.9, domains=["yandex.ru/an"], class_patterns=["yandex_rtb_"])
+    write_pack(rules / "networks" / "google_ads.json", name="google_ads", kind="network",
+               enabled=False, domains=["doubleclick.net"], class_patterns=["adsbygoogle"])
+    return rules
+
+
+@pytest.fixture
+def registry(rules_dir, tmp_path):
+    """Реестр правил, настроенный на временный каталог"""
+    RuleRegistry.configure(rules_dir, tmp_path / "cache")
+    yield RuleRegistry
+    RuleRegistry.configure()
+
+
+@allure.epic("Configuration")
+@allure.feature("Rule Packs")
+class TestRulePacks:
+
+    @allure.title("Test rule packs compile into selectors and network regexes")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_compile_packs(self, registry):
+        """Тест компиляции пакетов и атрибуции сетей"""
+
+        rules = registry.current()
+
+        assert rules.element_selector == "[class*='yandex_rtb_']"
+        assert rules.attribute_selector == "[data-ad]"
+        assert rules.standard_sizes == ((300, 250),)
+
+        identifier = NetworkIdentifier(rules)
+        assert identifier.identify_by_domain("https://yandex.ru/an/count")['network'] == 'yandex_ads'
+        # Отключённая сеть не ищется по домену и не подписывает найденные элементы
+        assert identifier.identify_by_domain("https://doubleclick.net/x") is None
+        assert identifier.identify_by_attributes({'class': 'adsbygoogle'}) is None
+
+    @allure.title("Test invalid pack is rejected with file and field")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_invalid_pack(self, rules_dir):
+        """Тест валидации пакета"""
+
+        write_pack(rules_dir / "broken.json", name="broken", kind="network", class_patterns="adfox_")
+
+        with pytest.raises(RulePackError, match="broken.json.*class_patterns"):
+            RulePackLoader(rules_dir).load()
+
+    @allure.title("Test site pack overrides rules for its domain")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_site_pack(self, rules_dir, registry):
+        """Тест пакета конкретного сайта"""
+
+        write_pack(rules_dir / "sites" / "ria.json", name="ria", kind="site",
+                   sites=["ria.ru"], id_patterns=["banner_before_header_index"])
+        registry.reload_if_changed()
+        rules = registry.current()
+
+        assert "banner_before_header_index" in rules.for_domain("m.ria.ru").id_patterns
+        assert "banner_before_header_index" not in rules.for_domain("rbc.ru").id_patterns
+
+    @allure.title("Test hot reload swaps the snapshot atomically")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_hot_reload(self, rules_dir, registry, tmp_path):
+        """Тест горячей перезагрузки и дискового кэша"""
+
+        snapshot = registry.current()
+        assert registry.reload_if_changed() is False
+
+        write_pack(rules_dir / "networks" / "yandex_ads.json", name="yandex_ads", kind="network",
+                   confidence=0.9, domains=["yandex.ru/an"], class_patterns=["yandex_rtb_", "adfox_"])
+        assert registry.reload_if_changed() is True
+
+        assert "adfox_" in registry.current().class_patterns
+        assert "adfox_" not in snapshot.class_patterns
+        assert len(list((tmp_path / "cache").glob("rules_*.pickle"))) == 1
+
+        # Невалидный пакет не подменяет действующие правила
+        write_pack(rules_dir / "broken.json", name="broken", kind="unknown")
+        assert registry.reload_if_changed() is False
+        assert "adfox_" in registry.current().class_patterns
+
+
+    @allure.title("Test attribution priority follows pack confidence")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_attribution_priority(self, rules_dir, registry):
+        """Тест атрибуции включёнными сетями с приоритетом по уверенности"""
+
+        write_pack(rules_dir / "networks" / "google_ads.json", name="google_ads", kind="network",
+                   confidence=0.8, attribution_confidence=0.9, domains=["doubleclick.net"],
+                   class_patterns=["adsbygoogle"])
+        write_pack(rules_dir / "networks" / "meta_ads.json", name="meta_ads", kind="network",
+                   domains=["fbcdn.net"], class_patterns=["fb-ad"])
+        registry.reload_if_changed()
+        identifier = NetworkIdentifier(registry.current())
+
+        assert identifier.identify_by_attributes({'class': 'fb-ad yandex_rtb_1'}) == \
+            {'network': 'yandex_ads', 'confidence': 0.9}
+        assert identifier.identify_by_attributes({'class': 'adsbygoogle fb-ad'}) == \
+            {'network': 'google_ads', 'confidence': 0.9}
+        assert identifier.identify_by_domain("https://doubleclick.net/x")['confidence'] == 0.8
@@ -0,0 +1,118 @@
+import io
+import json
+import pytest
+import allure
+from unittest.mock import MagicMock
+from PIL import Image, ImageDraw
+from allure_commons.types import Severity
+from config.settings import Settings
+from modules.screenshot.annotator import ScreenshotAnnotator
+from modules.screenshot.capturer import ScreenshotCapturer
+from modules.screenshot.legend_builder import LegendBuilder
+from modules.screenshot.storage import ScreenshotStorage
+from utils.domain import scan_key
+
+
+def make_page(width=1280, height=3000):
+    """Страница с текстоподобными полосами и блоком рекламы, PNG как от браузера"""
+    image = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(image)
+    for y in range(40, min(height, 3000) - 20, 24):
+        draw.text((40, y), "Lorem ipsum dolor sit amet " * 6, fill=(30, 30, 30))
+    draw.rectangle([900, 400, 1200, 650], fill=(200, 40, 40))
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = ScreenshotStorage(Settings, root=tmp_path, max_workers=2)
+    yield storage
+    storage.close()
+
+
+@allure.epic("Screenshot")
+@allure.feature("Screenshot Storage")
+class TestScreenshotStorage:
+
+    @allure.title("Test screenshots are content-addressed, lossless and stored once")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_content_addressed(self, storage, tmp_path):
+        """Тест адресации по содержимому и дедупликации"""
+
+        png = make_page()
+        first = storage.submit(png, 'full_page', 'ria.ru_1')
+        second = storage.submit(png, 'full_page', 'ria.ru_2')
+        storage.flush()
+
+        assert first == second and first.endswith('.webp')
+        assert len(list(tmp_path.glob('*/*.webp'))) == 1
+        assert storage.open(first).tobytes() == Image.open(io.BytesIO(png)).convert('RGB').tobytes()
+        scans = [entry['scan'] for entry in map(json.loads, open(tmp_path / "manifest.jsonl", encoding='utf-8'))]
+        assert sorted(scans) == ['ria.ru_1', 'ria.ru_2']
+        assert storage.get_stats()['compression_ratio'] > 1
+
+    @allure.title("Test pages taller than the tile threshold are stored as streamable PNG")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_tall_page_fallback(self, storage):
+        """Тест сохранения высоких страниц в PNG"""
+
+        path = storage.store(make_page(width=200, height=17000), 'full_page', 'tall')
+        tiled = storage.store(make_page(width=200, height=Settings.ANNOTATION_TILE_THRESHOLD + 1), 'full_page', 'tiled')
+
+        assert path.endswith('.png') and tiled.endswith('.png')
+        assert Image.open(path).size == (200, 17000)
+        assert storage.get_stats()['fallbacks'] == 2
+
+    @allure.title("Test annotator writes derived images through the storage")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_annotator(self, storage, mock_config):
+        """Тест записи размеченного и сравнительного изображений"""
+
+        mock_config.SCREENSHOT_STORAGE_ENABLED = True
+        mock_config.ANNOTATION_TILE_THRESHOLD = Settings.ANNOTATION_TILE_THRESHOLD
+        ScreenshotStorage._instance = storage
+        try:
+            original = storage.submit(make_page(height=1200), 'full_page', 'rbc.ru_1')
+            annotator = ScreenshotAnnotator(mock_config)
+            ads = [{'id': 1, 'network': 'yandex_ads', 'confidence': 0.9,
+                    'location': {'x': 900, 'y': 400}, 'size': {'width': 300, 'height': 250}}]
+
+            annotated = annotator.annotate_ads_on_screenshot(original, ads)
+            comparison = annotator.create_comparison_image(original, annotated)
+            storage.flush()
+        finally:
+            ScreenshotStorage._instance = None
+
+        assert annotated.endswith('.webp')
+        assert storage.open(comparison).size == (2560, 1200)
+        assert {entry['role'] for entry in storage.scan_blobs('rbc.ru_1')} == {'full_page', 'annotated', 'comparison'}
+
+    @allure.title("Test the manifest uses the scan key stored in scan_data")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_manifest_scan_key(self, storage, mock_config):
+        """Тест общего ключа сканирования для манифеста и легенд"""
+
+        mock_config.SCREENSHOT_STORAGE_ENABLED = True
+        mock_config.WIDTH_WINDOW = 1280
+        mock_config.HEIGHT_WINDOW = 900
+        driver = MagicMock(current_url="https://m.ria.ru/news")
+        driver.execute_script.return_value = 1200
+        driver.get_screenshot_as_png.return_value = make_page(height=1200)
+        key = scan_key("https://m.ria.ru/news", 1700000000.7)
+        ScreenshotStorage._instance = storage
+        try:
+            path = ScreenshotCapturer(driver, mock_config).capture_full_page(scan=key)
+            storage.flush()
+        finally:
+            ScreenshotStorage._instance = None
+
+        assert key == "ria.ru_1700000000"
+        assert [entry['role'] for entry in storage.scan_blobs(key)] == ['full_page']
+        assert storage.scan_of(path) == key
+        assert LegendBuilder.scan_key({'main_domain': 'ria.ru', 'scan_timestamp': 1700000042, 'scan_key': key}) == key
@@ -0,0 +1,100 @@
+import subprocess
+import sys
+import pytest
+import allure
+from pathlib import Path
+from unittest.mock import MagicMock
+from allure_commons.types import Severity
+from selenium.webdriver.remote.webelement import WebElement
+from config.settings import Settings
+from utils.file_utils import JSONLWriter, read_jsonl
+from utils.performance import measure_import_time
+
+PROJECT_ROOT = Path(__file__).parent.parent
+HEAVY_MODULES = ('selenium', 'PIL', 'numpy', 'pandas', 'fake_useragent', 'reportlab')
+
+
+@allure.epic("Startup")
+@allure.feature("Import budget")
+class TestStartup:
+
+    @allure.title("Test CLI entry points import without the browser stack")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    @pytest.mark.parametrize("module", ["main", "modules.reporting.report_generator", "modules.reporting.statistics"])
+    def test_import_budget(self, module):
+        """Тест бюджета времени импорта точек входа report/analyze"""
+
+        timing = measure_import_time(module, cwd=PROJECT_ROOT)
+
+        loaded_heavy = [name for name in timing['modules'] if name.split('.')[0] in HEAVY_MODULES]
+        assert loaded_heavy == [], f"{module} загружает {loaded_heavy[:5]}"
+        assert timing['total_ms'] < Settings.STARTUP_IMPORT_BUDGET_MS, timing['top']
+
+    @allure.title("Test importing settings has no filesystem side effects")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_settings_import_side_effect_free(self):
+        """Тест отсутствия создания каталогов при импорте Settings"""
+
+        script = (
+            "import pathlib; calls = []; "
+            "pathlib.Path.mkdir = lambda self, *a, **k: calls.append(self); "
+            "import config.settings; print(len(calls))"
+        )
+        completed = subprocess.run([sys.executable, "-c", script], cwd=PROJECT_ROOT,
+                                   capture_output=True, text=True, check=True)
+        assert completed.stdout.strip() == "0"
+
+    @allure.title("Test scan data survives a JSON Lines round trip")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_jsonl_roundtrip(self, tmp_path):
+        """Тест записи и чтения данных сканирования в JSON Lines"""
+
+        path = tmp_path / "scan_data.jsonl"
+        with JSONLWriter(path) as writer:
+            element = WebElement(MagicMock(), "f.1.d.2.e.3")
+            writer.write({'url': 'https://ria.ru/', 'detected_ads': [{'element': element, 'size': (300, 250)}]})
+            writer.write({'url': 'https://rbc.ru/', 'path': tmp_path})
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write("{broken\n")
+
+        records = list(read_jsonl(path))
+
+        assert len(records) == 2
+        assert records[0]['detected_ads'] == [{'element': None, 'size': [300, 250]}]
+        assert records[1]['path'] == str(tmp_path)
+
+        # Неизвестный тип — ошибка, а не молча записанный null
+        with JSONLWriter(tmp_path / "other.jsonl") as writer:
+            with pytest.raises(TypeError):
+                writer.write({'value': object()})
+
+    @allure.title("Test a URL as the first argument defaults to scan")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_default_command(self):
+        """Тест команды scan по умолчанию"""
+
+        from main import parse_args
+
+        assert parse_args(["https://site.ru/"]).urls == ["https://site.ru/"]
+        assert parse_args(["https://site.ru/"]).command == "scan"
+        assert parse_args([]).command == "scan"
+        assert parse_args(["report", "--input", "x.jsonl"]).command == "report"
+
+    @allure.title("Test analyze without saved scan data writes nothing")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_analyze_without_data(self, mock_config, tmp_path):
+        """Тест команды analyze без данных сканирования"""
+
+        import argparse
+        from main import command_analyze
+
+        mock_config.OUTPUT_DIR = tmp_path
+        mock_config.SCAN_DATA_PATH = tmp_path / "missing.jsonl"
+
+        assert command_analyze(mock_config, argparse.Namespace(input=None)) is None
+        assert not (tmp_path / "analysis.json").exists()
@@ -0,0 +1,95 @@
+import io
+import numpy as np
+import pytest
+import allure
+from PIL import Image
+from allure_commons.types import Severity
+from modules.screenshot.annotator import ScreenshotAnnotator
+from modules.screenshot.tiling import PNGStripReader, PNGStripWriter, image_strips
+
+ADS = [
+    {'id': 1, 'network': 'yandex_ads', 'confidence': 0.9,
+     'location': {'x': 40, 'y': 120}, 'size': {'width': 200, 'height': 150}},
+    {'id': 2, 'network': 'google_ads', 'confidence': 0.7,
+     'location': {'x': 300, 'y': 500}, 'size': {'width': 250, 'height': 90}}
+]
+
+
+def make_page(path, size=(640, 900), mode='RGB'):
+    """Шумная страница: PNG с адаптивными фильтрами (Sub/Up/Average/Paeth)"""
+    pixels = np.random.default_rng(7).integers(0, 256, (size[1], size[0], len(mode)), dtype=np.uint8)
+    pixels[:, ::3] //= 4
+    Image.fromarray(pixels, mode).save(path, optimize=True)
+    return path
+
+
+@pytest.fixture
+def tiled_annotator(mock_config):
+    mock_config.SCREENSHOT_STORAGE_ENABLED = False
+    mock_config.ANNOTATION_TILE_THRESHOLD = 0
+    mock_config.ANNOTATION_STRIP_HEIGHT = 64
+    return ScreenshotAnnotator(mock_config)
+
+
+@allure.epic("Screenshot")
+@allure.feature("Tiled Rendering")
+class TestTiling:
+
+    @allure.title("Test PNG strips round-trip through the streaming reader and writer")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_round_trip(self, tmp_path):
+        """Тест потокового чтения и записи PNG полосами"""
+
+        for mode in ('RGB', 'RGBA'):
+            source = make_page(tmp_path / f"page_{mode}.png", mode=mode)
+            reader = PNGStripReader(source)
+            strips = list(reader.strips(100))
+
+            assert reader.supported
+            assert [top for top, _ in strips] == list(range(0, 900, 100))
+            assert max(strip.height for _, strip in strips) == 100
+
+            output = tmp_path / f"copy_{mode}.png"
+            with PNGStripWriter(output, 640, 900) as writer:
+                for _, strip in strips:
+                    writer.write(strip)
+            assert Image.open(output).tobytes() == Image.open(source).convert('RGB').tobytes()
+
+        webp = io.BytesIO()
+        Image.open(source).save(webp, format='WEBP', lossless=True)
+        (tmp_path / "page.webp").write_bytes(webp.getvalue())
+        assert not PNGStripReader(tmp_path / "page.webp").supported
+        assert len(list(image_strips(tmp_path / "page.webp", 256))) == 4
+
+    @allure.title("Test tiled annotation matches rendering the whole page")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_tiled_annotation(self, tiled_annotator, mock_config, tmp_path):
+        """Тест совпадения полосовой и обычной отрисовки разметки"""
+
+        page = make_page(tmp_path / "page.png")
+        overlay = tiled_annotator.build_overlay(ADS, page)
+
+        tiled = tiled_annotator.render_overlay(overlay)
+        mock_config.ANNOTATION_TILE_THRESHOLD = 10 ** 6
+        whole = tiled_annotator.render_overlay(overlay, tmp_path / "whole.png")
+
+        assert tiled.endswith("annotated_page.png")
+        assert Image.open(tiled).tobytes() == Image.open(whole).tobytes()
+
+    @allure.title("Test tiled comparison matches the side-by-side image")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_tiled_comparison(self, tiled_annotator, mock_config, tmp_path):
+        """Тест полосового сравнительного изображения"""
+
+        page = make_page(tmp_path / "page.png")
+        annotated = tiled_annotator.annotate_ads_on_screenshot(str(page), ADS)
+
+        tiled = tiled_annotator.create_comparison_image(str(page), annotated, tmp_path / "tiled.png")
+        mock_config.ANNOTATION_TILE_THRESHOLD = 10 ** 6
+        whole = tiled_annotator.create_comparison_image(str(page), annotated, tmp_path / "whole.png")
+
+        assert Image.open(tiled).size == (1280, 900)
+        assert Image.open(tiled).tobytes() == Image.open(whole).tobytes()
@@ -0,0 +1,121 @@
+import argparse
+import json
+import pandas as pd
+import pytest
+import allure
+from allure_commons.types import Severity
+from config.settings import Settings
+from modules.reporting.url_analytics import URLAnalytics, iter_landings
+import main
+
+
+def write_scans(path, scans):
+    with open(path, 'w', encoding='utf-8') as f:
+        for scan in scans:
+            f.write(json.dumps(scan) + "\n")
+
+
+def interaction(url, network='yandex_ads', chain=()):
+    return {
+        'ad_data': {'network': network},
+        'interaction': {'current_url': url, 'redirect_chain': [{'url': hop, 'status': 302} for hop in chain]}
+    }
+
+
+@pytest.fixture
+def scan_file(tmp_path):
+    path = tmp_path / "scan_data.jsonl"
+    write_scans(path, [
+        {'main_domain': 'ria.ru', 'interaction_results': [
+            interaction("https://shop.ru/?utm_campaign=spring&utm_source=ya", chain=["https://clck.ru/abc"]),
+            interaction("https://shop.ru/?utm_campaign=spring&utm_source=ya"),
+            interaction("http://promo.xyz/login?utm_campaign=autumn", chain=["https://promo.xyz/r"])
+        ]},
+        {'main_domain': 'rbc.ru', 'interaction_results': [
+            interaction("https://store.ru/?utm_campaign=sale&gclid=1", network='google_ads',
+                        chain=["https://ad.doubleclick.net/c"]),
+            {'ad_data': {'network': 'google_ads'}, 'interaction': None}
+        ]}
+    ])
+    return path
+
+
+@allure.epic("Reporting")
+@allure.feature("URL Analytics")
+class TestURLAnalytics:
+
+    @allure.title("Test chunked aggregation gives campaign, tracking and risk summaries")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_summary(self, scan_file):
+        """Тест пакетной агрегации посадочных URL"""
+
+        analytics = URLAnalytics(Settings, chunk_size=2, max_workers=0)
+        summary = analytics.run([scan_file])
+
+        assert summary['total_urls'] == 4
+        assert analytics.chunks == 2
+        assert summary['redirect_share'] == 0.75
+        assert summary['tracking_redirect_share'] == round(2 / 3, 3)
+        assert summary['top_campaigns']['yandex_ads'][0] == {'campaign': 'spring', 'count': 2}
+        assert summary['risk_distribution'] == {'0-9': 3, '70-79': 1}
+        assert summary['top_landing_domains'] == {'shop.ru': 2, 'promo.xyz': 1, 'store.ru': 1}
+        table = analytics.summary_table()
+        assert table.loc['yandex_ads', 'top_campaign'] == 'spring'
+        assert table.loc['google_ads', 'tracking_share'] == 1.0
+
+    @allure.title("Test redirects without a recorded chain are derived or marked unknown")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_missing_redirect_chain(self, tmp_path):
+        """Тест результатов InteractionManagerV1 без цепочки редиректов"""
+
+        path = tmp_path / "scan_data.jsonl"
+        write_scans(path, [{'main_domain': 'ria.ru', 'interaction_results': [
+            {'ad_data': {'network': 'yandex_ads', 'attributes': {'href': "https://clck.ru/x"}},
+             'interaction': {'current_url': "https://shop.ru/"}},
+            {'ad_data': {'network': 'yandex_ads', 'attributes': {'href': "https://shop.ru/"}},
+             'interaction': {'current_url': "https://shop.ru/"}},
+            {'ad_data': {'network': 'yandex_ads'}, 'interaction': {'current_url': "https://shop.ru/"}}
+        ]}])
+
+        analytics = URLAnalytics(Settings, max_workers=0)
+        summary = analytics.run([path])
+
+        assert [row['redirect_known'] for row in iter_landings(path)] == [True, True, False]
+        assert summary['redirect_coverage'] == round(2 / 3, 3)
+        assert summary['redirect_share'] == 0.5
+
+        urls_only = tmp_path / "landings.txt"
+        urls_only.write_text("https://shop.ru/\n", encoding='utf-8')
+        summary = analytics.run([urls_only])
+        assert summary['redirect_share'] is None
+        assert summary['by_network'][0]['redirect_share'] is None
+
+        analytics.risk = analytics.risk.add(pd.Series({100: 1}), fill_value=0)
+        assert analytics.summarize()['risk_distribution'] == {'0-9': 1, '100': 1}
+
+    @allure.title("Test process pool gives the same result as in-process analysis")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_process_pool(self, scan_file, tmp_path):
+        """Тест разбора пачек в пуле процессов и сохранения сводки"""
+
+        urls_file = tmp_path / "landings.txt"
+        urls_file.write_text("https://store.ru/?utm_campaign=sale\n\n", encoding='utf-8')
+
+        expected = URLAnalytics(Settings, chunk_size=1, max_workers=0).run([scan_file, urls_file])
+        analytics = URLAnalytics(Settings, chunk_size=1, max_workers=2)
+        summary = analytics.run([scan_file, urls_file])
+
+        assert len(list(iter_landings(urls_file))) == 1
+        assert summary['total_urls'] == 5
+        for key in ('by_network', 'top_campaigns', 'risk_distribution', 'tracking_redirect_share'):
+            assert summary[key] == expected[key]
+        paths = analytics.save(summary, tmp_path / "reports")
+        assert json.loads(open(paths['summary'], encoding='utf-8').read())['total_urls'] == 5
+
+        # Отсутствующий файл — ошибка входа, а не «URL не найдены»
+        with pytest.raises(FileNotFoundError):
+            analytics.run([tmp_path / "missing.jsonl"])
+        assert main.command_urls(Settings, argparse.Namespace(input=[str(tmp_path / "missing.jsonl")])) is None
@@ -0,0 +1,72 @@
+import pytest
+import allure
+from allure_commons.types import Severity
+from modules.interaction.url_engine import URLAnalysisEngine
+from modules.interaction.url_analyzer import URLAnalyzer
+from modules.interaction.utm_analyzer import UTMAnalyzer
+
+AD_URL = (
+    "http://ad.doubleclick.net/click?utm_source=yandex&utm_medium=cpc&utm_campaign=spring%2520sale"
+    "&gclid=abc123&ref=main&utm_term=shoes"
+)
+
+
+@allure.epic("Interaction")
+@allure.feature("URL Analysis Engine")
+class TestURLAnalysisEngine:
+
+    @allure.title("Test a URL is parsed once into a compact record")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_record(self):
+        """Тест разбора URL в запись движка"""
+
+        record = URLAnalysisEngine(cache_size=16).analyze(AD_URL)
+
+        assert record.is_valid
+        assert record.netloc == 'ad.doubleclick.net'
+        assert dict(record.utm) == {
+            'utm_source': 'yandex', 'utm_medium': 'cpc',
+            'utm_campaign': 'spring%20sale', 'utm_term': 'shoes'
+        }
+        assert dict(record.click_ids) == {'gclid': 'abc123'}
+        assert set(record.tracking) == {'gclid', 'ref', 'utm_source'}
+        assert record.network == 'google_ads'
+        assert record.risk_score == 40
+        with pytest.raises(TypeError):
+            record.utm['utm_source'] = 'other'
+
+    @allure.title("Test batch analysis deduplicates through the LRU memo")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_batch(self):
+        """Тест пакетного разбора с кэшем"""
+
+        engine = URLAnalysisEngine(cache_size=16)
+        urls = [AD_URL, "https://shop.ru/?utm_source=vk", AD_URL, None]
+
+        records = engine.analyze_batch(urls)
+        summary = engine.summarize(records)
+
+        assert [r.url for r in records] == [AD_URL, "https://shop.ru/?utm_source=vk", AD_URL, '']
+        assert records[0] is records[2]
+        assert not records[3].is_valid
+        assert engine.cache_info().misses == 3
+        assert summary['with_utm'] == 3
+        assert summary['networks'] == {'google_ads': 2}
+
+    @allure.title("Test analyzers keep their output on top of the engine")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_analyzers(self):
+        """Тест совместимости URLAnalyzer и UTMAnalyzer"""
+
+        analysis = URLAnalyzer(URLAnalysisEngine(cache_size=16)).analyze_ad_url(AD_URL)
+
+        assert analysis['utm_analysis']['utm_completeness'] == 100
+        assert analysis['utm_analysis']['found_optional'] == ['utm_term']
+        assert analysis['security_analysis']['security_level'] == 'medium'
+        assert analysis['ad_network_indicators']['primary_network'] == 'google_ads'
+        assert analysis['parsed_components']['query_parameter_count'] == 6
+        assert analysis['redirect_analysis']['likely_redirect'] is False
+        assert UTMAnalyzer().extract_utm_params(AD_URL)['utm_campaign'] == 'spring sale'
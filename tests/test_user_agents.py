@@ -0,0 +1,58 @@
+import random
+import pytest
+import allure
+from collections import Counter
+from allure_commons.types import Severity
+from config.settings import Settings
+from config.user_agents import UserAgentPool
+from utils.performance import get_startup_report
+
+
+@allure.epic("Config")
+@allure.feature("User-Agent Pool")
+class TestUserAgentPool:
+
+    @allure.title("Test alias-method picks follow the corpus weights")
+    @allure.severity(Severity.CRITICAL)
+    @pytest.mark.unit
+    def test_weighted_pick(self):
+        """Тест взвешенного выбора методом псевдонимов"""
+
+        pool = UserAgentPool(['a', 'b', 'c', 'd'], [50, 30, 15, 5], rng=random.Random(7))
+
+        counts = Counter(pool.pick() for _ in range(40000))
+
+        for ua, share in (('a', 0.5), ('b', 0.3), ('c', 0.15), ('d', 0.05)):
+            assert abs(counts[ua] / 40000 - share) < 0.01
+        assert all(0.0 <= p <= 1.0 for p in pool._probability)
+
+    @allure.title("Test domain pinning is stable across pools and processes")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_domain_pinning(self):
+        """Тест закрепления User-Agent за доменом"""
+
+        agents = [f"ua{i}" for i in range(20)]
+        first = UserAgentPool(agents, seed="s1", rng=random.Random(1))
+        second = UserAgentPool(agents, seed="s1", rng=random.Random(2))
+        reseeded = UserAgentPool(agents, seed="s2")
+
+        domains = [f"site{i}.ru" for i in range(30)]
+        assert [first.pick(d) for d in domains] == [second.pick(d) for d in domains]
+        assert first.pick("ria.ru") == first.pick("RIA.ru")
+        assert [first.pick(d) for d in domains] != [reseeded.pick(d) for d in domains]
+
+    @allure.title("Test bundled corpus loads once and reports its cost")
+    @allure.severity(Severity.NORMAL)
+    @pytest.mark.unit
+    def test_bundled_corpus(self):
+        """Тест загрузки встроенного корпуса и замера инициализации"""
+
+        UserAgentPool.reset()
+        try:
+            pool = UserAgentPool.get(Settings)
+            assert UserAgentPool.get(Settings) is pool
+            assert all('Chrome/' in ua for ua in pool.user_agents)
+            assert 'user_agent_pool' in get_startup_report()
+        finally:
+            UserAgentPool.reset()
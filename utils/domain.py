@@ -0,0 +1,187 @@
+import ipaddress
+import logging
+import re
+import threading
+from functools import lru_cache
+from urllib.parse import urlsplit
+from config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# Служебные ключи узла префиксного дерева (в метках PSL не встречаются)
+_TERMINAL = '$'
+_EXCEPTION = '!'
+# Схема URL в начале строки: без неё вход считается хостом с путём
+_SCHEME = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*://')
+
+
+class PublicSuffixList:
+    """
+    Public Suffix List, собранный в префиксное дерево меток
+
+    Дерево строится один раз из config/public_suffix_list.dat: ключи —
+    метки домена справа налево, правила-исключения (!) хранятся в родителе
+    с префиксом «!», подстановки — под меткой «*». Поиск публичного
+    суффикса проходит не больше меток, чем в самом хосте.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, rules):
+        self.root = {}
+        self.rule_count = 0
+        for rule in rules:
+            self._add(rule)
+
+    def _add(self, rule):
+        exception = rule.startswith('!')
+        labels = rule.lstrip('!').split('.')[::-1]
+        node = self.root
+        for label in labels[:-1] if exception else labels:
+            node = node.setdefault(label, {})
+        if exception:
+            node[_EXCEPTION + labels[-1]] = True
+        else:
+            node[_TERMINAL] = True
+        self.rule_count += 1
+
+    @classmethod
+    def from_file(cls, path, include_private=True):
+        rules = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith('// ===BEGIN PRIVATE') and not include_private:
+                    break
+                if line and not line.startswith('//'):
+                    rules.append(_to_unicode(line.lower()))
+        return cls(rules)
+
+    @classmethod
+    def get(cls, config: Settings = Settings):
+        """Общее дерево процесса; строится при первом обращении"""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls.from_file(config.PUBLIC_SUFFIX_LIST_PATH, config.PUBLIC_SUFFIX_INCLUDE_PRIVATE)
+                    logger.debug(f"Public Suffix List: {cls._instance.rule_count} правил")
+        return cls._instance
+
+    def suffix_length(self, labels):
+        """
+        Число меток публичного суффикса
+
+        Args:
+            labels (list): Метки хоста справа налево
+
+        Returns:
+            int: Длина суффикса; для неизвестного TLD — 1 (правило «*»)
+        """
+        node = self.root
+        length = 1
+        for depth, label in enumerate(labels, 1):
+            if _EXCEPTION + label in node:
+                return depth - 1
+            child = node.get(label)
+            if child is None:
+                child = node.get('*')
+                if child is None:
+                    break
+            node = child
+            if _TERMINAL in node:
+                length = depth
+        return length
+
+
+def _to_unicode(host):
+    """Метки punycode (xn--) в Unicode; некорректные метки остаются как есть"""
+    if 'xn--' not in host:
+        return host
+    labels = []
+    for label in host.split('.'):
+        if label.startswith('xn--'):
+            try:
+                label = label.encode('ascii').decode('idna')
+            except UnicodeError:
+                pass
+        labels.append(label)
+    return '.'.join(labels)
+
+
+@lru_cache(maxsize=Settings.DOMAIN_CACHE_SIZE)
+def hostname(url_or_host):
+    """
+    Нормализованный хост URL или хоста
+
+    Нижний регистр, без схемы, порта, учётных данных и завершающей точки;
+    метки punycode переводятся в Unicode. Вход без схемы разбирается как
+    //хост/путь, поэтому «//» в пути или запросе не принимается за хост.
+
+    Returns:
+        str: Хост или пустая строка
+    """
+    if not url_or_host:
+        return ''
+    url = url_or_host.strip()
+    if not _SCHEME.match(url) and not url.startswith('//'):
+        url = '//' + url
+    try:
+        host = urlsplit(url).hostname or ''
+    except ValueError:
+        return ''
+    return _to_unicode(host.rstrip('.'))
+
+
+def _is_ip(host):
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+@lru_cache(maxsize=Settings.DOMAIN_CACHE_SIZE)
+def public_suffix(url_or_host):
+    """Публичный суффикс хоста: co.uk для news.bbc.co.uk"""
+    host = hostname(url_or_host)
+    if not host or _is_ip(host):
+        return ''
+    labels = host.split('.')[::-1]
+    return '.'.join(labels[:PublicSuffixList.get().suffix_length(labels)][::-1])
+
+
+@lru_cache(maxsize=Settings.DOMAIN_CACHE_SIZE)
+def registrable_domain(url_or_host):
+    """
+    Регистрируемый домен (eTLD+1): bbc.co.uk для https://news.bbc.co.uk/
+
+    IP-адреса и одиночные метки (localhost) возвращаются как есть; если
+    хост сам является публичным суффиксом, возвращается хост.
+
+    Returns:
+        str: Домен или пустая строка
+    """
+    host = hostname(url_or_host)
+    if not host or '.' not in host or _is_ip(host):
+        return host
+    labels = host.split('.')[::-1]
+    length = PublicSuffixList.get().suffix_length(labels)
+    if len(labels) <= length:
+        return host
+    return '.'.join(labels[:length + 1][::-1])
+
+
+def scan_key(url, started_at):
+    """
+    Ключ сканирования: <eTLD+1>_<время начала>
+
+    Один ключ на сканирование связывает манифест хранилища скриншотов,
+    файлы разметки и легенды с записью scan_data (поле scan_key).
+    """
+    return f"{registrable_domain(url) or 'scan'}_{int(started_at)}"
+
+
+def cache_clear():
+    for function in (hostname, public_suffix, registrable_domain):
+        function.cache_clear()
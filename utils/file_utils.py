@@ -0,0 +1,76 @@
+import json
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value):
+    """
+    Значения, которые json не сериализует: пути, множества, скаляры NumPy;
+    объекты WebDriver (элементы страницы) отбрасываются. Любой другой тип —
+    ошибка, а не молча записанный null.
+    """
+    if isinstance(value, Path):
+        return str(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    module = type(value).__module__
+    if module == 'numpy' and hasattr(value, 'item'):
+        return value.item()
+    if module.startswith('selenium.'):
+        return None
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def to_serializable(record):
+    """Копия записи только из JSON-типов (для передачи в другой процесс или на диск)"""
+    return json.loads(json.dumps(record, ensure_ascii=False, default=_json_default))
+
+
+class JSONLWriter:
+    """
+    Построчная запись JSON (JSON Lines)
+
+    Каждая запись сбрасывается на диск сразу, поэтому результаты уже
+    завершённых сканирований сохраняются даже при аварийном завершении.
+    """
+
+    def __init__(self, path, append=False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a' if append else 'w', encoding='utf-8')
+        self.count = 0
+
+    def write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False, default=_json_default) + "\n")
+        self._file.flush()
+        self.count += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def read_jsonl(path):
+    """
+    Чтение JSON Lines по одной записи; повреждённые строки пропускаются
+
+    Yields:
+        dict: Запись
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                logger.warning(f"{path}:{line_number}: строка пропущена ({str(e)})")
@@ -6,6 +6,7 @@ from config.settings import Settings
 def setup_logging():
     """Настройка логирования для всего приложения"""
     
+    Settings.ensure_directories()
     log_dir = Settings.LOG_DIR
     log_file = log_dir / "ad_parser.log"
     
@@ -0,0 +1,65 @@
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def measure_import_time(module, python=None, cwd=None):
+    """
+    Время импорта модуля в чистом интерпретаторе (python -X importtime)
+
+    Args:
+        module (str): Импортируемый модуль
+        python (str): Интерпретатор; по умолчанию текущий
+        cwd (str): Рабочий каталог (корень проекта)
+
+    Returns:
+        dict: total_ms, modules (все загруженные модули) и top (10 самых дорогих
+              по накопленному времени)
+    """
+    completed = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True, check=True
+    )
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append({
+                'module': name,
+                'self_ms': int(self_us) / 1000,
+                'cumulative_ms': int(cumulative_us) / 1000,
+                'depth': len(indent) // 2
+            })
+
+    total = next((e['cumulative_ms'] for e in reversed(entries) if e['module'] == module), 0.0)
+    top = sorted((e for e in entries if e['module'] != module), key=lambda e: e['cumulative_ms'], reverse=True)
+    return {
+        'total_ms': total,
+        'modules': {e['module'] for e in entries},
+        'top': top[:10]
+    }
+
+
+# Стоимость разовой инициализации подсистем в текущем процессе (мс)
+STARTUP_TIMINGS = {}
+
+
+@contextmanager
+def startup_timer(name):
+    """Замер разовой инициализации для отчёта о запуске"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS[name] = round((time.perf_counter() - started) * 1000, 2)
+
+
+def get_startup_report():
+    """Время инициализации подсистем, мс"""
+    return dict(STARTUP_TIMINGS)
@@ -1,6 +1,7 @@
 from urllib.parse import urlparse
 from typing import List, Optional
 import logging
+from utils.domain import hostname, registrable_domain
 
 class URLValidator:
     logger = logging.getLogger(__name__)
@@ -23,20 +24,18 @@ class URLValidator:
     @staticmethod
     def extract_domain(url, compare_url=None):
         try:
-            parsed = urlparse(url)
-            domain = parsed.hostname
-            if ':' in domain:
-                domain = domain.split(':')[0]
+            domain = hostname(url)
 
             if compare_url:
-                compare_parsed = urlparse(compare_url)
-                compare_domain = compare_parsed.hostname
-                if ':' in compare_domain:
-                    compare_domain = compare_domain.split(':')[0]
-                return domain == compare_domain
+                return domain == hostname(compare_url)
             else:
                 return domain
             
         except Exception as e:
             URLValidator.logger.warning(f"Ошибка извлечения домена из {url}: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def extract_registrable_domain(url):
+        """Регистрируемый домен (eTLD+1) — ключ группировки сайтов в отчётах"""
+        return registrable_domain(url) or None
\ No newline at end of file